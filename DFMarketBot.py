@@ -9,7 +9,13 @@ import platform
 import signal
 import sys
 
-import keyboard
+from src.utils.startup_profiler import finish_startup, startup_profiler
+
+# 设置 DFMB_PROFILE_STARTUP=1 时统计之后每个模块的导入耗时
+if startup_profiler.enabled:
+    startup_profiler.install_import_hook()
+
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication, QMainWindow
 
 from GUI.AppGUI import Ui_MainWindow
@@ -34,18 +40,22 @@ class MainWindow(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        self.ui = Ui_MainWindow()
-        self.ui.setupUi(self)
-        self.overlay = TransparentOverlay(self)
-        self.overlay.show()
+        with startup_profiler.stage("main_window"):
+            self.ui = Ui_MainWindow()
+            self.ui.setupUi(self)
+        with startup_profiler.stage("overlay"):
+            self.overlay = TransparentOverlay(self)
+            self.overlay.show()
 
-        # 初始化UI适配器
-        self.ui_adapter = UIAdapter(self.ui, self.overlay)
+        # 初始化UI适配器，交易服务在后台线程创建
+        with startup_profiler.stage("ui_adapter"):
+            self.ui_adapter = UIAdapter(self.ui, self.overlay)
 
         # 设置窗口属性
         self.setWindowTitle("V2")
         self.setFixedSize(self.size())
-        self.rolling_config_window = RollingConfigUI(self)
+        # 滚仓配置界面在打开时创建
+        self.rolling_config_window = None
 
         # 添加滚仓配置按钮
         self._add_rolling_config_button()
@@ -59,6 +69,8 @@ class MainWindow(QMainWindow):
         # 在Windows上使用keyboard库，macOS上跳过
         if platform.system() == "Windows":
             try:
+                import keyboard
+
                 # F8 - 开始
                 keyboard.add_hotkey("f8", self._start_trading)
 
@@ -114,7 +126,8 @@ class MainWindow(QMainWindow):
             self.ui_adapter.cleanup()
 
             # 清理热键
-            keyboard.unhook_all_hotkeys()
+            if "keyboard" in sys.modules:
+                sys.modules["keyboard"].unhook_all_hotkeys()
 
             event.accept()
         except Exception as e:
@@ -140,6 +153,8 @@ def main():
     # 创建主窗口
     window = MainWindow()
     window.show()
+    # 事件循环开始处理后界面即可响应
+    QTimer.singleShot(0, finish_startup)
 
     # 运行应用
     try:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DFMarketBot 命令行运行器
+
+不加载PyQt5和界面，直接驱动交易服务，适合无人值守运行：
+
+    python run_headless.py                          # 按 config/settings.yaml 运行
+    python run_headless.py --mode rolling --cycles 100
+
+Ctrl+C 停止交易。悬浮窗文本和错误输出到控制台，配置文件被修改后热更新。
+"""
+import argparse
+import signal
+import sys
+import threading
+from dataclasses import replace
+
+from src.config.config_factory import ConfigFactory
+from src.config.config_watcher import ConfigWatcher
+from src.config.trading_config import TradingMode
+from src.core.event_bus import event_bus
+from src.utils.metrics import Metric
+
+MODES = {"rolling": TradingMode.ROLLING, "hoarding": TradingMode.HOARDING}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DFMarketBot 命令行运行器")
+    parser.add_argument("--mode", choices=sorted(MODES), help="交易模式，默认使用配置文件中的模式")
+    parser.add_argument("--cycles", type=int, default=None, help="执行多少个周期后停止，默认不限制")
+    parser.add_argument("--no-watch", action="store_true", help="不监视配置文件的修改")
+    return parser.parse_args(argv)
+
+
+def print_summary() -> None:
+    """打印本次运行的指标汇总"""
+    snapshot = event_bus.metrics.snapshot()
+
+    def total(name: str) -> float:
+        summary = snapshot.get(name)
+        return summary.total if summary else 0
+
+    cycle = snapshot.get(Metric.CYCLE_MS)
+    print(
+        f"周期数: {cycle.count if cycle else 0}, 平均耗时: {cycle.mean if cycle else 0:.0f}ms, "
+        f"购买: {total(Metric.BUYS):.0f}, 盈利: {total(Metric.PROFIT):.0f}, 失败: {total(Metric.FAILURES):.0f}"
+    )
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    args = parse_args(argv)
+    event_bus.overlay_text_updated.connect(lambda text: print(f"[悬浮窗] {text}"))
+    event_bus.error_occurred.connect(lambda error: print(f"[错误] {error}"))
+
+    # 延迟导入，只查看帮助或参数错误时不加载截图和输入相关的依赖
+    from src.services.trading_runner import TradingRunner
+    from src.services.trading_service import TradingService
+
+    config_manager = ConfigFactory.get_config_manager()
+    try:
+        trading_service = TradingService()
+    except Exception as e:
+        print(f"交易服务创建失败: {e}")
+        return 1
+
+    runner = TradingRunner(trading_service, config_manager)
+    if args.mode:
+        runner.set_config(replace(config_manager.load_config(), trading_mode=MODES[args.mode]))
+
+    watcher = None
+    if not args.no_watch:
+        watcher = ConfigWatcher()
+        delay_manager = ConfigFactory.get_config_manager("delay")
+        for manager in (config_manager, delay_manager):
+            if hasattr(manager, "reload_from_file"):
+                watcher.watch(manager.config_path, manager.reload_from_file)
+        watcher.start()
+
+    def on_signal(signum, frame):
+        print("\n收到退出信号，正在停止交易...")
+        runner.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    # 交易循环在普通线程中运行，主线程等待时仍能及时处理 Ctrl+C
+    thread = threading.Thread(target=runner.run, kwargs={"max_cycles": args.cycles}, name="trading")
+    event_bus.emit_trading_started()
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if hasattr(config_manager, "flush"):
+            config_manager.flush()
+        print_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
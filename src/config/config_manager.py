@@ -2,12 +2,16 @@
 """
 配置管理模块
 """
+import atexit
 import os
+import threading
 import time
-from typing import Any, Dict, Type
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
+from .config_watcher import file_signature
 from .delay_config import DelayConfig
 from .serializer import ConfigSerializer, JsonSerializer, YamlSerializer
+from .write_behind import WriteBehind
 
 try:
     from src.core.exceptions import ConfigurationException
@@ -20,6 +24,9 @@ except ImportError:
 class BaseConfigManager(IConfigManager[TConfig]):
     """基础配置管理器"""
 
+    # 界面修改配置后静默多久再写文件（秒）
+    WRITE_DELAY = 0.5
+
     def __init__(self, config_path: str = None, serializer: ConfigSerializer = None):
         super().__init__(config_path)
         # 获取正确的基目录
@@ -41,6 +48,19 @@ class BaseConfigManager(IConfigManager[TConfig]):
         self._serializer = serializer
         self._last_modified = 0
         self._cached_config = None
+        # 延迟写回: stage_update 修改的配置先保存在内存，后台线程合并后写入文件
+        self._staged: Optional[TConfig] = None
+        self._flushing: Optional[TConfig] = None
+        self._stage_lock = threading.Lock()
+        # 保证同一时间只有一个线程写文件，且后写入的总是更新的配置
+        self._io_lock = threading.RLock()
+        self._writer: Optional[WriteBehind] = None
+        # 当前生效的配置快照，整体替换，读取方不需要加锁，也不应修改
+        self._snapshot: Optional[TConfig] = None
+        # 最近一次自己写入后的文件签名，监视到的修改与它相同时不重新加载
+        self._written_signature = None
+        # (回调, 是否只关心外部修改)
+        self._listeners: List[Tuple[Callable[[TConfig], None], bool]] = []
 
     def load_config(self) -> TConfig:
         raise NotImplementedError("Subclasses must implement this method")
@@ -64,15 +84,156 @@ class BaseConfigManager(IConfigManager[TConfig]):
             return self._create_default_config()
 
     def update_config(self, updates: Dict[str, Any]) -> TConfig:
-        """更新配置"""
+        """更新配置并立即写入文件，尚未写入的暂存修改一并写入"""
+        try:
+            with self._io_lock:
+                with self._stage_lock:
+                    staged, self._staged = self._staged, None
+                config_dict = self._config_to_dict(staged if staged is not None else self.load_config())
+                self._deep_update(config_dict, updates)
+                new_config = self._dict_to_config(config_dict, self._config_class())
+                self.save_config(new_config)
+                return new_config
+        except Exception as e:
+            raise ConfigurationException(f"更新配置失败: {e}") from e
+
+    def stage_update(self, updates: Dict[str, Any]) -> TConfig:
+        """
+        更新内存中的配置，稍后由后台线程写入文件
+
+        连续的修改只在内存中合并，最后一次修改静默 WRITE_DELAY 秒后写一次文件。
+        尚未写入期间 load_config 返回内存中的配置。
+
+        Returns:
+            更新后的配置
+        """
         try:
-            config_dict = self._config_to_dict(self.load_config())
+            with self._stage_lock:
+                base = self._unsaved_config()
+            if base is None:
+                # 没有暂存修改时以文件为准，文件被外部修改过会重新加载
+                base = self.reload_config()
+            config_dict = self._config_to_dict(base)
             self._deep_update(config_dict, updates)
             new_config = self._dict_to_config(config_dict, self._config_class())
-            self.save_config(new_config)
-            return new_config
         except Exception as e:
             raise ConfigurationException(f"更新配置失败: {e}") from e
+        with self._stage_lock:
+            self._staged = new_config
+            writer = self._get_writer()
+        writer.schedule()
+        self._publish(new_config)
+        return new_config
+
+    def flush(self) -> bool:
+        """
+        把暂存的修改立即写入文件
+
+        Returns:
+            是否有修改被写入
+        """
+        with self._io_lock:
+            with self._stage_lock:
+                staged, self._staged = self._staged, None
+                self._flushing = staged
+            if staged is None:
+                return False
+            try:
+                self.save_config(staged)
+            except Exception:
+                with self._stage_lock:
+                    # 写入失败时保留修改，下次写入重试
+                    if self._staged is None:
+                        self._staged = staged
+                raise
+            finally:
+                with self._stage_lock:
+                    self._flushing = None
+            return True
+
+    def snapshot(self) -> TConfig:
+        """当前生效的配置快照，热更新时整体替换"""
+        config = self._snapshot
+        if config is None:
+            config = self._snapshot = self.load_config()
+        return config
+
+    def subscribe(self, listener: Callable[[TConfig], None], external_only: bool = False) -> None:
+        """
+        订阅配置变化，以新的配置快照回调
+
+        Args:
+            listener: 回调，界面修改时在调用 stage_update 的线程、外部修改时在配置监视线程中调用
+            external_only: 只关心文件被外部修改，例如界面自身需要刷新显示
+        """
+        self.unsubscribe(listener)
+        self._listeners.append((listener, external_only))
+
+    def unsubscribe(self, listener: Callable[[TConfig], None]) -> None:
+        self._listeners = [item for item in self._listeners if item[0] != listener]
+
+    def reload_from_file(self) -> bool:
+        """
+        配置文件被外部修改后重新解析，由配置监视线程调用
+
+        解析或校验失败时继续使用原来的配置；界面还有尚未写入的修改时以界面为准，忽略这次外部修改。
+
+        Returns:
+            是否换用了新的配置
+        """
+        name = os.path.basename(self.config_path)
+        signature = file_signature(self.config_path)
+        if signature is None or signature == self._written_signature:
+            return False
+        if self.has_pending_writes():
+            print(f"{name} 被外部修改，但界面还有未保存的修改，忽略外部修改")
+            return False
+        try:
+            with self._io_lock:
+                config = self._dict_to_config(self._serializer.load(self.config_path), self._config_class())
+        except Exception as e:
+            print(f"{name} 修改无效，继续使用原配置: {e}")
+            return False
+        self._written_signature = signature
+        self._cached_config = config
+        self._last_modified = time.time()
+        print(f"{name} 已热更新")
+        self._publish(config, external=True)
+        return True
+
+    def _publish(self, config: TConfig, external: bool = False) -> None:
+        """替换配置快照并通知订阅者"""
+        self._snapshot = config
+        for listener, external_only in list(self._listeners):
+            if external_only and not external:
+                continue
+            try:
+                listener(config)
+            except Exception as e:
+                print(f"配置变化通知失败: {e}")
+
+    def has_pending_writes(self) -> bool:
+        """是否有尚未写入文件的修改"""
+        with self._stage_lock:
+            return self._unsaved_config() is not None
+
+    def write_stats(self) -> Dict[str, int]:
+        """延迟写回的请求次数和实际写入次数"""
+        with self._stage_lock:
+            writer = self._writer
+        return writer.stats() if writer is not None else {"requests": 0, "writes": 0, "failures": 0}
+
+    def _unsaved_config(self) -> Optional[TConfig]:
+        """尚未写入文件的最新配置（调用时需要持有 _stage_lock）"""
+        return self._staged if self._staged is not None else self._flushing
+
+    def _get_writer(self) -> WriteBehind:
+        """创建后台写入线程（调用时需要持有 _stage_lock），退出时写完未写入的修改"""
+        if self._writer is None:
+            name = os.path.basename(self.config_path)
+            self._writer = WriteBehind(self.flush, delay=self.WRITE_DELAY, name=f"{name} writer")
+            atexit.register(self._writer.close)
+        return self._writer
 
     def _config_class(self) -> Type[TConfig]:
         """获取配置类，子类实现"""
@@ -91,7 +252,11 @@ class BaseConfigManager(IConfigManager[TConfig]):
                 base_dict[key] = value
 
     def _load_config(self, config_class: Type[TConfig]) -> TConfig:
-        """通用配置加载方法"""
+        """通用配置加载方法，有尚未写入的修改时返回内存中的配置"""
+        with self._stage_lock:
+            unsaved = self._unsaved_config()
+        if unsaved is not None:
+            return unsaved
         try:
             if not os.path.exists(self.config_path):
                 # 如果配置文件不存在，创建默认配置
@@ -119,6 +284,11 @@ class BaseConfigManager(IConfigManager[TConfig]):
         """更新缓存"""
         self._cached_config = config
         self._last_modified = time.time()
+        with self._stage_lock:
+            # 写入期间界面又有新的修改时，快照保持为更新的配置
+            newer = self._staged
+        self._snapshot = newer if newer is not None else config
+        self._written_signature = file_signature(self.config_path)
 
 
 class TradingConfigManager(BaseConfigManager[TradingConfig]):
@@ -185,6 +355,10 @@ class DelayConfigManager(BaseConfigManager[DelayConfig]):
                     "after_option_switch": 0.05,
                     # 价格异常后重试的延迟，异常原因主要是配装时卡顿导致价格迟迟没有出现
                     "price_detection_retry": 0.05,
+                    # 购买之前的延迟(二次检测场景会在检测前执行延迟)
+                    "before_buy": 0.0,
+                    # 识别到可购买后，再执行一次延迟进行二次价格检测，主要是为了防止刷新太快买到高价子弹
+                    "second_price_detection_retry": 0.02,
                     # 点击购买按钮后，检测是否购买成功(也就是是否有弹窗)前的延迟，设置久一点让弹窗动画播完再检测
                     "after_buy": 2.0,
                     # 检测到购买失败(也就是有失败弹窗)后，按下esc退出后的延迟
@@ -207,6 +381,8 @@ class DelayConfigManager(BaseConfigManager[DelayConfig]):
                     "after_transfer_all": 1.0,
                     # 鼠标挪到待售卖物品后的延迟
                     "after_move_to_sell_item": 0.3,
+                    # 组合键（如 alt+d、ctrl+a）按下后保持的时间，约一帧，过短时游戏可能识别不到
+                    "chord_hold": 0.03,
                     # 鼠标右键点击待售卖物品后的延迟
                     "after_right_click_sell_item": 0.5,
                     # 等待出售窗口出现的延迟
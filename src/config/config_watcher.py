@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+配置文件监视
+
+在后台线程监视 settings.yaml、delay_config.yaml 等配置文件，文件被外部修改后回调对应的配置管理器，
+由管理器在监视线程中解析、校验并换用新的配置快照，交易线程不需要每次读取配置时检查文件。
+
+安装了 watchdog 时使用系统的文件通知（Linux 上为 inotify），收到通知立即检查；
+没有 watchdog 时退化为定时轮询文件的修改时间和大小。
+"""
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (修改时间ns, 大小)，文件不存在时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """收到被监视文件的通知时唤醒监视线程"""
+
+    def __init__(self, watcher: "ConfigWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        paths = (getattr(event, "src_path", None), getattr(event, "dest_path", None))
+        if any(path and os.path.abspath(path) in self._watcher.watched_paths() for path in paths):
+            self._watcher.wake()
+
+
+class ConfigWatcher:
+    """监视配置文件，文件内容稳定后回调"""
+
+    def __init__(self, interval: float = 1.0, settle: float = 0.2, use_native: bool = True):
+        """
+        Args:
+            interval: 轮询间隔（秒），使用系统通知时只作为兜底检查
+            settle: 检测到修改后等待多久确认文件不再变化（编辑器保存可能分多次写入）
+            use_native: 安装了 watchdog 时是否使用系统文件通知
+        """
+        self.interval = interval
+        self.settle = settle
+        self.use_native = use_native and Observer is not None
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def watch(self, path: str, callback: Callable[[], None]) -> None:
+        """
+        监视文件
+
+        Args:
+            path: 文件路径
+            callback: 文件被修改且内容稳定后在监视线程中调用
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._callbacks.setdefault(path, []).append(callback)
+            self._signatures.setdefault(path, file_signature(path))
+        if self._observer is not None:
+            self._observer.schedule(_WakeHandler(self), os.path.dirname(path), recursive=False)
+
+    def watched_paths(self) -> Tuple[str, ...]:
+        with self._lock:
+            return tuple(self._callbacks)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动监视线程"""
+        if self.running:
+            return
+        self._stop.clear()
+        if self.use_native:
+            try:
+                self._observer = Observer()
+                for directory in {os.path.dirname(path) for path in self.watched_paths()}:
+                    self._observer.schedule(_WakeHandler(self), directory, recursive=False)
+                self._observer.start()
+            except Exception as e:
+                print(f"文件通知不可用，改为轮询: {e}")
+                self._observer = None
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """停止监视"""
+        self._stop.set()
+        self._wake.set()
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout)
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def wake(self) -> None:
+        """立即检查一次，由文件通知调用"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        # 使用系统通知时轮询只作为兜底，间隔放宽
+        interval = self.interval * 5 if self._observer is not None else self.interval
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            self.check()
+
+    def check(self) -> List[str]:
+        """
+        检查所有文件，回调内容已稳定的修改
+
+        Returns:
+            发生修改的文件
+        """
+        changed = []
+        with self._lock:
+            paths = list(self._callbacks)
+        for path in paths:
+            signature = file_signature(path)
+            if signature == self._signatures.get(path):
+                continue
+            # 等文件写完，期间还在变化则留到下次检查
+            if self.settle > 0 and self._stop.wait(self.settle):
+                return changed
+            if file_signature(path) != signature:
+                continue
+            self._signatures[path] = signature
+            if signature is None:
+                # 保存时先删后写的编辑器会短暂删除文件，等文件重新出现
+                continue
+            changed.append(path)
+            with self._lock:
+                callbacks = list(self._callbacks.get(path, ()))
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"配置热更新失败({os.path.basename(path)}): {e}")
+        return changed
@@ -1,8 +1,86 @@
 # -*- coding: utf-8 -*-
 """
 坐标配置
+
+COORDINATES 中是以 2560x1440 为基准的比例坐标。CoordinateConfig.compile 按 (宽, 高, 窗口偏移)
+把它编译成只读的坐标表并缓存，同一分辨率下的检测器、模拟游戏共用一份，不再每次构造时递归还原。
+
+坐标表包含两份视图：
+- coordinates: 窗口内坐标（Point/Region），用于和识别出的位置做加减
+- screen: 已加上窗口偏移的屏幕坐标（ScreenPoint/ScreenRegion），执行器和截图直接使用，不再逐次换算
 """
-from typing import Dict
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class Point(NamedTuple):
+    """窗口内的点坐标"""
+
+    x: int
+    y: int
+
+
+class Region(NamedTuple):
+    """窗口内的区域坐标，顺序与配置一致"""
+
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
+
+class ScreenPoint(Point):
+    """已加上窗口偏移的屏幕点坐标，执行器直接使用"""
+
+    __slots__ = ()
+
+
+class ScreenRegion(Region):
+    """已加上窗口偏移并规范为左上、右下顺序的屏幕区域坐标，截图直接使用"""
+
+    __slots__ = ()
+
+
+class CoordinateGroup(Mapping):
+    """一组编译好的坐标，可以按属性或按名称访问，编译后不可修改"""
+
+    def __init__(self, entries: Mapping):
+        for name, value in entries.items():
+            self.__dict__[name] = CoordinateGroup(value) if isinstance(value, Mapping) else value
+
+    def __getitem__(self, name: str) -> Any:
+        return self.__dict__[name]
+
+    def __iter__(self):
+        return iter(self.__dict__)
+
+    def __len__(self) -> int:
+        return len(self.__dict__)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("编译后的坐标不可修改")
+
+    def __repr__(self) -> str:
+        return f"CoordinateGroup({self.__dict__!r})"
+
+
+class CoordinateTable:
+    """按分辨率和窗口偏移编译好的坐标表"""
+
+    __slots__ = ("width", "height", "offset", "coordinates", "screen")
+
+    def __init__(
+        self, width: int, height: int, offset: Tuple[int, int], coordinates: CoordinateGroup, screen: CoordinateGroup
+    ):
+        self.width = width
+        self.height = height
+        self.offset = offset
+        self.coordinates = coordinates
+        self.screen = screen
+
+    def __repr__(self) -> str:
+        return f"CoordinateTable({self.width}x{self.height}, offset={self.offset})"
 
 
 class CoordinateConfig:
@@ -96,44 +174,80 @@ class CoordinateConfig:
         "enter_game": [744 / 2560, 584 / 1440],
     }
 
+    # 表示位移或尺寸而不是位置的坐标，屏幕坐标中不加窗口偏移
+    VECTOR_KEYS = frozenset({"item_range", "item_sell_offset"})
+
+    _tables: Dict[Tuple[int, int, Tuple[int, int]], CoordinateTable] = {}
+    _tables_lock = threading.Lock()
+
     @classmethod
-    def restore_coordinates(cls, target_width: int = 2560, target_height: int = 1440) -> Dict:
-        """将比例坐标还原为目标分辨率下的绝对像素坐标
+    def compile(
+        cls, width: int = 2560, height: int = 1440, offset: Optional[Tuple[int, int]] = None
+    ) -> CoordinateTable:
+        """获取指定分辨率和窗口偏移下的坐标表，同一参数只编译一次
 
         Args:
-            target_width: 目标宽度（像素）
-            target_height: 目标高度（像素）
+            width: 目标宽度（像素）
+            height: 目标高度（像素）
+            offset: 窗口左上角的屏幕坐标，全屏时为None
 
         Returns:
-            包含绝对像素坐标的配置字典
+            坐标表
         """
+        key = (int(width), int(height), (int(offset[0]), int(offset[1])) if offset else (0, 0))
+        table = cls._tables.get(key)
+        if table is None:
+            with cls._tables_lock:
+                table = cls._tables.get(key)
+                if table is None:
+                    table = cls._tables[key] = cls._compile_table(*key)
+        return table
 
-        def restore_coord(coord):
+    @classmethod
+    def _compile_table(cls, width: int, height: int, offset: Tuple[int, int]) -> CoordinateTable:
+        def restore(coord):
             # 大于1的认为是绝对坐标，不处理
             if coord[0] > 1 or coord[1] > 1:
-                return coord
-            if isinstance(coord, list):
-                return [int(coord[i] * (target_width if i % 2 == 0 else target_height)) for i in range(len(coord))]
-            if isinstance(coord, tuple):
-                return tuple(int(coord[i] * (target_width if i % 2 == 0 else target_height)) for i in range(len(coord)))
-            return coord
-
-        # 递归处理所有坐标
-        def restore_dict(d):
-            result = {}
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    result[k] = restore_dict(v)
-                elif isinstance(v, list):
-                    if all(isinstance(item, (int, float)) for item in v):
-                        result[k] = restore_coord(v)
-                    else:
-                        result[k] = [restore_coord(item) if isinstance(item, (list, tuple)) else item for item in v]
-                else:
-                    result[k] = v
-            return result
-
-        return restore_dict(cls.COORDINATES)
+                return tuple(int(value) for value in coord)
+            return tuple(int(value * (width if i % 2 == 0 else height)) for i, value in enumerate(coord))
+
+        def compile_value(name, value, screen):
+            if isinstance(value, dict):
+                return {key: compile_value(key, item, screen) for key, item in value.items()}
+            if not all(isinstance(item, (int, float)) for item in value):
+                return tuple(compile_value(name, item, screen) for item in value)
+            coord = restore(value)
+            if len(coord) == 2:
+                if not screen or name in cls.VECTOR_KEYS:
+                    return Point(*coord)
+                return ScreenPoint(coord[0] + offset[0], coord[1] + offset[1])
+            if not screen:
+                return Region(*coord)
+            x1, y1, x2, y2 = coord
+            return ScreenRegion(
+                min(x1, x2) + offset[0], min(y1, y2) + offset[1], max(x1, x2) + offset[0], max(y1, y2) + offset[1]
+            )
+
+        return CoordinateTable(
+            width,
+            height,
+            offset,
+            CoordinateGroup(compile_value(None, cls.COORDINATES, screen=False)),
+            CoordinateGroup(compile_value(None, cls.COORDINATES, screen=True)),
+        )
+
+    @classmethod
+    def restore_coordinates(cls, target_width: int = 2560, target_height: int = 1440) -> CoordinateGroup:
+        """将比例坐标还原为目标分辨率下的绝对像素坐标
+
+        Args:
+            target_width: 目标宽度（像素）
+            target_height: 目标高度（像素）
+
+        Returns:
+            窗口内坐标，与 compile(target_width, target_height).coordinates 相同
+        """
+        return cls.compile(target_width, target_height).coordinates
 
 
 if __name__ == "__main__":
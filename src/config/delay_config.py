@@ -2,8 +2,8 @@
 """
 延迟配置数据类和管理器
 """
-from dataclasses import asdict, dataclass
-from typing import Any, Dict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -11,13 +11,19 @@ class DelayConfig:
     """延迟配置数据类"""
 
     delays: Dict[str, Dict[str, float]]
+    # 自动调优学习到的延迟，按模式/操作保存，不覆盖手工配置的 delays
+    tuned: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # 按模式开关自动调优
+    auto_tune: Dict[str, bool] = field(default_factory=dict)
 
     def __post_init__(self):
         """验证配置参数"""
         if not isinstance(self.delays, dict):
             raise ValueError("延迟配置必须是字典类型")
+        if not isinstance(self.tuned, dict) or not isinstance(self.auto_tune, dict):
+            raise ValueError("调优配置必须是字典类型")
 
-        for mode, operations in self.delays.items():
+        for mode, operations in list(self.delays.items()) + list(self.tuned.items()):
             if not isinstance(mode, str):
                 raise ValueError(f"交易模式名称必须是字符串: {mode}")
             if not isinstance(operations, dict):
@@ -75,6 +81,20 @@ class DelayConfig:
             self.delays[mode] = {}
         self.delays[mode][operation] = float(delay)
 
+    def get_tuned_delay(self, mode: str, operation: str) -> Optional[float]:
+        """获取自动调优学习到的延迟，不存在时返回None"""
+        return self.tuned.get(mode, {}).get(operation)
+
+    def set_tuned_delay(self, mode: str, operation: str, delay: float) -> None:
+        """记录自动调优学习到的延迟"""
+        if delay < 0:
+            raise ValueError(f"延迟时间不能为负数: {delay}")
+        self.tuned.setdefault(mode, {})[operation] = round(float(delay), 4)
+
+    def is_auto_tune(self, mode: str) -> bool:
+        """指定模式是否开启自动调优"""
+        return bool(self.auto_tune.get(mode, False))
+
     def get_mode_delays(self, mode: str) -> Dict[str, float]:
         """获取指定模式的所有延迟配置
 
@@ -184,7 +204,7 @@ class DelayConfig:
         if "delays" not in data:
             raise ValueError("配置数据中缺少 'delays' 字段")
 
-        return cls(delays=data["delays"])
+        return cls(delays=data["delays"], tuned=data.get("tuned") or {}, auto_tune=data.get("auto_tune") or {})
 
     def __str__(self) -> str:
         """字符串表示"""
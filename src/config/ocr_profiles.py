@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+OCR字段配置
+
+每个识别字段（价格、余额、最低售价等）的截图区域、字体、二值化、阈值、数值位数/范围和重试策略
+在 DEFAULT_OCR_PROFILES 中声明，不同分辨率的差异写在 resolutions 中，键为 "宽x高" 或屏幕宽度。
+
+config/ocr_profiles.yaml 存在时按字段覆盖默认值，调整参数不需要改代码，例如:
+
+    min_sell_price:
+      thresh: 60
+      resolutions:
+        1920: {font: g, binarize: false}
+
+OCRProfiles.compile 按分辨率合并一次并缓存，检测器按字段名通用地读取数值，
+识别时只匹配字段指定的字体模板。
+"""
+import os
+import threading
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .config_watcher import file_signature
+from .coordinates import CoordinateConfig, Region
+from .serializer import YamlSerializer
+
+DEFAULT_OCR_PROFILES: Dict[str, Dict[str, Any]] = {
+    # 滚仓模式购买价格
+    "rolling_price": {"area": "rolling_mode.price_area", "resolutions": {1920: {"thresh": 80}}},
+    # 屯仓模式购买价格（可兑换/不可兑换物品）
+    "hoarding_price_convertible": {
+        "area": "price_detection.convertible",
+        "binarize": False,
+        "resolutions": {1920: {"thresh": 80}},
+    },
+    "hoarding_price_non_convertible": {
+        "area": "price_detection.non_convertible",
+        "binarize": False,
+        "resolutions": {1920: {"thresh": 80}},
+    },
+    # 哈夫币余额
+    "balance": {"area": "balance_detection", "font": "w", "thresh": 100},
+    # 交易行当前最低售价，也用于判断上架界面是否已显示
+    "min_sell_price": {
+        "area": "rolling_mode.min_sell_price_area",
+        "font": "w",
+        "thresh": 50,
+        "resolutions": {1920: {"font": "g", "binarize": False}},
+    },
+    # 最低售价的挂单数量
+    "min_sell_price_count": {
+        "area": "rolling_mode.min_sell_price_count_area",
+        "font": "w",
+        "binarize": False,
+        "resolutions": {1920: {"font": "c"}},
+    },
+    # 售卖期望收益
+    "expected_revenue": {
+        "area": "rolling_mode.expected_revenue_area",
+        "font": "w",
+        "binarize": False,
+        "resolutions": {1920: {"font": "g"}},
+    },
+    # 售卖价格输入框
+    "current_sell_price": {"area": "rolling_mode.sell_price_text_area", "font": "w"},
+    # 售卖总价
+    "total_sell_price": {"area": "rolling_mode.total_sell_price_area", "font": "w", "thresh": 80},
+    # 上架栏位 "已上架/总数"，识别结果为文本，不重试
+    "sell_num": {"area": "rolling_mode.sell_full", "font": "w", "binarize": False, "retries": 1},
+}
+
+
+@dataclass(frozen=True)
+class OCRProfile:
+    """一个识别字段在当前分辨率下的参数"""
+
+    name: str
+    # 坐标表中的区域路径，例如 "rolling_mode.min_sell_price_area"
+    area: str
+    # 只匹配这一组字体模板，空字符串时匹配全部字体
+    font: str = ""
+    binarize: bool = True
+    thresh: int = 127
+    # 识别结果的位数和取值范围，不满足时视为识别失败并重试，None为不限制
+    min_digits: int = 1
+    max_digits: Optional[int] = None
+    min_value: Optional[int] = None
+    max_value: Optional[int] = None
+    # 识别失败时最多识别几次，以及两次之间的间隔（秒）
+    retries: int = 30
+    retry_interval: float = 0.005
+
+    def __post_init__(self):
+        """验证参数"""
+        if not isinstance(self.area, str) or not self.area:
+            raise ValueError(f"OCR字段[{self.name}]缺少截图区域")
+        if not isinstance(self.font, str):
+            raise ValueError(f"OCR字段[{self.name}]的字体必须是字符串: {self.font}")
+        if not 0 <= self.thresh <= 255:
+            raise ValueError(f"OCR字段[{self.name}]的阈值必须在0-255之间: {self.thresh}")
+        if self.retries < 1:
+            raise ValueError(f"OCR字段[{self.name}]的识别次数至少为1: {self.retries}")
+        if self.retry_interval < 0:
+            raise ValueError(f"OCR字段[{self.name}]的重试间隔不能为负数: {self.retry_interval}")
+        if self.max_digits is not None and self.max_digits < self.min_digits:
+            raise ValueError(f"OCR字段[{self.name}]的位数范围无效: {self.min_digits}-{self.max_digits}")
+
+    def accepts(self, value: int) -> bool:
+        """识别出的数值是否满足位数和取值范围"""
+        digits = len(str(value))
+        if digits < self.min_digits or (self.max_digits is not None and digits > self.max_digits):
+            return False
+        if self.min_value is not None and value < self.min_value:
+            return False
+        return self.max_value is None or value <= self.max_value
+
+
+PROFILE_FIELDS = frozenset(item.name for item in fields(OCRProfile)) - {"name"}
+
+
+class OCRProfiles:
+    """按分辨率编译OCR字段配置"""
+
+    _compiled: Dict[Tuple[int, int, str, Any], Mapping[str, OCRProfile]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def default_path() -> str:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        return os.path.join(base_dir, "config", "ocr_profiles.yaml")
+
+    @classmethod
+    def compile(cls, width: int, height: int, path: Optional[str] = None) -> Mapping[str, OCRProfile]:
+        """
+        获取指定分辨率下的全部字段配置，覆盖文件修改后重新编译
+
+        Args:
+            width: 屏幕宽度
+            height: 屏幕高度
+            path: 覆盖文件路径，默认 config/ocr_profiles.yaml
+
+        Returns:
+            字段名到 OCRProfile 的只读映射
+        """
+        path = path or cls.default_path()
+        key = (int(width), int(height), path, file_signature(path))
+        profiles = cls._compiled.get(key)
+        if profiles is None:
+            with cls._lock:
+                profiles = cls._compiled.get(key)
+                if profiles is None:
+                    profiles = cls._compiled[key] = cls._compile(key[0], key[1], cls._load_overrides(path))
+        return profiles
+
+    @staticmethod
+    def _load_overrides(path: str) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            data = YamlSerializer().load(path)
+        except Exception as e:
+            print(f"警告: 加载OCR字段配置失败，使用默认配置: {e}")
+            return {}
+        if not isinstance(data, dict):
+            print("警告: OCR字段配置必须是字典类型，使用默认配置")
+            return {}
+        return data
+
+    @classmethod
+    def _compile(cls, width: int, height: int, overrides: Dict[str, Dict[str, Any]]) -> Mapping[str, OCRProfile]:
+        coordinates = CoordinateConfig.compile(width, height).coordinates
+        profiles = {}
+        for name in list(DEFAULT_OCR_PROFILES) + [name for name in overrides if name not in DEFAULT_OCR_PROFILES]:
+            default = DEFAULT_OCR_PROFILES.get(name, {})
+            try:
+                profile = cls._build(name, width, height, default, overrides.get(name) or {})
+                cls.resolve_area(coordinates, profile)
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                print(f"警告: OCR字段[{name}]配置无效，使用默认配置: {e}")
+                if not default:
+                    continue
+                profile = cls._build(name, width, height, default, {})
+            profiles[name] = profile
+        return MappingProxyType(profiles)
+
+    @staticmethod
+    def _build(name: str, width: int, height: int, default: Dict[str, Any], override: Dict[str, Any]) -> OCRProfile:
+        values: Dict[str, Any] = {}
+        for layer in (default, override):
+            resolutions = layer.get("resolutions") or {}
+            # 按屏幕宽度的差异先合并，完整分辨率的差异优先
+            layers = (layer, resolutions.get(width), resolutions.get(str(width)), resolutions.get(f"{width}x{height}"))
+            for values_layer in layers:
+                for key, value in (values_layer or {}).items():
+                    if key == "resolutions":
+                        continue
+                    if key not in PROFILE_FIELDS:
+                        raise ValueError(f"未知参数: {key}")
+                    values[key] = value
+        return OCRProfile(name=name, **values)
+
+    @staticmethod
+    def resolve_area(coordinates: Mapping, profile: OCRProfile) -> Region:
+        """
+        字段在坐标表中的截图区域
+
+        Args:
+            coordinates: 坐标表的窗口坐标或屏幕坐标
+            profile: 字段配置
+        """
+        value = coordinates
+        for part in profile.area.split("."):
+            value = value[part]
+        if not isinstance(value, Region):
+            raise ValueError(f"{profile.area} 不是区域坐标")
+        return value
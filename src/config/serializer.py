@@ -1,10 +1,30 @@
 import json
+import os
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict, TextIO
 
 from ruamel.yaml import YAML
 
 
+def atomic_write(file_path: str, dump: Callable[[TextIO], None]) -> None:
+    """先写同目录下的临时文件再替换，写入中途失败或退出不会留下半个配置文件"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            dump(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 class ConfigSerializer(ABC):
     """配置序列化器抽象基类"""
 
@@ -39,13 +59,21 @@ class YamlSerializer(ConfigSerializer):
 
         # 逐层更新，而不是覆盖掉整个 dict，这样能尽量保持注释位置
         if isinstance(old_data, dict):
-            old_data.update(data)
+            self._merge(old_data, data)
             new_data = old_data
         else:
             new_data = data
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            self.yaml.dump(new_data, f)
+        atomic_write(file_path, lambda f: self.yaml.dump(new_data, f))
+
+    @classmethod
+    def _merge(cls, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """把 new 递归合并进 old，嵌套字典原地更新以保留其中的注释"""
+        for key, value in new.items():
+            if isinstance(value, dict) and isinstance(old.get(key), dict):
+                cls._merge(old[key], value)
+            else:
+                old[key] = value
 
 
 class JsonSerializer(ConfigSerializer):
@@ -56,5 +84,4 @@ class JsonSerializer(ConfigSerializer):
             return json.load(f)
 
     def save(self, file_path: str, data: Dict[str, Any]):
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        atomic_write(file_path, lambda f: json.dump(data, f, indent=2, ensure_ascii=False))
@@ -39,6 +39,10 @@ class TradingConfig:
     second_detect: bool = False
     switch_to_battlefield: bool = False
     switch_to_battlefield_count: int = 300
+    record_session: bool = False  # 记录截图/OCR/动作到 sessions 目录，用于回放排查
+    event_driven_waits: bool = False  # 滚仓模式按界面状态结束等待，配置的延迟作为超时
+    overlap_detection: bool = False  # 滚仓模式先截图再在后台识别，识别与后续鼠标键盘操作并行
+    action_executor: str = "pyautogui"  # 动作执行器后端: pyautogui / low_latency
 
     def __post_init__(self):
         """验证配置参数"""
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+延迟写回
+
+界面每次输入都会修改配置，如果每次都同步写文件，打一个价格就要做多次YAML读写。
+WriteBehind 把短时间内的多次写入请求合并，在最后一次请求之后静默 delay 秒再由后台线程写一次，
+退出前调用 flush 把尚未写入的修改同步写完。
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class WriteBehind:
+    """合并短时间内的多次写入请求，在后台线程延迟执行一次写入"""
+
+    def __init__(self, write: Callable[[], Any], delay: float = 0.5, name: str = "config-writer"):
+        """
+        Args:
+            write: 实际的写入函数，需要可重复调用，没有待写入内容时直接返回
+            delay: 最后一次请求之后等待多久再写入（秒）
+            name: 后台线程名称
+        """
+        self._write = write
+        self.delay = delay
+        self.name = name
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pending = False
+        self._deadline = 0.0
+        self._closed = False
+        self._stats = {"requests": 0, "writes": 0, "failures": 0}
+
+    def schedule(self) -> None:
+        """请求一次写入，delay 秒内的后续请求会推迟并合并到同一次写入"""
+        with self._cond:
+            self._pending = True
+            self._deadline = time.monotonic() + self.delay
+            self._stats["requests"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # 静默期内有新的请求时继续等待
+                remaining = self._deadline - time.monotonic()
+                while remaining > 0 and self._pending and not self._closed:
+                    self._cond.wait(remaining)
+                    remaining = self._deadline - time.monotonic()
+                if not self._pending:
+                    continue
+                self._pending = False
+            self._do_write()
+
+    def _do_write(self) -> None:
+        try:
+            self._write()
+            with self._cond:
+                self._stats["writes"] += 1
+        except Exception as e:
+            with self._cond:
+                self._stats["failures"] += 1
+            print(f"{self.name} 写入失败: {e}")
+
+    def flush(self) -> None:
+        """在调用线程立即执行尚未完成的写入"""
+        with self._cond:
+            pending, self._pending = self._pending, False
+        if pending:
+            self._do_write()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """写完尚未完成的写入并结束后台线程"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def has_pending(self) -> bool:
+        with self._cond:
+            return self._pending
+
+    def stats(self) -> Dict[str, int]:
+        """写入请求次数、实际写入次数和失败次数"""
+        with self._cond:
+            return dict(self._stats)
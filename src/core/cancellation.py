@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+协作式取消
+
+交易线程中的所有等待都通过取消令牌的 Event.wait 实现，停止交易时令牌被取消，
+正在进行的等待立即返回，而不是睡满配置的延迟，按下停止键后几十毫秒内即可退出。
+
+状态机还可以为当前线程设置截止时刻，到期后令牌上的检查和等待抛出 DeadlineExceededException，
+卡在等待循环里的状态不会无限期运行。截止时刻按线程保存，不影响后台识别线程。
+"""
+import threading
+import time
+from typing import Optional
+
+try:
+    from src.core.exceptions import DeadlineExceededException, OperationCancelledException
+except ImportError:
+    from ..core.exceptions import DeadlineExceededException, OperationCancelledException
+
+
+class CancellationToken:
+    """基于 threading.Event 的取消令牌"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        # 当前线程的截止时刻（time.perf_counter）
+        self._local = threading.local()
+
+    def cancel(self) -> None:
+        """取消，唤醒所有正在等待的线程"""
+        self._event.set()
+
+    def reset(self) -> None:
+        """重新开始交易前复位"""
+        self._event.clear()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def set_deadline(self, deadline: Optional[float]) -> None:
+        """设置当前线程的截止时刻（time.perf_counter），None 为不限制"""
+        self._local.deadline = deadline
+
+    def remaining(self) -> Optional[float]:
+        """距离当前线程截止时刻的秒数，没有截止时刻时返回None"""
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is None:
+            return None
+        return deadline - time.perf_counter()
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        可中断的等待
+
+        Returns:
+            是否睡满了指定时间，期间被取消返回False
+        """
+        if seconds <= 0:
+            return not self._event.is_set()
+        return not self._event.wait(seconds)
+
+    def raise_if_cancelled(self) -> None:
+        """
+        已取消或超过截止时刻时抛出异常
+
+        Raises:
+            OperationCancelledException: 令牌已取消
+            DeadlineExceededException: 超过了当前线程的截止时刻
+        """
+        if self._event.is_set():
+            raise OperationCancelledException("操作已取消")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededException("超过状态允许的时间")
+
+    def checked_sleep(self, seconds: float) -> None:
+        """
+        等待指定时间，期间被取消时抛出异常，用于不能在停止后继续执行的输入序列
+
+        Raises:
+            OperationCancelledException: 等待前或等待期间令牌被取消
+            DeadlineExceededException: 等待会超过当前线程的截止时刻，等到截止时刻后抛出
+        """
+        remaining = self.remaining()
+        if remaining is None or seconds <= remaining:
+            if not self.sleep(seconds):
+                raise OperationCancelledException("操作已取消")
+            return
+        if not self.sleep(remaining):
+            raise OperationCancelledException("操作已取消")
+        raise DeadlineExceededException("超过状态允许的时间")
+
+
+# 全局停止令牌，交易线程中的等待都使用它
+stop_token = CancellationToken()
@@ -1,14 +1,173 @@
 # -*- coding: utf-8 -*-
 """
 事件总线 - 实现组件间解耦通信
+
+悬浮窗文本和耗时分解这类只关心最新值的事件经过 CoalescingChannel：
+交易线程只把消息放进按主题保存的待投递表，界面线程以不超过 OVERLAY_RATE 的频率取出最新一条投递，
+消息可以是 LazyText，到投递时才格式化。
+
+数值指标样本直接记入 metrics 聚合器，界面线程同样按频率收到一次汇总。
+
+本模块不依赖Qt，命令行运行时不需要加载PyQt5，界面通过 src.ui.qt_bridge 接入。
 """
-from typing import Callable, Dict, List
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+try:
+    from src.utils.metrics import MetricsAggregator
+except ImportError:
+    from ..utils.metrics import MetricsAggregator
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class LazyText:
+    """延迟格式化的文本，投递时才调用 str.format"""
+
+    __slots__ = ("template", "args", "kwargs")
+
+    def __init__(self, template: str, *args, **kwargs):
+        self.template = template
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return self.template.format(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyText({self.template!r})"
+
+
+class CoalescingChannel:
+    """按主题只保留最新一条待投递的消息，以不超过 rate 的频率批量投递"""
+
+    def __init__(self, deliver: Callable[[str, Any], None], rate: float = 10.0, clock: Callable[[], float] = None):
+        """
+        Args:
+            deliver: 投递函数 (主题, 消息)
+            rate: 每秒最多投递几次
+            clock: 单调时钟，测试时可替换
+        """
+        self._deliver = deliver
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock or time.monotonic
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._scheduled = False
+        self._last_delivery = float("-inf")
+        self._stats = {"posted": 0, "delivered": 0, "coalesced": 0}
+
+    def post(self, topic: str, message: Any) -> bool:
+        """
+        放入一条消息，同一主题尚未投递的旧消息被替换
+
+        Returns:
+            是否需要安排一次投递（之前没有待投递的消息）
+        """
+        with self._lock:
+            if topic in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[topic] = message
+            self._stats["posted"] += 1
+            if self._scheduled:
+                return False
+            self._scheduled = True
+            return True
+
+    def delay(self) -> float:
+        """距离下一次允许投递还有多久（秒）"""
+        with self._lock:
+            return max(0.0, self._last_delivery + self.interval - self._clock())
+
+    def flush(self) -> int:
+        """投递所有主题的最新消息，返回投递条数"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+            self._last_delivery = self._clock()
+            self._stats["delivered"] += len(pending)
+        for topic, message in pending.items():
+            try:
+                self._deliver(topic, message)
+            except Exception as e:
+                print(f"事件投递失败({topic}): {e}")
+        return len(pending)
+
+    def stats(self) -> Dict[str, int]:
+        """放入、实际投递和被合并的消息数"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def _invoke(callback: Callable, args: Tuple) -> None:
+    """调用一个订阅者，异常只打印，不影响其他订阅者和发布者"""
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"事件处理失败({getattr(callback, '__qualname__', callback)}): {e}")
+
+
+class Signal:
+    """线程安全的信号，connect/disconnect/emit 与 pyqtSignal 用法一致"""
 
-from PyQt5.QtCore import QObject, pyqtSignal
+    __slots__ = ("_bus", "_callbacks", "_lock")
 
+    def __init__(self, bus: "EventBus"):
+        self._bus = bus
+        # 连接时整体替换，发布时不加锁直接遍历
+        self._callbacks: Tuple[Callable, ...] = ()
+        self._lock = threading.Lock()
 
-class EventBus(QObject):
-    """全局事件总线，用于组件间解耦通信"""
+    def connect(self, callback: Callable) -> None:
+        with self._lock:
+            self._callbacks += (callback,)
+
+    def disconnect(self, callback: Optional[Callable] = None) -> None:
+        """
+        断开连接，不传参数时断开全部
+
+        Raises:
+            TypeError: 没有连接过该回调
+        """
+        with self._lock:
+            if callback is None:
+                self._callbacks = ()
+                return
+            if callback not in self._callbacks:
+                raise TypeError(f"{callback} 没有连接到该信号")
+            callbacks = list(self._callbacks)
+            callbacks.remove(callback)
+            self._callbacks = tuple(callbacks)
+
+    def emit(self, *args) -> None:
+        """按事件总线的分发方式调用所有订阅者"""
+        dispatch = self._bus.dispatch
+        for callback in self._callbacks:
+            dispatch(_invoke, (callback, args))
+
+
+def _direct_dispatch(func: Callable, args: Tuple) -> None:
+    func(*args)
+
+
+def _thread_timer_schedule(delay: float, func: Callable[[], Any]) -> None:
+    if delay <= 0:
+        func()
+        return
+    timer = threading.Timer(delay, func)
+    timer.daemon = True
+    timer.start()
+
+
+class EventBus:
+    """
+    全局事件总线，用于组件间解耦通信
+
+    不依赖Qt。默认在发布者线程调用订阅者，合并通道用定时线程投递；
+    界面程序通过 src.ui.qt_bridge 把分发交给Qt界面线程，asyncio 程序可调用 bind_asyncio 交给事件循环。
+    """
 
     # 定义事件类型
     OVERLAY_TEXT_UPDATED = "text_updated"
@@ -18,21 +177,42 @@ class EventBus(QObject):
     ERROR_OCCURRED = "error_occurred"
     TRADING_STARTED = "trading_started"
     TRADING_STOPPED = "trading_stopped"
+    PROFILE_UPDATED = "profile_updated"
+    CONFIG_RELOADED = "config_reloaded"
+    METRICS_UPDATED = "metrics_updated"
 
-    # 信号定义
-    overlay_text_updated = pyqtSignal(str)
-    status_changed = pyqtSignal(str)
-    price_updated = pyqtSignal(int)
-    balance_updated = pyqtSignal(int)
-    error_occurred = pyqtSignal(str)
-    trading_started = pyqtSignal()
-    trading_stopped = pyqtSignal()
+    # 悬浮窗类事件每秒最多投递次数
+    OVERLAY_RATE = 10.0
 
     _instance = None
 
-    def __init__(self):
-        super().__init__()
-        self._handlers: Dict[str, List[Callable]] = {}
+    def __init__(
+        self,
+        dispatch: Optional[Callable[[Callable, Tuple], None]] = None,
+        schedule: Optional[Callable[[float, Callable[[], Any]], None]] = None,
+    ):
+        """
+        Args:
+            dispatch: 分发函数 (func, args)，负责在合适的线程调用 func(*args)，默认直接调用
+            schedule: 定时函数 (秒, func)，负责在分发线程延迟调用 func，默认使用定时线程
+        """
+        self.dispatch = dispatch or _direct_dispatch
+        self._schedule = schedule or _thread_timer_schedule
+
+        # 信号定义
+        self.overlay_text_updated = Signal(self)
+        self.status_changed = Signal(self)
+        self.price_updated = Signal(self)
+        self.balance_updated = Signal(self)
+        self.error_occurred = Signal(self)
+        self.trading_started = Signal(self)
+        self.trading_stopped = Signal(self)
+        self.profile_updated = Signal(self)
+        self.config_reloaded = Signal(self)
+        self.metrics_updated = Signal(self)
+
+        self.metrics = MetricsAggregator()
+        self.overlay_channel = CoalescingChannel(self._deliver, self.OVERLAY_RATE)
 
     @classmethod
     def instance(cls) -> "EventBus":
@@ -41,9 +221,40 @@ class EventBus(QObject):
             cls._instance = cls()
         return cls._instance
 
-    def emit_overlay_text_updated(self, text: str) -> None:
-        """发送文本更新事件"""
-        self.overlay_text_updated.emit(text)
+    def set_dispatcher(
+        self, dispatch: Callable[[Callable, Tuple], None], schedule: Callable[[float, Callable[[], Any]], None]
+    ) -> None:
+        """更换分发和定时方式，例如交给Qt界面线程"""
+        self.dispatch = dispatch
+        self._schedule = schedule
+
+    def bind_asyncio(self, loop: "asyncio.AbstractEventLoop") -> None:
+        """在 asyncio 事件循环中调用订阅者，可以从任意线程发布"""
+
+        def schedule(delay: float, func: Callable[[], Any]) -> None:
+            loop.call_soon_threadsafe(loop.call_later, delay, func)
+
+        self.set_dispatcher(lambda func, args: loop.call_soon_threadsafe(func, *args), schedule)
+
+    def _post(self, topic: str, message: Any) -> None:
+        # 合并通道从空闲变为有待投递消息时，按频率限制安排一次投递
+        if self.overlay_channel.post(topic, message):
+            self._schedule(self.overlay_channel.delay(), self.overlay_channel.flush)
+
+    def _deliver(self, topic: str, message: Any) -> None:
+        if topic == self.METRICS_UPDATED:
+            # 汇总在界面线程计算
+            self.metrics_updated.emit(message.snapshot())
+            return
+        text = str(message)
+        if topic == self.OVERLAY_TEXT_UPDATED:
+            self.overlay_text_updated.emit(text)
+        elif topic == self.PROFILE_UPDATED:
+            self.profile_updated.emit(text)
+
+    def emit_overlay_text_updated(self, text) -> None:
+        """发送文本更新事件，只投递最新一条，可传入 LazyText 延迟格式化"""
+        self._post(self.OVERLAY_TEXT_UPDATED, text)
 
     def emit_status_changed(self, status: str) -> None:
         """发送状态改变事件"""
@@ -69,6 +280,24 @@ class EventBus(QObject):
         """发送交易停止事件"""
         self.trading_stopped.emit()
 
+    def emit_profile_updated(self, text) -> None:
+        """发送耗时分解更新事件，只投递最新一条"""
+        self._post(self.PROFILE_UPDATED, text)
+
+    def emit_config_reloaded(self, config) -> None:
+        """发送配置文件被外部修改事件，界面据此刷新显示"""
+        self.config_reloaded.emit(config)
+
+    def emit_metric(self, name: str, value: float) -> None:
+        """发布一个指标样本，界面按频率限制收到 {名称: MetricSummary}"""
+        self.metrics.record(name, value)
+        self._post(self.METRICS_UPDATED, self.metrics)
+
+    def emit_metrics(self, samples: Dict[str, float]) -> None:
+        """一次发布多个指标样本"""
+        self.metrics.record_many(samples)
+        self._post(self.METRICS_UPDATED, self.metrics)
+
 
 # 全局事件总线实例
 event_bus = EventBus.instance()
@@ -50,3 +50,11 @@ class WindowSizeException(WindowDetectionException):
 
 class WindowNotFoundException(WindowDetectionException):
     """窗口未找到异常"""
+
+
+class OperationCancelledException(TradingException):
+    """操作被停止信号取消"""
+
+
+class DeadlineExceededException(TradingException):
+    """等待超过了当前状态允许的时间"""
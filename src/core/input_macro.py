@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+输入宏
+
+把固定的 点击/按键/延迟 序列声明为宏，按当前分辨率的坐标和窗口偏移预先编译，
+执行时整体提交给支持批量输入的执行器（LowLatencyActionExecutor.execute_batch），
+不支持批量的执行器逐步执行。两种方式都可以在停止时中断，并记录每一步的执行轨迹。
+"""
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from src.core.interfaces import InputStep
+    from src.utils.delay_helper import delay_helper
+    from src.utils.profiler import profiler
+except ImportError:
+    from ..core.interfaces import InputStep
+    from ..utils.delay_helper import delay_helper
+    from ..utils.profiler import profiler
+
+
+# 宏支持的动作，delay 的目标是延迟配置中的操作名
+MACRO_ACTIONS = ("click", "right_click", "move", "key", "chord", "type", "delay")
+# 组合键按住时间对应的延迟操作，按一帧左右保持，逐帧轮询输入的游戏才能识别
+CHORD_HOLD = "chord_hold"
+# 旧的延迟配置中没有按住时间时使用的默认值（秒）
+DEFAULT_CHORD_HOLD = 0.03
+
+
+@dataclass(frozen=True)
+class MacroStep:
+    """宏中的一步"""
+
+    action: str
+    # 坐标名或坐标、按键、组合键元组、文本、延迟操作名
+    target: Any = None
+
+
+@dataclass(frozen=True)
+class InputMacro:
+    """一段固定的输入序列"""
+
+    name: str
+    steps: Tuple[MacroStep, ...]
+
+    def __post_init__(self):
+        for step in self.steps:
+            if step.action not in MACRO_ACTIONS:
+                raise ValueError(f"宏[{self.name}]包含不支持的动作: {step.action}")
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """编译后的一步，坐标已解析"""
+
+    action: str
+    target: Any
+    # 窗口内坐标，交给逐步执行的执行器自行转换
+    position: Optional[Tuple[int, int]] = None
+    # 加上窗口偏移后的屏幕坐标，批量提交时直接使用
+    screen: Optional[Tuple[int, int]] = None
+
+
+@dataclass(frozen=True)
+class CompiledMacro:
+    """按分辨率坐标和窗口偏移编译好的宏"""
+
+    name: str
+    steps: Tuple[CompiledStep, ...]
+    window_offset: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class MacroTrace:
+    """一次宏执行的轨迹"""
+
+    name: str
+    batched: bool
+    # (步骤序号, 动作, 目标, 开始时间ms, 耗时ms)
+    entries: List[Tuple[int, str, Any, float, float]] = field(default_factory=list)
+    interrupted: bool = False
+    elapsed_ms: float = 0.0
+
+    def format(self) -> str:
+        mode = "批量" if self.batched else "逐步"
+        status = "，已中断" if self.interrupted else ""
+        lines = [f"宏[{self.name}]({mode}) {len(self.entries)}步 {self.elapsed_ms:.0f}ms{status}"]
+        for index, action, target, start_ms, duration_ms in self.entries:
+            lines.append(f"  {index:>2} +{start_ms:7.1f}ms {action} {target} ({duration_ms:.1f}ms)")
+        return "\n".join(lines)
+
+
+def delay_operations(*macros: InputMacro) -> Tuple[str, ...]:
+    """宏中用到的延迟操作名（含组合键按住时间），用于检查延迟配置"""
+    names = []
+    for name in delay_steps(*macros):
+        if name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+def delay_steps(*macros: InputMacro) -> Tuple[str, ...]:
+    """宏依次执行的延迟操作名，重复的延迟按次数列出，用于估算宏的最长耗时"""
+    names = []
+    for macro in macros:
+        for step in macro.steps:
+            if step.action == "delay":
+                names.append(step.target)
+            elif step.action == "chord":
+                names.append(CHORD_HOLD)
+    return tuple(names)
+
+
+def chord_hold_ms() -> float:
+    """组合键按住时间（毫秒），延迟配置中没有该项时使用默认值"""
+    try:
+        return delay_helper.get_delay(CHORD_HOLD) * 1000
+    except ValueError:
+        return DEFAULT_CHORD_HOLD * 1000
+
+
+def compile_macro(
+    macro: InputMacro, coordinates: Dict[str, Any], window_offset: Optional[Tuple[int, int]] = None
+) -> CompiledMacro:
+    """
+    解析宏中的坐标
+
+    Args:
+        macro: 宏定义
+        coordinates: CoordinateConfig.restore_coordinates 得到的坐标，坐标名先在 rolling_mode 下查找
+        window_offset: 执行器的窗口偏移
+
+    Raises:
+        KeyError: 坐标名不存在
+    """
+    offset_x, offset_y = window_offset or (0, 0)
+    rolling = coordinates.get("rolling_mode", {})
+    steps = []
+    for step in macro.steps:
+        if step.action in ("click", "right_click", "move"):
+            target = step.target
+            if isinstance(target, str):
+                target = rolling[target] if target in rolling else coordinates[target]
+            position = (int(target[0]), int(target[1]))
+            screen = (position[0] + offset_x, position[1] + offset_y)
+            steps.append(CompiledStep(step.action, step.target, position, screen))
+        else:
+            steps.append(CompiledStep(step.action, step.target))
+    return CompiledMacro(macro.name, tuple(steps), window_offset)
+
+
+class MacroRunner:
+    """编译并执行输入宏"""
+
+    def __init__(self, action_executor, coordinates: Dict[str, Any], should_stop: Callable[[], bool] = None):
+        """
+        Args:
+            action_executor: 动作执行器，有 execute_batch 时整体提交
+            coordinates: 当前分辨率的坐标
+            should_stop: 返回True时中断执行
+        """
+        self.action_executor = action_executor
+        self.coordinates = coordinates
+        self.should_stop = should_stop or (lambda: False)
+        self.last_trace: Optional[MacroTrace] = None
+        self._compiled: Dict[Tuple[str, Optional[Tuple[int, int]]], CompiledMacro] = {}
+
+    def compile(self, macro: InputMacro) -> CompiledMacro:
+        """按执行器当前的窗口偏移编译，偏移变化后重新编译"""
+        window_offset = getattr(self.action_executor, "window_offset", None)
+        key = (macro.name, window_offset)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = compile_macro(macro, self.coordinates, window_offset)
+        return compiled
+
+    def run(self, macro: InputMacro) -> bool:
+        """
+        执行宏
+
+        Returns:
+            是否完整执行，停止时中断返回False
+        """
+        compiled = self.compile(macro)
+        # 只认执行器类上定义的批量接口，避免 Mock 之类动态属性误判
+        batched = hasattr(type(self.action_executor), "execute_batch")
+        trace = MacroTrace(macro.name, batched)
+        start = time.perf_counter()
+        with profiler.span(f"macro.{macro.name}"):
+            if batched:
+                self._run_batched(compiled, trace, start)
+            else:
+                self._run_stepwise(compiled, trace, start)
+        trace.elapsed_ms = (time.perf_counter() - start) * 1000
+        trace.interrupted = len(trace.entries) < len(compiled.steps)
+        self.last_trace = trace
+        return not trace.interrupted
+
+    def _run_batched(self, compiled: CompiledMacro, trace: MacroTrace, start: float) -> None:
+        steps, owners = [], []
+        for index, step in enumerate(compiled.steps):
+            if step.action == "delay":
+                # 延迟在执行时读取，保证热更新和自动调优的值生效
+                expanded = [InputStep("wait", delay_helper.get_delay(step.target))]
+            elif step.action == "chord":
+                keys = tuple(step.target)
+                expanded = [InputStep("key_down", key) for key in keys]
+                expanded.append(InputStep("wait", chord_hold_ms() / 1000))
+                expanded += [InputStep("key_up", key) for key in reversed(keys)]
+            elif step.action == "type":
+                expanded = [InputStep("type", step.target)]
+            elif step.action == "key":
+                expanded = [InputStep("key", step.target)]
+            else:
+                expanded = [InputStep(step.action, step.screen, absolute=True)]
+            steps += expanded
+            owners += [index] * len(expanded)
+
+        timings: List[Tuple[float, float]] = []
+        self.action_executor.execute_batch(steps, should_stop=self.should_stop, trace=timings)
+        # 一个宏步骤可能展开为多个输入，按宏步骤合并耗时，只记录完整执行的步骤
+        expected = Counter(owners)
+        executed = Counter(owners[: len(timings)])
+        spans: Dict[int, Tuple[float, float]] = {}
+        for owner, (step_start, step_end) in zip(owners, timings):
+            spans[owner] = (spans.get(owner, (step_start,))[0], step_end)
+        for index, (step_start, step_end) in sorted(spans.items()):
+            if executed[index] < expected[index]:
+                break
+            step = compiled.steps[index]
+            trace.entries.append(
+                (index, step.action, step.target, (step_start - start) * 1000, (step_end - step_start) * 1000)
+            )
+
+    def _run_stepwise(self, compiled: CompiledMacro, trace: MacroTrace, start: float) -> None:
+        executor = self.action_executor
+        for index, step in enumerate(compiled.steps):
+            if self.should_stop():
+                return
+            step_start = time.perf_counter()
+            if step.action == "delay":
+                delay_helper.sleep(step.target)
+            elif step.action == "chord":
+                executor.chord(step.target, hold_ms=chord_hold_ms())
+            elif step.action == "type":
+                executor.enter_text(step.target)
+            elif step.action == "key":
+                executor.press_key(step.target)
+            elif step.action == "move":
+                executor.move_mouse(step.position)
+            else:
+                executor.click_position(step.position, right_click=step.action == "right_click")
+            step_end = time.perf_counter()
+            trace.entries.append(
+                (index, step.action, step.target, (step_start - start) * 1000, (step_end - step_start) * 1000)
+            )
@@ -4,12 +4,14 @@
 """
 from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass
-from typing import Any, Dict, Generic, Optional, Tuple, Type, TypeVar
-
-import numpy as np
+from typing import TYPE_CHECKING, Any, Dict, Generic, Optional, Sequence, Tuple, Type, TypeVar
 
 from src.config.trading_config import TradingConfig
 
+if TYPE_CHECKING:
+    # numpy 只用于类型标注，配置和界面模块导入接口时不加载
+    import numpy as np
+
 
 @dataclass
 class MarketData:
@@ -24,6 +26,20 @@ class MarketData:
     count: Optional[int] = 0
 
 
+@dataclass(frozen=True)
+class InputStep:
+    """批量输入中的一步"""
+
+    # move / click / right_click / key / key_down / key_up / type / scroll / wait
+    action: str
+    # 坐标、按键、文本、滚动格数或等待秒数
+    target: Any = None
+    # 本步之后的停顿，None 时使用该类型的默认停顿
+    pause: Optional[float] = None
+    # 坐标已经是屏幕坐标，不再应用窗口偏移
+    absolute: bool = False
+
+
 class IPriceDetector(ABC):
     """价格检测器接口"""
 
@@ -51,6 +67,20 @@ class IActionExecutor(ABC):
     def move_mouse(self, position: Tuple[float, float]) -> None:
         """移动鼠标到指定位置"""
 
+    @abstractmethod
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        """按顺序按下组合键，保持 hold_ms 毫秒后逆序松开，例如 ("alt", "d")"""
+
+    @abstractmethod
+    def enter_text(self, text: str, mode: str = "auto") -> None:
+        """
+        输入文本
+
+        Args:
+            text: 文本
+            mode: type 逐字输入；paste 写入剪贴板后粘贴；auto 长文本粘贴，否则逐字输入
+        """
+
 
 class ITradingStrategy(ABC):
     """交易策略接口"""
@@ -157,20 +187,20 @@ class IOCREngine(ABC):
     """OCR引擎接口"""
 
     @abstractmethod
-    def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
+    def image_to_string(self, image: "np.ndarray", binarize: bool = True, font: str = "", thresh=127) -> str:
         """将图像转换为字符串"""
 
     @abstractmethod
-    def detect_template(self, image: np.ndarray, template_name: str) -> bool:
+    def detect_template(self, image: "np.ndarray", template_name: str) -> bool:
         """检测模板匹配"""
 
     @abstractmethod
-    def find_template(self, image: np.ndarray, template_name: str) -> tuple:
+    def find_template(self, image: "np.ndarray", template_name: str) -> tuple:
         """检测模板所在位置"""
 
     @staticmethod
     @abstractmethod
-    def get_pixel_color(image: np.ndarray, x: int, y: int):
+    def get_pixel_color(image: "np.ndarray", x: int, y: int):
         """检测固定点的像素值"""
 
 
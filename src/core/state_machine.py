@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+交易流程状态机
+
+把一个交易周期拆成显式的状态，每个状态由处理函数返回下一个状态（None 表示周期结束）。
+状态机负责统计每个状态的耗时和转移次数、在状态失败时按配置原地恢复重试，
+并在超时或重试用尽后抛出带有当前状态和上下文的 StateFailure，由调用方决定从哪里继续。
+
+状态的超时通过取消令牌的截止时刻实现：处理函数中的延迟、条件等待和取消检查到期后抛出
+DeadlineExceededException，因此处理函数中的循环需要经过这些等待点，超时才能生效。
+"""
+import time
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from src.core.cancellation import CancellationToken, stop_token
+    from src.core.exceptions import DeadlineExceededException, TradingException
+    from src.utils.profiler import LatencyHistogram
+except ImportError:
+    from ..core.cancellation import CancellationToken, stop_token
+    from ..core.exceptions import DeadlineExceededException, TradingException
+    from ..utils.profiler import LatencyHistogram
+
+
+@dataclass(frozen=True)
+class StateSpec:
+    """状态定义"""
+
+    handler: Callable[[Any], Optional[Enum]]
+    # 状态（含重试）允许花费的总时间，到期后状态内的等待抛出超时异常，不再原地重试
+    timeout: float = 10.0
+    # 失败后原地重试的次数
+    retries: int = 0
+    # 重试前执行的恢复动作，例如按esc回到仓库
+    recover: Optional[Callable[[Any], None]] = None
+    # 彻底失败后下个周期是否可以从该状态继续
+    resumable: bool = False
+
+
+class StateFailure(TradingException):
+    """状态执行失败，携带失败的状态和周期上下文"""
+
+    def __init__(self, state: Enum, context: Any, cause: Exception):
+        super().__init__(f"状态[{state.value}]失败: {cause}")
+        self.state = state
+        self.context = context
+        self.cause = cause
+
+
+class StateStats:
+    """单个状态的统计"""
+
+    __slots__ = ("latency", "failures", "retries", "timeouts")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        result = self.latency.to_dict()
+        result.update(failures=self.failures, retries=self.retries, timeouts=self.timeouts)
+        return result
+
+
+class StateMachine:
+    """按状态定义驱动交易周期"""
+
+    def __init__(
+        self,
+        name: str,
+        specs: Dict[Enum, StateSpec],
+        should_stop: Callable[[], bool] = None,
+        token: Optional[CancellationToken] = None,
+    ):
+        """
+        Args:
+            name: 状态机名称，用于日志
+            specs: 状态 -> 状态定义
+            should_stop: 返回True时不再重试
+            token: 处理函数等待使用的取消令牌，在上面设置状态的截止时刻
+        """
+        self.name = name
+        self.specs = specs
+        self.should_stop = should_stop or (lambda: False)
+        self.token = token or stop_token
+        self.current_state: Optional[Enum] = None
+        self._stats: Dict[Enum, StateStats] = {state: StateStats() for state in specs}
+        self._transitions: Dict[Tuple[Enum, Optional[Enum]], int] = {}
+
+    def set_timeout(self, state: Enum, timeout: float) -> None:
+        """修改状态的超时，下一次进入该状态时生效"""
+        self.specs[state] = replace(self.specs[state], timeout=timeout)
+
+    def run(self, start: Enum, context: Any) -> None:
+        """
+        从 start 状态开始运行到周期结束
+
+        Raises:
+            StateFailure: 某个状态超时或重试用尽
+        """
+        state = start
+        while state is not None:
+            self.current_state = state
+            next_state = self._run_state(state, context)
+            key = (state, next_state)
+            self._transitions[key] = self._transitions.get(key, 0) + 1
+            state = next_state
+        self.current_state = None
+
+    def _run_state(self, state: Enum, context: Any) -> Optional[Enum]:
+        spec = self.specs[state]
+        stats = self._stats[state]
+        entered = time.perf_counter()
+        attempt = 0
+        self.token.set_deadline(entered + spec.timeout)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    next_state = spec.handler(context)
+                except Exception as e:
+                    stats.failures += 1
+                    stats.latency.record(time.perf_counter() - start)
+                    timed_out = (
+                        isinstance(e, DeadlineExceededException) or time.perf_counter() - entered >= spec.timeout
+                    )
+                    stats.timeouts += int(timed_out)
+                    if attempt >= spec.retries or timed_out or self.should_stop():
+                        raise StateFailure(state, context, e) from e
+                    attempt += 1
+                    stats.retries += 1
+                    print(f"[{self.name}] 状态[{state.value}]失败，原地重试({attempt}/{spec.retries}): {e}")
+                    if spec.recover is not None:
+                        try:
+                            spec.recover(context)
+                        except DeadlineExceededException as recover_error:
+                            stats.timeouts += 1
+                            raise StateFailure(state, context, recover_error) from recover_error
+                    continue
+                stats.latency.record(time.perf_counter() - start)
+                if time.perf_counter() - entered >= spec.timeout:
+                    # 最后一次等待之后的步骤没有经过截止时刻检查
+                    stats.timeouts += 1
+                    print(f"[{self.name}] 状态[{state.value}]耗时超过 {spec.timeout}s")
+                return next_state
+        finally:
+            self.token.set_deadline(None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各状态的耗时和失败统计（毫秒）"""
+        return {state.value: stats.to_dict() for state, stats in self._stats.items() if stats.latency.count}
+
+    def transitions(self) -> Dict[str, int]:
+        """状态转移次数，键为 "起始->目标"，周期结束记为 "end" """
+        return {
+            f"{source.value}->{target.value if target is not None else 'end'}": count
+            for (source, target), count in self._transitions.items()
+        }
+
+    def format_stats(self) -> str:
+        """按平均耗时排序的状态统计"""
+        stats = self.stats()
+        if not stats:
+            return f"[{self.name}] 无状态记录"
+        lines = [f"[{self.name}] 状态耗时:"]
+        for name, item in sorted(stats.items(), key=lambda x: -x[1]["mean_ms"]):
+            lines.append(
+                f"  {name}: {item['count']}次, 平均{item['mean_ms']:.0f}ms, p95 {item['p95_ms']:.0f}ms, "
+                f"失败{item['failures']}次, 重试{item['retries']}次, 超时{item['timeouts']}次"
+            )
+        return "\n".join(lines)
+
+    def reset_stats(self) -> None:
+        """清空统计"""
+        self._stats = {state: StateStats() for state in self.specs}
+        self._transitions.clear()
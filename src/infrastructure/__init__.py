@@ -1,6 +1,17 @@
 # -*- coding: utf-8 -*-
 """模块包初始化文件"""
+from typing import TYPE_CHECKING
 
-from .window_detector import WindowDetector
+if TYPE_CHECKING:
+    from .window_detector import WindowDetector
 
 __all__ = ["WindowDetector"]
+
+
+def __getattr__(name):
+    # 窗口检测依赖 win32 和 pyautogui，用到时才导入
+    if name == "WindowDetector":
+        from .window_detector import WindowDetector
+
+        return WindowDetector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
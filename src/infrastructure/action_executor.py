@@ -5,24 +5,48 @@
 import platform
 import threading
 import time
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import keyboard
 import pyautogui
 from pyautogui import Point
 
+from ..config.coordinates import ScreenPoint
 from ..core.exceptions import ActionExecutionException
-from ..core.interfaces import IActionExecutor
+from ..core.interfaces import IActionExecutor, InputStep
+from ..utils.profiler import profiler
+
+try:
+    import win32clipboard
+except ImportError:
+    # 非Windows平台没有剪贴板快速路径，粘贴模式退化为逐字输入
+    win32clipboard = None
+
+TEXT_MODES = ("auto", "type", "paste")
 
 
 class PyAutoGUIActionExecutor(IActionExecutor):
     """基于PyAutoGUI的动作执行器"""
 
-    def __init__(self, debug=False):
+    # enter_text 逐字输入时的字符间隔
+    TEXT_INTERVAL = 0.01
+    # auto 模式下达到该长度的文本用剪贴板粘贴
+    PASTE_MIN_LENGTH = 6
+
+    def __init__(self, debug=False, track_cursor: bool = True, move_duration: float = 0.0):
+        """
+        Args:
+            debug: 打印每个动作
+            track_cursor: 记录上次移动到的位置，光标已在目标位置时跳过移动
+            move_duration: 移动耗时，0 表示直接跳到目标位置不做补间
+        """
         # 设置PyAutoGUI的安全特性
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.05
         self.debug = debug
+        self.track_cursor = track_cursor
+        self.move_duration = move_duration
 
         # 锁用于线程安全
         self._lock = threading.Lock()
@@ -30,26 +54,73 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         # 窗口偏移量，用于窗口模式下的坐标转换
         self.window_offset: Optional[Tuple[int, int]] = None
 
+        # 上次移动到的屏幕坐标，用户移动鼠标或窗口变化后失效
+        self._cursor: Optional[Tuple[int, int]] = None
+        self._cursor_stats = {"moves": 0, "elided": 0, "invalidated": 0}
+
     def set_window_offset(self, x: int, y: int) -> None:
         """设置窗口偏移量，用于窗口模式下的坐标转换"""
         self.window_offset = (x, y)
+        self.invalidate_cursor()
         if self.debug:
             print(f"设置窗口偏移量: ({x}, {y})")
 
     def clear_window_offset(self) -> None:
         """清除窗口偏移量，回到全屏模式"""
         self.window_offset = None
+        self.invalidate_cursor()
         if self.debug:
             print("清除窗口偏移量，回到全屏模式")
 
+    def invalidate_cursor(self) -> None:
+        """丢弃记录的光标位置，窗口切换或失去焦点后调用"""
+        self._cursor = None
+
+    def _move_to(self, x: int, y: int, **kwargs) -> bool:
+        """
+        移动鼠标到屏幕坐标，光标已在目标位置时跳过
+
+        记录的位置与目标一致时再读取一次真实位置确认，用户手动移动过鼠标则照常移动。
+
+        Returns:
+            是否实际移动了鼠标
+        """
+        if self.track_cursor and self._cursor == (x, y):
+            if tuple(pyautogui.position()) == (x, y):
+                self._cursor_stats["elided"] += 1
+                return False
+            self._cursor_stats["invalidated"] += 1
+        if self.move_duration > 0:
+            kwargs["duration"] = self.move_duration
+        pyautogui.moveTo(x, y, **kwargs)
+        self._cursor = (x, y)
+        self._cursor_stats["moves"] += 1
+        return True
+
+    def cursor_stats(self) -> Dict[str, int]:
+        """本次会话的鼠标移动次数、跳过的移动次数和检测到用户移动鼠标的次数"""
+        return dict(self._cursor_stats)
+
+    def format_cursor_stats(self) -> str:
+        stats = self._cursor_stats
+        total = stats["moves"] + stats["elided"]
+        ratio = stats["elided"] / total if total else 0.0
+        return (
+            f"鼠标移动: {stats['moves']}次, 跳过{stats['elided']}次({ratio:.0%}), "
+            f"检测到手动移动{stats['invalidated']}次"
+        )
+
+    def reset_cursor_stats(self) -> None:
+        self._cursor_stats = {"moves": 0, "elided": 0, "invalidated": 0}
+
     def _convert_coordinates(self, x: float, y: float, reverse=False) -> Tuple[int, int]:
         """将模板坐标转换为基于窗口位置的绝对屏幕坐标"""
-        offset_x = self.window_offset[0]
-        offset_y = self.window_offset[1]
-        if reverse:
-            offset_x = -offset_x
-            offset_y = -offset_y
         if self.window_offset:
+            offset_x = self.window_offset[0]
+            offset_y = self.window_offset[1]
+            if reverse:
+                offset_x = -offset_x
+                offset_y = -offset_y
             converted_x = int(x + offset_x)
             converted_y = int(y + offset_y)
             if self.debug:
@@ -57,15 +128,18 @@ class PyAutoGUIActionExecutor(IActionExecutor):
             return converted_x, converted_y
         return int(x), int(y)
 
+    @profiler.profiled("action.click_position")
     def click_position(self, position: Tuple[float, float], right_click=False) -> None:
         """点击指定坐标位置"""
         try:
             with self._lock:
-                # 应用窗口偏移量进行坐标转换
-                x, y = self._convert_coordinates(position[0], position[1])
+                # 坐标表中的屏幕坐标已包含窗口偏移，其他坐标按窗口偏移量转换
+                x, y = (
+                    position if type(position) is ScreenPoint else self._convert_coordinates(position[0], position[1])
+                )
 
                 # 移动鼠标并点击
-                pyautogui.moveTo(x, y)
+                self._move_to(x, y)
                 if right_click:
                     pyautogui.rightClick()
                 else:
@@ -76,6 +150,7 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         except Exception as e:
             raise ActionExecutionException(f"点击位置失败: {e}") from e
 
+    @profiler.profiled("action.press_key")
     def press_key(self, key: str) -> None:
         """按下指定按键"""
         try:
@@ -87,6 +162,7 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         except Exception as e:
             raise ActionExecutionException(f"按键失败: {e}") from e
 
+    @profiler.profiled("action.key_down")
     def key_down(self, key: str) -> None:
         """按下指定按键"""
         try:
@@ -98,6 +174,7 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         except Exception as e:
             raise ActionExecutionException(f"按键失败: {e}") from e
 
+    @profiler.profiled("action.key_up")
     def key_up(self, key: str) -> None:
         """按下指定按键"""
         try:
@@ -118,6 +195,72 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         time.sleep(interval)
         self.key_up(b)
 
+    @profiler.profiled("action.chord")
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        """按顺序按下组合键，保持 hold_ms 毫秒后逆序松开，不使用全局停顿"""
+        try:
+            with self._lock:
+                pressed = []
+                try:
+                    for key in keys:
+                        pyautogui.keyDown(key, _pause=False)
+                        pressed.append(key)
+                    if hold_ms > 0:
+                        time.sleep(hold_ms / 1000)
+                finally:
+                    # 出错时也要松开已按下的键，避免按键卡住
+                    for key in reversed(pressed):
+                        pyautogui.keyUp(key, _pause=False)
+                if self.debug:
+                    print(f"chord {'+'.join(keys)}")
+        except Exception as e:
+            raise ActionExecutionException(f"组合键失败: {e}") from e
+
+    def _resolve_text_mode(self, text: str, mode: str) -> str:
+        if mode not in TEXT_MODES:
+            raise ValueError(f"不支持的输入方式: {mode}")
+        if mode == "auto":
+            mode = "paste" if len(text) >= self.PASTE_MIN_LENGTH else "type"
+        if mode == "paste" and win32clipboard is None:
+            mode = "type"
+        return mode
+
+    @staticmethod
+    def _set_clipboard(text: str) -> None:
+        """写入剪贴板，原有内容会被覆盖"""
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardText(text, win32clipboard.CF_UNICODETEXT)
+        finally:
+            win32clipboard.CloseClipboard()
+
+    def _type_fast(self, text: str) -> None:
+        try:
+            with self._lock:
+                pyautogui.typewrite(text, interval=self.TEXT_INTERVAL, _pause=False)
+        except Exception as e:
+            raise ActionExecutionException(f"输入文本失败: {e}") from e
+
+    @profiler.profiled("action.enter_text")
+    def enter_text(self, text: str, mode: str = "auto") -> None:
+        """
+        输入文本
+
+        Args:
+            text: 文本
+            mode: type 逐字输入；paste 写入剪贴板后 ctrl+v；auto 长文本粘贴，否则逐字输入
+        """
+        if self._resolve_text_mode(text, mode) == "type":
+            self._type_fast(text)
+            return
+        try:
+            self._set_clipboard(text)
+        except Exception as e:
+            raise ActionExecutionException(f"写入剪贴板失败: {e}") from e
+        self.chord(("ctrl", "v"))
+
+    @profiler.profiled("action.type_text")
     def type_text(self, text: str) -> None:
         """输入文本"""
         try:
@@ -127,6 +270,7 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         except Exception as e:
             raise ActionExecutionException(f"输入文本失败: {e}") from e
 
+    @profiler.profiled("action.scroll")
     def scroll(self, clicks: int) -> None:
         """滚动鼠标滚轮"""
         try:
@@ -136,13 +280,16 @@ class PyAutoGUIActionExecutor(IActionExecutor):
         except Exception as e:
             raise ActionExecutionException(f"滚动失败: {e}") from e
 
+    @profiler.profiled("action.move_mouse")
     def move_mouse(self, position: Tuple[float, float]) -> None:
         """移动鼠标到指定位置"""
         try:
             with self._lock:
-                # 应用窗口偏移量进行坐标转换
-                x, y = self._convert_coordinates(position[0], position[1])
-                pyautogui.moveTo(x, y)
+                # 坐标表中的屏幕坐标已包含窗口偏移，其他坐标按窗口偏移量转换
+                x, y = (
+                    position if type(position) is ScreenPoint else self._convert_coordinates(position[0], position[1])
+                )
+                self._move_to(x, y)
                 if self.debug:
                     print(f"move to ({x}, {y})")
         except Exception as e:
@@ -180,6 +327,268 @@ class PyAutoGUIActionExecutor(IActionExecutor):
             raise ActionExecutionException(f"按键失败: {e}") from e
 
 
+@dataclass
+class ActionPacing:
+    """
+    低延迟执行器的逐类停顿（秒）
+
+    每个动作之后只停顿该类型配置的时间，不再使用 pyautogui 全局的 PAUSE。
+    """
+
+    move: float = 0.0
+    click: float = 0.02
+    key: float = 0.02
+    key_down: float = 0.01
+    key_up: float = 0.01
+    # 输入文本时每个字符之间的间隔
+    type: float = 0.005
+    scroll: float = 0.02
+
+    def pause_for(self, action: str) -> float:
+        if action == "right_click":
+            return self.click
+        return getattr(self, action, 0.0)
+
+
+class LatencyBudget:
+    """各类动作的耗时预算：后端调用耗时、请求的停顿和实际停顿"""
+
+    __slots__ = ("count", "input_s", "pause_s", "paced_s")
+
+    def __init__(self):
+        self.count = 0
+        self.input_s = 0.0
+        self.pause_s = 0.0
+        self.paced_s = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "input_ms": self.input_s * 1000,
+            "pause_ms": self.pause_s * 1000,
+            "paced_ms": self.paced_s * 1000,
+            "total_ms": (self.input_s + self.paced_s) * 1000,
+        }
+
+
+class LowLatencyActionExecutor(PyAutoGUIActionExecutor):
+    """
+    低延迟动作执行器
+
+    所有 pyautogui 调用都带 _pause=False，动作之间的停顿按动作类型配置或由调用方指定，
+    多个动作可以作为一个批次在一次加锁内连续执行，并统计每类动作的耗时预算。
+    窗口偏移的坐标转换与 PyAutoGUIActionExecutor 一致。
+    """
+
+    # pyautogui 默认每次调用后的停顿，用于估算节省的时间
+    LEGACY_PAUSE = 0.05
+    # 停顿的最后一段用忙等，避免 sleep 的调度误差
+    SPIN_THRESHOLD = 0.002
+    # 批量输入中等待步骤检查停止信号的间隔
+    STOP_CHECK_INTERVAL = 0.05
+
+    def __init__(self, debug=False, pacing: Optional[ActionPacing] = None, **kwargs):
+        super().__init__(debug=debug, **kwargs)
+        self.pacing = pacing or ActionPacing()
+        self._budget: Dict[str, LatencyBudget] = {}
+
+    def _pace(self, seconds: float, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """精确停顿，传入 should_stop 时分段检查停止信号"""
+        if seconds <= 0:
+            return
+        deadline = time.perf_counter() + seconds
+        if should_stop is not None:
+            while deadline - time.perf_counter() > self.STOP_CHECK_INTERVAL:
+                if should_stop():
+                    return
+                time.sleep(self.STOP_CHECK_INTERVAL)
+            seconds = deadline - time.perf_counter()
+        if seconds > self.SPIN_THRESHOLD:
+            time.sleep(seconds - self.SPIN_THRESHOLD)
+        while time.perf_counter() < deadline:
+            pass
+
+    def _dispatch(self, step: InputStep) -> None:
+        action, target = step.action, step.target
+        if action in ("move", "click", "right_click"):
+            if step.absolute or type(target) is ScreenPoint:
+                x, y = int(target[0]), int(target[1])
+            else:
+                x, y = self._convert_coordinates(*target)
+            self._move_to(x, y, _pause=False)
+            if action == "click":
+                pyautogui.click(_pause=False)
+            elif action == "right_click":
+                pyautogui.rightClick(_pause=False)
+            if self.debug:
+                print(f"{action} ({x}, {y})")
+        elif action == "key":
+            pyautogui.press(target, _pause=False)
+        elif action == "key_down":
+            pyautogui.keyDown(target, _pause=False)
+        elif action == "key_up":
+            pyautogui.keyUp(target, _pause=False)
+        elif action == "type":
+            interval = self.pacing.type if step.pause is None else step.pause
+            pyautogui.typewrite(target, interval=interval, _pause=False)
+        elif action == "scroll":
+            pyautogui.scroll(target, _pause=False)
+        elif action != "wait":
+            raise ValueError(f"不支持的输入动作: {action}")
+
+    def _run_step(self, step: InputStep, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        start = time.perf_counter()
+        self._dispatch(step)
+        dispatched = time.perf_counter()
+        if step.action == "wait":
+            pause = step.target
+        elif step.action == "type":
+            # 文本的字符间隔已经在输入时使用，结束后不再额外停顿
+            pause = 0.0
+        else:
+            pause = self.pacing.pause_for(step.action) if step.pause is None else step.pause
+        self._pace(pause, should_stop if step.action == "wait" else None)
+        budget = self._budget.get(step.action)
+        if budget is None:
+            budget = self._budget[step.action] = LatencyBudget()
+        budget.count += 1
+        budget.input_s += dispatched - start
+        budget.pause_s += pause
+        budget.paced_s += time.perf_counter() - dispatched
+
+    @profiler.profiled("action.batch")
+    def execute_batch(
+        self,
+        steps: Sequence[InputStep],
+        should_stop: Optional[Callable[[], bool]] = None,
+        trace: Optional[List[Tuple[float, float]]] = None,
+    ) -> int:
+        """
+        在一次加锁内连续执行一组输入
+
+        Args:
+            steps: 输入步骤
+            should_stop: 每步之前和等待期间检查，返回True时中断
+            trace: 传入列表时追加每步的 (开始, 结束) perf_counter 时间
+
+        Returns:
+            实际执行的步数
+        """
+        executed = 0
+        try:
+            with self._lock:
+                for step in steps:
+                    if should_stop is not None and should_stop():
+                        break
+                    start = time.perf_counter()
+                    self._run_step(step, should_stop)
+                    if trace is not None:
+                        trace.append((start, time.perf_counter()))
+                    executed += 1
+        except Exception as e:
+            raise ActionExecutionException(f"批量输入失败: {e}") from e
+        return executed
+
+    def _run_single(self, step: InputStep, error: str) -> None:
+        try:
+            with self._lock:
+                self._run_step(step)
+        except Exception as e:
+            raise ActionExecutionException(f"{error}: {e}") from e
+
+    @profiler.profiled("action.click_position")
+    def click_position(self, position: Tuple[float, float], right_click=False, pause: Optional[float] = None) -> None:
+        """点击指定坐标位置"""
+        self._run_single(InputStep("right_click" if right_click else "click", position, pause), "点击位置失败")
+
+    @profiler.profiled("action.press_key")
+    def press_key(self, key: str, pause: Optional[float] = None) -> None:
+        """按下并松开指定按键"""
+        self._run_single(InputStep("key", key, pause), "按键失败")
+
+    @profiler.profiled("action.key_down")
+    def key_down(self, key: str, pause: Optional[float] = None) -> None:
+        """按下指定按键"""
+        self._run_single(InputStep("key_down", key, pause), "按键失败")
+
+    @profiler.profiled("action.key_up")
+    def key_up(self, key: str, pause: Optional[float] = None) -> None:
+        """松开指定按键"""
+        self._run_single(InputStep("key_up", key, pause), "按键失败")
+
+    @profiler.profiled("action.multi_key_press")
+    def multi_key_press(self, a, b, interval=None):
+        """按下组合键，interval 为 None 时使用 key_down / key_up 的停顿"""
+        self.execute_batch(
+            [
+                InputStep("key_down", a, interval),
+                InputStep("key_down", b, interval),
+                InputStep("key_up", a, interval),
+                InputStep("key_up", b, interval),
+            ]
+        )
+
+    @profiler.profiled("action.type_text")
+    def type_text(self, text: str, interval: Optional[float] = None) -> None:
+        """输入文本"""
+        self._run_single(InputStep("type", text, interval), "输入文本失败")
+
+    @profiler.profiled("action.chord")
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        """组合键作为一个批次提交，按下之间使用 key_down 的停顿"""
+        steps = [InputStep("key_down", key) for key in keys]
+        if hold_ms > 0:
+            steps.append(InputStep("wait", hold_ms / 1000))
+        steps += [InputStep("key_up", key) for key in reversed(keys)]
+        try:
+            self.execute_batch(steps)
+        except ActionExecutionException:
+            # 出错时松开全部按键，避免按键卡住
+            for key in keys:
+                pyautogui.keyUp(key, _pause=False)
+            raise
+
+    def _type_fast(self, text: str) -> None:
+        self._run_single(InputStep("type", text), "输入文本失败")
+
+    @profiler.profiled("action.scroll")
+    def scroll(self, clicks: int, pause: Optional[float] = None) -> None:
+        """滚动鼠标滚轮"""
+        self._run_single(InputStep("scroll", clicks, pause), "滚动失败")
+
+    @profiler.profiled("action.move_mouse")
+    def move_mouse(self, position: Tuple[float, float], pause: Optional[float] = None) -> None:
+        """移动鼠标到指定位置"""
+        self._run_single(InputStep("move", position, pause), "移动鼠标失败")
+
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        """各类动作的耗时预算（毫秒）"""
+        with self._lock:
+            return {action: budget.to_dict() for action, budget in sorted(self._budget.items())}
+
+    def format_latency_report(self) -> str:
+        """耗时预算报告，并估算相比 pyautogui 全局停顿节省的时间"""
+        report = self.latency_report()
+        if not report:
+            return "动作耗时: 无记录"
+        lines = ["动作耗时:"]
+        saved = 0.0
+        for action, item in report.items():
+            lines.append(
+                f"  {action}: {item['count']}次, 输入{item['input_ms']:.1f}ms, "
+                f"停顿{item['paced_ms']:.1f}ms(配置{item['pause_ms']:.1f}ms)"
+            )
+            if action != "wait":
+                saved += item["count"] * self.LEGACY_PAUSE * 1000 - item["paced_ms"]
+        lines.append(f"  相比固定停顿{self.LEGACY_PAUSE * 1000:.0f}ms节省约 {saved:.0f}ms")
+        return "\n".join(lines)
+
+    def reset_latency_report(self) -> None:
+        """清空耗时预算"""
+        with self._lock:
+            self._budget.clear()
+
+
 class MockActionExecutor(IActionExecutor):
     """动作执行器的模拟实现，用于测试"""
 
@@ -213,8 +622,10 @@ class MockActionExecutor(IActionExecutor):
 
     def click_position(self, position: Tuple[float, float], right_click=False) -> None:
         """模拟点击位置"""
-        # 应用窗口偏移量进行坐标转换
-        converted_pos = self._convert_coordinates(position[0], position[1])
+        # 坐标表中的屏幕坐标已包含窗口偏移，其他坐标按窗口偏移量转换
+        converted_pos = (
+            tuple(position) if type(position) is ScreenPoint else self._convert_coordinates(position[0], position[1])
+        )
         action = {
             "type": "click",
             "original_coordinates": position,
@@ -239,6 +650,22 @@ class MockActionExecutor(IActionExecutor):
         if self.log_actions:
             print(f"模拟输入: {text}")
 
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        """模拟组合键"""
+        action = {"type": "chord", "keys": list(keys), "hold_ms": hold_ms}
+        self.actions.append(action)
+        if self.log_actions:
+            print(f"模拟组合键: {'+'.join(keys)}")
+
+    def enter_text(self, text: str, mode: str = "auto") -> None:
+        """模拟输入文本，记录输入方式"""
+        if mode not in TEXT_MODES:
+            raise ValueError(f"不支持的输入方式: {mode}")
+        action = {"type": "text", "text": text, "mode": mode}
+        self.actions.append(action)
+        if self.log_actions:
+            print(f"模拟输入({mode}): {text}")
+
     def scroll(self, clicks: int) -> None:
         """模拟滚动"""
         action = {"type": "scroll", "clicks": clicks}
@@ -248,8 +675,10 @@ class MockActionExecutor(IActionExecutor):
 
     def move_mouse(self, position: Tuple[float, float]) -> None:
         """模拟移动鼠标"""
-        # 应用窗口偏移量进行坐标转换
-        converted_pos = self._convert_coordinates(position[0], position[1])
+        # 坐标表中的屏幕坐标已包含窗口偏移，其他坐标按窗口偏移量转换
+        converted_pos = (
+            tuple(position) if type(position) is ScreenPoint else self._convert_coordinates(position[0], position[1])
+        )
         action = {"type": "move", "original_position": position, "converted_position": converted_pos}
         self.actions.append(action)
         if self.log_actions:
@@ -279,7 +708,9 @@ class ActionExecutorFactory:
     def create_executor(executor_type: str = "pyautogui", **kwargs):
         """创建动作执行器"""
         if executor_type == "pyautogui":
-            return PyAutoGUIActionExecutor()
+            return PyAutoGUIActionExecutor(**kwargs)
+        if executor_type == "low_latency":
+            return LowLatencyActionExecutor(**kwargs)
         if executor_type == "mock":
             return MockActionExecutor(**kwargs)
         raise ValueError(f"不支持的动作执行器类型: {executor_type}")
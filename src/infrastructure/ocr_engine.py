@@ -17,9 +17,11 @@ import pyautogui
 try:
     from src.core.exceptions import OCRException
     from src.core.interfaces import IOCREngine
+    from src.utils.profiler import profiler
 except ImportError:
     from ..core.exceptions import OCRException
     from ..core.interfaces import IOCREngine
+    from ..utils.profiler import profiler
 
 
 class TemplateOCREngine(IOCREngine):
@@ -145,6 +147,11 @@ class TemplateOCREngine(IOCREngine):
         except Exception as e:
             raise OCRException(f"加载模板失败: {e}") from e
 
+    def font_names(self) -> Tuple[str, ...]:
+        """已加载的数字字体模板组"""
+        return tuple(self._templates)
+
+    @profiler.profiled("ocr.image_to_string")
     def image_to_string(self, image: np.ndarray, binarize=True, font: str = "", thresh=127) -> str:
         """将图像转换为数字字符串"""
         try:
@@ -218,11 +225,13 @@ class TemplateOCREngine(IOCREngine):
             gray = image
         return gray
 
+    @profiler.profiled("ocr.detect_template")
     def detect_template(self, image: np.ndarray, template_name: str) -> bool:
         """检测模板是否存在于图像中"""
         x, y = self.find_template(image, template_name)
         return x > 0 and y > 0
 
+    @profiler.profiled("ocr.find_template")
     def find_template(self, image: np.ndarray, template_name: str) -> tuple:
         """检测模板并返回坐标"""
         try:
@@ -328,13 +337,14 @@ class TemplateContoursOCREngine(TemplateOCREngine):
 
         return max_val
 
-    def _determine_best_font_and_digits(self, digit_regions, binary_image):
+    def _determine_best_font_and_digits(self, digit_regions, binary_image, font: str = ""):
         """
         确定最佳匹配字体并同时识别数字
 
         Args:
             digit_regions: 数字区域列表
             binary_image: 二值化后的图像
+            font: 指定字体时只匹配这一组模板
 
         Returns:
             best_font: 最佳字体名称
@@ -344,7 +354,8 @@ class TemplateContoursOCREngine(TemplateOCREngine):
         font_scores = defaultdict(float)
         font_digit_results = {}  # 存储每种字体下每个区域的识别结果
 
-        for font_name in self._templates:
+        font_names = [font] if font in self._templates else list(self._templates)
+        for font_name in font_names:
             total_confidence = 0
             valid_digits = 0
             digit_results = []
@@ -383,6 +394,7 @@ class TemplateContoursOCREngine(TemplateOCREngine):
 
         return best_font, digit_results, avg_confidence
 
+    @profiler.profiled("ocr.image_to_string")
     def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
         """
         识别图像中的连续数字
@@ -404,7 +416,9 @@ class TemplateContoursOCREngine(TemplateOCREngine):
         if not digit_regions:
             return ""
 
-        best_font, digit_results, avg_confidence = self._determine_best_font_and_digits(digit_regions, binary_image)
+        best_font, digit_results, avg_confidence = self._determine_best_font_and_digits(
+            digit_regions, binary_image, font
+        )
         print(best_font, digit_results, avg_confidence)
         # 使用最佳字体识别每个数字
         result = ""
@@ -9,6 +9,9 @@ import numpy as np
 import pyautogui
 from mss import mss
 
+from ..config.coordinates import ScreenRegion
+from ..utils.profiler import profiler
+
 
 class ScreenCapture:
     """屏幕捕获服务"""
@@ -58,15 +61,22 @@ class ScreenCapture:
             ]
         return region
 
+    @profiler.profiled("capture.region")
     def capture_region(self, coordinates: List[float]) -> np.ndarray:
         """捕获指定区域的屏幕截图
 
         Args:
-            coordinates: [x1_ratio, y1_ratio, x2_ratio, y2_ratio] 相对坐标
+            coordinates: [x1, y1, x2, y2] 窗口内坐标，或坐标表中已加上窗口偏移的 ScreenRegion
 
         Returns:
             截图的numpy数组
         """
+        if type(coordinates) is ScreenRegion:
+            # 已规范化并包含窗口偏移，不需要再换算
+            x1, y1, x2, y2 = coordinates
+            with mss() as sct:
+                return np.array(sct.grab({"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1}))
+
         if len(coordinates) != 4:
             raise ValueError("坐标必须是4个元素的列表")
 
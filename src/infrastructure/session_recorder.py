@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+会话记录器
+
+可选开启的记录器把每次截图（PNG压缩、按哈希去重）、每次OCR输出、每次检测器调用和
+每次 IActionExecutor 动作连同单调时间戳写入会话归档，由 src.simulation.flight_recorder 回放。
+
+归档结构（目录，关闭后打包为同名 .zip）:
+    meta.json       分辨率、开始时间等
+    events.jsonl    按时间顺序的事件
+    frames/<hash>.png
+"""
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from src.core.interfaces import IActionExecutor, IOCREngine
+except ImportError:
+    from ..core.interfaces import IActionExecutor, IOCREngine
+
+
+def to_jsonable(value: Any) -> Any:
+    """把参数/返回值转换为可JSON序列化的形式"""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return f"<ndarray {value.shape}>"
+    return repr(value)
+
+
+def frame_hash(frame: np.ndarray) -> str:
+    """截图内容哈希，包含尺寸信息"""
+    digest = hashlib.blake2b(frame.tobytes(), digest_size=12)
+    digest.update(str(frame.shape).encode())
+    return digest.hexdigest()
+
+
+class SessionRecorder:
+    """会话记录器，PNG编码和写盘在后台线程完成，不阻塞交易线程"""
+
+    DEFAULT_DIR = "sessions"
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None, pack: bool = True):
+        """
+        Args:
+            path: 会话目录
+            meta: 写入 meta.json 的附加信息，例如分辨率
+            pack: 关闭时是否打包为 .zip 并删除目录
+        """
+        self.path = path
+        self.pack = pack
+        self._start = time.monotonic()
+        self._known_frames = set()
+        self._capture_index = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue()
+        self._closed = False
+
+        os.makedirs(os.path.join(path, "frames"), exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(dict(meta or {}, started_at=time.time()), f, ensure_ascii=False)
+        self._events_file = open(os.path.join(path, "events.jsonl"), "a", encoding="utf-8")
+
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def start(cls, base_dir: str = DEFAULT_DIR, **meta) -> "SessionRecorder":
+        """在 base_dir 下创建以时间命名的新会话"""
+        name = time.strftime("session-%Y%m%d-%H%M%S")
+        return cls(os.path.join(base_dir, name), meta)
+
+    @property
+    def capture_index(self) -> int:
+        """已记录的截图数量"""
+        return self._capture_index
+
+    def _timestamp(self) -> float:
+        return round(time.monotonic() - self._start, 6)
+
+    def _frame_ref(self, frame: np.ndarray) -> str:
+        """登记截图并返回哈希，新截图交给后台线程编码"""
+        key = frame_hash(frame)
+        if key not in self._known_frames:
+            self._known_frames.add(key)
+            self._queue.put(("frame", (key, frame.copy())))
+        return key
+
+    def record_frame(self, frame: np.ndarray) -> str:
+        """登记调用参数中的截图，返回哈希"""
+        with self._lock:
+            return self._frame_ref(frame)
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """记录任意事件"""
+        if self._closed:
+            return
+        event.setdefault("t", self._timestamp())
+        self._queue.put(("event", event))
+
+    def record_capture(self, coordinates, frame: np.ndarray) -> None:
+        """记录一次截图"""
+        with self._lock:
+            index = self._capture_index
+            self._capture_index += 1
+            ref = self._frame_ref(frame)
+        self.record_event({"type": "capture", "index": index, "coords": to_jsonable(coordinates), "frame": ref})
+
+    def record_ocr(self, method: str, image: np.ndarray, args: Dict[str, Any], result: Any) -> None:
+        """记录一次OCR调用"""
+        with self._lock:
+            ref = self._frame_ref(image)
+        self.record_event(
+            {"type": "ocr", "method": method, "frame": ref, "args": to_jsonable(args), "result": to_jsonable(result)}
+        )
+
+    def record_call(self, kind: str, method: str, args: tuple, kwargs: dict, result: Any = None, **extra) -> None:
+        """记录一次动作或检测器调用"""
+        event = {"type": kind, "method": method, "args": to_jsonable(args), "kwargs": to_jsonable(kwargs)}
+        if result is not None:
+            event["result"] = to_jsonable(result)
+        event.update(extra)
+        self.record_event(event)
+
+    def _run(self) -> None:
+        """后台写盘线程"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, payload = item
+            try:
+                if kind == "frame":
+                    key, frame = payload
+                    ok, encoded = cv2.imencode(".png", frame)
+                    if ok:
+                        with open(os.path.join(self.path, "frames", f"{key}.png"), "wb") as f:
+                            f.write(encoded.tobytes())
+                else:
+                    self._events_file.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                    if self._queue.empty():
+                        self._events_file.flush()
+            except (OSError, ValueError) as e:
+                print(f"写入会话记录失败: {e}")
+
+    def close(self) -> Optional[str]:
+        """
+        落盘并关闭记录器
+
+        Returns:
+            归档路径（打包后为 .zip 路径）
+        """
+        if self._closed:
+            return None
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._events_file.close()
+        if not self.pack:
+            return self.path
+        archive = shutil.make_archive(self.path, "zip", self.path)
+        shutil.rmtree(self.path, ignore_errors=True)
+        print(f"会话记录已保存: {archive}")
+        return archive
+
+
+class RecordingScreenCapture:
+    """记录每次截图的截图包装器，其余属性转发给被包装对象"""
+
+    def __init__(self, inner, recorder: SessionRecorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def capture_region(self, coordinates: List[float]) -> np.ndarray:
+        """截图并记录"""
+        frame = self._inner.capture_region(coordinates)
+        self._recorder.record_capture(coordinates, frame)
+        return frame
+
+    def capture_window(self) -> np.ndarray:
+        """整窗截图并记录"""
+        frame = self._inner.capture_window()
+        self._recorder.record_capture("window", frame)
+        return frame
+
+
+class RecordingOCREngine(IOCREngine):
+    """记录每次识别输入和输出的OCR包装器"""
+
+    def __init__(self, inner: IOCREngine, recorder: SessionRecorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
+        result = self._inner.image_to_string(image, binarize, font, thresh)
+        self._recorder.record_ocr(
+            "image_to_string", image, {"binarize": binarize, "font": font, "thresh": thresh}, result
+        )
+        return result
+
+    def detect_template(self, image: np.ndarray, template_name: str) -> bool:
+        result = self._inner.detect_template(image, template_name)
+        self._recorder.record_ocr("detect_template", image, {"template_name": template_name}, result)
+        return result
+
+    def find_template(self, image: np.ndarray, template_name: str) -> tuple:
+        result = self._inner.find_template(image, template_name)
+        self._recorder.record_ocr("find_template", image, {"template_name": template_name}, result)
+        return result
+
+    @staticmethod
+    def get_pixel_color(image: np.ndarray, x: int, y: int):
+        # 像素读取由截图内容完全决定，直接读取截图，不经过被包装的引擎也不单独记录
+        if image.ndim == 3:
+            return tuple(image[y, x])
+        return int(image[y, x])
+
+
+class RecordingActionExecutor(IActionExecutor):
+    """记录每次动作的动作执行器包装器"""
+
+    def __init__(self, inner, recorder: SessionRecorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            self._recorder.record_call("action", name, args, kwargs)
+            return attr(*args, **kwargs)
+
+        return wrapper
+
+    def click_position(self, position: Tuple[float, float], right_click=False) -> None:
+        self._recorder.record_call("action", "click_position", (position,), {"right_click": right_click})
+        self._inner.click_position(position, right_click)
+
+    def press_key(self, key: str) -> None:
+        self._recorder.record_call("action", "press_key", (key,), {})
+        self._inner.press_key(key)
+
+    def move_mouse(self, position: Tuple[float, float]) -> None:
+        self._recorder.record_call("action", "move_mouse", (position,), {})
+        self._inner.move_mouse(position)
+
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        self._recorder.record_call("action", "chord", (list(keys),), {"hold_ms": hold_ms})
+        self._inner.chord(keys, hold_ms)
+
+    def enter_text(self, text: str, mode: str = "auto") -> None:
+        self._recorder.record_call("action", "enter_text", (text,), {"mode": mode})
+        self._inner.enter_text(text, mode)
+
+
+class RecordingDetector:
+    """记录检测器调用及其消耗的截图区间，用于按调用回放"""
+
+    def __init__(self, inner, recorder: SessionRecorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            start = self._recorder.capture_index
+            began = time.perf_counter()
+            result = attr(*args, **kwargs)
+            self._recorder.record_call(
+                "detector",
+                name,
+                tuple(self._frame_arg(arg) for arg in args),
+                {key: self._frame_arg(value) for key, value in kwargs.items()},
+                result,
+                captures=[start, self._recorder.capture_index],
+                elapsed_ms=round((time.perf_counter() - began) * 1000, 3),
+            )
+            return result
+
+        return wrapper
+
+    def _frame_arg(self, value: Any) -> Any:
+        """传入的截图（流水线识别）记录为截图引用，回放时换回截图"""
+        if isinstance(value, np.ndarray):
+            return {"frame": self._recorder.record_frame(value)}
+        return value
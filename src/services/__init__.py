@@ -1,6 +1,17 @@
 # -*- coding: utf-8 -*-
 """模块包初始化文件"""
+from typing import TYPE_CHECKING
 
-from .window_service import WindowService
+if TYPE_CHECKING:
+    from .window_service import WindowService
 
 __all__ = ["WindowService"]
+
+
+def __getattr__(name):
+    # 窗口服务依赖 win32 和 pyautogui，用到时才导入，导入子模块（如交易循环）时不加载
+    if name == "WindowService":
+        from .window_service import WindowService
+
+        return WindowService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
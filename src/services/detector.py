@@ -3,7 +3,6 @@
 价格检测服务
 """
 import re
-import time
 from abc import abstractmethod
 from typing import List, Optional, Tuple
 
@@ -12,11 +11,15 @@ import win32gui
 
 try:
     from src.config.coordinates import CoordinateConfig
+    from src.config.ocr_profiles import OCRProfile, OCRProfiles
+    from src.core.cancellation import stop_token
     from src.core.exceptions import BalanceDetectionException, PriceDetectionException
     from src.core.interfaces import IOCREngine, IPriceDetector
     from src.infrastructure.screen_capture import ScreenCapture
 except ImportError:
     from ..config.coordinates import CoordinateConfig
+    from ..config.ocr_profiles import OCRProfile, OCRProfiles
+    from ..core.cancellation import stop_token
     from ..core.exceptions import BalanceDetectionException, PriceDetectionException
     from ..core.interfaces import IOCREngine, IPriceDetector
     from ..infrastructure.screen_capture import ScreenCapture
@@ -28,48 +31,99 @@ class PriceDetector(IPriceDetector):
     def __init__(self, screen_capture: ScreenCapture, ocr_engine: IOCREngine):
         self.screen_capture = screen_capture
         self.ocr_engine = ocr_engine
-        self.coordinates = CoordinateConfig.restore_coordinates(screen_capture.width, screen_capture.height)
-
+        # 同一分辨率和窗口偏移的坐标表只编译一次；截图用已加上窗口偏移的 screen 坐标
+        window_region = getattr(screen_capture, "window_region", None)
+        table = CoordinateConfig.compile(
+            screen_capture.width, screen_capture.height, window_region[:2] if window_region else None
+        )
+        self.coordinates = table.coordinates
+        self.screen = table.screen
+        # 各识别字段的参数和截图区域，按分辨率编译一次
+        self.ocr_profiles = OCRProfiles.compile(screen_capture.width, screen_capture.height)
+        self._field_areas = {
+            name: OCRProfiles.resolve_area(self.screen, profile) for name, profile in self.ocr_profiles.items()
+        }
+        self._check_fonts()
+        # 重试间隔可被停止信号中断
+        self.cancel_token = stop_token
+
+    @property
     @abstractmethod
-    def get_detection_coordinates(self) -> List[float]:
-        """获取价格检测坐标 - 由子类实现"""
+    def price_field(self) -> str:
+        """价格对应的OCR字段名 - 由子类实现"""
         raise NotImplementedError("not implemented")
 
-    def _detect_value(
-        self,
-        coords: List[float],
-        binarize=True,
-        font="",
-        thresh=127,
-    ) -> int:
+    def get_detection_coordinates(self) -> List[float]:
+        """获取价格检测坐标"""
+        return self._field_areas[self.price_field]
+
+    def _check_fonts(self) -> None:
+        """字段指定的字体模板不存在时提示，识别会退化为全量匹配"""
+        if not hasattr(type(self.ocr_engine), "font_names"):
+            return
+        fonts = set(self.ocr_engine.font_names())
+        missing = sorted({profile.font for profile in self.ocr_profiles.values() if profile.font} - fonts)
+        if missing:
+            print(f"警告: 未找到OCR字段使用的字体模板{missing}，将使用全量匹配")
+
+    def read_field(self, name: str, screenshot: Optional[np.ndarray] = None) -> int:
+        """
+        按字段配置识别数值
+
+        传入 screenshot 时只识别这张截图，失败直接抛出异常，不重新截图：
+        检测流水线在后台线程识别先截好的图，那时界面可能已经变化，由调用方在交易线程重新检测。
+        没有传入时按字段配置截图重试，收到停止信号时不再重试。
+
+        Args:
+            name: OCR字段名
+            screenshot: 已截取的字段区域画面
+
+        Raises:
+            PriceDetectionException: 重试次数内没有识别出满足位数和范围的数值
+        """
+        profile = self.ocr_profiles[name]
+        return self._detect_value(self._field_areas[name], profile, screenshot)
+
+    def is_field_readable(self, name: str) -> bool:
+        """字段区域内能否识别出满足要求的数值（单次识别，不重试）"""
+        profile = self.ocr_profiles[name]
+        value = self._read_once(self.screen_capture.capture_region(self._field_areas[name]), profile)
+        return value is not None and profile.accepts(value)
+
+    def _detect_value(self, coords, profile: OCRProfile, screenshot: Optional[np.ndarray] = None) -> int:
         """通用的数值检测逻辑"""
-        for _ in range(30):
-            screenshot = self.screen_capture.capture_region(coords)
-            value = self._extract_number(screenshot, binarize, font, thresh)
-            if value is not None:
+        if screenshot is not None:
+            value = self._read_once(screenshot, profile)
+            if value is not None and profile.accepts(value):
+                print("detected:", value)
+                return value
+            raise PriceDetectionException(f"ocr检测失败({profile.name})，截图中没有有效数值")
+
+        for attempt in range(profile.retries):
+            value = self._read_once(self.screen_capture.capture_region(coords), profile)
+            if value is not None and profile.accepts(value):
                 print("detected:", value)
                 return value
 
-            time.sleep(0.005)
+            if attempt + 1 < profile.retries:
+                self.cancel_token.checked_sleep(profile.retry_interval)
+
+        raise PriceDetectionException(f"ocr检测失败({profile.name})")
 
-        raise PriceDetectionException("ocr检测失败")
+    def _read_once(self, image: np.ndarray, profile: OCRProfile) -> Optional[int]:
+        return self._extract_number(image, profile.binarize, profile.font, profile.thresh)
 
     def detect_price(self) -> int:
-        """检测当前物品价格 - 使用模板方法模式"""
+        """检测当前物品价格"""
         try:
-            coords = self.get_detection_coordinates()
-            thresh = 127
-            if self.screen_capture.width == 1920:
-                thresh = 80
-            return self._detect_value(coords, thresh=thresh)
+            return self.read_field(self.price_field)
         except Exception as e:
             raise PriceDetectionException(f"价格检测异常: {e}") from e
 
-    def detect_balance(self) -> Optional[int]:
+    def detect_balance(self, screenshot: Optional[np.ndarray] = None) -> Optional[int]:
         """检测当前哈夫币余额"""
         try:
-            coords = self.coordinates["balance_detection"]
-            return self._detect_value(coords, font="w", thresh=100)
+            return self.read_field("balance", screenshot)
         except Exception as e:
             raise BalanceDetectionException(f"余额检测异常: {e}") from e
 
@@ -92,30 +146,17 @@ class HoardingModeDetector(PriceDetector):
         super().__init__(screen_capture, ocr_engine)
         self.item_convertible = item_convertible
 
-    def get_detection_coordinates(self) -> List[float]:
-        """获取价格检测坐标"""
+    @property
+    def price_field(self) -> str:
         if self.item_convertible:
-            return self.coordinates["price_detection"]["convertible"]
-        return self.coordinates["price_detection"]["non_convertible"]
-
-    def detect_price(self) -> int:
-        """检测当前物品价格 - 使用模板方法模式"""
-        try:
-            coords = self.get_detection_coordinates()
-            thresh = 127
-            if self.screen_capture.width == 1920:
-                thresh = 80
-            return self._detect_value(coords, thresh=thresh, binarize=False)
-        except Exception as e:
-            raise PriceDetectionException(f"价格检测异常: {e}") from e
+            return "hoarding_price_convertible"
+        return "hoarding_price_non_convertible"
 
 
 class RollingModeDetector(PriceDetector):
     """滚仓模式检测器"""
 
-    def get_detection_coordinates(self) -> List[float]:
-        """获取价格检测坐标"""
-        return self.coordinates["rolling_mode"]["price_area"]
+    price_field = "rolling_price"
 
     def check_purchase_failure(self) -> bool:
         """检查购买是否失败"""
@@ -147,6 +188,29 @@ class RollingModeDetector(PriceDetector):
         """检查仓库出售页面是不是无法售卖（三角洲bug）"""
         return self._match_template("failure_check", "sell")
 
+    def is_sell_listing_open(self) -> bool:
+        """售卖上架界面是否已显示（最低售价可识别）"""
+        return self.is_field_readable("min_sell_price")
+
+    def capture_area(self, area: str) -> np.ndarray:
+        """截取滚仓坐标中的指定区域，用作界面变化检测的基准"""
+        return self.screen_capture.capture_region(self.screen.rolling_mode[area])
+
+    def area_changed(self, area: str, baseline: Optional[np.ndarray], min_ratio: float = 0.005) -> bool:
+        """
+        区域画面与基准相比是否发生变化
+
+        Args:
+            area: 滚仓坐标中的区域名
+            baseline: 操作前截取的基准画面
+            min_ratio: 判定为变化的最小像素比例（仓库中一个格子的变化约占1%）
+        """
+        current = self.capture_area(area)
+        if baseline is None or current.shape != baseline.shape:
+            return True
+        diff = np.abs(current[..., :3].astype(np.int16) - baseline[..., :3].astype(np.int16)).max(axis=2)
+        return float((diff > 30).mean()) > min_ratio
+
     def check_game_start(self):
         """检测重启后游戏是否已进入选模式页面"""
         return self._match_template("app_ver_area", "app_ver", rolling_config=False)
@@ -154,45 +218,56 @@ class RollingModeDetector(PriceDetector):
     def _match_template(self, coords: str, template_name: str, rolling_config: bool = True):
         try:
             if rolling_config:
-                coords = self.coordinates["rolling_mode"][coords]
+                coords = self.screen.rolling_mode[coords]
             else:
-                coords = self.coordinates[coords]
+                coords = self.screen[coords]
             screenshot = self.screen_capture.capture_region(coords)
             return self.ocr_engine.detect_template(screenshot, template_name)
         except Exception as e:
             print("检测失败:", e)
             return False
 
-    def detect_sellable_item(self):
+    def _iter_storage_cells(self, screenshot: np.ndarray):
+        """按行遍历仓库格子中心，返回 (行, 列, 区域内坐标, 颜色, 是否为空格子)"""
         width = 9
         length = 10
         color_toleration = 20
-        coords = self.coordinates["rolling_mode"]["wait_sell_item_area"]
-        item_range = self.coordinates["rolling_mode"]["item_range"]
+        item_range = self.coordinates.rolling_mode.item_range
         item_center = [int(item_range[0] / 2), int(item_range[1] / 2)]
-        screenshot = self.screen_capture.capture_region(coords)
         valid_color = [26, 31, 34]
         current_pos = [item_center[0], item_center[1]]
         for i in range(length):
             for j in range(width):
                 color = self.ocr_engine.get_pixel_color(screenshot, current_pos[0], current_pos[1])
-                if not (
+                empty = (
                     valid_color[0] - color_toleration < color[0] < valid_color[0] + color_toleration
                     and valid_color[1] - color_toleration < color[1] < valid_color[1] + color_toleration
                     and valid_color[2] - color_toleration < color[2] < valid_color[2] + color_toleration
-                ):
-                    print(f"检测到可售卖物品: 第{j}行第{i}个, 颜色: ({color[0]}, {color[1]}, {color[2]})")
-                    return [coords[0] + current_pos[0], coords[1] + current_pos[1]]
+                )
+                yield i, j, tuple(current_pos), color, empty
                 current_pos[0] += item_range[0] + 1
             current_pos[0] = item_center[0]
             current_pos[1] += item_range[1] + 1
+
+    def detect_sellable_item(self):
+        coords = self.coordinates.rolling_mode.wait_sell_item_area
+        screenshot = self.screen_capture.capture_region(self.screen.rolling_mode.wait_sell_item_area)
+        for i, j, pos, color, empty in self._iter_storage_cells(screenshot):
+            if not empty:
+                print(f"检测到可售卖物品: 第{j}行第{i}个, 颜色: ({color[0]}, {color[1]}, {color[2]})")
+                return [coords[0] + pos[0], coords[1] + pos[1]]
         return [0, 0]
 
+    def is_storage_open(self, min_empty_ratio: float = 0.5) -> bool:
+        """仓库界面是否已显示（大部分格子中心为空格子颜色）"""
+        screenshot = self.capture_area("wait_sell_item_area")
+        cells = [empty for _, _, _, _, empty in self._iter_storage_cells(screenshot)]
+        return sum(cells) >= len(cells) * min_empty_ratio
+
     def detect_sell_num(self) -> Tuple[int, int]:
-        coords = self.coordinates["rolling_mode"]["sell_full"]
-        screenshot = self.screen_capture.capture_region(coords)
-        font = "w"
-        res = self.ocr_engine.image_to_string(screenshot, font=font, binarize=False)
+        profile = self.ocr_profiles["sell_num"]
+        screenshot = self.screen_capture.capture_region(self._field_areas["sell_num"])
+        res = self.ocr_engine.image_to_string(screenshot, profile.binarize, profile.font, profile.thresh)
         if res == "":
             return 0, 0
         if "/" in res:
@@ -205,47 +280,31 @@ class RollingModeDetector(PriceDetector):
         # 识别失败时为了防止检测失误，就当拍卖行上架已满，等待下次检测
         return cur_num == 0 and max_num == 0
 
-    def detect_min_sell_price(self) -> int:
+    def detect_min_sell_price(self, screenshot: Optional[np.ndarray] = None) -> int:
         """检测当前售卖的最小价格"""
-        font = "w"
-        binarize = True
-        thresh = 50
-        if self.screen_capture.width == 1920:
-            font = "g"
-            binarize = False
-        return self._detect_area("min_sell_price_area", font=font, binarize=binarize, thresh=thresh)
-
-    def detect_min_sell_price_count(self) -> int:
-        """检测当前售卖的最小价格"""
-        font = "w"
-        if self.screen_capture.width == 1920:
-            font = "c"
+        return self._detect_field("min_sell_price", screenshot)
 
-        return self._detect_area("min_sell_price_count_area", binarize=False, font=font)
+    def detect_min_sell_price_count(self, screenshot: Optional[np.ndarray] = None) -> int:
+        """检测当前售卖的最小价格"""
+        return self._detect_field("min_sell_price_count", screenshot)
 
-    def detect_expected_revenue(self) -> int:
+    def detect_expected_revenue(self, screenshot: Optional[np.ndarray] = None) -> int:
         """检测当前售卖的期望收益"""
-        font = "w"
-        binarize = False
-        if self.screen_capture.width == 1920:
-            font = "g"
-        res = self._detect_area("expected_revenue_area", binarize=binarize, font=font)
+        res = self._detect_field("expected_revenue", screenshot)
         # 检测器会把售价边上的问号当成7，所以这里特殊处理一下... TODO: 以后再修
         return int((res - 7) / 10) if res % 10 == 7 else res
 
     def detect_current_sell_price(self) -> int:
-        return self._detect_area("sell_price_text_area", font="w")
+        return self._detect_field("current_sell_price")
 
     def detect_total_sell_price_area(self) -> int:
         """检测当前售卖总价"""
-        return self._detect_area("total_sell_price_area", font="w", thresh=80)
+        return self._detect_field("total_sell_price")
 
-    def _detect_area(self, template, binarize=True, font="", thresh=127) -> int:
-        """检测模板的区域, 并返回数值"""
+    def _detect_field(self, name: str, screenshot: Optional[np.ndarray] = None) -> int:
+        """检测字段的数值"""
         try:
-            coords = self.coordinates["rolling_mode"][template]
-            print(coords)
-            return self._detect_value(coords, binarize=binarize, font=font, thresh=thresh)
+            return self.read_field(name, screenshot)
         except Exception as e:
             raise PriceDetectionException(f"价格检测异常: {e}") from e
 
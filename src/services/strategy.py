@@ -5,7 +5,7 @@
 from typing import Any, Dict
 
 from ..config.trading_config import TradingMode
-from ..core.event_bus import event_bus
+from ..core.event_bus import LazyText, event_bus
 from ..core.interfaces import ITradingStrategy, MarketData, TradingConfig
 
 
@@ -38,10 +38,10 @@ class HoardingStrategy(ITradingStrategy):
             # 计算单价
             unit_price = self._calc_unit_price(market_data)
             if unit_price > 100:
-                event_bus.emit_overlay_text_updated(f"上次购买单价: {unit_price}")
+                event_bus.emit_overlay_text_updated(LazyText("上次购买单价: {}", unit_price))
                 return unit_price <= self.config.max_price
             print(f"单价计算异常({unit_price})，直接看市场底价")
-            event_bus.emit_overlay_text_updated(f"单价计算异常({unit_price})，直接看市场底价")
+            event_bus.emit_overlay_text_updated(LazyText("单价计算异常({})，直接看市场底价", unit_price))
         print("current_price:", market_data.current_price, "max_price:", self.config.max_price)
         return market_data.current_price <= int(self.config.max_price)
 
@@ -60,7 +60,7 @@ class HoardingStrategy(ITradingStrategy):
             unit_price = self._calc_unit_price(market_data)
             if unit_price >= 50:
                 print("计算上次购买单价:", unit_price)
-                event_bus.emit_overlay_text_updated(f"上次购买单价: {unit_price}")
+                event_bus.emit_overlay_text_updated(LazyText("上次购买单价: {}", unit_price))
                 if self.config.ideal_price < unit_price <= self.config.max_price:
                     buy_quantity = 31
                 elif unit_price <= self.config.ideal_price:
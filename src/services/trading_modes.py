@@ -2,35 +2,108 @@
 """
 交易模式实现
 """
-import datetime
 import os
 import time
-from typing import Dict, Optional, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pyautogui
 
 from src.utils.window_helper import bring_window_to_front
 
 try:
+    from src.config.config_factory import ConfigFactory
     from src.config.trading_config import ItemType, TradingConfig, TradingMode
-    from src.core.event_bus import event_bus
-    from src.core.exceptions import TradingException
+    from src.core.cancellation import stop_token
+    from src.core.event_bus import LazyText, event_bus
+    from src.core.exceptions import (
+        DeadlineExceededException,
+        DetectionException,
+        OperationCancelledException,
+        TradingException,
+    )
+    from src.core.input_macro import (
+        InputMacro,
+        MacroRunner,
+        MacroStep,
+        chord_hold_ms,
+        delay_operations,
+        delay_steps,
+    )
     from src.core.interfaces import IOCREngine, ITradingMode, MarketData
+    from src.core.state_machine import StateFailure, StateMachine, StateSpec
     from src.infrastructure.action_executor import PyAutoGUIActionExecutor as ActionExecutor
     from src.infrastructure.screen_capture import ScreenCapture
     from src.services.detector import HoardingModeDetector, RollingModeDetector
     from src.services.strategy import StrategyFactory
+    from src.storage.price_store import PriceStore
+    from src.storage.trade_ledger import TradeLedger
+    from src.storage.trade_log import TradeLogWriter
     from src.utils.delay_helper import delay_helper
+    from src.utils.detection_pipeline import DetectionPipeline, PendingDetection
+    from src.utils.metrics import Metric
 except ImportError:
+    from ..config.config_factory import ConfigFactory
     from ..config.trading_config import ItemType, TradingConfig, TradingMode
-    from ..core.event_bus import event_bus
-    from ..core.exceptions import TradingException
+    from ..core.cancellation import stop_token
+    from ..core.event_bus import LazyText, event_bus
+    from ..core.exceptions import (
+        DeadlineExceededException,
+        DetectionException,
+        OperationCancelledException,
+        TradingException,
+    )
+    from ..core.input_macro import (
+        InputMacro,
+        MacroRunner,
+        MacroStep,
+        chord_hold_ms,
+        delay_operations,
+        delay_steps,
+    )
     from ..core.interfaces import IOCREngine, ITradingMode, MarketData
+    from ..core.state_machine import StateFailure, StateMachine, StateSpec
     from ..infrastructure.action_executor import PyAutoGUIActionExecutor as ActionExecutor
     from ..infrastructure.screen_capture import ScreenCapture
     from ..services.detector import HoardingModeDetector, RollingModeDetector
     from ..services.strategy import StrategyFactory
+    from ..storage.price_store import PriceStore
+    from ..storage.trade_ledger import TradeLedger
+    from ..storage.trade_log import TradeLogWriter
     from ..utils.delay_helper import delay_helper
+    from ..utils.detection_pipeline import DetectionPipeline, PendingDetection
+    from ..utils.metrics import Metric
+
+
+def record_price_observation(mode: str, item: str, price: int, decision: str, cycle_start: float) -> None:
+    """把本周期的价格观测写入价格存储，存储异常不影响交易"""
+    try:
+        latency_ms = (time.perf_counter() - cycle_start) * 1000
+        PriceStore.get_store().record(mode, item, price, decision, latency_ms)
+    except Exception as e:
+        print(f"记录价格观测失败: {e}")
+
+
+def record_trade(kind: str, **fields) -> None:
+    """把购买/售卖/邮件领取写入盈亏账本，账本异常不影响交易"""
+    try:
+        ledger = TradeLedger.get_store()
+        {"buy": ledger.record_buy, "sell": ledger.record_sell, "mail": ledger.record_mail}[kind](**fields)
+    except Exception as e:
+        print(f"记录交易账本失败: {e}")
+
+
+def check_delay_operations(operations: Tuple[str, ...]) -> List[str]:
+    """启动时检查当前模式的延迟配置是否包含代码中用到的所有操作，缺少的操作执行到时会失败"""
+    missing = delay_helper.missing_operations(operations)
+    if missing:
+        print(f"延迟配置缺少以下操作，请检查 delay_config.yaml: {', '.join(missing)}")
+    return missing
+
+
+# 屯仓模式用到的延迟操作
+HOARDING_DELAY_OPERATIONS = ("enter_action", "refresh_operation")
 
 
 class HoardingTradingMode(ITradingMode):
@@ -51,22 +124,44 @@ class HoardingTradingMode(ITradingMode):
         self.buy_failed_count = 0
         # 停止标志
         self._should_stop = False
+        # 停止时中断正在进行的等待
+        self.cancel_token = stop_token
+        # 热更新的配置，在下一个周期开始时生效
+        self._next_config: Optional[TradingConfig] = None
 
     def initialize(self, config: TradingConfig, **kwargs) -> None:
         """初始化屯仓模式"""
         self.config = config
+        self._next_config = None
         factory = StrategyFactory()
         self.strategy = factory.create_strategy(config)
         self.refresh_strategy = factory.create_refresh_strategy(config)
         self._should_stop = False
+        self.cancel_token.reset()
         delay_helper.reload_config()
         delay_helper.set_mode(TradingMode.HOARDING)
+        check_delay_operations(HOARDING_DELAY_OPERATIONS)
 
     def stop(self) -> None:
         """停止交易模式"""
         self._should_stop = True
+        self.cancel_token.cancel()
         print("屯仓模式收到停止信号")
 
+    def apply_config(self, config: TradingConfig) -> None:
+        """运行中换用热更新的配置，在下一个周期开始时生效"""
+        self._next_config = config
+
+    def _apply_next_config(self) -> None:
+        config = self._next_config
+        if config is None or config is self.config:
+            return
+        self.config = config
+        factory = StrategyFactory()
+        self.strategy = factory.create_strategy(config)
+        self.refresh_strategy = factory.create_refresh_strategy(config)
+        print(f"屯仓模式已换用新配置: 理想价格={config.ideal_price}, 最高价格={config.max_price}")
+
     def prepare(self) -> None:
         self.mouse_position = self.action_executor.get_mouse_position()
         self.current_balance = self._detect_balance()
@@ -75,19 +170,22 @@ class HoardingTradingMode(ITradingMode):
 
     def execute_cycle(self) -> bool:
         """执行一个屯仓交易周期"""
+        cycle_start = time.perf_counter()
         try:
             # 检查停止信号
             if self._should_stop:
                 print("检测到停止信号，退出交易周期")
                 return False
 
+            self._apply_next_config()
             self._execute_enter()
             # 获取当前价格
             current_price = self.detector.detect_price()
             if current_price < 100:
-                event_bus.emit_overlay_text_updated(f"当前价格({current_price})异常, 跳过本次购买")
+                event_bus.emit_overlay_text_updated(LazyText("当前价格({})异常, 跳过本次购买", current_price))
+                self._record_price(current_price, "skip", cycle_start)
                 return not self._should_stop
-            event_bus.emit_overlay_text_updated(f"当前价格: {current_price}")
+            event_bus.emit_overlay_text_updated(LazyText("当前价格: {}", current_price))
             # 获取当前余额（如果需要）
             if self.config.use_balance_calculation and self.last_buy_quantity != 0:
                 self.current_balance = self._detect_balance()
@@ -112,14 +210,16 @@ class HoardingTradingMode(ITradingMode):
             if self.buy_failed_count >= 10:
                 print("连续10次购买失败，仓库可能满了，退出购买")
                 event_bus.emit_overlay_text_updated("连续10次购买失败，仓库可能满了，退出购买")
+                self._record_price(current_price, "storage_full", cycle_start)
                 return False
 
             # 执行交易逻辑
             if self.strategy.should_buy(self.current_market_data):
                 print("直接购买")
+                self._record_price(current_price, "buy", cycle_start)
                 # 购买逻辑
                 quantity = self.strategy.get_buy_quantity(self.current_market_data)
-                event_bus.emit_overlay_text_updated(f"直接购买, 价格: {current_price}, 数量: {quantity}")
+                event_bus.emit_overlay_text_updated(LazyText("直接购买, 价格: {}, 数量: {}", current_price, quantity))
 
                 self._execute_buy(quantity)
                 self.last_buy_quantity = quantity
@@ -128,13 +228,17 @@ class HoardingTradingMode(ITradingMode):
                     return False  # 钥匙卡模式购买后停止
             elif self.refresh_strategy.should_refresh(self.current_market_data):
                 print("刷新购买")
+                self._record_price(current_price, "refresh_buy", cycle_start)
                 quantity = self.strategy.get_buy_quantity(self.current_market_data)
                 self._execute_buy(quantity)
                 self.last_buy_quantity = self.refresh_strategy.get_buy_quantity(self.config)
             elif self.strategy.should_refresh(self.current_market_data):
                 print("直接刷新")
+                self._record_price(current_price, "refresh", cycle_start)
                 self._execute_refresh()
                 self.last_buy_quantity = 0
+            else:
+                self._record_price(current_price, "hold", cycle_start)
 
             # 更新余额
             if self.config.use_balance_calculation:
@@ -143,11 +247,19 @@ class HoardingTradingMode(ITradingMode):
             return not self._should_stop  # 如果收到停止信号则返回False
 
         except Exception as e:
+            if self.cancel_token.is_cancelled():
+                print("交易周期被停止信号中断")
+                return False
             self._execute_enter()
             raise TradingException(f"屯仓模式交易失败: {e}") from e
 
+    def _record_price(self, price: int, decision: str, cycle_start: float) -> None:
+        """记录本周期的价格观测"""
+        item = ItemType(self.config.item_type).name.lower()
+        record_price_observation("hoarding", item, price, decision, cycle_start)
+
     def _detect_balance(self):
-        self.action_executor.move_mouse(self.detector.coordinates["balance_active"])
+        self.action_executor.move_mouse(self.detector.screen.balance_active)
         return self.detector.detect_balance()
 
     def _execute_enter(self) -> None:
@@ -161,10 +273,11 @@ class HoardingTradingMode(ITradingMode):
         if not self.config.key_mode:
             quantity_pos = "min" if quantity == 31 else "max"
             self.action_executor.click_position(
-                self.detector.coordinates["buy_buttons"][f"{convertible}convertible_{quantity_pos}"]
+                self.detector.screen.buy_buttons[f"{convertible}convertible_{quantity_pos}"]
             )
-        self.action_executor.click_position(self.detector.coordinates["buy_buttons"][f"{convertible}convertible_buy"])
+        self.action_executor.click_position(self.detector.screen.buy_buttons[f"{convertible}convertible_buy"])
         print(f"执行购买: 数量={quantity}")
+        event_bus.emit_metric(Metric.BUYS, 1)
 
     def _execute_refresh(self) -> None:
         """执行刷新操作"""
@@ -177,8 +290,187 @@ class HoardingTradingMode(ITradingMode):
         return self.current_market_data
 
 
+class RollingState(Enum):
+    """滚仓周期状态"""
+
+    CONFIG_PAGE = "config_page"  # 进入配装页并切换配装
+    PRICE_CHECK = "price_check"  # 检测价格并决定是否购买
+    BUY = "buy"  # 二次检测并点击购买
+    VERIFY = "verify"  # 检查购买结果并计算花费
+    STORAGE = "storage"  # 进入仓库并转移物品
+    SELL = "sell"  # 按比例分轮售卖
+    MAIL = "mail"  # 邮件领取哈夫币
+    BACK = "back"  # 返回配装页并记录余额
+
+
+@dataclass
+class RollingCycleContext:
+    """一个滚仓周期在状态之间传递的数据"""
+
+    option_config: dict
+    target_price: int
+    min_price: int
+    cycle_start: float
+    current_price: int = 0
+    cur_balance: int = 0
+    cost: int = 0
+    # 周期结束后是否继续下一个周期
+    keep_running: bool = True
+    # 售卖进度
+    sell_time: int = 0
+    sell_failures: int = 0
+    sell_profit: int = 0
+    sell_count: int = 0
+    sell_cycles: List[dict] = field(default_factory=list)
+    transfer_checked: bool = False
+    # 从中途失败的校验状态继续
+    verify_resumed: bool = False
+
+
+# 领取邮件中的售卖所得
+GET_MAIL_MACRO = InputMacro(
+    "get_mail_half_coin",
+    (
+        MacroStep("click", "mail_button"),
+        MacroStep("delay", "after_mail_button_click"),
+        MacroStep("click", "mail_trade_button"),
+        MacroStep("delay", "after_mail_trade_click"),
+        MacroStep("click", "mail_get_button"),
+        MacroStep("delay", "after_mail_get_click"),
+        MacroStep("click", "mail_get_button"),
+        MacroStep("delay", "after_confirm_mail_click"),
+        MacroStep("key", "esc"),
+    ),
+)
+
+# 进入仓库并转移全部物品（固定延迟）
+ENTER_STORAGE_MACRO = InputMacro(
+    "enter_storage_and_transfer",
+    (
+        MacroStep("click", "enter_storage"),
+        MacroStep("delay", "after_enter_storage"),
+        MacroStep("click", "transfer_all"),
+        MacroStep("delay", "after_transfer_all"),
+    ),
+)
+
+# 快速售卖：售价输入1后点击倒数第二根价格柱子获得最高卖价
+FAST_SELL_PRICE_MACRO = InputMacro(
+    "fast_sell_price",
+    (
+        MacroStep("click", "sell_price_text"),
+        MacroStep("delay", "after_sell_price_text_click"),
+        MacroStep("chord", ("ctrl", "a")),
+        MacroStep("delay", "after_select_sell_text_price"),
+        MacroStep("type", "1"),
+        MacroStep("delay", "after_select_sell_text_price"),
+        MacroStep("click", "btn_quick_sell_area"),
+        MacroStep("delay", "after_sell_price_text_click"),
+        MacroStep("click", "fast_sell_price_button"),
+        MacroStep("delay", "after_sell_price_text_click"),
+    ),
+)
+
+# 滚仓模式用到的延迟操作，宏中的延迟从宏定义中收集
+ROLLING_DELAY_OPERATIONS = (
+    "initialization",
+    "balance_detection",
+    "before_option_switch",
+    "after_option_switch",
+    "price_detection_retry",
+    "second_price_detection_retry",
+    "before_buy",
+    "after_buy",
+    "after_check_purchase_failure",
+    "after_buy_failed",
+    "after_buy_success",
+    "after_refresh",
+    "after_enter_storage",
+    "after_transfer_all",
+    "after_move_to_sell_item",
+    "chord_hold",
+    "after_right_click_sell_item",
+    "sell_window_wait",
+    "after_sell_button_click",
+    "resolve_sell_stuck",
+    "after_sell_price_text_click",
+    "after_set_sell_price",
+    "after_sale_column_full",
+    "after_move_to_sell_detail",
+    "after_sell_finish",
+    "before_get_mail",
+    "after_get_mail",
+    "buy_success_refresh_final",
+    "after_get_mail_and_detect_balance",
+    "before_open_mode_select_menu_tarkov_mode",
+    "before_select_mode",
+    "before_open_mode_select_menu_battlefield_mode",
+    "before_select_map",
+    "before_select_zero_dam",
+    "before_start_action",
+    "after_enter_game_home",
+) + delay_operations(GET_MAIL_MACRO, ENTER_STORAGE_MACRO, FAST_SELL_PRICE_MACRO)
+
+# 状态超时 = 识别和输入的固定余量 + 一次执行中各延迟可能达到的最大值之和 * (重试次数 + 1)
+# 延迟按执行顺序列出，重复执行的按次数列出；延迟配置重新加载后重新计算
+ROLLING_STATE_TIMEOUTS: Dict[RollingState, Tuple[float, Tuple[str, ...]]] = {
+    RollingState.CONFIG_PAGE: (5.0, ("before_option_switch", "after_option_switch")),
+    RollingState.PRICE_CHECK: (5.0, ("price_detection_retry",) * 5 + ("after_refresh",)),
+    RollingState.BUY: (5.0, ("before_buy", "second_price_detection_retry", "after_refresh")),
+    RollingState.VERIFY: (
+        10.0,
+        (
+            "after_buy",
+            "after_refresh",
+            "after_check_purchase_failure",
+            "balance_detection",
+            "after_buy_failed",
+            "after_buy_success",
+            "balance_detection",
+        ),
+    ),
+    RollingState.STORAGE: (15.0, delay_steps(ENTER_STORAGE_MACRO)),
+    RollingState.SELL: (
+        60.0,
+        (
+            "resolve_sell_stuck",
+            "resolve_sell_stuck",
+            "after_move_to_sell_item",
+            "chord_hold",
+            "sell_window_wait",
+            "after_sell_button_click",
+            "after_refresh",
+            "after_refresh",
+        )
+        + delay_steps(FAST_SELL_PRICE_MACRO)
+        + (
+            "after_sell_price_text_click",
+            "after_set_sell_price",
+            "after_sell_finish",
+            "after_sale_column_full",
+            "after_move_to_sell_detail",
+            "after_move_to_sell_detail",
+            "after_sell_finish",
+        ),
+    ),
+    RollingState.MAIL: (20.0, ("before_get_mail",) + delay_steps(GET_MAIL_MACRO) + ("after_get_mail",)),
+    RollingState.BACK: (
+        15.0,
+        ("after_refresh", "buy_success_refresh_final", "balance_detection", "after_get_mail_and_detect_balance"),
+    ),
+}
+
+
 class RollingTradingMode(ITradingMode):
     """滚仓模式交易实现"""
+
+    # 每轮售卖的数量比例
+    SELL_RATIOS = [0.33, 0.5, 1.0]
+    # 售卖轮次最多失败次数，超过后带着已售结果去领取邮件
+    MAX_SELL_FAILURES = 10
+    # 连续跨周期继续的最大次数，超过后走整体恢复逻辑
+    MAX_RESUMES = 2
+
     detector: RollingModeDetector
 
     current_market_data: MarketData
@@ -195,20 +487,41 @@ class RollingTradingMode(ITradingMode):
         self.count = 0
         # 停止标志
         self._should_stop = False
+        # 停止时中断正在进行的等待
+        self.cancel_token = stop_token
         self.loop_count = 0
         self.buy_failed_count = 0
         self.buy_success_count = 0
         self.fail_count = 0
+        # 上个周期失败时可继续的状态和上下文
+        self._resume: Optional[Tuple[RollingState, RollingCycleContext]] = None
+        self._resume_count = 0
+        self.state_machine = self._build_state_machine()
+        # 已稳定区域的识别与后续输入并行，未开启时同步执行
+        self.pipeline = DetectionPipeline(enabled=False)
+        self._macro_runner: Optional[MacroRunner] = None
+        # 热更新的配置，在下一个周期开始时生效
+        self._next_config: Optional[TradingConfig] = None
 
     def initialize(self, config: TradingConfig, **kwargs) -> None:
         """初始化滚仓模式"""
         self.config = config
+        self._next_config = None
         self.option_configs = config.rolling_options
         self.last_balance = None
         self._should_stop = False
+        self.cancel_token.reset()
         self.fail_count = 0
+        self._resume = None
+        self._resume_count = 0
+        self.pipeline.enabled = config.overlap_detection
         delay_helper.reload_config()
         delay_helper.set_mode(TradingMode.ROLLING)
+        check_delay_operations(ROLLING_DELAY_OPERATIONS)
+        self._update_state_timeouts()
+        delay_config_manager = ConfigFactory.get_config_manager("delay")
+        if hasattr(delay_config_manager, "subscribe"):
+            delay_config_manager.subscribe(self._on_delay_config_reloaded)
         if kwargs.get("profit", None):
             self.profit = kwargs.get("profit")
         if kwargs.get("count", None):
@@ -217,178 +530,391 @@ class RollingTradingMode(ITradingMode):
     def stop(self) -> None:
         """停止交易模式"""
         self._should_stop = True
+        self.cancel_token.cancel()
         print("滚仓模式收到停止信号")
+        delay_config_manager = ConfigFactory.get_config_manager("delay")
+        if hasattr(delay_config_manager, "unsubscribe"):
+            delay_config_manager.unsubscribe(self._on_delay_config_reloaded)
+        TradeLogWriter.get_writer().flush()
+        TradeLedger.get_store().flush()
+        delay_helper.save_tuned()
+        print(self.state_machine.format_stats())
+        if self.pipeline.enabled:
+            print(self.pipeline.format_stats())
+        self.pipeline.shutdown(wait=False)
+        if delay_helper.get_saved_time(TradingMode.ROLLING):
+            print(delay_helper.format_tuning_report())
+
+    def apply_config(self, config: TradingConfig) -> None:
+        """运行中换用热更新的配置，在下一个新周期开始时生效，继续中的周期仍使用原配置"""
+        self._next_config = config
+
+    def _apply_next_config(self) -> None:
+        config = self._next_config
+        if config is None or config is self.config:
+            return
+        self.config = config
+        self.option_configs = config.rolling_options
+        self.pipeline.enabled = config.overlap_detection
+        print(f"滚仓模式已换用新配置: 配装选项={config.rolling_option + 1}")
 
     def prepare(self) -> None:
         self.last_balance = self._detect_balance()
         print("===" * 30)
         print("初始化成功，当前余额:", self.last_balance)
-        self.append_to_sell_log("===" * 30)
-        self.append_to_sell_log(f"初始化成功，当前余额: {self.last_balance}")
-        event_bus.emit_overlay_text_updated(f"初始化成功，当前余额: {self.last_balance}")
+        self.append_to_sell_log("===" * 30, event="session")
+        self.append_to_sell_log(
+            f"初始化成功，当前余额: {self.last_balance}", event="session", balance=self.last_balance
+        )
+        event_bus.emit_overlay_text_updated(LazyText("初始化成功，当前余额: {}", self.last_balance))
         delay_helper.sleep("initialization")
 
     def execute_cycle(self) -> bool:
-        """执行一个滚仓交易周期"""
+        """执行一个滚仓交易周期，上个周期在可继续的状态失败时从该状态继续"""
+        context = None
         try:
             # 检查停止信号
             if self._should_stop:
                 print("检测到停止信号，退出交易周期")
                 return False
 
-            # 获取配装配置
-            if self.config.rolling_option >= len(self.option_configs):
-                return False
-            option_config = self.option_configs[self.config.rolling_option]
-            if not option_config:
+            if self._resume is not None:
+                state, context = self._resume
+                self._resume = None
+                print(f"从状态[{state.value}]继续上个周期")
+                self._recover_on_resume(state, context)
+            else:
+                self._apply_next_config()
+                # 获取配装配置
+                if self.config.rolling_option >= len(self.option_configs):
+                    return False
+                option_config = self.option_configs[self.config.rolling_option]
+                if not option_config:
+                    return False
+
+                if (
+                    self.config.switch_to_battlefield
+                    and self.loop_count > 0
+                    and self.loop_count % self.config.switch_to_battlefield_count == 0
+                ):
+                    self.cancel_token.checked_sleep(1)
+                    self._switch_to_battlefield_and_return()
+                    self.cancel_token.checked_sleep(0.5)
+                self.loop_count += 1
+
+                context = RollingCycleContext(
+                    option_config=option_config,
+                    target_price=option_config["buy_price"] * option_config["buy_count"],
+                    min_price=option_config["min_buy_price"] * option_config["buy_count"],
+                    cycle_start=time.perf_counter(),
+                )
+                state = RollingState.CONFIG_PAGE
+
+            self.state_machine.run(state, context)
+            self._resume_count = 0
+            self._update_statistics()
+            self.fail_count = 0
+            return context.keep_running and not self._should_stop  # 如果收到停止信号则返回False
+
+        except StateFailure as e:
+            spec = self.state_machine.specs[e.state]
+            if spec.resumable and self._resume_count < self.MAX_RESUMES and not self._should_stop:
+                # 已经买入，保留进度，下个周期直接从失败的状态继续，不必重新走一遍完整周期
+                self._resume = (e.state, e.context)
+                self._resume_count += 1
+                self.fail_count += 1
+                raise TradingException(f"滚仓模式交易失败({self.fail_count + 1})，下个周期从该状态继续: {e}") from e
+            self._resume_count = 0
+            return self._recover_from_failure(e)
+        except Exception as e:
+            return self._recover_from_failure(e)
+
+    def _recover_from_failure(self, e: Exception) -> bool:
+        """根据当前画面尝试脱离卡死并抛出交易异常，游戏闪退且重启失败或收到停止信号时返回False"""
+        if self.cancel_token.is_cancelled():
+            print(f"交易周期被停止信号中断: {e}")
+            return False
+        if self.detector.check_stuck():
+            print("检测到点入装备界面，尝试脱离卡死")
+            self._execute_refresh()
+        elif self.detector.is_in_game_lobby():
+            print("检测到进入游戏大厅，尝试脱离卡死")
+            self._enter_action_window(self.detector.pei_zhuang_enabled())
+        elif self.detector.check_stuck2():
+            print("检测到没有L按钮进入配装界面，尝试修复")
+            # 没有L按钮进入配装界面
+            self._execute_refresh()
+            self.cancel_token.checked_sleep(1)
+            self._enter_action_window()
+        self.fail_count += 1
+        if self.fail_count > 10 and not self.detector.detect_window_exist()[0]:
+            print("检测到游戏闪退，尝试重启")
+            self.append_to_sell_log("游戏闪退，尝试重启", event="restart")
+            if not self._restart_game():
                 return False
+            self.append_to_sell_log("游戏重启成功！", event="restart")
+            raise TradingException("游戏闪退！") from e
+        raise TradingException(f"滚仓模式交易失败({self.fail_count + 1}): {e}") from e
+
+    def _build_state_machine(self) -> StateMachine:
+        """滚仓周期: 配装页 -> 价格检测 -> 购买 -> 校验 -> 仓库 -> 售卖 -> 邮件 -> 返回"""
+        return StateMachine(
+            "滚仓",
+            {
+                RollingState.CONFIG_PAGE: StateSpec(self._state_config_page),
+                RollingState.PRICE_CHECK: StateSpec(self._state_price_check, retries=1),
+                # 购买和校验涉及扣款，失败时不原地重试，交给整体恢复逻辑；校验失败时可能已经扣款，下个周期按余额继续校验
+                RollingState.BUY: StateSpec(self._state_buy),
+                RollingState.VERIFY: StateSpec(self._state_verify, resumable=True),
+                RollingState.STORAGE: StateSpec(self._state_storage, retries=2, resumable=True),
+                RollingState.SELL: StateSpec(self._state_sell, retries=3, recover=self._recover_sell, resumable=True),
+                RollingState.MAIL: StateSpec(self._state_mail, retries=1, resumable=True),
+                RollingState.BACK: StateSpec(self._state_back, retries=1, resumable=True),
+            },
+            should_stop=lambda: self._should_stop,
+            token=self.cancel_token,
+        )
 
-            if (
-                self.config.switch_to_battlefield
-                and self.loop_count > 0
-                and self.loop_count % self.config.switch_to_battlefield_count == 0
-            ):
-                time.sleep(1)
-                self._switch_to_battlefield_and_return()
-                time.sleep(0.5)
-            self.loop_count += 1
+    def _update_state_timeouts(self) -> None:
+        """按当前延迟配置重新计算每个状态的超时"""
+        for state, (margin, operations) in ROLLING_STATE_TIMEOUTS.items():
+            delays = 0.0
+            for operation in operations:
+                try:
+                    delays += delay_helper.get_delay(operation, upper_bound=True)
+                except ValueError:
+                    # 配置中缺少的操作在初始化检查时已经提示
+                    continue
+            retries = self.state_machine.specs[state].retries
+            self.state_machine.set_timeout(state, margin + delays * (retries + 1))
+
+    def _on_delay_config_reloaded(self, config) -> None:
+        """延迟配置文件被外部修改后重新计算状态超时，delay_helper 先于交易模式订阅，此时已换用新配置"""
+        self._update_state_timeouts()
+
+    def _recover_sell(self, context: RollingCycleContext) -> None:
+        """售卖状态重试前回到仓库"""
+        self._resolve_sell_stuck()
+
+    def _recover_on_resume(self, state: RollingState, context: RollingCycleContext) -> None:
+        """跨周期继续前的恢复动作"""
+        if state == RollingState.SELL:
+            self._resolve_sell_stuck()
+        elif state == RollingState.VERIFY:
+            # 校验中途失败时可能停在购买结果弹窗上，关闭后按余额重新判断是否买入
+            self._execute_refresh()
+            context.verify_resumed = True
 
-            target_price = option_config["buy_price"] * option_config["buy_count"]
-            min_price = option_config["min_buy_price"] * option_config["buy_count"]
+    def _state_config_page(self, context: RollingCycleContext) -> RollingState:
+        """进入配装页并切换到指定配装"""
+        self._execute_enter()
+        delay_helper.sleep("before_option_switch")
+        self._switch_to_option(self.config.rolling_option)
+        delay_helper.sleep("after_option_switch")
+        return RollingState.PRICE_CHECK
+
+    def _state_price_check(self, context: RollingCycleContext) -> Optional[RollingState]:
+        """检测价格，价格合适时进入购买，否则刷新并结束周期"""
+        option_config = context.option_config
+        current_price = 0
+        for i in range(5):
+            # 检测价格
+            current_price = self.detector.detect_price()
+            if current_price > context.min_price:
+                break
+            print(f"价格小于异常价格，重新检测({i}/5)")
+            delay_helper.sleep("price_detection_retry")
+        context.current_price = current_price
+        # 存储市场数据
+        self.current_market_data = MarketData(
+            current_price=current_price, balance=None, timestamp=time.time()  # 滚仓模式不检测余额
+        )
 
-            self._execute_enter()
-            delay_helper.sleep("before_option_switch")
-            # 切换到指定配装选项
-            self._switch_to_option(self.config.rolling_option)
-            delay_helper.sleep("after_option_switch")
-            current_price = 0
-            for i in range(5):
-                # 检测价格
-                current_price = self.detector.detect_price()
-                if current_price > min_price:
-                    break
-                print(f"价格小于异常价格，重新检测({i}/5)")
-                delay_helper.sleep("price_detection_retry")
-            # 存储市场数据
-            self.current_market_data = MarketData(
-                current_price=current_price, balance=None, timestamp=time.time()  # 滚仓模式不检测余额
+        print(
+            f"滚仓模式: 单价={option_config['buy_price']}, "
+            f"数量={option_config['buy_count']}, "
+            f"总价={context.target_price}, 最低价={context.min_price}, "
+            f"当前价={current_price}, 循环次数: {self.loop_count}"
+        )
+        event_bus.emit_overlay_text_updated(
+            LazyText(
+                "当前价格[{}, {}] 目标价格[{}] 总盈利[{}] 总购买数[{}] 循环次数[{}] 购买成功[{}] 购买失败[{}]",
+                current_price,
+                current_price / option_config["buy_count"],
+                context.target_price,
+                self.profit,
+                self.count,
+                self.loop_count,
+                self.buy_success_count,
+                self.buy_failed_count,
             )
+        )
 
-            print(
-                f"滚仓模式: 单价={option_config['buy_price']}, "
-                f"数量={option_config['buy_count']}, "
-                f"总价={target_price}, 最低价={min_price}, "
-                f"当前价={current_price}, 循环次数: {self.loop_count}"
-            )
+        if context.min_price < current_price <= context.target_price:
+            return RollingState.BUY
+        # 刷新
+        self._record_price(current_price, "refresh", context.cycle_start)
+        self._execute_refresh()
+        return None
+
+    def _state_buy(self, context: RollingCycleContext) -> Optional[RollingState]:
+        """可选的二次价格检测后点击购买"""
+        delay_helper.sleep("before_buy")
+        if self.config.second_detect:
+            delay_helper.sleep("second_price_detection_retry")
+            second_detect_price = self.detector.detect_price()
+            if not context.min_price < second_detect_price <= context.target_price:
+                event_bus.emit_overlay_text_updated(
+                    LazyText("二次检测失败({}, {})，跳过购买", context.current_price, second_detect_price)
+                )
+                self._record_price(second_detect_price, "second_detect_failed", context.cycle_start)
+                self._execute_refresh()
+                return None
             event_bus.emit_overlay_text_updated(
-                f"当前价格[{current_price}, {current_price / option_config['buy_count']}] 目标价格[{target_price}] "
-                f"总盈利[{self.profit}] 总购买数[{self.count}] 循环次数[{self.loop_count}] "
-                f"购买成功[{self.buy_success_count}] 购买失败[{self.buy_failed_count}]"
+                LazyText("二次检测成功({}, {})，执行购买", context.current_price, second_detect_price)
             )
+            self._record_price(second_detect_price, "buy", context.cycle_start)
+        else:
+            self._record_price(context.current_price, "buy", context.cycle_start)
+        self._execute_buy()
+        return RollingState.VERIFY
+
+    def _state_verify(self, context: RollingCycleContext) -> Optional[RollingState]:
+        """检查购买结果并计算花费"""
+        # 检查购买是否成功，失败弹窗出现即可提前结束等待
+        self._wait("after_buy", self.detector.check_purchase_failure)
+        print("执行检测购买失败")
+        if self.detector.check_purchase_failure():
+            print("购买失败！")
+            self._execute_refresh()
+            delay_helper.sleep("after_check_purchase_failure")
+            cur_balance = self._detect_balance()
+            if cur_balance == self.last_balance:
+                print("购买失败！")
+                delay_helper.report_outcome("after_buy", True)
+                self.buy_failed_count += 1
+                event_bus.emit_metric(Metric.FAILURES, 1)
+                delay_helper.sleep("after_buy_failed")
+                return None
+            print("部分购买成功，执行售卖")
+        else:
+            print("购买成功！")
+        delay_helper.sleep("after_buy_success")
+        cur_balance = self._detect_balance()
+        cost = self.last_balance - cur_balance
+        if cost == 0 and context.verify_resumed:
+            # 失败弹窗已经在继续前被关闭，余额未变化说明没有买入
+            print("余额未变化，购买失败！")
+            self.buy_failed_count += 1
+            event_bus.emit_metric(Metric.FAILURES, 1)
+            return None
+        self.buy_success_count += 1
+        # 没有失败弹窗但余额未变，说明检测时弹窗还没出现，after_buy 偏短
+        delay_helper.report_outcome("after_buy", cost != 0)
+        self.profit -= cost
+        event_bus.emit_metrics({Metric.BUYS: 1, Metric.PROFIT: -cost})
+        context.cur_balance = cur_balance
+        context.cost = cost
+        self.append_to_sell_log(
+            f"购买成功, 总花费: {cost}, 当前盈利: {self.profit}",
+            event="buy",
+            price=context.current_price,
+            cost=cost,
+            profit=self.profit,
+        )
+        record_trade(
+            "buy",
+            cost=cost,
+            option=self.config.rolling_option,
+            price=context.current_price,
+            balance_before=self.last_balance,
+            balance_after=cur_balance,
+        )
+        event_bus.emit_overlay_text_updated(LazyText("购买成功, 总花费[{}], 当前盈利: {}", cost, self.profit))
 
-            # 执行交易决策
-            if min_price < current_price <= target_price:
-                delay_helper.sleep("before_buy")
-                if self.config.second_detect:
-                    delay_helper.sleep("second_price_detection_retry")
-                    second_detect_price = self.detector.detect_price()
-                    if min_price < second_detect_price <= target_price:
-                        event_bus.emit_overlay_text_updated(
-                            f"二次检测成功({current_price}, {second_detect_price})，执行购买"
-                        )
-                        # 购买
-                        self._execute_buy()
-                    else:
-                        event_bus.emit_overlay_text_updated(
-                            f"二次检测失败({current_price}, {second_detect_price})，跳过购买"
-                        )
-                        self._execute_refresh()
-                        self.fail_count = 0
-                        return not self._should_stop
-                else:
-                    self._execute_buy()
-
-                # 检查购买是否成功
-                delay_helper.sleep("after_buy")
-                print("执行检测购买失败")
-                if self.detector.check_purchase_failure():
-                    print("购买失败！")
-                    self._execute_refresh()
-                    delay_helper.sleep("after_check_purchase_failure")
-                    cur_balance = self._detect_balance()
-                    if cur_balance == self.last_balance:
-                        print("购买失败！")
-                        self.buy_failed_count += 1
-                        self._update_statistics()
-                        delay_helper.sleep("after_buy_failed")
-                        self.fail_count = 0
-                        return True
-                    print("部分购买成功，执行售卖")
-                else:
-                    print("购买成功！")
-                self.buy_success_count += 1
-                delay_helper.sleep("after_buy_success")
-                cur_balance = self._detect_balance()
-                cost = self.last_balance - cur_balance
-                self.profit -= cost
-                self.append_to_sell_log(f"购买成功, 总花费: {cost}, 当前盈利: {self.profit}")
-                event_bus.emit_overlay_text_updated(f"购买成功, 总花费[{cost}], 当前盈利: {self.profit}")
-
-                # current = time.localtime()
-                # if current.tm_hour == 1 and current.tm_min >= 55:
-                #     return False
-
-                # 检查停止信号再执行售卖
-                if self._should_stop or not self.config.auto_sell:
-                    return False
-
-                self._execute_auto_sell(cost)
+        # 检查停止信号再执行售卖
+        if self._should_stop or not self.config.auto_sell:
+            context.keep_running = False
+            return None
+        return RollingState.STORAGE
 
-                # 检查停止信号
-                if self._should_stop:
-                    return False
+    def _state_storage(self, context: RollingCycleContext) -> RollingState:
+        """进入仓库并转移物品"""
+        self._enter_storage_and_transfer()
+        return RollingState.SELL
 
-                # 自动售卖结束时已经有1s间隔了，这里延迟可以不用太高
-                delay_helper.sleep("before_get_mail")
-                self._execute_get_mail_half_coin()
-                delay_helper.sleep("after_get_mail")
-                self._execute_refresh()
-                delay_helper.sleep("buy_success_refresh_final")
-                self.last_balance = self._detect_balance()
+    def _state_sell(self, context: RollingCycleContext) -> Optional[RollingState]:
+        """执行一轮售卖，全部轮次完成后进入邮件领取"""
+        if context.sell_time < len(self.SELL_RATIOS) and context.sell_failures <= self.MAX_SELL_FAILURES:
+            if self._should_stop:
+                print(f"在第{context.sell_time + 1}轮售卖前收到停止信号，退出售卖循环")
                 event_bus.emit_overlay_text_updated(
-                    f"当前价格[{current_price}, {current_price / option_config['buy_count']}] 总购买数[{self.count}]"
+                    LazyText("在第{}轮售卖前收到停止信号，退出售卖循环", context.sell_time + 1)
                 )
-                delay_helper.sleep("after_get_mail_and_detect_balance")
             else:
-                # 刷新
-                self._execute_refresh()
+                result = self._execute_single_sell_cycle(context.sell_time, self.SELL_RATIOS[context.sell_time])
+                if not context.transfer_checked:
+                    # 第一轮能找到物品说明进入仓库和转移全部的延迟足够
+                    context.transfer_checked = True
+                    transferred = result["message"] != "无可售卖物品"
+                    delay_helper.report_outcome("after_enter_storage", transferred)
+                    delay_helper.report_outcome("after_transfer_all", transferred)
+                if result["success"]:
+                    context.sell_profit += result["revenue"]
+                    context.sell_count += result["count"]
+                    context.sell_cycles.append(result)
+                    context.sell_time += 1
+                    return RollingState.SELL
+                # 售卖失败或已无可售卖物品都先等待1s，进入邮件前的延迟按这段间隔调过
+                self.cancel_token.checked_sleep(1)
+                if result["message"] != "无可售卖物品":
+                    context.sell_failures += 1
+                    return RollingState.SELL
+
+        self._log_final_sell_results(
+            {"total_profit": context.sell_profit, "total_count": context.sell_count, "cycles": context.sell_cycles},
+            context.cost,
+        )
+        # 检查停止信号
+        if self._should_stop:
+            context.keep_running = False
+            return None
+        return RollingState.MAIL
+
+    def _state_mail(self, context: RollingCycleContext) -> RollingState:
+        """邮件领取售卖所得"""
+        # 自动售卖结束时已经有1s间隔了，这里延迟可以不用太高
+        delay_helper.sleep("before_get_mail")
+        self._execute_get_mail_half_coin()
+        delay_helper.sleep("after_get_mail")
+        return RollingState.BACK
+
+    def _state_back(self, context: RollingCycleContext) -> None:
+        """返回配装页并记录新的余额"""
+        self._execute_refresh()
+        delay_helper.sleep("buy_success_refresh_final")
+        # 余额识别与最后的等待并行
+        balance = self._submit_balance_detection()
+        delay_helper.sleep("after_get_mail_and_detect_balance")
+        self.last_balance = self._get_detection(balance, self.detector.detect_balance)
+        record_trade(
+            "mail",
+            balance_before=context.cur_balance,
+            balance_after=self.last_balance,
+            option=self.config.rolling_option,
+        )
+        event_bus.emit_overlay_text_updated(
+            LazyText(
+                "当前价格[{}, {}] 总购买数[{}]",
+                context.current_price,
+                context.current_price / context.option_config["buy_count"],
+                self.count,
+            )
+        )
 
-            self._update_statistics()
-            self.fail_count = 0
-            return not self._should_stop  # 如果收到停止信号则返回False
-
-        except Exception as e:
-            if self.detector.check_stuck():
-                print("检测到点入装备界面，尝试脱离卡死")
-                self._execute_refresh()
-            elif self.detector.is_in_game_lobby():
-                print("检测到进入游戏大厅，尝试脱离卡死")
-                self._enter_action_window(self.detector.pei_zhuang_enabled())
-            elif self.detector.check_stuck2():
-                print("检测到没有L按钮进入配装界面，尝试修复")
-                # 没有L按钮进入配装界面
-                self._execute_refresh()
-                time.sleep(1)
-                self._enter_action_window()
-            self.fail_count += 1
-            if self.fail_count > 10 and not self.detector.detect_window_exist()[0]:
-                print("检测到游戏闪退，尝试重启")
-                self.append_to_sell_log("游戏闪退，尝试重启")
-                if not self._restart_game():
-                    return False
-                self.append_to_sell_log("游戏重启成功！")
-                raise TradingException("游戏闪退！") from e
-            raise TradingException(f"滚仓模式交易失败({self.fail_count + 1}): {e}") from e
+    def _record_price(self, price: int, decision: str, cycle_start: float) -> None:
+        """记录本周期的价格观测"""
+        record_price_observation("rolling", f"option_{self.config.rolling_option}", price, decision, cycle_start)
 
     def _update_statistics(self):
         self.current_market_data.profit = self.profit
@@ -397,15 +923,31 @@ class RollingTradingMode(ITradingMode):
     def _execute_enter(self):
         self.action_executor.press_key("l")
 
+    def _wait(self, operation: str, condition: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        等待界面完成条件，配置的延迟作为超时
+
+        未开启 event_driven_waits 时总是执行固定延迟。
+        """
+        if not self.config.event_driven_waits:
+            condition = None
+        return delay_helper.wait_until(operation, condition)
+
+    def _click_and_wait_change(self, button: str, operation: str, area: str) -> bool:
+        """点击按钮并等待指定区域画面变化"""
+        baseline = self.detector.capture_area(area) if self.config.event_driven_waits else None
+        self.action_executor.click_position(self.detector.screen.rolling_mode[button])
+        return self._wait(operation, lambda: self.detector.area_changed(area, baseline))
+
     def _switch_to_option(self, option_index: int) -> None:
         """切换到指定配装选项"""
-        coordinates = self.detector.coordinates["rolling_mode"]["options"]
+        coordinates = self.detector.screen.rolling_mode.options
         if 0 <= option_index < len(coordinates):
             self.action_executor.click_position(coordinates[option_index])
 
     def _execute_buy(self) -> None:
         """执行购买操作"""
-        coordinates = self.detector.coordinates["rolling_mode"]["buy_button"]
+        coordinates = self.detector.screen.rolling_mode.buy_button
         self.action_executor.click_position(coordinates)
 
     def _execute_refresh(self) -> None:
@@ -414,47 +956,27 @@ class RollingTradingMode(ITradingMode):
         self.action_executor.press_key("esc")
         delay_helper.sleep("after_refresh")
 
-    def _execute_auto_sell(self, cost=0):
-        """执行自动售卖流程"""
-        self._enter_storage_and_transfer()
-        sell_results = self._execute_sell_cycles(cost)
-        self._log_final_sell_results(sell_results, cost)
+    def _run_macro(self, macro: InputMacro) -> bool:
+        """执行输入宏，坐标变化后重新编译，停止时中断"""
+        runner = self._macro_runner
+        if runner is None or runner.coordinates is not self.detector.coordinates:
+            runner = self._macro_runner = MacroRunner(
+                self.action_executor, self.detector.coordinates, self.cancel_token.is_cancelled
+            )
+        completed = runner.run(macro)
+        if not completed:
+            print(runner.last_trace.format())
+        return completed
 
     def _enter_storage_and_transfer(self):
         """进入仓库并转移物品"""
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["enter_storage"])
-        delay_helper.sleep("after_enter_storage")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["transfer_all"])
-        delay_helper.sleep("after_transfer_all")
-
-    def _execute_sell_cycles(self, cost: float) -> Dict[str, any]:
-        """执行售卖循环"""
-        sell_time = 0
-        sell_ratios = [0.33, 0.5, 1.0]
-        total_profit = 0
-        total_count = 0
-        cycle_results = []
-
-        while sell_time < len(sell_ratios):
-            # 检查停止信号
-            if self._should_stop:
-                print(f"在第{sell_time + 1}轮售卖前收到停止信号，退出售卖循环")
-                event_bus.emit_overlay_text_updated(f"在第{sell_time + 1}轮售卖前收到停止信号，退出售卖循环")
-                break
-
-            result = self._execute_single_sell_cycle(sell_time, sell_ratios[sell_time])
-            if not result["success"]:
-                time.sleep(1)
-                if result["message"] == "无可售卖物品":
-                    break
-                continue
-
-            total_profit += result["revenue"]
-            total_count += result["count"]
-            cycle_results.append(result)
-            sell_time += 1
-
-        return {"total_profit": total_profit, "total_count": total_count, "cycles": cycle_results}
+        if not self.config.event_driven_waits:
+            self._run_macro(ENTER_STORAGE_MACRO)
+            return
+        # 条件等待需要在输入之间检查画面，不能整体提交
+        self.action_executor.click_position(self.detector.screen.rolling_mode.enter_storage)
+        self._wait("after_enter_storage", self.detector.is_storage_open)
+        self._click_and_wait_change("transfer_all", "after_transfer_all", "wait_sell_item_area")
 
     def _execute_single_sell_cycle(self, cycle_index: int, sell_ratio: float) -> Dict[str, any]:
         """执行单个售卖循环"""
@@ -472,6 +994,16 @@ class RollingTradingMode(ITradingMode):
             # 更新统计数据
             self.profit += sell_info["revenue"]
             self.count += sell_info["count"]
+            event_bus.emit_metric(Metric.PROFIT, sell_info["revenue"])
+            record_trade(
+                "sell",
+                unit_price=sell_info["price"],
+                count=sell_info["count"],
+                revenue=sell_info["revenue"],
+                option=self.config.rolling_option,
+                cycle_index=cycle_index,
+                ratio=sell_ratio,
+            )
 
             return {
                 "success": True,
@@ -481,8 +1013,11 @@ class RollingTradingMode(ITradingMode):
                 "message": "",
             }
 
+        except (OperationCancelledException, DeadlineExceededException):
+            # 停止和状态超时交给状态机处理，不算作售卖失败
+            raise
         except Exception as e:
-            print(f"售卖失败111：{str(e)}")
+            print(f"售卖失败：{str(e)}")
             return {"success": False, "message": str(e)}
 
     def _perform_sell_operation(self, item_pos: Tuple[int, int], sell_ratio: float, cycle_index: int) -> Dict[str, any]:
@@ -490,8 +1025,8 @@ class RollingTradingMode(ITradingMode):
         if self._should_stop:
             return {}
         sell_pos = (
-            item_pos[0] + self.detector.coordinates["rolling_mode"]["item_sell_offset"][0],
-            item_pos[1] + self.detector.coordinates["rolling_mode"]["item_sell_offset"][1],
+            item_pos[0] + self.detector.coordinates.rolling_mode.item_sell_offset[0],
+            item_pos[1] + self.detector.coordinates.rolling_mode.item_sell_offset[1],
         )
 
         # 进入售卖界面并处理可能的卡顿
@@ -512,8 +1047,8 @@ class RollingTradingMode(ITradingMode):
                     return
                 self._click_sell_item(item_pos, sell_pos)
                 if self._wait_for_sell_window():
-                    self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["sell_button"])
-                    delay_helper.sleep("after_sell_button_click")
+                    self.action_executor.click_position(self.detector.screen.rolling_mode.sell_button)
+                    self._wait("after_sell_button_click", self.detector.is_sell_listing_open)
                     return
 
                 # 处理卡顿
@@ -526,7 +1061,7 @@ class RollingTradingMode(ITradingMode):
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise e
-                time.sleep(1)
+                self.cancel_token.checked_sleep(1)
 
     def _click_sell_item(self, item_pos: Tuple[int, int], sell_pos: Tuple[int, int]):
         """点击售卖物品"""
@@ -537,18 +1072,20 @@ class RollingTradingMode(ITradingMode):
         # self.action_executor.click_position(sell_pos)
         self.action_executor.move_mouse(item_pos)
         delay_helper.sleep("after_move_to_sell_item")
-        self.action_executor.multi_key_press("alt", "d")
+        self.action_executor.chord(("alt", "d"), hold_ms=chord_hold_ms())
 
     def _wait_for_sell_window(self) -> bool:
         """等待售卖窗口出现"""
-        delay_helper.sleep("sell_window_wait")
-        return self.detector.check_sell_window()
+        self._wait("sell_window_wait", self.detector.check_sell_window)
+        opened = self.detector.check_sell_window()
+        delay_helper.report_outcome("sell_window_wait", opened)
+        return opened
 
     def _resolve_sell_stuck(self):
         """解决售卖卡顿"""
         self.action_executor.press_key("esc")
         delay_helper.sleep("resolve_sell_stuck")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["enter_storage"])
+        self.action_executor.click_position(self.detector.screen.rolling_mode.enter_storage)
         delay_helper.sleep("resolve_sell_stuck")
 
     def _get_fast_sell_threshold(self) -> int:
@@ -573,55 +1110,50 @@ class RollingTradingMode(ITradingMode):
         """设置售卖价格"""
         if self._should_stop:
             return 0
-        min_sell_pos = self.detector.coordinates["rolling_mode"]["sell_num_left"]
-        sell_num_slice_length = self.detector.coordinates["rolling_mode"]["sell_num_right"][0] - min_sell_pos[0]
+        min_sell_pos = self.detector.coordinates.rolling_mode.sell_num_left
+        sell_num_slice_length = self.detector.coordinates.rolling_mode.sell_num_right[0] - min_sell_pos[0]
 
         sell_x = min_sell_pos[0] + sell_num_slice_length * sell_ratio
         sell_y = min_sell_pos[1]
 
-        min_sell_price = self.detector.detect_min_sell_price()
-        min_sell_price_count = self.detector.detect_min_sell_price_count()
+        # 最低价和数量同时识别，数量只在快速售卖时才需要
+        min_sell_price_pending = self._submit_area_detection("min_sell_price_area", self.detector.detect_min_sell_price)
+        min_sell_price_count = self._submit_area_detection(
+            "min_sell_price_count_area", self.detector.detect_min_sell_price_count
+        )
+        min_sell_price = self._get_detection(min_sell_price_pending, self.detector.detect_min_sell_price)
 
         # 使用当前配装的最低售卖价格
         config_min_sell_price = self._get_min_sell_price()
         print(f"detect min_sell_price: {min_sell_price}, config: {config_min_sell_price}")
         if config_min_sell_price > 0 and min_sell_price < config_min_sell_price:
             print(f"{min_sell_price}小于最小卖价{config_min_sell_price}，跳过售卖")
-            event_bus.emit_overlay_text_updated(f"{min_sell_price}小于最小卖价{config_min_sell_price}，跳过售卖")
+            event_bus.emit_overlay_text_updated(
+                LazyText("{}小于最小卖价{}，跳过售卖", min_sell_price, config_min_sell_price)
+            )
             self._execute_refresh()
-            time.sleep(0.1)
+            self.cancel_token.checked_sleep(0.1)
             self._execute_refresh()
             raise ValueError(f"{min_sell_price}小于最小卖价{config_min_sell_price}")
         # 使用当前配装的快速售卖阈值
         fast_sell_threshold = self._get_fast_sell_threshold()
 
-        if fast_sell and min_sell_price > 0 and min_sell_price_count > fast_sell_threshold:
-            # 点击售价输入框
-            self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["sell_price_text"])
-            delay_helper.sleep("after_sell_price_text_click")
-
-            # 全选输入框内容
-            self.action_executor.multi_key_press("ctrl", "a")
-            delay_helper.sleep("after_select_sell_text_price")
-
-            # 将售卖价格设置为1
-            self.action_executor.type_text('1')
-            delay_helper.sleep("after_select_sell_text_price")
-
-            # 快速售卖指定点击位置
-            self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["btn_quick_sell_area"])
-            delay_helper.sleep("after_sell_price_text_click")
-
-            # 点击倒数第二根价格柱子获得最高卖价
-            self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["fast_sell_price_button"])
-            delay_helper.sleep("after_sell_price_text_click")
+        if (
+            fast_sell
+            and min_sell_price > 0
+            and self._get_detection(min_sell_price_count, self.detector.detect_min_sell_price_count)
+            > fast_sell_threshold
+        ):
+            # 售价输入1后点击价格柱子，整段作为输入宏提交
+            if not self._run_macro(FAST_SELL_PRICE_MACRO):
+                return 0
 
             # 获取当前售卖价格
             min_sell_price = self.detector.detect_current_sell_price()
             delay_helper.sleep("after_sell_price_text_click")
 
         else:
-            self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["min_sell_price_button"])
+            self.action_executor.click_position(self.detector.screen.rolling_mode.min_sell_price_button)
         delay_helper.sleep("after_set_sell_price")
         self.action_executor.click_position((sell_x, sell_y))
         delay_helper.sleep("after_sell_finish")
@@ -638,25 +1170,49 @@ class RollingTradingMode(ITradingMode):
             delay_helper.sleep("after_sale_column_full")
             raise ValueError("售卖数量超出限制")
 
-        # 获取售卖信息
+        # 获取售卖信息，截图后识别与移动鼠标查看总价并行
+        min_sell_price_pending = None
         if min_sell_price <= 0:
-            min_sell_price = self.detector.detect_min_sell_price()
-        expected_revenue = self.detector.detect_expected_revenue()
+            min_sell_price_pending = self._submit_area_detection(
+                "min_sell_price_area", self.detector.detect_min_sell_price
+            )
+        expected_revenue_pending = self._submit_area_detection(
+            "expected_revenue_area", self.detector.detect_expected_revenue
+        )
 
-        self.action_executor.move_mouse(self.detector.coordinates["rolling_mode"]["sell_detail_button"])
+        mouse_position = self.action_executor.get_mouse_position()
+        self.action_executor.move_mouse(self.detector.screen.rolling_mode.sell_detail_button)
         delay_helper.sleep("after_move_to_sell_detail")
 
         total_sell_price = self.detector.detect_total_sell_price_area()
+
+        def leave_sell_detail():
+            # 售卖详情的提示可能挡住价格和预期收入，重新检测前把鼠标移回原位置
+            self.action_executor.move_mouse((mouse_position[0], mouse_position[1]))
+            delay_helper.sleep("after_move_to_sell_detail")
+
+        if min_sell_price_pending is not None:
+            min_sell_price = self._get_detection(
+                min_sell_price_pending, self.detector.detect_min_sell_price, leave_sell_detail
+            )
+            leave_sell_detail = None
+        expected_revenue = self._get_detection(
+            expected_revenue_pending, self.detector.detect_expected_revenue, leave_sell_detail
+        )
         count = int(total_sell_price / min_sell_price) if min_sell_price > 0 else 0
 
-        # 确认售卖
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["final_sell_button"])
-        delay_helper.sleep("after_sell_finish")
+        # 确认售卖，等待上架界面关闭
+        self._click_and_wait_change("final_sell_button", "after_sell_finish", "min_sell_price_area")
 
         # 记录售卖日志
         self.append_to_sell_log(
             f"出售成功, 单价: {min_sell_price}, 数量: {count}, 总价: {total_sell_price}, "
-            f"预期收入: {expected_revenue}"
+            f"预期收入: {expected_revenue}",
+            event="sell",
+            price=min_sell_price,
+            count=count,
+            revenue=expected_revenue,
+            total=total_sell_price,
         )
         event_bus.emit_overlay_text_updated(
             f"第{sell_time + 1}轮售卖成功, 单价: {min_sell_price}, "
@@ -670,25 +1226,23 @@ class RollingTradingMode(ITradingMode):
         total_profit = sell_results.get("total_profit", 0)
         total_count = sell_results.get("total_count", 0)
         cur_profit = total_profit
+        average_cost = cost / total_count if total_count else 0
 
         self.append_to_sell_log(
-            f"本轮售卖完成, 本轮盈利: {cur_profit - cost}, 本轮售卖: {total_count}个, 购买均价: {cost / total_count}"
-            f"当前总盈利: {self.profit}, 当前售卖总量: {self.count}"
+            f"本轮售卖完成, 本轮盈利: {cur_profit - cost}, 本轮售卖: {total_count}个, 购买均价: {average_cost}"
+            f"当前总盈利: {self.profit}, 当前售卖总量: {self.count}",
+            event="sell_round",
+            count=total_count,
+            cost=cost,
+            revenue=cur_profit,
+            profit=self.profit,
         )
         event_bus.emit_overlay_text_updated(
-            f"本轮售卖完成, 本轮盈利: {cur_profit - cost}, 本轮售卖: {total_count}个, 购买均价: {cost / total_count}"
+            f"本轮售卖完成, 本轮盈利: {cur_profit - cost}, 本轮售卖: {total_count}个, 购买均价: {average_cost}"
         )
 
     def _execute_get_mail_half_coin(self):
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["mail_button"])
-        delay_helper.sleep("after_mail_button_click")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["mail_trade_button"])
-        delay_helper.sleep("after_mail_trade_click")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["mail_get_button"])
-        delay_helper.sleep("after_mail_get_click")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["mail_get_button"])
-        delay_helper.sleep("after_confirm_mail_click")
-        self.action_executor.press_key("esc")
+        self._run_macro(GET_MAIL_MACRO)
 
     def _switch_to_battlefield_and_return(self):
         """切换到大战场模式解除卡顿，再切回来"""
@@ -696,14 +1250,14 @@ class RollingTradingMode(ITradingMode):
         delay_helper.sleep("before_open_mode_select_menu_tarkov_mode")
         self._execute_refresh()
         delay_helper.sleep("before_select_mode")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["battlefield_mode_button"])
+        self.action_executor.click_position(self.detector.screen.rolling_mode.battlefield_mode_button)
         delay_helper.sleep("before_open_mode_select_menu_battlefield_mode")
         for _ in range(3):
             self.action_executor.press_key(" ")
-            time.sleep(0.5)
+            self.cancel_token.checked_sleep(0.5)
         self._execute_refresh()
         delay_helper.sleep("before_select_mode")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["tarkov_mode_button"])
+        self.action_executor.click_position(self.detector.screen.rolling_mode.tarkov_mode_button)
         delay_helper.sleep("before_select_map")
         self._enter_action_window()
 
@@ -714,40 +1268,66 @@ class RollingTradingMode(ITradingMode):
         :return:
         """
         if not fast_enter_button:
-            self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["prepare_equipment_button"])
+            self.action_executor.click_position(self.detector.screen.rolling_mode.prepare_equipment_button)
             delay_helper.sleep("before_select_zero_dam")
             if not self.detector.is_clicked_map():
-                self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["zero_dam_button"])
+                self.action_executor.click_position(self.detector.screen.rolling_mode.zero_dam_button)
             delay_helper.sleep("before_start_action")
-        self.action_executor.click_position(self.detector.coordinates["rolling_mode"]["start_action_button"])
+        self.action_executor.click_position(self.detector.screen.rolling_mode.start_action_button)
 
     def get_market_data(self) -> Optional[MarketData]:
         """获取当前市场数据"""
         return self.current_market_data
 
     def _detect_balance(self):
-        self.action_executor.move_mouse(self.detector.coordinates["balance_active"])
+        return self._get_detection(self._submit_balance_detection(), self.detector.detect_balance)
+
+    def _submit_balance_detection(self) -> PendingDetection:
+        """显示余额后截图，识别提交到检测流水线"""
+        self.action_executor.move_mouse(self.detector.screen.balance_active)
         delay_helper.sleep("balance_detection")
-        return self.detector.detect_balance()
+        screenshot = self.detector.screen_capture.capture_region(self.detector.screen.balance_detection)
+        return self.pipeline.submit("balance", self.detector.detect_balance, screenshot)
 
-    def append_to_sell_log(self, content, path="sell.log"):
+    def _submit_area_detection(self, area: str, detect: Callable[..., int]) -> PendingDetection:
+        """在调用线程截取已稳定的区域，识别提交到检测流水线"""
+        return self.pipeline.submit(area, detect, self.detector.capture_area(area))
+
+    @staticmethod
+    def _get_detection(
+        pending: PendingDetection, detect: Callable[[], int], before_retry: Optional[Callable[[], None]] = None
+    ) -> int:
         """
-        追加内容到当前目录下的sell.log文件中
+        取流水线的识别结果，截图识别失败时在交易线程重新截图检测
+
+        后台线程只识别提交时的截图，不重新截图，那时界面可能已经被后续操作改变。
+
+        Args:
+            pending: 提交的识别
+            detect: 重新截图检测的方法
+            before_retry: 重新检测前恢复界面的动作，例如移开鼠标
+        """
+        try:
+            return pending.get()
+        except DetectionException as e:
+            print(f"{pending.name}截图识别失败，重新检测: {e}")
+            if before_retry is not None:
+                before_retry()
+            return detect()
+
+    def append_to_sell_log(self, content, path="sell.log", event="info", **fields):
+        """
+        追加内容到当前目录下的sell.log文件中（同时写入结构化的sell.jsonl）
 
         参数:
             content (str): 要追加写入的内容
+            event (str): 事件类型，例如 buy / sell / sell_round
+            **fields: 结构化字段，例如 price、count、cost、revenue、profit
 
         返回:
             bool: 成功返回True，失败返回False
         """
-        try:
-            with open(path, "a", encoding="utf-8") as f:
-                current_time = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-                f.write(f"{current_time} {content}\n")  # 自动添加换行符
-            return True
-        except Exception as e:
-            print(f"写入sell.log文件失败: {e}")
-            return False
+        return TradeLogWriter.get_writer(path).write(content, event=event, **fields)
 
     def _restart_game(self):
         for _ in range(10):
@@ -755,39 +1335,42 @@ class RollingTradingMode(ITradingMode):
             if not exists:
                 print("游戏闪退，且wegame不在前台，等待wegame出现...")
                 os.system("start wegame://")
-                time.sleep(10)
+                self.cancel_token.checked_sleep(10)
                 continue
             bring_window_to_front(hwnd)
-            time.sleep(1)
+            # 切换窗口后记录的光标位置不再可信
+            if hasattr(self.action_executor, "invalidate_cursor"):
+                self.action_executor.invalidate_cursor()
+            self.cancel_token.checked_sleep(1)
             x, y = self.detector.find_game_start_button()
             if x == 0 and y == 0:
                 print("游戏闪退，找到wegame窗口，但启动按钮未找到")
                 continue
-            time.sleep(0.3)
+            self.cancel_token.checked_sleep(0.3)
             self.action_executor.click_position((x, y))
             for _ in range(18):
                 if not self.detector.check_game_start():
                     print("等待游戏启动...")
-                    time.sleep(10)
+                    self.cancel_token.checked_sleep(10)
                     continue
-                print(self.detector.coordinates["enter_game"])
+                print(self.detector.screen.enter_game)
                 # 截全屏时鼠标会挪到左上角，进而触发pyautogui的失效保护，所以这里要临时禁用一下
                 pyautogui.FAILSAFE = False
-                self.action_executor.click_position(self.detector.coordinates["enter_game"])
+                self.action_executor.click_position(self.detector.screen.enter_game)
                 pyautogui.FAILSAFE = True
-                time.sleep(1)
+                self.cancel_token.checked_sleep(1)
                 for _ in range(3):
                     self.action_executor.press_key(" ")
-                    time.sleep(1)
+                    self.cancel_token.checked_sleep(1)
                 delay_helper.sleep("after_enter_game_home")
                 self.action_executor.press_key("tab")
-                time.sleep(1)
+                self.cancel_token.checked_sleep(1)
                 self._enter_action_window()
                 return True
             print("游戏3分钟没有启动成功，退出循环")
-            self.append_to_sell_log("游戏3分钟没有启动成功，退出循环")
+            self.append_to_sell_log("游戏3分钟没有启动成功，退出循环", event="restart")
             return False
-        self.append_to_sell_log("游戏闪退，且wegame不在前台，退出循环")
+        self.append_to_sell_log("游戏闪退，且wegame不在前台，退出循环", event="restart")
         return False
 
 
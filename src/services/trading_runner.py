@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+交易循环
+
+不依赖Qt的交易主循环：初始化交易服务，按循环间隔执行交易周期，发布耗时、价格等指标和状态事件，
+运行中接收热更新的配置，停止时唤醒所有等待。屯仓模式的循环间隔按周期开始时刻计算（扣除本轮耗时），
+连续失败时按倍数退避，由 CycleScheduler 统计抖动和超时。界面的 TradingWorker 在 QThread 中运行它，
+命令行运行器 run_headless.py 在普通线程中运行它，不需要加载PyQt5。
+"""
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+try:
+    from src.config.trading_config import TradingMode
+    from src.core.cancellation import stop_token
+    from src.core.event_bus import event_bus
+    from src.core.exceptions import TradingException
+    from src.utils.cycle_scheduler import CycleScheduler
+    from src.utils.metrics import Metric
+    from src.utils.profiler import profiler
+except ImportError:
+    from ..config.trading_config import TradingMode
+    from ..core.cancellation import stop_token
+    from ..core.event_bus import event_bus
+    from ..core.exceptions import TradingException
+    from ..utils.cycle_scheduler import CycleScheduler
+    from ..utils.metrics import Metric
+    from ..utils.profiler import profiler
+
+if TYPE_CHECKING:
+    # 接口模块依赖 numpy，只在类型检查时导入，界面和命令行启动时不加载
+    from ..core.interfaces import IConfigManager, ITradingService
+
+
+class TradingRunner:
+    """交易主循环"""
+
+    def __init__(self, trading_service: "ITradingService", config_manager: "IConfigManager"):
+        self.trading_service = trading_service
+        self.config_manager = config_manager
+
+        # 线程控制
+        self._lock = threading.Lock()
+        self._running = False
+        self._config = None
+        self._trading_mode = None
+        self._loop_interval = 0
+        # 周期调度，只在交易线程中使用
+        self.scheduler = CycleScheduler()
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self._running
+
+    def update_config(self, config: Dict[str, Any]) -> None:
+        """更新配置"""
+        # 只更新内存中的配置，文件由后台线程合并写入，不在持有锁时读写文件
+        new_config = self.config_manager.stage_update(config)
+        with self._lock:
+            self._config = new_config
+
+    def set_config(self, config) -> None:
+        """使用指定的配置快照，不写入文件，例如命令行临时指定交易模式"""
+        with self._lock:
+            self._config = config
+
+    def stop(self) -> None:
+        """停止交易，可以从其他线程调用"""
+        with self._lock:
+            self._running = False
+        # 唤醒交易线程中正在进行的等待，不必等到延迟睡满
+        stop_token.cancel()
+        # 立即停止交易服务
+        self.trading_service.stop()
+
+    def run(self, max_cycles: Optional[int] = None) -> None:
+        """
+        执行交易循环，直到停止、交易模式要求停止或达到周期数
+
+        Args:
+            max_cycles: 最多执行几个周期，None为不限制
+        """
+        with self._lock:
+            self._running = True
+            # 获取当前配置
+            current_config = self._config or self.config_manager.load_config()
+            self._trading_mode = current_config.trading_mode
+            self._loop_interval = self._get_loop_interval(current_config)
+        # 屯仓模式按固定频率刷新价格；滚仓每轮包含完整的购买流程，仍在每轮结束后等待循环间隔
+        self.scheduler.reset(self._loop_interval / 1000, start_to_start=self._trading_mode == TradingMode.HOARDING)
+
+        cycles = 0
+        try:
+            # 初始化交易服务
+            self.trading_service.initialize(current_config)
+            # 运行中修改的配置在下一个周期生效
+            if hasattr(self.config_manager, "subscribe"):
+                self.config_manager.subscribe(self._on_config_reloaded)
+            self.trading_service.prepare()
+            event_bus.metrics.reset()
+            last_time = time.time()
+            while self.running:
+                try:
+                    # 执行交易周期
+                    self.scheduler.begin_cycle()
+                    profiler.begin_cycle()
+                    should_continue = self.trading_service.execute_cycle()
+                    cycle_breakdown = profiler.end_cycle()
+                    cur_time = time.time()
+                    print(f"上轮耗时: {int((cur_time - last_time) * 1000)}ms")
+                    breakdown = profiler.format_breakdown()
+                    print(breakdown)
+                    event_bus.emit_profile_updated(breakdown)
+                    last_time = cur_time
+                    # 获取最新数据
+                    market_data = self.trading_service.get_market_data()
+                    self._publish_metrics(cycle_breakdown, market_data)
+
+                    # 发送事件更新UI - 使用事件总线
+                    if market_data:
+                        event_bus.emit_price_updated(market_data.current_price)
+                        if market_data.balance is not None:
+                            event_bus.emit_balance_updated(market_data.balance)
+
+                    # 更新状态
+                    event_bus.emit_status_changed("运行中")
+
+                    # 检查是否应该停止
+                    cycles += 1
+                    if not should_continue or (max_cycles is not None and cycles >= max_cycles):
+                        self.stop()
+                        break
+
+                    # 等到下一轮的计划开始时刻，停止时立即返回
+                    stop_token.sleep(self.scheduler.on_success())
+
+                except TradingException as e:
+                    if stop_token.is_cancelled():
+                        print("交易周期被停止信号中断")
+                        break
+                    print(f"循环流执行失败，跳过当前循环流： {e}")
+                    event_bus.emit_metric(Metric.FAILURES, 1)
+                    stop_token.sleep(self.scheduler.on_failure())  # 错误后等待，连续失败时退避
+
+        except Exception as e:
+            if stop_token.is_cancelled():
+                print(f"交易准备阶段被停止信号中断: {e}")
+                return
+            print(f"交易服务初始化失败: {e}")
+            event_bus.emit_error_occurred(f"交易服务初始化失败: {e}")
+            event_bus.emit_status_changed("错误")
+        finally:
+            with self._lock:
+                self._running = False
+            if hasattr(self.config_manager, "unsubscribe"):
+                self.config_manager.unsubscribe(self._on_config_reloaded)
+            print(self.scheduler.format_stats())
+            self._export_profile()
+            event_bus.emit_trading_stopped()
+
+    @staticmethod
+    def _publish_metrics(breakdown, market_data) -> None:
+        """发布本轮耗时和价格指标，购买次数和盈利由交易模式发布"""
+        categories = dict(breakdown)
+        samples = {
+            Metric.CYCLE_MS: sum(categories.values()),
+            Metric.CAPTURE_MS: categories.get("capture", 0.0),
+            Metric.OCR_MS: categories.get("ocr", 0.0),
+        }
+        if market_data:
+            samples[Metric.PRICE] = market_data.current_price
+        event_bus.emit_metrics(samples)
+
+    def _get_loop_interval(self, config) -> int:
+        """当前交易模式的循环间隔（毫秒）"""
+        if self._trading_mode == TradingMode.ROLLING:
+            return config.rolling_loop_interval
+        return config.hoarding_loop_interval
+
+    def _on_config_reloaded(self, config) -> None:
+        """界面或配置文件修改后，把新的配置快照交给运行中的交易服务"""
+        with self._lock:
+            self._config = config
+            self._loop_interval = self._get_loop_interval(config)
+        self.scheduler.set_period(self._loop_interval / 1000)
+        if hasattr(self.trading_service, "apply_config"):
+            self.trading_service.apply_config(config)
+
+    @staticmethod
+    def _export_profile(path: str = "profile.json") -> None:
+        """导出本次运行的分步耗时统计"""
+        try:
+            profiler.export_json(path)
+        except OSError as e:
+            print(f"导出耗时统计失败: {e}")
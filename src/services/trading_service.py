@@ -2,6 +2,7 @@
 """
 交易服务 - 核心业务逻辑整合
 """
+from dataclasses import replace
 from typing import Optional
 
 from ..core.exceptions import TradingException, WindowDetectionException, WindowNotFoundException, WindowSizeException
@@ -9,6 +10,13 @@ from ..core.interfaces import ITradingService, MarketData, TradingConfig
 from ..infrastructure.action_executor import ActionExecutorFactory
 from ..infrastructure.ocr_engine import OCREngineFactory
 from ..infrastructure.screen_capture import ScreenCapture
+from ..infrastructure.session_recorder import (
+    RecordingActionExecutor,
+    RecordingDetector,
+    RecordingOCREngine,
+    RecordingScreenCapture,
+    SessionRecorder,
+)
 from ..services.trading_modes import TradingModeFactory
 from ..services.window_service import WindowService
 
@@ -16,6 +24,9 @@ from ..services.window_service import WindowService
 class TradingService(ITradingService):
     """交易服务实现"""
 
+    # 这些配置决定创建哪种交易模式和基础设施，运行中修改需要重新开始交易才能生效
+    RESTART_FIELDS = ("trading_mode", "item_type", "action_executor", "record_session")
+
     def __init__(self):
         # 初始化窗口服务
         self.window_service = WindowService()
@@ -26,11 +37,15 @@ class TradingService(ITradingService):
         # 初始化基础设施
         self.screen_capture = ScreenCapture(resolution)
         self.ocr_engine = OCREngineFactory.create_engine("template", resolution=resolution)
-        self.action_executor = ActionExecutorFactory.create_executor("pyautogui")
+        self.action_executor_type = "pyautogui"
+        self.action_executor = ActionExecutorFactory.create_executor(self.action_executor_type)
 
         # 初始化交易模式
         self.current_mode = None
         self.current_config = None
+        self.session_recorder = None
+        # 截图、OCR和输入是否已检查可用，启动时在后台预先检查过则开始交易时不再检查
+        self._infrastructure_checked = False
 
         self.profit = 0
         self.count = 0
@@ -38,8 +53,17 @@ class TradingService(ITradingService):
     def initialize(self, config: TradingConfig) -> None:
         """初始化交易服务"""
         try:
+            # 按配置切换动作执行器后端
+            if config.action_executor != self.action_executor_type:
+                self.action_executor = ActionExecutorFactory.create_executor(config.action_executor)
+                self.action_executor_type = config.action_executor
+                self._infrastructure_checked = False
+            if hasattr(self.action_executor, "reset_cursor_stats"):
+                self.action_executor.reset_cursor_stats()
+
             # 检查基础设施是否可用
-            self._check_infrastructure()
+            if not self._infrastructure_checked:
+                self._check_infrastructure()
 
             # 自动检测窗口模式
             self._initialize_window_mode()
@@ -57,6 +81,20 @@ class TradingService(ITradingService):
         except Exception as e:
             raise TradingException(f"交易服务初始化失败: {e}") from e
 
+    def warm_up(self) -> bool:
+        """
+        启动时在后台线程检查基础设施，顺带预热截图后端和OCR模板
+
+        Returns:
+            是否可用，不可用时开始交易时重新检查
+        """
+        try:
+            self._check_infrastructure()
+        except TradingException as e:
+            print(f"基础设施预检失败，开始交易时重新检查: {e}")
+            return False
+        return True
+
     def prepare(self) -> None:
         try:
             self.current_mode.prepare()
@@ -76,6 +114,24 @@ class TradingService(ITradingService):
         except Exception as e:
             raise TradingException(f"交易周期执行失败: {e}") from e
 
+    def apply_config(self, config: TradingConfig) -> bool:
+        """
+        运行中应用热更新的配置，交给当前交易模式在下一个周期开始时换用
+
+        Returns:
+            是否已交给当前交易模式
+        """
+        mode, current = self.current_mode, self.current_config
+        if mode is None or current is None or not hasattr(mode, "apply_config"):
+            return False
+        changed = [name for name in self.RESTART_FIELDS if getattr(config, name) != getattr(current, name)]
+        if changed:
+            print(f"{', '.join(changed)} 的修改需要重新开始交易后生效")
+            config = replace(config, **{name: getattr(current, name) for name in changed})
+        self.current_config = config
+        mode.apply_config(config)
+        return True
+
     def get_market_data(self) -> Optional[MarketData]:
         """获取当前市场数据"""
         if self.current_mode is not None:
@@ -87,6 +143,13 @@ class TradingService(ITradingService):
         if self.current_mode and hasattr(self.current_mode, "stop"):
             self.current_mode.stop()
 
+        if hasattr(self.action_executor, "format_latency_report"):
+            print(self.action_executor.format_latency_report())
+        if hasattr(self.action_executor, "format_cursor_stats"):
+            print(self.action_executor.format_cursor_stats())
+
+        self._stop_recording()
+
         # 清理窗口服务
         if self.window_service:
             self.window_service.reset()
@@ -133,6 +196,7 @@ class TradingService(ITradingService):
             self.action_executor.get_mouse_position()
         except Exception as e:
             raise TradingException(f"动作执行器不可用: {e}") from e
+        self._infrastructure_checked = True
 
     def _initialize_window_mode(self) -> None:
         """自动检测窗口模式"""
@@ -192,13 +256,28 @@ class TradingService(ITradingService):
         except Exception as e:
             print(f"清除窗口偏移设置时出错: {e}")
 
+    def _stop_recording(self) -> None:
+        """结束当前会话记录"""
+        if self.session_recorder is not None:
+            self.session_recorder.close()
+            self.session_recorder = None
+
     def _switch_mode(self, config: TradingConfig) -> None:
         """切换交易模式"""
         try:
             # 创建新的交易模式
-            new_mode = TradingModeFactory.create_mode(
-                config, self.ocr_engine, self.screen_capture, self.action_executor
-            )
+            screen_capture, ocr_engine, action_executor = self.screen_capture, self.ocr_engine, self.action_executor
+            self._stop_recording()
+            if config.record_session:
+                self.session_recorder = SessionRecorder.start(
+                    resolution=[screen_capture.width, screen_capture.height], trading_mode=config.trading_mode.value
+                )
+                screen_capture = RecordingScreenCapture(screen_capture, self.session_recorder)
+                ocr_engine = RecordingOCREngine(ocr_engine, self.session_recorder)
+                action_executor = RecordingActionExecutor(action_executor, self.session_recorder)
+            new_mode = TradingModeFactory.create_mode(config, ocr_engine, screen_capture, action_executor)
+            if self.session_recorder is not None:
+                new_mode.detector = RecordingDetector(new_mode.detector, self.session_recorder)
 
             # 初始化新模式
             new_mode.initialize(config, profit=self.profit, count=self.count)
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""模块包初始化文件"""
+
+from .fake_game import FakeGame, FakeGameActionExecutor, FakeScreenCapture, GlyphAtlas
+
+__all__ = ["FakeGame", "FakeGameActionExecutor", "FakeScreenCapture", "GlyphAtlas"]
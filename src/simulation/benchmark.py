@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+模拟游戏上的端到端交易周期基准测试
+
+使用真实的OCR引擎、检测器和交易模式，把截图和动作接到 FakeGame 上，
+统计每秒周期数和各步骤耗时分布，用于在没有游戏的机器上验证延迟/轮询相关的改动。
+
+用法:
+    python -m src.simulation.benchmark --cycles 50 --resolution 2560x1440 --ui-latency 0.05
+    python -m src.simulation.benchmark --cycles 10 --ui-latency 0.2 --compare-waits
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Optional, Tuple
+
+try:
+    from src.config.trading_config import TradingConfig, TradingMode
+    from src.core.cancellation import stop_token
+    from src.core.exceptions import TradingException
+    from src.simulation.fake_game import FakeGame, FakeGameActionExecutor, FakeScreenCapture
+    from src.storage.sqlite_store import WriteBehindSqliteStore
+    from src.storage.trade_log import TradeLogWriter
+    from src.utils.delay_helper import delay_helper
+    from src.utils.profiler import profiler
+except ImportError:
+    from ..config.trading_config import TradingConfig, TradingMode
+    from ..core.cancellation import stop_token
+    from ..core.exceptions import TradingException
+    from ..storage.sqlite_store import WriteBehindSqliteStore
+    from ..storage.trade_log import TradeLogWriter
+    from ..utils.delay_helper import delay_helper
+    from ..utils.profiler import profiler
+    from .fake_game import FakeGame, FakeGameActionExecutor, FakeScreenCapture
+
+# 屯仓模式默认的理想价格和最高价格，TradingConfig 的默认值为0，任何价格都不会购买
+DEFAULT_IDEAL_PRICE = 1200
+DEFAULT_MAX_PRICE = 1500
+
+
+@dataclass
+class BenchmarkResult:
+    """基准测试结果"""
+
+    mode: str
+    resolution: Tuple[int, int]
+    ui_latency: float
+    cycles: int
+    errors: int
+    elapsed: float
+    cycles_per_second: float
+    game_stats: Dict[str, int]
+    steps: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    waits: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        """单行摘要"""
+        return (
+            f"[{self.mode}] {self.resolution[0]}x{self.resolution[1]} ui_latency={self.ui_latency}s "
+            f"周期数={self.cycles} 失败={self.errors} 耗时={self.elapsed:.2f}s "
+            f"速度={self.cycles_per_second:.2f}周期/秒 游戏统计={self.game_stats}"
+        )
+
+
+def create_trading_mode(game: FakeGame, config: TradingConfig):
+    """在模拟游戏上组装真实的OCR引擎、检测器和交易模式"""
+    # 交易模式依赖的模块在导入时会加载截图/输入相关的库，放在函数内延迟导入
+    try:
+        from src.infrastructure.ocr_engine import OCREngineFactory
+        from src.services.trading_modes import TradingModeFactory
+    except ImportError:
+        from ..infrastructure.ocr_engine import OCREngineFactory
+        from ..services.trading_modes import TradingModeFactory
+
+    ocr_engine = OCREngineFactory.create_engine("template", resolution=(game.width, game.height))
+    return TradingModeFactory.create_mode(config, ocr_engine, FakeScreenCapture(game), FakeGameActionExecutor(game))
+
+
+def run_benchmark(
+    cycles: int = 20,
+    mode: TradingMode = TradingMode.ROLLING,
+    resolution: Tuple[int, int] = (2560, 1440),
+    ui_latency: float = 0.0,
+    seed: Optional[int] = 0,
+    config: Optional[TradingConfig] = None,
+    workdir: Optional[str] = None,
+    event_driven_waits: Optional[bool] = None,
+    overlap_detection: Optional[bool] = None,
+    ideal_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+) -> BenchmarkResult:
+    """
+    运行端到端基准测试
+
+    Args:
+        cycles: 执行的交易周期数
+        mode: 交易模式
+        resolution: 模拟的游戏分辨率
+        ui_latency: 模拟界面的响应延迟（秒）
+        seed: 随机种子
+        config: 交易配置，默认使用 TradingConfig 的默认值
+        workdir: 运行目录，交易日志和数据库写在这里，默认使用临时目录以免污染真实数据
+        event_driven_waits: 是否按界面状态结束等待，None 时沿用 config 中的设置
+        overlap_detection: 是否在后台识别已稳定区域，None 时沿用 config 中的设置
+        ideal_price: 屯仓模式的理想价格，None 时沿用 config 中的设置
+        max_price: 屯仓模式的最高价格，None 时沿用 config 中的设置
+    """
+    if config is None:
+        config = TradingConfig(
+            screen_width=resolution[0],
+            screen_height=resolution[1],
+            ideal_price=DEFAULT_IDEAL_PRICE,
+            max_price=DEFAULT_MAX_PRICE,
+        )
+    # 不修改调用方传入的配置
+    overrides = {
+        "event_driven_waits": event_driven_waits,
+        "overlap_detection": overlap_detection,
+        "ideal_price": ideal_price,
+        "max_price": max_price,
+    }
+    config = replace(
+        config, trading_mode=mode, **{name: value for name, value in overrides.items() if value is not None}
+    )
+    if mode == TradingMode.ROLLING:
+        option = config.rolling_options[config.rolling_option]
+        game = FakeGame(
+            resolution,
+            buy_count=option["buy_count"],
+            unit_price_range=(int(option["min_buy_price"] * 1.2), int(option["buy_price"] * 1.2)),
+            ui_latency=ui_latency,
+            seed=seed,
+        )
+    else:
+        # 价格在理想价格的一半到最高价格的两倍之间，一部分周期会购买，其余刷新；低于100的价格会被当作识别异常跳过
+        low = max(100, config.ideal_price // 2)
+        game = FakeGame(
+            resolution,
+            unit_price_range=(low, max(low + 1, config.max_price * 2)),
+            ui_latency=ui_latency,
+            start_screen=FakeGame.HOARDING_LIST,
+            seed=seed,
+        )
+
+    original_dir = os.getcwd()
+    temp_dir = None
+    if workdir is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        workdir = temp_dir.name
+    os.chdir(workdir)
+    profiler.reset()
+    delay_helper.reset_wait_stats()
+    errors = 0
+    completed = 0
+    try:
+        trading_mode = create_trading_mode(game, config)
+        trading_mode.initialize(config)
+        trading_mode.prepare()
+        start = time.perf_counter()
+        for _ in range(cycles):
+            profiler.begin_cycle()
+            try:
+                should_continue = trading_mode.execute_cycle()
+            except TradingException as e:
+                errors += 1
+                print(f"模拟周期失败: {e}")
+                should_continue = True
+            finally:
+                profiler.end_cycle()
+            completed += 1
+            if not should_continue:
+                break
+        elapsed = time.perf_counter() - start
+        trading_mode.stop()
+    finally:
+        # 交易日志和数据库写在运行目录下，离开前全部落盘关闭
+        TradeLogWriter.close_all()
+        WriteBehindSqliteStore.close_all()
+        # 交易模式开始时复位、停止时取消全局停止令牌，结束后复位，之后同一进程中的等待不受影响
+        stop_token.reset()
+        os.chdir(original_dir)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    return BenchmarkResult(
+        mode=mode.name.lower(),
+        resolution=resolution,
+        ui_latency=ui_latency,
+        cycles=completed,
+        errors=errors,
+        elapsed=elapsed,
+        cycles_per_second=completed / elapsed if elapsed > 0 else 0.0,
+        game_stats=dict(game.stats),
+        steps=profiler.stats(),
+        waits=delay_helper.get_wait_stats(),
+    )
+
+
+def format_wait_comparison(before: BenchmarkResult, after: BenchmarkResult) -> str:
+    """固定延迟与条件等待两次运行的对比报告"""
+    lines = [
+        f"固定延迟: {before.cycles_per_second:.3f}周期/秒, 条件等待: {after.cycles_per_second:.3f}周期/秒",
+        f"{'操作':<36}{'固定延迟(ms/次)':>16}{'条件等待(ms/次)':>16}{'提前满足':>10}",
+    ]
+    for operation in sorted(set(before.waits) | set(after.waits)):
+        old = before.waits.get(operation, {})
+        new = after.waits.get(operation, {})
+        old_avg = old["waited"] * 1000 / old["waits"] if old.get("waits") else 0.0
+        new_avg = new["waited"] * 1000 / new["waits"] if new.get("waits") else 0.0
+        early = f"{int(new.get('early', 0))}/{int(new.get('waits', 0))}"
+        lines.append(f"{operation:<36}{old_avg:>16.1f}{new_avg:>16.1f}{early:>10}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="模拟游戏上的交易周期基准测试")
+    parser.add_argument("--cycles", type=int, default=20, help="执行的交易周期数")
+    parser.add_argument("--mode", choices=["rolling", "hoarding"], default="rolling", help="交易模式")
+    parser.add_argument("--resolution", default="2560x1440", help="模拟分辨率，例如 1920x1080")
+    parser.add_argument("--ui-latency", type=float, default=0.0, help="界面响应延迟（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--ideal-price", type=int, default=DEFAULT_IDEAL_PRICE, help="屯仓模式的理想价格")
+    parser.add_argument("--max-price", type=int, default=DEFAULT_MAX_PRICE, help="屯仓模式的最高价格")
+    parser.add_argument("--json", dest="json_path", help="把结果导出为JSON文件")
+    parser.add_argument("--event-driven", action="store_true", help="按界面状态结束等待")
+    parser.add_argument("--overlap-detection", action="store_true", help="识别与后续输入并行")
+    parser.add_argument("--compare-waits", action="store_true", help="分别用固定延迟和条件等待运行并输出对比")
+    args = parser.parse_args(argv)
+
+    width, height = (int(value) for value in args.resolution.lower().split("x"))
+    mode = TradingMode.ROLLING if args.mode == "rolling" else TradingMode.HOARDING
+    if args.compare_waits:
+        results = [
+            run_benchmark(
+                args.cycles,
+                mode,
+                (width, height),
+                args.ui_latency,
+                args.seed,
+                event_driven_waits=enabled,
+                overlap_detection=args.overlap_detection,
+                ideal_price=args.ideal_price,
+                max_price=args.max_price,
+            )
+            for enabled in (False, True)
+        ]
+        for result in results:
+            print(result.summary())
+        print(format_wait_comparison(*results))
+        output = [asdict(result) for result in results]
+    else:
+        result = run_benchmark(
+            args.cycles,
+            mode,
+            (width, height),
+            args.ui_latency,
+            args.seed,
+            event_driven_waits=args.event_driven,
+            overlap_detection=args.overlap_detection,
+            ideal_price=args.ideal_price,
+            max_price=args.max_price,
+        )
+        print(result.summary())
+        print(profiler.format_breakdown())
+        output = asdict(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
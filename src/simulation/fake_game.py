@@ -0,0 +1,700 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的模拟游戏
+
+用现有的模板图片合成游戏画面（价格区域、购买失败弹窗、出售窗口、仓库格子、邮件等），
+响应模拟动作执行器的点击/按键，通过模拟截图后端提供画面，并支持可配置的界面响应延迟。
+配合真实的OCR引擎和检测器即可在没有游戏的机器上完整运行交易周期并做性能基准测试。
+"""
+import os
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from src.config.coordinates import CoordinateConfig
+    from src.core.interfaces import IActionExecutor
+except ImportError:
+    from ..config.coordinates import CoordinateConfig
+    from ..core.interfaces import IActionExecutor
+
+# 与 pyautogui.Point 字段一致的鼠标位置
+MousePosition = namedtuple("MousePosition", "x y")
+
+
+class GlyphAtlas:
+    """按OCR引擎相同的预处理方式加载模板，用于合成可被识别的画面"""
+
+    _default_resolution = (1920, 1080)
+
+    # 需要不同二值化阈值的图片模板，与OCR引擎保持一致
+    PIC_THRESHOLDS = {"enter_teqingchu": 50, "equipment_scheme": 50}
+
+    def __init__(self, resolution: Tuple[int, int], templates_dir: str = None):
+        if templates_dir is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+            templates_dir = os.path.join(base_dir, f"templates/{resolution[0]}x{resolution[1]}")
+            if not Path(templates_dir).exists():
+                templates_dir = os.path.join(
+                    base_dir, f"templates/{self._default_resolution[0]}x{self._default_resolution[1]}"
+                )
+        self.templates_dir = Path(templates_dir)
+        self.fonts: Dict[str, Dict[str, np.ndarray]] = {}
+        self.pictures: Dict[str, np.ndarray] = {}
+        self._load()
+
+    @staticmethod
+    def _preprocess_digit(path: Path, prefix: str) -> Optional[np.ndarray]:
+        template = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if template is None:
+            return None
+        if prefix == "g":
+            _, processed = cv2.threshold(template, 50, 255, cv2.THRESH_BINARY)
+        else:
+            _, processed = cv2.threshold(template, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if prefix != "":
+            contours, _ = cv2.findContours(processed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if contours:
+                x, y, w, h = cv2.boundingRect(contours[0])
+                processed = processed[y : y + h, x : x + w]
+        return processed
+
+    def _load(self) -> None:
+        for path in sorted(self.templates_dir.glob("*.png")):
+            stem = path.stem
+            if stem.isdigit():
+                glyph = self._preprocess_digit(path, "")
+                if glyph is not None:
+                    self.fonts.setdefault("default", {})[stem] = glyph
+                continue
+            parts = stem.split("_")
+            if len(parts) == 2 and (parts[1].isdigit() or stem == "w_slash"):
+                glyph = self._preprocess_digit(path, parts[0])
+                if glyph is not None:
+                    char = "/" if parts[1] == "slash" else parts[1]
+                    self.fonts.setdefault(parts[0], {})[char] = glyph
+                continue
+            template = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if template is not None:
+                _, binary = cv2.threshold(template, self.PIC_THRESHOLDS.get(stem, 127), 255, cv2.THRESH_BINARY)
+                self.pictures[stem] = binary
+
+    def has_font(self, font: str) -> bool:
+        """是否存在完整的字体组"""
+        return all(str(i) in self.fonts.get(font, {}) for i in range(10))
+
+    def render_text(self, text: str, font: str = "default", spacing: int = 3) -> np.ndarray:
+        """把数字文本渲染为二值图像，缺失的字体回退到默认字体"""
+        glyphs = self.fonts.get(font) if self.has_font(font) else self.fonts["default"]
+        images = [glyphs[char] for char in text if char in glyphs]
+        if not images:
+            return np.zeros((1, 1), dtype=np.uint8)
+        height = max(image.shape[0] for image in images)
+        width = sum(image.shape[1] for image in images) + spacing * (len(images) - 1)
+        canvas = np.zeros((height, width), dtype=np.uint8)
+        x = 0
+        for image in images:
+            canvas[: image.shape[0], x : x + image.shape[1]] = image
+            x += image.shape[1] + spacing
+        return canvas
+
+
+class FakeGame:
+    """
+    模拟游戏状态机
+
+    画面:
+        lobby -> (L键) equipment -> (购买) -> (仓库) storage -> (Alt+D) sell_window
+        -> (出售) sell_listing -> (上架) storage -> (邮件) mail -> (Esc) lobby
+    屯仓模式使用 hoarding_list / hoarding_item 两个画面。
+    """
+
+    LOBBY = "lobby"
+    EQUIPMENT = "equipment"
+    STORAGE = "storage"
+    SELL_WINDOW = "sell_window"
+    SELL_LISTING = "sell_listing"
+    MAIL = "mail"
+    HOARDING_LIST = "hoarding_list"
+    HOARDING_ITEM = "hoarding_item"
+
+    # 仓库背景颜色与检测器判断空格子的颜色一致
+    EMPTY_CELL_COLOR = (26, 31, 34)
+    ITEM_CELL_COLOR = (90, 120, 150)
+    BACKGROUND_COLOR = (12, 12, 12)
+    STORAGE_ROWS = 10
+    STORAGE_COLUMNS = 9
+
+    def __init__(
+        self,
+        resolution: Tuple[int, int] = (2560, 1440),
+        balance: int = 50_000_000,
+        buy_count: int = 4980,
+        unit_price_range: Tuple[int, int] = (400, 650),
+        sell_unit_price_range: Tuple[int, int] = (600, 700),
+        buy_failure_rate: float = 0.1,
+        fee_rate: float = 0.1,
+        listing_slots: int = 15,
+        hoarding_max_quantity: int = 200,
+        ui_latency: float = 0.0,
+        start_screen: str = LOBBY,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            resolution: 模拟的游戏分辨率
+            balance: 初始哈夫币余额
+            buy_count: 滚仓配装一次购买的数量
+            unit_price_range: 配装单价的随机范围
+            sell_unit_price_range: 交易行最低售价的随机范围
+            buy_failure_rate: 购买失败（被抢）的概率
+            fee_rate: 售卖手续费比例
+            listing_slots: 交易行上架栏位数
+            hoarding_max_quantity: 屯仓模式点击最大数量按钮时的购买数量
+            ui_latency: 界面切换的响应延迟（秒），延迟期间画面保持旧状态，动作按旧画面处理
+            start_screen: 初始画面
+            seed: 随机种子
+        """
+        self.width, self.height = resolution
+        self.coordinates = CoordinateConfig.restore_coordinates(self.width, self.height)
+        self.atlas = GlyphAtlas(resolution)
+        self.buy_count = buy_count
+        self.unit_price_range = unit_price_range
+        self.sell_unit_price_range = sell_unit_price_range
+        self.buy_failure_rate = buy_failure_rate
+        self.fee_rate = fee_rate
+        self.listing_slots = listing_slots
+        self.hoarding_max_quantity = hoarding_max_quantity
+        self.ui_latency = ui_latency
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._transitions: Deque[Tuple[float, Callable[[], None]]] = deque()
+        self._held_keys: List[str] = []
+        self._click_tolerance = max(4, int(8 * self.width / CoordinateConfig.BASE_WIDTH))
+
+        # 游戏状态
+        self.screen = start_screen
+        self.balance = balance
+        self.option = 0
+        self.price = 0
+        self.purchase_failed = False
+        self.pending_lots: List[int] = []
+        self.storage_lots: List[int] = []
+        self.hovered_lot: Optional[int] = None
+        self.listing: Optional[Dict[str, int]] = None
+        self.active_listings = 0
+        self.mail_revenue = 0
+        self.hoarding_quantity = 0
+
+        # 统计
+        self.stats = {"buys": 0, "failed_buys": 0, "listings": 0, "mails": 0, "ignored_actions": 0}
+        self._reroll_price()
+
+    # ------------------------------------------------------------------
+    # 状态切换
+    # ------------------------------------------------------------------
+    def _later(self, change: Callable[[], None]) -> None:
+        """界面切换经过 ui_latency 后才可见"""
+        if self.ui_latency <= 0:
+            change()
+        else:
+            self._transitions.append((time.perf_counter() + self.ui_latency, change))
+
+    def _advance(self) -> None:
+        """应用已到期的界面切换"""
+        now = time.perf_counter()
+        while self._transitions and self._transitions[0][0] <= now:
+            self._transitions.popleft()[1]()
+
+    def _go(self, screen: str) -> None:
+        def change():
+            self.screen = screen
+
+        self._later(change)
+
+    def _reroll_price(self) -> None:
+        unit = self._random.randint(*self.unit_price_range)
+        if self.screen in (self.HOARDING_LIST, self.HOARDING_ITEM):
+            self.price = unit
+        else:
+            self.price = unit * self.buy_count
+
+    def _ignore(self) -> None:
+        self.stats["ignored_actions"] += 1
+
+    def _near(self, x: float, y: float, point) -> bool:
+        return abs(x - point[0]) <= self._click_tolerance and abs(y - point[1]) <= self._click_tolerance
+
+    # ------------------------------------------------------------------
+    # 动作入口
+    # ------------------------------------------------------------------
+    def press(self, key: str) -> None:
+        """单次按键"""
+        with self._lock:
+            self._advance()
+            key = key.lower()
+            if key == "l" and self.screen == self.LOBBY:
+                self._go(self.EQUIPMENT)
+            elif key == "esc":
+                self._on_escape()
+            else:
+                self._ignore()
+
+    def _on_escape(self) -> None:
+        screen = self.screen
+
+        def change():
+            if screen == self.EQUIPMENT:
+                self.purchase_failed = False
+                self.screen = self.LOBBY
+                self._reroll_price()
+            elif screen in (self.SELL_WINDOW, self.SELL_LISTING):
+                self.listing = None
+                self.screen = self.STORAGE
+            elif screen in (self.STORAGE, self.MAIL):
+                self.screen = self.LOBBY
+            elif screen == self.HOARDING_ITEM:
+                self.screen = self.HOARDING_LIST
+                self._reroll_price()
+
+        self._later(change)
+
+    def key_down(self, key: str) -> None:
+        """按下按键，与已按下的按键组成组合键"""
+        with self._lock:
+            self._advance()
+            key = key.lower()
+            if self._held_keys:
+                self._on_hotkey(self._held_keys + [key])
+            self._held_keys.append(key)
+
+    def key_up(self, key: str) -> None:
+        """松开按键"""
+        with self._lock:
+            key = key.lower()
+            if key in self._held_keys:
+                self._held_keys.remove(key)
+
+    def _on_hotkey(self, keys: List[str]) -> None:
+        if keys == ["alt", "d"] and self.screen == self.STORAGE and self.hovered_lot is not None:
+            self._go(self.SELL_WINDOW)
+        elif keys == ["ctrl", "a"] and self.screen == self.SELL_LISTING and self.listing is not None:
+            self.listing["text_selected"] = 1
+        else:
+            self._ignore()
+
+    def type_text(self, text: str) -> None:
+        """在售价输入框输入文本"""
+        with self._lock:
+            self._advance()
+            if self.screen == self.SELL_LISTING and self.listing and self.listing.get("text_selected"):
+                digits = "".join(char for char in text if char.isdigit())
+                self.listing["price"] = int(digits) if digits else 0
+                self.listing["text_selected"] = 0
+            else:
+                self._ignore()
+
+    def move(self, x: float, y: float) -> None:
+        """移动鼠标，仓库画面中记录悬停的物品"""
+        with self._lock:
+            self._advance()
+            self.hovered_lot = self._lot_at(x, y) if self.screen == self.STORAGE else None
+
+    def click(self, x: float, y: float, right_click: bool = False) -> None:
+        """点击指定位置"""
+        with self._lock:
+            self._advance()
+            rolling = self.coordinates["rolling_mode"]
+            if self.screen not in (self.MAIL, self.HOARDING_LIST, self.HOARDING_ITEM) and self._near(
+                x, y, rolling["enter_storage"]
+            ):
+                self.listing = None
+                self._go(self.STORAGE)
+                return
+            handler = {
+                self.EQUIPMENT: self._click_equipment,
+                self.STORAGE: self._click_storage,
+                self.SELL_WINDOW: self._click_sell_window,
+                self.SELL_LISTING: self._click_sell_listing,
+                self.MAIL: self._click_mail,
+                self.HOARDING_LIST: self._click_hoarding_list,
+                self.HOARDING_ITEM: self._click_hoarding_item,
+            }.get(self.screen)
+            if handler is None or not handler(x, y):
+                self._ignore()
+
+    def _click_equipment(self, x: float, y: float) -> bool:
+        rolling = self.coordinates["rolling_mode"]
+        for index, point in enumerate(rolling["options"]):
+            if self._near(x, y, point):
+                self.option = index
+                return True
+        if self._near(x, y, rolling["buy_button"]) and not self.purchase_failed:
+            price = self.price
+            if self.balance < price or self._random.random() < self.buy_failure_rate:
+                self.stats["failed_buys"] += 1
+
+                def fail():
+                    self.purchase_failed = True
+
+                self._later(fail)
+            else:
+                self.stats["buys"] += 1
+                self.balance -= price
+                self.pending_lots.append(self.buy_count)
+            return True
+        return False
+
+    def _click_storage(self, x: float, y: float) -> bool:
+        rolling = self.coordinates["rolling_mode"]
+        if self._near(x, y, rolling["transfer_all"]):
+            self.storage_lots.extend(self.pending_lots)
+            self.pending_lots = []
+            return True
+        if self._near(x, y, rolling["mail_button"]):
+            self._go(self.MAIL)
+            return True
+        return False
+
+    def _click_sell_window(self, x: float, y: float) -> bool:
+        if not self._near(x, y, self.coordinates["rolling_mode"]["sell_button"]):
+            return False
+        unit = self._random.randint(*self.sell_unit_price_range)
+        self.listing = {
+            "lot": self.hovered_lot,
+            "min_price": unit,
+            "min_price_count": self._random.randint(100, 50000),
+            "price": unit,
+            "count": 1,
+            "text_selected": 0,
+        }
+        self._go(self.SELL_LISTING)
+        return True
+
+    def _click_sell_listing(self, x: float, y: float) -> bool:
+        rolling = self.coordinates["rolling_mode"]
+        listing = self.listing
+        left, right = rolling["sell_num_left"], rolling["sell_num_right"]
+        if abs(y - left[1]) <= self._click_tolerance and left[0] - self._click_tolerance <= x <= right[0] + 1:
+            available = self.storage_lots[listing["lot"]]
+            ratio = min(1.0, max(0.0, (x - left[0]) / (right[0] - left[0])))
+            listing["count"] = available if ratio >= 1.0 else max(1, int(available * ratio))
+            return True
+        if self._near(x, y, rolling["min_sell_price_button"]):
+            listing["price"] = listing["min_price"]
+            return True
+        if self._near(x, y, rolling["fast_sell_price_button"]):
+            listing["price"] = listing["min_price"] + self._random.randint(1, 30)
+            return True
+        if self._near(x, y, rolling["sell_price_text"]) or self._near(x, y, rolling["btn_quick_sell_area"]):
+            return True
+        if self._near(x, y, rolling["final_sell_button"]):
+            self._finish_listing()
+            return True
+        return False
+
+    def _finish_listing(self) -> None:
+        listing = self.listing
+        lot = listing["lot"]
+        self.storage_lots[lot] -= listing["count"]
+        if self.storage_lots[lot] <= 0:
+            del self.storage_lots[lot]
+        # 模拟即时成交，收入进入邮件
+        self.mail_revenue += self.expected_revenue(listing)
+        self.active_listings += 1
+        self.stats["listings"] += 1
+        self.hovered_lot = None
+
+        # 上架窗口整体关闭，关闭前仍显示原来的内容
+        def close():
+            self.listing = None
+            self.screen = self.STORAGE
+
+        self._later(close)
+
+    def _click_mail(self, x: float, y: float) -> bool:
+        rolling = self.coordinates["rolling_mode"]
+        if self._near(x, y, rolling["mail_trade_button"]):
+            return True
+        if self._near(x, y, rolling["mail_get_button"]):
+            if self.mail_revenue:
+                self.stats["mails"] += 1
+            self.balance += self.mail_revenue
+            self.mail_revenue = 0
+            self.active_listings = 0
+            return True
+        return False
+
+    def _click_hoarding_list(self, x: float, y: float) -> bool:
+        self._go(self.HOARDING_ITEM)
+        return True
+
+    def _click_hoarding_item(self, x: float, y: float) -> bool:
+        buttons = self.coordinates["buy_buttons"]
+        for name, quantity in (("min", 31), ("max", self.hoarding_max_quantity)):
+            if self._near(x, y, buttons[f"convertible_{name}"]) or self._near(x, y, buttons[f"non_convertible_{name}"]):
+                self.hoarding_quantity = quantity
+                return True
+        if self._near(x, y, buttons["convertible_buy"]) or self._near(x, y, buttons["non_convertible_buy"]):
+            cost = self.price * max(1, self.hoarding_quantity)
+            if self.balance >= cost:
+                self.balance -= cost
+                self.stats["buys"] += 1
+            else:
+                self.stats["failed_buys"] += 1
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # 画面合成
+    # ------------------------------------------------------------------
+    def expected_revenue(self, listing: Dict[str, int]) -> int:
+        """扣除手续费后的预期收入"""
+        revenue = int(listing["price"] * listing["count"] * (1 - self.fee_rate))
+        # 检测器会把末位7当作售价旁的问号处理，模拟数据避开这一特例
+        return revenue - 1 if revenue % 10 == 7 else revenue
+
+    def _storage_cells(self) -> List[Tuple[int, int, int, int]]:
+        """仓库前若干格子的绝对坐标 (x1, y1, x2, y2)"""
+        area = self.coordinates["rolling_mode"]["wait_sell_item_area"]
+        item_range = self.coordinates["rolling_mode"]["item_range"]
+        cells = []
+        for index in range(len(self.storage_lots)):
+            row, column = divmod(index, self.STORAGE_COLUMNS)
+            if row >= self.STORAGE_ROWS:
+                break
+            x1 = area[0] + column * (item_range[0] + 1)
+            y1 = area[1] + row * (item_range[1] + 1)
+            cells.append((x1, y1, x1 + item_range[0], y1 + item_range[1]))
+        return cells
+
+    def _lot_at(self, x: float, y: float) -> Optional[int]:
+        for index, (x1, y1, x2, y2) in enumerate(self._storage_cells()):
+            if x1 <= x < x2 and y1 <= y < y2:
+                return index
+        return None
+
+    def _font(self, font_2560: str, font_1920: str) -> str:
+        """与检测器一致：1920宽度下部分区域使用另一套字体"""
+        return font_1920 if self.width == 1920 else font_2560
+
+    def _scene(self) -> Tuple[List[Tuple[List[int], tuple]], List[Tuple[List[int], np.ndarray]]]:
+        """当前画面的填充矩形和文字/图片元素"""
+        rolling = self.coordinates["rolling_mode"]
+        fills = []
+        elements = [(self.coordinates["balance_detection"], self.atlas.render_text(str(self.balance), "w"))]
+
+        if self.screen == self.EQUIPMENT:
+            elements.append((rolling["price_area"], self.atlas.render_text(str(self.price))))
+            if self.purchase_failed and "option_failed" in self.atlas.pictures:
+                elements.append((rolling["failure_check"], self.atlas.pictures["option_failed"]))
+        elif self.screen == self.HOARDING_ITEM:
+            for area in self.coordinates["price_detection"].values():
+                elements.append((area, self.atlas.render_text(str(self.price))))
+        elif self.screen in (self.STORAGE, self.SELL_WINDOW, self.SELL_LISTING):
+            fills.append((rolling["wait_sell_item_area"], self.EMPTY_CELL_COLOR))
+            fills.extend((list(cell), self.ITEM_CELL_COLOR) for cell in self._storage_cells())
+            if self.screen == self.SELL_WINDOW and "sell" in self.atlas.pictures:
+                elements.append((rolling["failure_check"], self.atlas.pictures["sell"]))
+            if self.screen == self.SELL_LISTING and self.listing:
+                listing = self.listing
+                elements.extend(
+                    [
+                        (
+                            rolling["min_sell_price_area"],
+                            self.atlas.render_text(str(listing["min_price"]), self._font("w", "g")),
+                        ),
+                        (
+                            rolling["min_sell_price_count_area"],
+                            self.atlas.render_text(str(listing["min_price_count"]), self._font("w", "c")),
+                        ),
+                        (
+                            rolling["sell_full"],
+                            self.atlas.render_text(f"{self.active_listings}/{self.listing_slots}", "w"),
+                        ),
+                        (
+                            rolling["expected_revenue_area"],
+                            self.atlas.render_text(str(self.expected_revenue(listing)), self._font("w", "g")),
+                        ),
+                        (
+                            rolling["total_sell_price_area"],
+                            self.atlas.render_text(str(listing["price"] * listing["count"]), "w"),
+                        ),
+                        (rolling["sell_price_text_area"], self.atlas.render_text(str(listing["price"]), "w")),
+                    ]
+                )
+        return fills, elements
+
+    def render(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """合成指定区域的画面，返回与mss截图相同的BGRA数组"""
+        with self._lock:
+            self._advance()
+            fills, elements = self._scene()
+
+        frame = np.empty((height, width, 4), dtype=np.uint8)
+        frame[..., :3] = self.BACKGROUND_COLOR
+        frame[..., 3] = 255
+
+        for area, color in fills:
+            self._blit_fill(frame, x, y, area, color)
+        for area, image in elements:
+            ax1, ay1 = min(area[0], area[2]), min(area[1], area[3])
+            ay2 = max(area[1], area[3])
+            top = ay1 + max(0, (ay2 - ay1 - image.shape[0]) // 2)
+            self._blit_binary(frame, x, y, ax1 + 4, top, image)
+        return frame
+
+    @staticmethod
+    def _blit_fill(frame: np.ndarray, x: int, y: int, area: List[int], color: tuple) -> None:
+        x1, y1 = max(area[0] - x, 0), max(area[1] - y, 0)
+        x2, y2 = min(area[2] - x, frame.shape[1]), min(area[3] - y, frame.shape[0])
+        if x1 < x2 and y1 < y2:
+            frame[y1:y2, x1:x2, :3] = color
+
+    @staticmethod
+    def _blit_binary(frame: np.ndarray, x: int, y: int, left: int, top: int, image: np.ndarray) -> None:
+        x1, y1 = left - x, top - y
+        sx1, sy1 = max(0, -x1), max(0, -y1)
+        dx1, dy1 = max(0, x1), max(0, y1)
+        dx2 = min(frame.shape[1], x1 + image.shape[1])
+        dy2 = min(frame.shape[0], y1 + image.shape[0])
+        if dx1 >= dx2 or dy1 >= dy2:
+            return
+        patch = image[sy1 : sy1 + dy2 - dy1, sx1 : sx1 + dx2 - dx1]
+        target = frame[dy1:dy2, dx1:dx2, :3]
+        target[patch > 0] = 255
+        target[patch == 0] = 0
+
+
+class FakeScreenCapture:
+    """模拟截图后端，接口与 ScreenCapture 保持一致，画面来自 FakeGame"""
+
+    def __init__(self, game: FakeGame, capture_latency: float = 0.0):
+        """
+        Args:
+            game: 模拟游戏
+            capture_latency: 每次截图额外的耗时（秒），用于模拟截图开销
+        """
+        self.game = game
+        self.capture_latency = capture_latency
+        self.width, self.height = game.width, game.height
+        self.window_region: Optional[Tuple[int, int, int, int]] = None
+        self.capture_count = 0
+
+    def set_window_region(self, x: int, y: int, width: int, height: int) -> None:
+        """设置窗口区域信息，模拟游戏始终按窗口内坐标渲染"""
+        self.window_region = (x, y, width, height)
+
+    def clear_window_region(self) -> None:
+        """清除窗口区域信息"""
+        self.window_region = None
+
+    def capture_region(self, coordinates: List[float]) -> np.ndarray:
+        """捕获指定区域的模拟画面"""
+        if len(coordinates) != 4:
+            raise ValueError("坐标必须是4个元素的列表")
+        x1, y1, x2, y2 = (int(value) for value in coordinates)
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        if self.capture_latency > 0:
+            time.sleep(self.capture_latency)
+        self.capture_count += 1
+        return self.game.render(x1, y1, x2 - x1, y2 - y1)
+
+    def capture_window(self) -> np.ndarray:
+        """捕获整个模拟画面"""
+        return self.capture_region([0, 0, self.width, self.height])
+
+
+class FakeGameActionExecutor(IActionExecutor):
+    """把动作转发给模拟游戏的动作执行器，动作记录格式与 MockActionExecutor 一致"""
+
+    def __init__(self, game: FakeGame, log_actions: bool = False):
+        self.game = game
+        self.log_actions = log_actions
+        self.actions = []
+        self.window_offset: Optional[Tuple[int, int]] = None
+        self._mouse = (100, 100)
+
+    def set_window_offset(self, x: int, y: int) -> None:
+        """设置窗口偏移量"""
+        self.window_offset = (x, y)
+
+    def clear_window_offset(self) -> None:
+        """清除窗口偏移量"""
+        self.window_offset = None
+
+    def _record(self, action: dict) -> None:
+        self.actions.append(action)
+        if self.log_actions:
+            print(f"模拟动作: {action}")
+
+    def click_position(self, position: Tuple[float, float], right_click=False) -> None:
+        """点击位置（游戏内坐标）"""
+        self._mouse = (int(position[0]), int(position[1]))
+        self._record({"type": "click", "original_coordinates": position, "right_click": right_click})
+        self.game.click(position[0], position[1], right_click)
+
+    def press_key(self, key: str) -> None:
+        """按键"""
+        self._record({"type": "key", "key": key})
+        self.game.press(key)
+
+    def key_down(self, key: str) -> None:
+        """按下按键"""
+        self._record({"type": "key_down", "key": key})
+        self.game.key_down(key)
+
+    def key_up(self, key: str) -> None:
+        """松开按键"""
+        self._record({"type": "key_up", "key": key})
+        self.game.key_up(key)
+
+    def multi_key_press(self, a, b, interval=0.03):
+        """组合键"""
+        self.key_down(a)
+        self.key_down(b)
+        self.key_up(a)
+        self.key_up(b)
+
+    def type_text(self, text: str) -> None:
+        """输入文本"""
+        self._record({"type": "type", "text": text})
+        self.game.type_text(text)
+
+    def chord(self, keys: Sequence[str], hold_ms: float = 0) -> None:
+        """组合键，逆序松开"""
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+
+    def enter_text(self, text: str, mode: str = "auto") -> None:
+        """输入文本，模拟游戏不区分输入方式"""
+        self._record({"type": "text", "text": text, "mode": mode})
+        self.game.type_text(text)
+
+    def scroll(self, clicks: int) -> None:
+        """滚动"""
+        self._record({"type": "scroll", "clicks": clicks})
+
+    def move_mouse(self, position: Tuple[float, float]) -> None:
+        """移动鼠标"""
+        self._mouse = (int(position[0]), int(position[1]))
+        self._record({"type": "move", "original_position": position})
+        self.game.move(position[0], position[1])
+
+    def get_mouse_position(self):
+        """获取模拟鼠标位置"""
+        return MousePosition(*self._mouse)
+
+    def wait_for_key(self, key: str, timeout: Optional[float] = None) -> bool:
+        """模拟等待按键"""
+        return True
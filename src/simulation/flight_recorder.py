@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+会话回放
+
+回放驱动读取 src.infrastructure.session_recorder 记录的会话归档，按记录顺序把截图重新喂给
+RollingModeDetector/OCR 引擎，以最快速度重新执行并对比结果，可用于定位错误周期，
+也可作为OCR和检测器优化的真实基准数据集。
+"""
+import argparse
+import json
+import os
+import time
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List
+
+import cv2
+import numpy as np
+
+try:
+    from src.core.interfaces import IOCREngine
+    from src.infrastructure.session_recorder import to_jsonable
+except ImportError:
+    from ..core.interfaces import IOCREngine
+    from ..infrastructure.session_recorder import to_jsonable
+
+
+class SessionArchive:
+    """读取会话归档（目录或 .zip）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+        self.meta = json.loads(self._read("meta.json").decode("utf-8"))
+        self.events: List[Dict[str, Any]] = [
+            json.loads(line) for line in self._read("events.jsonl").decode("utf-8").splitlines() if line.strip()
+        ]
+        self.captures = [event for event in self.events if event["type"] == "capture"]
+        self.frame = lru_cache(maxsize=256)(self._load_frame)
+
+    def _read(self, name: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(name)
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def _load_frame(self, key: str) -> np.ndarray:
+        data = np.frombuffer(self._read(f"frames/{key}.png"), dtype=np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+
+    def of_type(self, kind: str) -> List[Dict[str, Any]]:
+        """指定类型的事件"""
+        return [event for event in self.events if event["type"] == kind]
+
+    def close(self) -> None:
+        """关闭归档"""
+        if self._zip is not None:
+            self._zip.close()
+
+
+class ReplayScreenCapture:
+    """按记录顺序返回截图的回放截图后端"""
+
+    def __init__(self, archive: SessionArchive):
+        self.archive = archive
+        resolution = archive.meta.get("resolution") or [2560, 1440]
+        self.width, self.height = resolution
+        self.window_region = None
+        self.cursor = 0
+
+    def seek(self, index: int) -> None:
+        """定位到第 index 次截图"""
+        self.cursor = index
+
+    def set_window_region(self, x: int, y: int, width: int, height: int) -> None:
+        """回放时坐标已是窗口内坐标，忽略窗口区域"""
+
+    def clear_window_region(self) -> None:
+        """回放时忽略窗口区域"""
+
+    def capture_region(self, coordinates) -> np.ndarray:
+        """返回下一张记录的截图，超出记录范围时重复最后一张"""
+        captures = self.archive.captures
+        if not captures:
+            raise ValueError("会话中没有截图记录")
+        event = captures[min(self.cursor, len(captures) - 1)]
+        self.cursor += 1
+        return self.archive.frame(event["frame"])
+
+    def capture_window(self) -> np.ndarray:
+        """返回下一张记录的截图"""
+        return self.capture_region("window")
+
+
+@dataclass
+class ReplayReport:
+    """回放结果"""
+
+    kind: str
+    total: int = 0
+    matched: int = 0
+    elapsed: float = 0.0
+    mismatches: List[Dict[str, Any]] = field(default_factory=list)
+    per_method: Dict[str, List[float]] = field(default_factory=dict)
+
+    def add(self, method: str, elapsed: float, expected: Any, actual: Any, index: int) -> None:
+        """记录一次回放调用"""
+        self.total += 1
+        self.elapsed += elapsed
+        stats = self.per_method.setdefault(method, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed * 1000
+        if to_jsonable(actual) == expected:
+            self.matched += 1
+        else:
+            self.mismatches.append(
+                {"index": index, "method": method, "expected": expected, "actual": to_jsonable(actual)}
+            )
+
+    def summary(self) -> str:
+        """多行摘要"""
+        lines = [
+            f"[{self.kind}] 回放 {self.total} 次, 一致 {self.matched} 次, 不一致 {len(self.mismatches)} 次, "
+            f"耗时 {self.elapsed * 1000:.1f}ms"
+        ]
+        for method, (count, total_ms) in sorted(self.per_method.items(), key=lambda x: -x[1][1]):
+            lines.append(f"  {method}: {count}次, 平均 {total_ms / count:.3f}ms")
+        for mismatch in self.mismatches[:20]:
+            lines.append(
+                f"  不一致 #{mismatch['index']} {mismatch['method']}: {mismatch['expected']} -> {mismatch['actual']}"
+            )
+        return "\n".join(lines)
+
+
+class SessionReplay:
+    """会话回放驱动"""
+
+    def __init__(self, path: str):
+        self.archive = SessionArchive(path)
+
+    def replay_ocr(self, engine: IOCREngine) -> ReplayReport:
+        """用给定OCR引擎重新识别所有记录的OCR输入并对比输出"""
+        report = ReplayReport("ocr")
+        for index, event in enumerate(self.archive.events):
+            if event["type"] != "ocr":
+                continue
+            image = self.archive.frame(event["frame"])
+            method: Callable = getattr(engine, event["method"])
+            start = time.perf_counter()
+            actual = method(image, **event["args"])
+            report.add(event["method"], time.perf_counter() - start, event["result"], actual, index)
+        return report
+
+    def replay_detector(self, engine: IOCREngine, detector_factory: Callable = None) -> ReplayReport:
+        """
+        按记录顺序重新执行检测器调用
+
+        Args:
+            engine: OCR引擎
+            detector_factory: (screen_capture, ocr_engine) -> 检测器，默认 RollingModeDetector
+        """
+        if detector_factory is None:
+            try:
+                from src.services.detector import RollingModeDetector
+            except ImportError:
+                from ..services.detector import RollingModeDetector
+            detector_factory = RollingModeDetector
+
+        screen_capture = ReplayScreenCapture(self.archive)
+        detector = detector_factory(screen_capture, engine)
+        report = ReplayReport("detector")
+        for index, event in enumerate(self.archive.events):
+            if event["type"] != "detector" or "result" not in event:
+                continue
+            start_capture, end_capture = event.get("captures", [0, 0])
+            args = [self._resolve_frame(arg) for arg in event["args"]]
+            kwargs = {key: self._resolve_frame(value) for key, value in event["kwargs"].items()}
+            # 流水线识别传入截图，其余调用需要在调用期间截图，不依赖截图的调用（如窗口检测）无法回放
+            with_frames = any(isinstance(value, np.ndarray) for value in args + list(kwargs.values()))
+            if not with_frames and end_capture <= start_capture:
+                continue
+            screen_capture.seek(start_capture)
+            start = time.perf_counter()
+            actual = getattr(detector, event["method"])(*args, **kwargs)
+            report.add(event["method"], time.perf_counter() - start, event["result"], actual, index)
+        return report
+
+    def _resolve_frame(self, value: Any) -> Any:
+        """把记录的截图引用换回截图"""
+        if isinstance(value, dict) and set(value) == {"frame"}:
+            return self.archive.frame(value["frame"])
+        return value
+
+    def close(self) -> None:
+        """关闭归档"""
+        self.archive.close()
+
+
+def main(argv=None) -> None:
+    """命令行入口: 回放会话归档"""
+    parser = argparse.ArgumentParser(description="回放会话记录")
+    parser.add_argument("archive", help="会话目录或 .zip 归档")
+    parser.add_argument("--ocr-only", action="store_true", help="只回放OCR调用")
+    args = parser.parse_args(argv)
+
+    try:
+        from src.infrastructure.ocr_engine import OCREngineFactory
+    except ImportError:
+        from ..infrastructure.ocr_engine import OCREngineFactory
+
+    replay = SessionReplay(args.archive)
+    resolution = tuple(replay.archive.meta.get("resolution") or (2560, 1440))
+    engine = OCREngineFactory.create_engine("template", resolution=resolution)
+    try:
+        print(replay.replay_ocr(engine).summary())
+        if not args.ocr_only:
+            print(replay.replay_detector(engine).summary())
+    finally:
+        replay.close()
+
+
+if __name__ == "__main__":
+    main()
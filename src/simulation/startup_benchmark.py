@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+冷启动基准测试
+
+每次启动一个新的Python进程，导入 DFMarketBot 并创建主窗口，事件循环开始处理后记为界面就绪，
+统计从创建进程到界面就绪的耗时，取多次运行的中位数与目标值比较，超出目标时返回非零退出码，
+用于发现拖慢启动的导入和初始化。子进程同时输出启动剖析报告（各模块导入耗时和各阶段初始化耗时）。
+
+子进程使用配置文件的副本，不会修改真实配置。
+
+用法:
+    python -m src.simulation.startup_benchmark --runs 5 --target-ms 1000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    from src.utils.startup_profiler import format_startup_report
+except ImportError:
+    from ..utils.startup_profiler import format_startup_report
+
+# 冷启动目标（毫秒）：界面就绪前不再加载截图、OCR和输入相关的库
+DEFAULT_TARGET_MS = 1000.0
+READY_MARKER = "DFMB_STARTUP_READY "
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 子进程直接执行的脚本，不经过 src.simulation 包，避免先加载模拟游戏依赖的库
+_CHILD_SCRIPT = """
+import json, os, shutil, sys, time
+sys.path.insert(0, {root!r})
+from src.utils.startup_profiler import startup_profiler
+startup_profiler.install_import_hook()
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+import DFMarketBot
+from src.config.config_factory import ConfigFactory
+
+for config_type, name in (("trading", "settings.yaml"), ("delay", "delay_config.yaml")):
+    source = os.path.join({root!r}, "config", name)
+    if os.path.exists(source):
+        shutil.copy(source, name)
+    ConfigFactory._instances[config_type] = ConfigFactory.create_config_manager(config_type, os.path.abspath(name))
+
+app = QApplication(sys.argv)
+window = DFMarketBot.MainWindow()
+window.show()
+
+
+def ready():
+    startup_profiler.mark("ui_ready")
+    report = startup_profiler.report(top=20)
+    print({marker!r} + json.dumps({{"ready_at": time.time(), "profile": report}}), flush=True)
+    app.quit()
+
+
+QTimer.singleShot(0, ready)
+app.exec_()
+# 不等待后台预热线程和配置写入
+os._exit(0)
+"""
+
+
+@dataclass
+class ColdStartResult:
+    """冷启动基准测试结果"""
+
+    target_ms: float
+    # 每次运行从创建进程到界面就绪的耗时（毫秒）
+    runs_ms: List[float] = field(default_factory=list)
+    # 最后一次运行的启动剖析报告
+    profile: Dict = field(default_factory=dict)
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.runs_ms) if self.runs_ms else 0.0
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.runs_ms) and self.median_ms <= self.target_ms
+
+    def summary(self) -> str:
+        """单行摘要"""
+        runs = ", ".join(f"{value:.0f}" for value in self.runs_ms)
+        verdict = "达标" if self.passed else "超出目标"
+        return f"冷启动中位数={self.median_ms:.0f}ms 目标={self.target_ms:.0f}ms [{verdict}] 各次: {runs}"
+
+
+def measure_once(timeout: float = 60.0) -> Dict:
+    """
+    启动一次子进程，返回界面就绪耗时和启动剖析报告
+
+    Returns:
+        {"ready_ms": 耗时毫秒, "profile": 剖析报告}
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    with tempfile.TemporaryDirectory() as workdir:
+        script = _CHILD_SCRIPT.format(root=PROJECT_ROOT, marker=READY_MARKER)
+        started_at = time.time()
+        completed = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+            check=False,
+        )
+    # 子进程就绪后以 os._exit(0) 退出，非零退出码说明启动过程出错，测得的耗时不可信
+    if completed.returncode != 0:
+        raise RuntimeError(f"启动子进程异常退出 (退出码 {completed.returncode}):\n{completed.stderr[-2000:]}")
+    for line in completed.stdout.splitlines():
+        if line.startswith(READY_MARKER):
+            data = json.loads(line[len(READY_MARKER) :])
+            return {"ready_ms": (data["ready_at"] - started_at) * 1000, "profile": data["profile"]}
+    raise RuntimeError(f"启动子进程没有到达界面就绪:\n{completed.stderr[-2000:]}")
+
+
+def run_cold_start(runs: int = 5, target_ms: float = DEFAULT_TARGET_MS, timeout: float = 60.0) -> ColdStartResult:
+    """
+    多次测量冷启动耗时
+
+    Args:
+        runs: 运行次数
+        target_ms: 界面就绪耗时中位数的目标（毫秒）
+        timeout: 单次运行的超时（秒）
+    """
+    result = ColdStartResult(target_ms=target_ms)
+    for _ in range(runs):
+        measured = measure_once(timeout)
+        result.runs_ms.append(measured["ready_ms"])
+        result.profile = measured["profile"]
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，超出目标时返回1"""
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数")
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS, help="界面就绪耗时中位数的目标（毫秒）")
+    parser.add_argument("--json", dest="json_path", help="把结果导出为JSON文件")
+    args = parser.parse_args(argv)
+
+    result = run_cold_start(args.runs, args.target_ms)
+    print(format_startup_report(result.profile))
+    print(result.summary())
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(dict(asdict(result), median_ms=result.median_ms), f, ensure_ascii=False, indent=2)
+    return 0 if result.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
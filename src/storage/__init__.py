@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""模块包初始化文件"""
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+价格观测时间序列存储
+
+每个交易周期观测到的价格、决策和周期耗时以追加方式写入SQLite，
+通过 (ts) / (item, ts) 索引实现 O(log n) 的时间范围查询，
+并在内存中增量维护每小时的最小值/中位数/分位数统计。
+"""
+import bisect
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .sqlite_store import WriteBehindSqliteStore
+
+
+@dataclass
+class PriceObservation:
+    """单次价格观测"""
+
+    timestamp: float
+    mode: str
+    item: str
+    price: int
+    decision: str
+    latency_ms: float
+
+
+@dataclass
+class HourlyPriceStats:
+    """单个物品在某一小时内的价格统计"""
+
+    item: str
+    hour: int  # 小时起始时间戳
+    count: int
+    min: int
+    max: int
+    mean: float
+    median: float
+    p10: float
+    p90: float
+
+
+class HourlyAggregate:
+    """增量维护的单小时价格分布（有序列表，插入 O(log n) 查找）"""
+
+    __slots__ = ("prices", "total")
+
+    def __init__(self):
+        self.prices: List[int] = []
+        self.total = 0
+
+    def add(self, price: int) -> None:
+        """加入一个价格"""
+        bisect.insort(self.prices, price)
+        self.total += price
+
+    def percentile(self, q: float) -> float:
+        """线性插值分位数，q取值0~100"""
+        if not self.prices:
+            return 0.0
+        pos = (len(self.prices) - 1) * q / 100
+        low = math.floor(pos)
+        high = math.ceil(pos)
+        if low == high:
+            return float(self.prices[low])
+        return self.prices[low] + (self.prices[high] - self.prices[low]) * (pos - low)
+
+    def to_stats(self, item: str, hour: int) -> HourlyPriceStats:
+        """生成统计结果"""
+        count = len(self.prices)
+        return HourlyPriceStats(
+            item=item,
+            hour=hour,
+            count=count,
+            min=self.prices[0] if count else 0,
+            max=self.prices[-1] if count else 0,
+            mean=self.total / count if count else 0.0,
+            median=self.percentile(50),
+            p10=self.percentile(10),
+            p90=self.percentile(90),
+        )
+
+
+class PriceStore(WriteBehindSqliteStore):
+    """价格观测存储"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS price_observations ("
+        " id INTEGER PRIMARY KEY,"
+        " ts REAL NOT NULL,"
+        " mode TEXT NOT NULL,"
+        " item TEXT NOT NULL,"
+        " price INTEGER NOT NULL,"
+        " decision TEXT NOT NULL,"
+        " latency_ms REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_price_ts ON price_observations (ts)",
+        "CREATE INDEX IF NOT EXISTS idx_price_item_ts ON price_observations (item, ts)",
+    )
+
+    _INSERT_SQL = (
+        "INSERT INTO price_observations (ts, mode, item, price, decision, latency_ms) VALUES (?, ?, ?, ?, ?, ?)"
+    )
+
+    DEFAULT_PATH = "price_history.db"
+
+    def __init__(self, db_path: str = "price_history.db", **kwargs):
+        super().__init__(db_path, **kwargs)
+        self._aggregates: Dict[Tuple[str, int], HourlyAggregate] = {}
+        self._aggregates_lock = threading.Lock()
+        # 打开存储之前（含当前小时）的数据只在数据库中，需要加载一次
+        self._first_live_hour = self.hour_of(time.time()) + 3600
+        self._seeded: Set[Tuple[str, int]] = set()
+
+    @staticmethod
+    def hour_of(timestamp: float) -> int:
+        """时间戳所在小时的起始时间戳（本地时间）"""
+        local = time.localtime(timestamp)
+        return int(timestamp) - local.tm_min * 60 - local.tm_sec
+
+    def record(
+        self,
+        mode: str,
+        item: str,
+        price: int,
+        decision: str,
+        latency_ms: float = 0.0,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        记录一次价格观测
+
+        Args:
+            mode: 交易模式，例如 rolling / hoarding
+            item: 物品或配装选项标识
+            price: 观测到的价格
+            decision: 本次观测后的决策，例如 buy / refresh / skip
+            latency_ms: 本周期从开始到做出决策的耗时（毫秒）
+            timestamp: 观测时间，默认当前时间
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._aggregates_lock:
+            key = (item, self.hour_of(timestamp))
+            aggregate = self._aggregates.get(key)
+            if aggregate is None:
+                aggregate = self._aggregates[key] = HourlyAggregate()
+            aggregate.add(int(price))
+        return self._enqueue(self._INSERT_SQL, (timestamp, mode, item, int(price), decision, float(latency_ms)))
+
+    def query_range(self, start: float, end: float, item: Optional[str] = None) -> List[PriceObservation]:
+        """查询 [start, end) 时间范围内的观测，按时间排序"""
+        if item is None:
+            rows = self._query(
+                "SELECT ts, mode, item, price, decision, latency_ms FROM price_observations"
+                " WHERE ts >= ? AND ts < ? ORDER BY ts",
+                (start, end),
+            )
+        else:
+            rows = self._query(
+                "SELECT ts, mode, item, price, decision, latency_ms FROM price_observations"
+                " WHERE item = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (item, start, end),
+            )
+        return [PriceObservation(*row) for row in rows]
+
+    def hourly_stats(self, item: str, start: float, end: float) -> List[HourlyPriceStats]:
+        """
+        获取 [start, end) 范围内每小时的价格统计
+
+        打开存储之后的小时直接使用增量统计；更早的小时从数据库按范围加载一次后继续增量维护。
+        """
+        result = []
+        hour = self.hour_of(start)
+        while hour < end:
+            key = (item, hour)
+            if hour < self._first_live_hour and key not in self._seeded:
+                self._seed_hour(item, hour)
+            with self._aggregates_lock:
+                aggregate = self._aggregates.get(key)
+                stats = aggregate.to_stats(item, hour) if aggregate and aggregate.prices else None
+            if stats:
+                result.append(stats)
+            hour += 3600
+        return result
+
+    def _seed_hour(self, item: str, hour: int) -> None:
+        """用数据库中的历史数据重建某小时的统计"""
+        with self._aggregates_lock:
+            aggregate = HourlyAggregate()
+            rows = self._query(
+                "SELECT price FROM price_observations WHERE item = ? AND ts >= ? AND ts < ?",
+                (item, hour, hour + 3600),
+            )
+            for (price,) in rows:
+                aggregate.add(price)
+            self._aggregates[(item, hour)] = aggregate
+            self._seeded.add((item, hour))
+
+    def items(self) -> List[str]:
+        """所有出现过的物品标识"""
+        return [row[0] for row in self._query("SELECT DISTINCT item FROM price_observations ORDER BY item")]
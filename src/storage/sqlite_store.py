@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite存储基类 - 写后队列(write-behind)批量写入
+
+调用方只把写操作放入内存队列，后台线程按数量/时间阈值合并为executemany批量提交，
+查询前会先落盘队列，保证读到自己写入的数据。
+"""
+import atexit
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class WriteBehindSqliteStore:
+    """带写后队列的SQLite存储基类"""
+
+    # 子类定义的建表/建索引语句
+    SCHEMA: Tuple[str, ...] = ()
+    # 子类定义的默认数据库文件
+    DEFAULT_PATH = ""
+
+    _shared: Dict[Tuple[type, str], "WriteBehindSqliteStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str, flush_interval: float = 1.0, max_batch: int = 256):
+        """
+        Args:
+            db_path: 数据库文件路径，":memory:" 表示内存数据库
+            flush_interval: 后台线程的最长落盘间隔（秒）
+            max_batch: 队列长度达到该值时立即落盘
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._pending: List[Tuple[str, Sequence[Any]]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        with self._db_lock:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get_store(cls, db_path: Optional[str] = None):
+        """获取指定路径的共享存储实例"""
+        db_path = db_path or cls.DEFAULT_PATH
+        key = (cls, os.path.abspath(db_path))
+        with cls._shared_lock:
+            store = cls._shared.get(key)
+            if store is None or store.closed:
+                store = cls(db_path)
+                cls._shared[key] = store
+            return store
+
+    @classmethod
+    def close_all(cls) -> None:
+        """关闭该类型（含子类）的所有共享存储，进程退出时调用"""
+        with cls._shared_lock:
+            keys = [key for key in cls._shared if issubclass(key[0], cls)]
+            stores = [cls._shared.pop(key) for key in keys]
+        for store in stores:
+            store.close()
+
+    @property
+    def closed(self) -> bool:
+        """存储是否已关闭"""
+        return self._closed
+
+    def _enqueue(self, sql: str, params: Sequence[Any]) -> bool:
+        """写操作入队，不阻塞调用方"""
+        with self._cond:
+            if self._closed:
+                return False
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def flush(self) -> None:
+        """同步落盘队列中的所有写操作"""
+        with self._cond:
+            batch = self._pending
+            self._pending = []
+        self._write_batch(batch)
+
+    def close(self) -> None:
+        """落盘并关闭数据库连接"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """执行查询，查询前先落盘队列"""
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _execute_now(self, sql: str, params: Sequence[Any] = ()) -> None:
+        """绕过队列立即执行写操作"""
+        self.flush()
+        with self._db_lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _run(self) -> None:
+        """后台落盘线程"""
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                batch = self._pending
+                self._pending = []
+                closed = self._closed
+            self._write_batch(batch)
+            if closed:
+                return
+
+    def _write_batch(self, batch: List[Tuple[str, Sequence[Any]]]) -> None:
+        """把连续相同的语句合并为executemany，在一个事务中提交"""
+        if not batch:
+            return
+        with self._db_lock:
+            try:
+                start = 0
+                while start < len(batch):
+                    sql = batch[start][0]
+                    end = start
+                    while end < len(batch) and batch[end][0] == sql:
+                        end += 1
+                    self._conn.executemany(sql, [params for _, params in batch[start:end]])
+                    start = end
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                print(f"写入数据库{self.db_path}失败: {e}")
+
+
+# 进程退出时保证所有写操作落盘
+atexit.register(WriteBehindSqliteStore.close_all)
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+交易盈亏账本
+
+把滚仓模式的购买、售卖和邮件领取记录写入SQLite，按天/配装选项建立索引，
+用于跨重启的盈亏统计；并支持把已有的sell.log流式导入账本。
+"""
+import datetime
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .sqlite_store import WriteBehindSqliteStore
+
+
+@dataclass
+class DailyPnl:
+    """单日（单配装选项）盈亏统计"""
+
+    day: str
+    option: Optional[int]
+    buy_count: int
+    cost: int
+    sell_count: int
+    revenue: int
+    mail_amount: int
+
+    @property
+    def profit(self) -> int:
+        """售卖收入减去购买花费"""
+        return self.revenue - self.cost
+
+
+@dataclass
+class SellLogImportResult:
+    """sell.log导入结果"""
+
+    buys: int = 0
+    sells: int = 0
+    skipped: int = 0
+
+
+class TradeLedger(WriteBehindSqliteStore):
+    """交易盈亏账本"""
+
+    DEFAULT_PATH = "trade_ledger.db"
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS buys ("
+        " id INTEGER PRIMARY KEY,"
+        " ts REAL NOT NULL,"
+        " day TEXT NOT NULL,"
+        " option INTEGER,"
+        " price INTEGER,"
+        " cost INTEGER NOT NULL,"
+        " balance_before INTEGER,"
+        " balance_after INTEGER)",
+        "CREATE TABLE IF NOT EXISTS sells ("
+        " id INTEGER PRIMARY KEY,"
+        " ts REAL NOT NULL,"
+        " day TEXT NOT NULL,"
+        " option INTEGER,"
+        " cycle_index INTEGER,"
+        " ratio REAL,"
+        " unit_price INTEGER NOT NULL,"
+        " count INTEGER NOT NULL,"
+        " revenue INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS mail_collections ("
+        " id INTEGER PRIMARY KEY,"
+        " ts REAL NOT NULL,"
+        " day TEXT NOT NULL,"
+        " option INTEGER,"
+        " balance_before INTEGER,"
+        " balance_after INTEGER,"
+        " amount INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_buys_day_option ON buys (day, option)",
+        "CREATE INDEX IF NOT EXISTS idx_sells_day_option ON sells (day, option)",
+        "CREATE INDEX IF NOT EXISTS idx_mail_day_option ON mail_collections (day, option)",
+    )
+
+    _INSERT_BUY = (
+        "INSERT INTO buys (ts, day, option, price, cost, balance_before, balance_after) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+    _INSERT_SELL = (
+        "INSERT INTO sells (ts, day, option, cycle_index, ratio, unit_price, count, revenue)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _INSERT_MAIL = (
+        "INSERT INTO mail_collections (ts, day, option, balance_before, balance_after, amount)"
+        " VALUES (?, ?, ?, ?, ?, ?)"
+    )
+
+    # sell.log 行格式: [2025-01-01 12:00:00] 内容
+    _LOG_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*)$")
+    _LOG_BUY = re.compile(r"^购买成功, 总花费: (-?\d+)")
+    _LOG_SELL = re.compile(r"^出售成功, 单价: (-?\d+), 数量: (-?\d+), 总价: (-?\d+), 预期收入: (-?\d+)")
+
+    @staticmethod
+    def _day_of(timestamp: float) -> str:
+        return datetime.date.fromtimestamp(timestamp).isoformat()
+
+    def record_buy(
+        self,
+        cost: int,
+        option: Optional[int] = None,
+        price: Optional[int] = None,
+        balance_before: Optional[int] = None,
+        balance_after: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """记录一次购买"""
+        timestamp = time.time() if timestamp is None else timestamp
+        return self._enqueue(
+            self._INSERT_BUY,
+            (timestamp, self._day_of(timestamp), option, price, cost, balance_before, balance_after),
+        )
+
+    def record_sell(
+        self,
+        unit_price: int,
+        count: int,
+        revenue: int,
+        option: Optional[int] = None,
+        cycle_index: Optional[int] = None,
+        ratio: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """记录一轮售卖"""
+        timestamp = time.time() if timestamp is None else timestamp
+        return self._enqueue(
+            self._INSERT_SELL,
+            (timestamp, self._day_of(timestamp), option, cycle_index, ratio, unit_price, count, revenue),
+        )
+
+    def record_mail(
+        self,
+        balance_before: Optional[int],
+        balance_after: Optional[int],
+        option: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """记录一次邮件领取，领取金额为前后余额之差"""
+        timestamp = time.time() if timestamp is None else timestamp
+        amount = balance_after - balance_before if balance_before is not None and balance_after is not None else 0
+        return self._enqueue(
+            self._INSERT_MAIL,
+            (timestamp, self._day_of(timestamp), option, balance_before, balance_after, amount),
+        )
+
+    def daily_pnl(
+        self, start_day: Optional[str] = None, end_day: Optional[str] = None, option: Optional[int] = None
+    ) -> List[DailyPnl]:
+        """
+        按天和配装选项汇总盈亏
+
+        Args:
+            start_day: 起始日期（含），格式 YYYY-MM-DD
+            end_day: 结束日期（含），格式 YYYY-MM-DD
+            option: 只统计指定配装选项
+        """
+        conditions = []
+        params: List = []
+        if start_day is not None:
+            conditions.append("day >= ?")
+            params.append(start_day)
+        if end_day is not None:
+            conditions.append("day <= ?")
+            params.append(end_day)
+        if option is not None:
+            conditions.append("option = ?")
+            params.append(option)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        result: Dict[Tuple[str, Optional[int]], DailyPnl] = {}
+
+        def entry(day, opt):
+            key = (day, opt)
+            if key not in result:
+                result[key] = DailyPnl(day, opt, 0, 0, 0, 0, 0)
+            return result[key]
+
+        for day, opt, buy_count, cost in self._query(
+            f"SELECT day, option, COUNT(*), SUM(cost) FROM buys{where} GROUP BY day, option", params
+        ):
+            pnl = entry(day, opt)
+            pnl.buy_count, pnl.cost = buy_count, cost or 0
+        for day, opt, sell_count, revenue in self._query(
+            f"SELECT day, option, SUM(count), SUM(revenue) FROM sells{where} GROUP BY day, option", params
+        ):
+            pnl = entry(day, opt)
+            pnl.sell_count, pnl.revenue = sell_count or 0, revenue or 0
+        for day, opt, amount in self._query(
+            f"SELECT day, option, SUM(amount) FROM mail_collections{where} GROUP BY day, option", params
+        ):
+            entry(day, opt).mail_amount = amount or 0
+
+        return sorted(result.values(), key=lambda p: (p.day, -1 if p.option is None else p.option))
+
+    def total_pnl(self) -> Tuple[int, int]:
+        """历史累计 (盈利, 售卖数量)"""
+        revenue, count = self._query("SELECT COALESCE(SUM(revenue), 0), COALESCE(SUM(count), 0) FROM sells")[0]
+        (cost,) = self._query("SELECT COALESCE(SUM(cost), 0) FROM buys")[0]
+        return revenue - cost, count
+
+    def import_sell_log(self, path: str, option: Optional[int] = None) -> SellLogImportResult:
+        """
+        逐行流式导入已有的sell.log
+
+        Args:
+            path: sell.log 文件路径
+            option: 导入记录归属的配装选项，旧日志中没有该信息时为空
+        """
+        result = SellLogImportResult()
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                matched = self._LOG_LINE.match(line.rstrip("\n"))
+                if not matched:
+                    result.skipped += 1
+                    continue
+                timestamp = time.mktime(time.strptime(matched.group(1), "%Y-%m-%d %H:%M:%S"))
+                content = matched.group(2)
+                buy = self._LOG_BUY.match(content)
+                if buy:
+                    self.record_buy(int(buy.group(1)), option=option, timestamp=timestamp)
+                    result.buys += 1
+                    continue
+                sell = self._LOG_SELL.match(content)
+                if sell:
+                    unit_price, count, _, revenue = (int(v) for v in sell.groups())
+                    self.record_sell(unit_price, count, revenue, option=option, timestamp=timestamp)
+                    result.sells += 1
+                    continue
+                result.skipped += 1
+        self.flush()
+        return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    ledger = TradeLedger.get_store()
+    for log_path in sys.argv[1:]:
+        print(log_path, ledger.import_sell_log(log_path))
+    for daily in ledger.daily_pnl():
+        print(daily, "profit:", daily.profit)
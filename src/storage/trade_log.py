@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+交易日志写入器 - 批量缓冲写入sell.log
+
+交易线程只负责把记录放入内存队列，由后台线程按数量/时间阈值批量落盘，
+同时输出人类可读的文本日志和结构化的JSON Lines日志，并按大小/日期轮转文件。
+"""
+import atexit
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class TradeLogRecord:
+    """单条交易日志记录"""
+
+    content: str
+    event: str = "info"
+    timestamp: float = field(default_factory=time.time)
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> Dict[str, Any]:
+        """转换为JSON Lines使用的字典"""
+        data = {"ts": round(self.timestamp, 3), "event": self.event}
+        data.update(self.fields)
+        data["message"] = self.content
+        return data
+
+
+class TradeLogWriter:
+    """批量缓冲的交易日志写入器"""
+
+    _writers: Dict[str, "TradeLogWriter"] = {}
+    _writers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str = "sell.log",
+        jsonl_path: Optional[str] = None,
+        flush_interval: float = 1.0,
+        max_batch: int = 64,
+        max_bytes: int = 5 * 1024 * 1024,
+        rotate_daily: bool = True,
+    ):
+        """
+        Args:
+            path: 文本日志路径
+            jsonl_path: 结构化日志路径，默认与文本日志同名，后缀为.jsonl
+            flush_interval: 后台线程的最长落盘间隔（秒）
+            max_batch: 缓冲记录数达到该值时立即落盘
+            max_bytes: 单个日志文件的最大字节数，超过后轮转，0表示不按大小轮转
+            rotate_daily: 是否按天轮转
+        """
+        self.path = path
+        self.jsonl_path = jsonl_path or f"{os.path.splitext(path)[0]}.jsonl"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+
+        self._pending: List[TradeLogRecord] = []
+        self._cond = threading.Condition()
+        # 取出缓冲和写入文件都在这把锁内完成，后台线程和 flush 的批次按入队顺序落盘
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._flush_requested = False
+        self._current_day = self._file_day(self.path)
+
+        # 同一秒内的时间戳前缀只格式化一次
+        self._last_second = -1
+        self._last_prefix = ""
+
+        self._thread = threading.Thread(target=self._run, name="TradeLogWriter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get_writer(cls, path: str = "sell.log") -> "TradeLogWriter":
+        """获取指定路径的共享写入器"""
+        key = os.path.abspath(path)
+        with cls._writers_lock:
+            writer = cls._writers.get(key)
+            if writer is None or writer.closed:
+                writer = cls(path)
+                cls._writers[key] = writer
+            return writer
+
+    @classmethod
+    def close_all(cls) -> None:
+        """关闭所有共享写入器（进程退出时调用）"""
+        with cls._writers_lock:
+            writers = list(cls._writers.values())
+            cls._writers.clear()
+        for writer in writers:
+            writer.close()
+
+    @property
+    def closed(self) -> bool:
+        """写入器是否已关闭"""
+        return self._closed
+
+    def write(self, content: str, event: str = "info", **fields) -> bool:
+        """
+        追加一条记录，只入队不落盘
+
+        Args:
+            content: 人类可读的日志内容
+            event: 事件类型，例如 buy / sell / sell_round
+            **fields: 结构化字段，例如 price、count、cost、revenue、profit
+
+        Returns:
+            bool: 成功入队返回True，写入器已关闭返回False
+        """
+        record = TradeLogRecord(content=content, event=event, fields=fields)
+        with self._cond:
+            if self._closed:
+                return False
+            self._pending.append(record)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def flush(self) -> None:
+        """同步落盘当前所有缓冲记录"""
+        with self._io_lock:
+            with self._cond:
+                batch = self._pending
+                self._pending = []
+            self._write_batch(batch)
+
+    def close(self) -> None:
+        """落盘并停止后台线程"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self) -> None:
+        """后台落盘线程"""
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _format_prefix(self, timestamp: float) -> str:
+        second = int(timestamp)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_prefix = datetime.datetime.fromtimestamp(second).strftime("[%Y-%m-%d %H:%M:%S]")
+        return self._last_prefix
+
+    def _write_batch(self, batch: List[TradeLogRecord]) -> None:
+        """写入一批记录（调用时需要持有 _io_lock）"""
+        if not batch:
+            return
+        try:
+            text_lines = []
+            json_lines = []
+            for record in batch:
+                text_lines.append(f"{self._format_prefix(record.timestamp)} {record.content}\n")
+                json_lines.append(json.dumps(record.to_json(), ensure_ascii=False) + "\n")
+            text = "".join(text_lines)
+            self._rotate_if_needed(batch[0].timestamp, len(text.encode("utf-8")))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write("".join(json_lines))
+        except Exception as e:
+            print(f"写入{self.path}文件失败: {e}")
+
+    def _rotate_if_needed(self, timestamp: float, incoming_bytes: int) -> None:
+        """按日期或大小轮转日志文件"""
+        day = datetime.date.fromtimestamp(timestamp)
+        if self._current_day is None:
+            self._current_day = day
+        need_rotate = self.rotate_daily and day != self._current_day
+        if not need_rotate and self.max_bytes > 0 and os.path.exists(self.path):
+            need_rotate = os.path.getsize(self.path) + incoming_bytes > self.max_bytes
+        if not need_rotate:
+            return
+        for path in (self.path, self.jsonl_path):
+            if os.path.exists(path):
+                os.replace(path, self._rotated_name(path, self._current_day))
+        self._current_day = day
+
+    @staticmethod
+    def _rotated_name(path: str, day: datetime.date) -> str:
+        """生成轮转后的文件名，例如 sell.2025-01-01.log、sell.2025-01-01.1.log"""
+        base, ext = os.path.splitext(path)
+        candidate = f"{base}.{day.isoformat()}{ext}"
+        index = 1
+        while os.path.exists(candidate):
+            candidate = f"{base}.{day.isoformat()}.{index}{ext}"
+            index += 1
+        return candidate
+
+    @staticmethod
+    def _file_day(path: str) -> Optional[datetime.date]:
+        if not os.path.exists(path):
+            return None
+        return datetime.date.fromtimestamp(os.path.getmtime(path))
+
+
+# 进程退出时保证所有缓冲记录落盘
+atexit.register(TradeLogWriter.close_all)
@@ -2,41 +2,35 @@
 """
 UI适配层 - 连接新架构与现有PyQt5 UI
 """
-import time
-from typing import Any, Dict
+import threading
+from typing import TYPE_CHECKING, Any, Dict
 
-from PyQt5.QtCore import QMutex, QThread
+from PyQt5.QtCore import QThread
 
 from ..config.config_factory import ConfigFactory
+from ..config.config_watcher import ConfigWatcher
 from ..config.trading_config import ItemType, TradingMode
 from ..core.event_bus import event_bus
-from ..core.exceptions import TradingException
-from ..core.interfaces import IConfigManager, ITradingService
-from ..services.trading_service import TradingService
+from ..services.trading_runner import TradingRunner
+from ..utils.startup_profiler import finish_startup, startup_profiler
+from .qt_bridge import install_qt_bridge
+
+if TYPE_CHECKING:
+    from ..core.interfaces import IConfigManager, ITradingService
 
 
 class TradingWorker(QThread):
-    """交易工作线程"""
+    """交易工作线程，在 QThread 中运行 TradingRunner"""
 
-    def __init__(self, trading_service: ITradingService, config_manager: IConfigManager):
+    def __init__(self, trading_service: "ITradingService", config_manager: "IConfigManager"):
         super().__init__()
         self.trading_service = trading_service
         self.config_manager = config_manager
-
-        # 线程控制
-        self._mutex = QMutex()
-        self._running = False
-        self._config = None
+        self.runner = TradingRunner(trading_service, config_manager)
 
     def update_config(self, config: Dict[str, Any]) -> None:
         """更新配置"""
-        self._mutex.lock()
-        try:
-            # 保存到配置文件
-            self._config = self.config_manager.update_config(config)
-
-        finally:
-            self._mutex.unlock()
+        self.runner.update_config(config)
 
     def start_trading(self) -> None:
         """开始交易"""
@@ -47,100 +41,64 @@ class TradingWorker(QThread):
 
     def stop_trading(self) -> None:
         """停止交易"""
-        self._mutex.lock()
-        self._running = False
-        self._mutex.unlock()
-
-        # 立即停止交易服务
-        if hasattr(self, "trading_service"):
-            self.trading_service.stop()
-
+        self.runner.stop()
         if self.isRunning():
             self.wait()
-            # 通过事件总线发送交易停止事件
-            event_bus.emit_trading_stopped()
 
     def run(self) -> None:
         """工作线程主循环"""
-        self._mutex.lock()
-        self._running = True
-        # 获取当前配置
-        current_config = self._config or self.config_manager.load_config()
-        loop_interval = (
-            current_config.rolling_loop_interval
-            if current_config.trading_mode == TradingMode.ROLLING
-            else current_config.hoarding_loop_interval
-        )
-        self._mutex.unlock()
-
-        try:
-            # 初始化交易服务
-            self.trading_service.initialize(current_config)
-            self.trading_service.prepare()
-            last_time = time.time()
-            while True:
-                self._mutex.lock()
-                if not self._running:
-                    self._mutex.unlock()
-                    break
-
-                self._mutex.unlock()
-
-                try:
-                    # 执行交易周期
-                    should_continue = self.trading_service.execute_cycle()
-                    cur_time = time.time()
-                    print(f"上轮耗时: {int((cur_time - last_time) * 1000)}ms")
-                    last_time = cur_time
-                    # 获取最新数据
-                    market_data = self.trading_service.get_market_data()
-
-                    # 发送事件更新UI - 使用事件总线
-                    if market_data:
-                        event_bus.emit_price_updated(market_data.current_price)
-                        if market_data.balance is not None:
-                            event_bus.emit_balance_updated(market_data.balance)
-
-                    # 更新状态
-                    event_bus.emit_status_changed("运行中")
-
-                    # 检查是否应该停止
-                    if not should_continue:
-                        self.stop_trading()
-                        break
-
-                    # 休眠
-                    self.msleep(loop_interval)
-
-                except TradingException as e:
-                    print(f"循环流执行失败，跳过当前循环流： {e}")
-                    # 使用事件总线发送错误事件
-                    # event_bus.emit_error_occurred(str(e))
-                    # event_bus.emit_status_changed("错误")
-                    self.msleep(loop_interval)  # 错误后等待
-
-        except Exception as e:
-            print(f"交易服务初始化失败: {e}")
-            event_bus.emit_error_occurred(f"交易服务初始化失败: {e}")
-            event_bus.emit_status_changed("错误")
-        finally:
-            event_bus.emit_trading_stopped()
+        self.runner.run()
 
 
 class UIAdapter:
     """UI适配器 - 连接PyQt5 UI与新架构"""
 
     def __init__(self, ui_instance, overlay):
+        # 交易线程和配置监视线程发布的事件都回到界面线程处理
+        install_qt_bridge()
         self.ui = ui_instance
         self.config_manager = ConfigFactory.get_config_manager()
         self.overlay_ui = overlay
-        self.trading_service = TradingService()
+        # 交易服务（截图、OCR模板、输入和窗口检测）在后台线程创建，界面先显示出来
+        self.trading_service = None
+        self._service_ready = threading.Event()
         self.worker = None
+        # 同步配置到界面时不把控件变化当作用户修改
+        self._syncing_ui = False
 
         # 初始化UI
         self._setup_ui()
         self._connect_signals()
         self._load_initial_config()
+        self._start_config_watcher()
+        threading.Thread(target=self._warm_up, name="startup-warmup", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        """导入截图、OCR和输入相关的模块，创建交易服务并预先检查基础设施"""
+        try:
+            with startup_profiler.stage("trading_service"):
+                from ..services.trading_service import TradingService
+
+                service = TradingService()
+            with startup_profiler.stage("infrastructure_check"):
+                service.warm_up()
+            self.trading_service = service
+        except Exception as e:
+            # 例如启动时游戏还没打开，开始交易时重新创建
+            print(f"交易服务初始化失败: {e}")
+            event_bus.emit_error_occurred(f"交易服务初始化失败: {e}")
+        finally:
+            self._service_ready.set()
+            finish_startup("services_ready")
+
+    def _get_trading_service(self) -> "ITradingService":
+        """等待后台创建的交易服务，创建失败时重新创建"""
+        self._service_ready.wait()
+        if self.trading_service is None:
+            from ..services.trading_service import TradingService
+
+            self.trading_service = TradingService()
+        return self.trading_service
 
     def _setup_ui(self) -> None:
         """设置UI初始状态"""
@@ -192,10 +150,31 @@ class UIAdapter:
         """加载初始配置"""
         try:
             config = self.config_manager.load_config()
-            self._update_ui_from_config(config.__dict__)
+            self._on_config_reloaded(config)
         except Exception as e:
             print(f"加载初始配置失败: {e}")
 
+    def _start_config_watcher(self) -> None:
+        """监视配置文件，外部修改后热更新延迟和交易参数，并刷新界面显示"""
+        self.config_watcher = ConfigWatcher()
+        delay_manager = ConfigFactory.get_config_manager("delay")
+        for manager in (self.config_manager, delay_manager):
+            if hasattr(manager, "reload_from_file"):
+                self.config_watcher.watch(manager.config_path, manager.reload_from_file)
+        if hasattr(self.config_manager, "subscribe"):
+            # 监视线程不能直接操作控件，通过事件总线回到界面线程
+            self.config_manager.subscribe(event_bus.emit_config_reloaded, external_only=True)
+        event_bus.config_reloaded.connect(self._on_config_reloaded)
+        self.config_watcher.start()
+
+    def _on_config_reloaded(self, config) -> None:
+        """按配置刷新界面（启动时和配置文件被外部修改后），控件变化不当作用户修改"""
+        self._syncing_ui = True
+        try:
+            self._update_ui_from_config(config.__dict__)
+        finally:
+            self._syncing_ui = False
+
     def _update_ui_from_config(self, config: Dict[str, Any]) -> None:
         """根据配置更新UI"""
         # 更新模式选择
@@ -258,11 +237,13 @@ class UIAdapter:
 
     def _on_config_changed(self) -> None:
         """配置改变处理"""
+        if self._syncing_ui:
+            return
         config = self._get_config_from_ui()
         if self.worker:
             self.worker.update_config(config)
         else:
-            self.config_manager.update_config(config)
+            self.config_manager.stage_update(config)
 
     def _get_config_from_ui(self) -> Dict[str, Any]:
         """从UI获取配置"""
@@ -332,7 +313,7 @@ class UIAdapter:
     def start_trading(self) -> None:
         """开始交易"""
         if self.worker is None:
-            self.worker = TradingWorker(self.trading_service, self.config_manager)
+            self.worker = TradingWorker(self._get_trading_service(), self.config_manager)
             self._connect_worker_signals()
 
         if not self.worker.isRunning():
@@ -403,3 +384,13 @@ class UIAdapter:
         if self.worker:
             self.worker.stop_trading()
             self.worker = None
+
+        self.config_watcher.stop()
+        if hasattr(self.config_manager, "unsubscribe"):
+            self.config_manager.unsubscribe(event_bus.emit_config_reloaded)
+
+        # 写完界面上尚未写入文件的修改
+        try:
+            self.config_manager.flush()
+        except Exception as e:
+            print("保存配置失败:", e)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+悬浮窗性能HUD
+
+显示每轮耗时、截图和OCR耗时的滚动平均，购买次数和盈利的每小时速率，以及价格和每轮耗时的折线图。
+数据来自事件总线的 metrics_updated，已按频率限制合并，收到后只格式化两行文本并请求重绘。
+"""
+from typing import Dict, List, Sequence, Tuple
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+try:
+    from src.utils.metrics import Metric, MetricSummary
+except ImportError:
+    from ..utils.metrics import Metric, MetricSummary
+
+
+def sparkline_points(values: Sequence[float], width: float, height: float) -> List[Tuple[float, float]]:
+    """
+    把样本映射为折线图上的点，最新的样本在最右侧，数值越大越靠上
+
+    Args:
+        values: 样本，从旧到新
+        width: 折线图宽度
+        height: 折线图高度
+    """
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    span = high - low
+    step = width / (len(values) - 1) if len(values) > 1 else 0.0
+    last = len(values) - 1
+    return [
+        (width - (last - i) * step, height - ((value - low) / span if span > 0 else 0.5) * height)
+        for i, value in enumerate(values)
+    ]
+
+
+class MetricsHud(QWidget):
+    """悬浮窗中的性能HUD"""
+
+    PADDING = 4
+    LINE_HEIGHT = 16
+    SPARKLINE_HEIGHT = 28
+    # 折线图：(指标, 标题, 单位, 颜色)
+    SPARKLINES = (
+        (Metric.PRICE, "价格", "", QColor(120, 200, 255)),
+        (Metric.CYCLE_MS, "周期", "ms", QColor(255, 190, 90)),
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._snapshot: Dict[str, MetricSummary] = {}
+        self._lines: Tuple[str, str] = self.format_lines({})
+        self._font = QFont()
+        self._font.setPixelSize(11)
+        self.setFixedHeight(self.PADDING * 3 + self.LINE_HEIGHT * 3 + self.SPARKLINE_HEIGHT)
+
+    def set_snapshot(self, snapshot: Dict[str, MetricSummary]) -> None:
+        """更新指标汇总"""
+        self._snapshot = snapshot
+        self._lines = self.format_lines(snapshot)
+        self.update()
+
+    @staticmethod
+    def format_lines(snapshot: Dict[str, MetricSummary]) -> Tuple[str, str]:
+        """滚动平均和每小时速率的两行文本"""
+
+        def mean(name: str) -> float:
+            summary = snapshot.get(name)
+            return summary.mean if summary else 0.0
+
+        def per_hour(name: str) -> float:
+            summary = snapshot.get(name)
+            return summary.per_hour if summary else 0.0
+
+        failures = snapshot.get(Metric.FAILURES)
+        return (
+            f"周期 {mean(Metric.CYCLE_MS):.0f}ms | 截图 {mean(Metric.CAPTURE_MS):.0f}ms | "
+            f"OCR {mean(Metric.OCR_MS):.0f}ms",
+            f"购买 {per_hour(Metric.BUYS):.1f}/时 | 盈利 {per_hour(Metric.PROFIT):.0f}/时 | "
+            f"失败 {failures.total if failures else 0:.0f}",
+        )
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 150))
+        painter.drawRoundedRect(QRectF(self.rect()), 5, 5)
+
+        painter.setFont(self._font)
+        painter.setPen(QColor(200, 200, 200))
+        width = self.width() - self.PADDING * 2
+        y = self.PADDING
+        for line in self._lines:
+            painter.drawText(QRectF(self.PADDING, y, width, self.LINE_HEIGHT), Qt.AlignCenter, line)
+            y += self.LINE_HEIGHT
+        y += self.PADDING
+
+        # 折线图左右并排
+        chart_width = (width - self.PADDING) / len(self.SPARKLINES)
+        for index, (name, title, unit, color) in enumerate(self.SPARKLINES):
+            x = self.PADDING + index * (chart_width + self.PADDING)
+            summary = self._snapshot.get(name)
+            label = f"{title} {summary.last:.0f}{unit}" if summary else f"{title} -"
+            painter.setPen(color)
+            painter.drawText(QRectF(x, y, chart_width, self.LINE_HEIGHT), Qt.AlignLeft | Qt.AlignVCenter, label)
+            if summary is None or len(summary.recent) < 2:
+                continue
+            top = y + self.LINE_HEIGHT
+            points = sparkline_points(summary.recent, chart_width, self.SPARKLINE_HEIGHT)
+            painter.setPen(QPen(color, 1.2))
+            painter.drawPolyline(QPolygonF([QPointF(x + px, top + py) for px, py in points]))
+        painter.end()
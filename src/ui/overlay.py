@@ -1,11 +1,15 @@
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QGuiApplication
 from PyQt5.QtWidgets import QApplication, QLabel, QMainWindow
 
 try:
     from src.core.event_bus import event_bus
+    from src.ui.hud import MetricsHud
+    from src.ui.qt_bridge import install_qt_bridge
 except ImportError:
     from ..core.event_bus import event_bus
+    from .hud import MetricsHud
+    from .qt_bridge import install_qt_bridge
 
 
 class TransparentOverlay(QMainWindow):
@@ -14,7 +18,8 @@ class TransparentOverlay(QMainWindow):
         super().__init__(parent)
         self.old_pos = None
         self.label = None
-        self._pending_text = None
+        self.profile_label = None
+        self.hud = None
         self.init_ui()
         self._connect_events()
 
@@ -40,35 +45,82 @@ class TransparentOverlay(QMainWindow):
         self.label.setText("准备就绪")
         self.label.setWordWrap(True)
 
+        # 每轮耗时分解，有数据时显示在主文本下方
+        self.profile_label = QLabel(self)
+        self.profile_label.setAlignment(Qt.AlignCenter)
+        self.profile_label.setStyleSheet(
+            """
+            background-color: rgba(0, 0, 0, 150);
+            color: #c8c8c8;
+            border-radius: 5px;
+            padding: 4px;
+            font-size: 11px;
+        """
+        )
+        self.profile_label.setWordWrap(True)
+        self.profile_label.hide()
+
+        # 性能HUD，双击悬浮窗切换显示
+        self.hud = MetricsHud(self)
+        self.hud.hide()
+
         self.old_pos = None
 
     def _connect_events(self):
-        """连接事件总线信号"""
+        """连接事件总线信号，事件在界面线程处理"""
+        install_qt_bridge()
         event_bus.overlay_text_updated.connect(self._on_overlay_text_updated)
+        event_bus.profile_updated.connect(self._on_profile_updated)
+        event_bus.metrics_updated.connect(self._on_metrics_updated)
 
     def _on_overlay_text_updated(self, text: str):
-        """处理文本更新事件"""
-        self._pending_text = text
-        QTimer.singleShot(0, self._process_pending_text)
+        """处理文本更新事件，事件总线已按频率合并，这里直接更新"""
+        if not self.isVisible() or text == self.label.text():
+            return
+        self.label.setText(text)
+        self.label.adjustSize()
+        self.label.setMinimumWidth(350)
+        self._relayout()
+
+    def _on_profile_updated(self, text: str):
+        """处理耗时分解更新事件"""
+        if text == self.profile_label.text() and self.profile_label.isHidden() != bool(text):
+            return
+        self.profile_label.setText(text)
+        self.profile_label.setVisible(bool(text))
+        self._relayout()
+
+    def _on_metrics_updated(self, snapshot):
+        """处理指标汇总更新事件，HUD隐藏时不处理"""
+        if not self.hud.isHidden():
+            self.hud.set_snapshot(snapshot)
+
+    def set_hud_enabled(self, enabled: bool):
+        """显示或隐藏性能HUD"""
+        if enabled:
+            self.hud.set_snapshot(event_bus.metrics.snapshot())
+        self.hud.setVisible(enabled)
+        self._relayout()
 
     def update_text(self, text: str):
         """兼容旧接口的方法, 计划废弃"""
         event_bus.emit_overlay_text_updated(text)
 
-    def _process_pending_text(self):
-        """实际处理文本更新"""
-        if self._pending_text is None or not self.isVisible():
-            return
-
-        try:
-            self.label.setText(self._pending_text)
-            self.label.adjustSize()
-            self.label.setMinimumWidth(350)
-            new_width = max(350, self.label.width())  # 设置最小宽度
-            new_height = max(50, self.label.height())  # 设置最小高度
+    def _relayout(self):
+        """根据主文本和耗时分解调整窗口大小"""
+        new_width = max(350, self.label.width())  # 设置最小宽度
+        new_height = max(50, self.label.height())  # 设置最小高度
+        if self.profile_label.isVisible():
+            self.profile_label.setFixedWidth(new_width)
+            self.profile_label.adjustSize()
+            self.profile_label.move(0, new_height)
+            new_height += self.profile_label.height()
+        if not self.hud.isHidden():
+            self.hud.setFixedWidth(new_width)
+            self.hud.move(0, new_height)
+            new_height += self.hud.height()
+        if (new_width, new_height) != (self.width(), self.height()):
             self.resize(new_width, new_height)
-        finally:
-            self._pending_text = None
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -80,6 +132,10 @@ class TransparentOverlay(QMainWindow):
             self.move(self.x() + delta.x(), self.y() + delta.y())
             self.old_pos = event.globalPos()
 
+    def mouseDoubleClickEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.set_hud_enabled(self.hud.isHidden())
+
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.old_pos = None
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+事件总线的Qt桥接
+
+事件总线本身不依赖Qt。界面程序启动时安装桥接，订阅者都在界面线程被调用：
+在界面线程发布时直接调用，其他线程（交易线程、配置监视线程）发布时经排队信号转到界面线程，
+合并通道的定时投递使用界面线程的 QTimer。
+"""
+from typing import Any, Callable, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+try:
+    from src.core.event_bus import EventBus, event_bus
+except ImportError:
+    from ..core.event_bus import EventBus, event_bus
+
+
+class QtEventBridge(QObject):
+    """把事件总线的分发交给创建桥接的线程（界面线程）"""
+
+    _queued = pyqtSignal(object, object)
+
+    def __init__(self, bus: EventBus):
+        super().__init__()
+        self.bus = bus
+        self._queued.connect(self._run)
+        bus.set_dispatcher(self.dispatch, self.schedule)
+
+    def dispatch(self, func: Callable, args: Tuple) -> None:
+        """在界面线程调用 func(*args)"""
+        if QThread.currentThread() == self.thread():
+            func(*args)
+        else:
+            self._queued.emit(func, args)
+
+    def schedule(self, delay: float, func: Callable[[], Any]) -> None:
+        """在界面线程延迟调用 func"""
+        self.dispatch(QTimer.singleShot, (int(delay * 1000), func))
+
+    @staticmethod
+    def _run(func: Callable, args: Tuple) -> None:
+        func(*args)
+
+
+_bridge: Optional[QtEventBridge] = None
+
+
+def install_qt_bridge() -> QtEventBridge:
+    """在界面线程为全局事件总线安装Qt桥接，重复调用返回同一个桥接"""
+    global _bridge
+    if _bridge is None:
+        _bridge = QtEventBridge(event_bus)
+    return _bridge
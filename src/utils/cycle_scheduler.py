@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+交易周期调度
+
+按截止时间安排交易周期：周期从开始到下一个周期开始为一个循环间隔，等待时间扣除本轮已用的时间，
+OCR和输入延迟波动时刷新频率保持稳定。本轮超过循环间隔时记为超时，下一轮立即开始，不补跑错过的周期。
+连续出现交易异常时等待时间按倍数退避，成功一轮后恢复。
+
+统计每轮实际开始时刻晚于计划时刻的抖动，以及超时次数和超出的时间。
+"""
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    from src.utils.profiler import LatencyHistogram
+except ImportError:
+    from .profiler import LatencyHistogram
+
+
+class CycleScheduler:
+    """交易周期调度器，只在交易线程中使用"""
+
+    def __init__(
+        self,
+        period: float = 0.0,
+        start_to_start: bool = True,
+        backoff_factor: float = 2.0,
+        max_backoff: float = 30.0,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Args:
+            period: 循环间隔（秒）
+            start_to_start: True 时按周期开始时刻计算间隔，False 时在每轮结束后等待一个循环间隔
+            backoff_factor: 连续失败时等待时间的倍数
+            max_backoff: 失败后最长等待时间（秒）
+            clock: 单调时钟，测试时可替换
+        """
+        if backoff_factor < 1:
+            raise ValueError(f"退避倍数不能小于1: {backoff_factor}")
+        self.period = period
+        self.start_to_start = start_to_start
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._clock = clock or time.perf_counter
+        # 下一轮计划开始的时刻，第一轮之前为None
+        self._deadline: Optional[float] = None
+        self._cycle_start = self._clock()
+        self.cycles = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.overruns = 0
+        self._jitter = LatencyHistogram()
+        self._overrun = LatencyHistogram()
+
+    def reset(self, period: Optional[float] = None, start_to_start: Optional[bool] = None) -> None:
+        """开始新一次运行，清空统计"""
+        if period is not None:
+            self.period = period
+        if start_to_start is not None:
+            self.start_to_start = start_to_start
+        self._deadline = None
+        self._cycle_start = self._clock()
+        self.cycles = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.overruns = 0
+        self._jitter = LatencyHistogram()
+        self._overrun = LatencyHistogram()
+
+    def set_period(self, period: float) -> None:
+        """修改循环间隔，从下一轮开始生效"""
+        self.period = period
+
+    def begin_cycle(self) -> None:
+        """一轮开始，记录相对于计划开始时刻的抖动"""
+        now = self._clock()
+        if self._deadline is not None:
+            self._jitter.record(max(0.0, now - self._deadline))
+        self._cycle_start = now
+        self.cycles += 1
+
+    def on_success(self) -> float:
+        """
+        本轮成功结束，退避复位
+
+        Returns:
+            距离下一轮开始需要等待的秒数
+        """
+        self.consecutive_failures = 0
+        now = self._clock()
+        if not self.start_to_start:
+            self._deadline = now + self.period
+            return self.period
+        deadline = self._cycle_start + self.period
+        if now > deadline:
+            # 超时后从现在重新计时，不连续补跑错过的周期
+            self.overruns += 1
+            self._overrun.record(now - deadline)
+            deadline = now
+        self._deadline = deadline
+        return deadline - now
+
+    def on_failure(self) -> float:
+        """
+        本轮因交易异常失败，连续失败时等待时间按倍数增加
+
+        Returns:
+            距离下一轮开始需要等待的秒数
+        """
+        self.failures += 1
+        self.consecutive_failures += 1
+        delay = min(self.max_backoff, self.period * self.backoff_factor ** (self.consecutive_failures - 1))
+        self._deadline = self._clock() + delay
+        return delay
+
+    def stats(self) -> Dict[str, float]:
+        """调度统计（毫秒）"""
+        jitter = self._jitter.to_dict()
+        return {
+            "cycles": self.cycles,
+            "period_ms": self.period * 1000,
+            "failures": self.failures,
+            "jitter_mean_ms": jitter["mean_ms"],
+            "jitter_p95_ms": jitter["p95_ms"],
+            "jitter_max_ms": jitter["max_ms"],
+            "overruns": self.overruns,
+            "overrun_total_ms": self._overrun.total_us / 1000,
+            "overrun_max_ms": self._overrun.max_us / 1000,
+        }
+
+    def format_stats(self) -> str:
+        """调度统计的单行文本"""
+        stats = self.stats()
+        return (
+            f"调度: {stats['cycles']}轮, 间隔{stats['period_ms']:.0f}ms | "
+            f"抖动 平均{stats['jitter_mean_ms']:.1f}ms p95 {stats['jitter_p95_ms']:.1f}ms "
+            f"最大{stats['jitter_max_ms']:.1f}ms | 超时{stats['overruns']}次 共{stats['overrun_total_ms']:.0f}ms | "
+            f"失败{stats['failures']}次"
+        )
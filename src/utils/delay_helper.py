@@ -5,23 +5,144 @@
 """
 import threading
 import time
-from typing import Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from ..config.trading_config import TradingMode
 
 try:
     from src.config.config_factory import ConfigFactory
     from src.config.delay_config import DelayConfig
+    from src.core.cancellation import CancellationToken, stop_token
     from src.core.interfaces import IConfigManager
+    from src.utils.profiler import profiler
 except ImportError:
     from ..config.config_factory import ConfigFactory
     from ..config.delay_config import DelayConfig
+    from ..core.cancellation import CancellationToken, stop_token
     from ..core.interfaces import IConfigManager
+    from ..utils.profiler import profiler
+
+
+class DelayTuner:
+    """
+    延迟自动调优器（AIMD策略）
+
+    每个操作连续成功若干次后把延迟加性减小一步，失败一次则乘性增大，
+    从而逼近机器和服务器负载下的最小安全延迟。延迟始终限制在
+    [max(min_delay, 配置值 * min_ratio), 配置值 * max_ratio] 之间。
+    """
+
+    def __init__(
+        self,
+        success_streak: int = 5,
+        decrease_ratio: float = 0.05,
+        increase_factor: float = 1.5,
+        min_ratio: float = 0.2,
+        max_ratio: float = 2.0,
+        min_delay: float = 0.05,
+    ):
+        """
+        Args:
+            success_streak: 减小延迟前需要的连续成功次数
+            decrease_ratio: 每次减小的步长（相对配置值）
+            increase_factor: 失败后延迟的放大倍数
+            min_ratio: 下限（相对配置值）
+            max_ratio: 上限（相对配置值）
+            min_delay: 下限绝对值（秒）
+        """
+        self.success_streak = success_streak
+        self.decrease_ratio = decrease_ratio
+        self.increase_factor = increase_factor
+        self.min_ratio = min_ratio
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        # (模式, 操作) -> {"delay", "streak", "required", "successes", "failures"}
+        self._states: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def bounds(self, base: float) -> Tuple[float, float]:
+        """配置值对应的调优区间"""
+        low = min(base, max(self.min_delay, base * self.min_ratio))
+        return low, base * self.max_ratio
+
+    def _state(self, mode: str, operation: str, base: float, learned: Optional[float]) -> Dict[str, float]:
+        key = (mode, operation)
+        if key not in self._states:
+            low, high = self.bounds(base)
+            start = base if learned is None else min(max(learned, low), high)
+            self._states[key] = {
+                "delay": start,
+                "streak": 0,
+                "required": self.success_streak,
+                "successes": 0,
+                "failures": 0,
+            }
+        return self._states[key]
+
+    def current(self, mode: str, operation: str, base: float, learned: Optional[float] = None) -> float:
+        """当前使用的延迟"""
+        return self._state(mode, operation, base, learned)["delay"]
+
+    def peek(self, mode: str, operation: str, base: float, learned: Optional[float] = None) -> float:
+        """当前使用的延迟，还没有调优记录时不创建状态"""
+        state = self._states.get((mode, operation))
+        if state is not None:
+            return state["delay"]
+        if learned is None:
+            return base
+        low, high = self.bounds(base)
+        return min(max(learned, low), high)
+
+    def record(self, mode: str, operation: str, base: float, success: bool, learned: Optional[float] = None) -> bool:
+        """
+        记录一次结果并调整延迟
+
+        Returns:
+            延迟是否发生变化
+        """
+        state = self._state(mode, operation, base, learned)
+        low, high = self.bounds(base)
+        old = state["delay"]
+        if success:
+            state["successes"] += 1
+            state["streak"] += 1
+            if state["streak"] >= state["required"]:
+                state["delay"] = max(low, old - base * self.decrease_ratio)
+                state["streak"] = 0
+                state["required"] = self.success_streak
+        else:
+            state["failures"] += 1
+            state["streak"] = 0
+            # 失败后需要更长的连续成功才会再次尝试减小
+            state["required"] = self.success_streak * 2
+            state["delay"] = min(high, max(old * self.increase_factor, old + base * self.decrease_ratio))
+        return state["delay"] != old
+
+    def states(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """所有操作的调优状态副本"""
+        return {key: dict(state) for key, state in self._states.items()}
+
+    def reset(self) -> None:
+        """清空调优状态"""
+        self._states.clear()
+
+
+@dataclass(frozen=True)
+class DelayTable:
+    """按当前模式编译好的延迟表，配置、模式或调优结果变化时整体替换"""
+
+    mode: str
+    # 操作名 -> (实际使用的延迟, 配置的延迟)
+    entries: Mapping[str, Tuple[float, float]]
 
 
 class DelayHelper:
     """延迟操作辅助类，提供便捷的延迟获取和执行方法"""
 
+    # 累计多少次延迟调整后写回配置文件
+    SAVE_EVERY = 10
+
     MODE_MAPPING = {TradingMode.ROLLING: "rolling_mode", TradingMode.HOARDING: "hoarding_mode"}
 
     def __init__(self, mode: TradingMode = TradingMode.ROLLING):
@@ -29,10 +150,23 @@ class DelayHelper:
         self.mode = self.MODE_MAPPING[mode]
         self._config_manager: IConfigManager[DelayConfig] = ConfigFactory.get_config_manager("delay")
         self._cached_config: Optional[DelayConfig] = None
+        # 热路径只读这一个属性，不加锁；修改配置的地方持有锁重新编译后整体替换
+        self._table: Optional[DelayTable] = None
         self._lock = threading.RLock()  # 使用可重入锁保证线程安全
+        # 条件等待统计: 操作名 -> {"waits": 次数, "early": 提前满足次数, "waited": 实际等待秒数, "configured": 配置秒数}
+        self._wait_stats: Dict[str, Dict[str, float]] = {}
+        self._tuner = DelayTuner()
+        self._pending_tuned = 0
+        # 自动调优累计节省的时间: 模式 -> 秒
+        self._saved_time: Dict[str, float] = {}
+        # 等待通过取消令牌实现，停止时立即中断
+        self.cancel_token: CancellationToken = stop_token
 
         # 初始加载配置
         self._load_config()
+        # 延迟配置文件被外部修改后换用新配置
+        if hasattr(self._config_manager, "subscribe"):
+            self._config_manager.subscribe(self._on_config_reloaded)
 
     def set_mode(self, mode: TradingMode) -> None:
         """
@@ -43,23 +177,74 @@ class DelayHelper:
         """
         if mode not in self.MODE_MAPPING:
             raise ValueError(f"无效的交易模式: {mode}")
-        self.mode = self.MODE_MAPPING[mode]
+        with self._lock:
+            self.mode = self.MODE_MAPPING[mode]
+            self._compile()
 
-    def get_delay(self, operation: str) -> float:
+    def set_cancel_token(self, token: CancellationToken) -> None:
+        """设置等待使用的取消令牌"""
+        self.cancel_token = token
+
+    def get_delay(self, operation: str, upper_bound: bool = False) -> float:
         """
         获取延迟时间
 
         Args:
             operation: 操作名称
+            upper_bound: 为True时返回自动调优可能达到的最长延迟（配置值乘以调优上限）
 
         Returns:
             延迟时间（秒），如果配置不存在则返回0.0
         """
-        with self._lock:
-            if self._cached_config is None:
-                return 0.0
+        delay, base = self._resolve_delay(operation)
+        if upper_bound:
+            return max(delay, base * self._tuner.max_ratio)
+        return delay
+
+    def _resolve_delay(self, operation: str) -> Tuple[float, float]:
+        """返回 (实际使用的延迟, 配置的延迟)，开启自动调优时使用学习到的值"""
+        table = self._table
+        if table is None:
+            return 0.0, 0.0
+        entry = table.entries.get(operation)
+        if entry is None:
+            raise ValueError(f"未找到对应操作: {operation}")
+        return entry
+
+    def _compile(self) -> None:
+        """按当前模式编译延迟表（调用时需要持有锁）"""
+        config = self._cached_config
+        if config is None:
+            self._table = None
+            return
+        auto_tune = config.is_auto_tune(self.mode)
+        entries = {}
+        for operation, base in config.get_mode_delays(self.mode).items():
+            base = float(base)
+            delay = base
+            if auto_tune and base > 0:
+                learned = config.get_tuned_delay(self.mode, operation)
+                delay = self._tuner.peek(self.mode, operation, base, learned)
+            entries[operation] = (delay, base)
+        self._table = DelayTable(self.mode, MappingProxyType(entries))
+
+    def missing_operations(self, operations: Iterable[str], mode: Optional[TradingMode] = None) -> List[str]:
+        """
+        检查延迟配置是否包含代码中用到的所有操作
 
-            return self._cached_config.get_delay(self.mode, operation)
+        Args:
+            operations: 操作名称
+            mode: 交易模式，默认为当前模式
+
+        Returns:
+            配置中不存在的操作名称
+        """
+        name = self.mode if mode is None else self.MODE_MAPPING[mode]
+        with self._lock:
+            config = self._cached_config
+            if config is None:
+                return sorted(set(operations))
+            return sorted({operation for operation in operations if not config.has_operation(name, operation)})
 
     def sleep(self, operation: str) -> None:
         """
@@ -67,10 +252,172 @@ class DelayHelper:
 
         Args:
             operation: 操作名称
+
+        Raises:
+            OperationCancelledException: 等待前或等待期间收到停止信号
         """
-        delay = self.get_delay(operation)
+        delay, base = self._resolve_delay(operation)
         if delay > 0:
-            time.sleep(delay)
+            with profiler.span(f"delay.{operation}"):
+                self.cancel_token.checked_sleep(delay)
+        else:
+            self.cancel_token.raise_if_cancelled()
+        self._add_saved_time(base - delay)
+
+    def wait_until(
+        self, operation: str, condition: Optional[Callable[[], bool]] = None, poll_interval: float = 0.02
+    ) -> bool:
+        """
+        等待界面状态满足条件，配置的延迟作为超时时间
+
+        条件未知(None)时退化为固定延迟；条件抛出异常视为未满足。
+
+        Args:
+            operation: 操作名称，对应的延迟作为超时
+            condition: 界面完成条件
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            条件是否在超时前满足（无条件时总是True）
+
+        Raises:
+            OperationCancelledException: 等待期间收到停止信号
+        """
+        delay, base = self._resolve_delay(operation)
+        if condition is None or delay <= 0:
+            self.sleep(operation)
+            self._record_wait(operation, delay, delay, False)
+            return True
+
+        start = time.perf_counter()
+        deadline = start + delay
+        satisfied = False
+        with profiler.span(f"delay.{operation}"):
+            while True:
+                try:
+                    satisfied = bool(condition())
+                except Exception as e:
+                    print(f"等待条件检测失败({operation}): {e}")
+                    satisfied = False
+                now = time.perf_counter()
+                if satisfied or now >= deadline:
+                    break
+                self.cancel_token.checked_sleep(min(poll_interval, deadline - now))
+        waited = time.perf_counter() - start
+        self._record_wait(operation, waited, delay, satisfied)
+        self._add_saved_time(base - delay)
+        return satisfied
+
+    def report_outcome(self, operation: str, success: bool) -> None:
+        """
+        报告延迟之后的检测结果，供自动调优使用
+
+        Args:
+            operation: 操作名称
+            success: 延迟后界面状态是否符合预期（例如出售窗口已出现）
+        """
+        with self._lock:
+            config = self._cached_config
+            if config is None or not config.is_auto_tune(self.mode):
+                return
+            base = config.get_delay(self.mode, operation)
+            if base <= 0:
+                return
+            learned = config.get_tuned_delay(self.mode, operation)
+            if not self._tuner.record(self.mode, operation, base, success, learned):
+                return
+            config.set_tuned_delay(self.mode, operation, self._tuner.current(self.mode, operation, base))
+            self._compile()
+            self._pending_tuned += 1
+            if self._pending_tuned >= self.SAVE_EVERY:
+                self.save_tuned()
+
+    def save_tuned(self) -> bool:
+        """
+        把学习到的延迟写回延迟配置文件
+
+        Returns:
+            是否成功保存
+        """
+        with self._lock:
+            if self._cached_config is None or self._pending_tuned == 0:
+                return False
+            try:
+                self._config_manager.update_config({"tuned": self._cached_config.tuned})
+                self._pending_tuned = 0
+                return True
+            except Exception as e:
+                print(f"保存调优延迟失败: {e}")
+                return False
+
+    def set_auto_tune(self, mode: TradingMode, enabled: bool) -> None:
+        """按模式开关自动调优并写回配置"""
+        with self._lock:
+            if self._cached_config is None:
+                return
+            name = self.MODE_MAPPING[mode]
+            self._cached_config.auto_tune[name] = enabled
+            self._compile()
+            try:
+                self._config_manager.update_config({"auto_tune": {name: enabled}})
+            except Exception as e:
+                print(f"保存自动调优开关失败: {e}")
+
+    def _add_saved_time(self, seconds: float) -> None:
+        if seconds == 0:
+            return
+        with self._lock:
+            self._saved_time[self.mode] = self._saved_time.get(self.mode, 0.0) + seconds
+
+    def get_saved_time(self, mode: Optional[TradingMode] = None) -> float:
+        """自动调优累计节省的时间（秒），不指定模式时返回所有模式之和"""
+        with self._lock:
+            if mode is None:
+                return sum(self._saved_time.values())
+            return self._saved_time.get(self.MODE_MAPPING[mode], 0.0)
+
+    def format_tuning_report(self) -> str:
+        """自动调优报告"""
+        with self._lock:
+            lines = [f"自动调优累计节省: {self.get_saved_time():.1f}s"]
+            for (mode, operation), state in sorted(self._tuner.states().items()):
+                base = self._cached_config.get_delay(mode, operation) if self._cached_config else 0.0
+                lines.append(
+                    f"{mode}.{operation}: {base:.3f}s -> {state['delay']:.3f}s "
+                    f"(成功{int(state['successes'])}次, 失败{int(state['failures'])}次)"
+                )
+            return "\n".join(lines)
+
+    def _record_wait(self, operation: str, waited: float, configured: float, early: bool) -> None:
+        with self._lock:
+            stats = self._wait_stats.setdefault(operation, {"waits": 0, "early": 0, "waited": 0.0, "configured": 0.0})
+            stats["waits"] += 1
+            stats["early"] += int(early)
+            stats["waited"] += waited
+            stats["configured"] += configured
+
+    def get_wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """获取条件等待统计的副本"""
+        with self._lock:
+            return {operation: dict(stats) for operation, stats in self._wait_stats.items()}
+
+    def reset_wait_stats(self) -> None:
+        """清空条件等待统计"""
+        with self._lock:
+            self._wait_stats.clear()
+
+    def format_wait_report(self) -> str:
+        """按节省时间排序的条件等待报告"""
+        stats = self.get_wait_stats()
+        if not stats:
+            return "无等待记录"
+        lines = []
+        for operation, item in sorted(stats.items(), key=lambda x: x[1]["waited"] - x[1]["configured"]):
+            lines.append(
+                f"{operation}: {int(item['waits'])}次, 提前满足{int(item['early'])}次, "
+                f"实际{item['waited']:.2f}s / 配置{item['configured']:.2f}s"
+            )
+        return "\n".join(lines)
 
     def get_mode_delays(self, mode: TradingMode) -> dict:
         """
@@ -148,6 +495,15 @@ class DelayHelper:
         with self._lock:
             return self._load_config()
 
+    def _on_config_reloaded(self, config: DelayConfig) -> None:
+        """配置监视线程解析出新的延迟配置后整体替换，下一次等待即使用新值"""
+        with self._lock:
+            self._cached_config = config
+            # 配置值变化后调优区间随之变化，从文件中学习到的值重新开始
+            self._tuner.reset()
+            self._pending_tuned = 0
+            self._compile()
+
     def _load_config(self) -> bool:
         """
         加载配置（内部方法，调用时需要持有锁）
@@ -155,8 +511,14 @@ class DelayHelper:
         Returns:
             是否成功加载
         """
+        if self._pending_tuned:
+            self.save_tuned()
         try:
             self._cached_config = self._config_manager.load_config()
+            # 调优状态从配置中学习到的值重新开始
+            self._tuner.reset()
+            self._pending_tuned = 0
+            self._compile()
             return True
         except Exception as e:
             print(f"加载延迟配置失败: {e}")
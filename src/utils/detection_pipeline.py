@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+异步检测流水线
+
+把已经稳定区域的截图识别放到后台线程执行，交易流程继续执行后续的鼠标键盘操作和延迟，
+只在真正需要数值时才等待结果，从而把识别耗时藏在输入和延迟后面。
+
+调用方负责保证提交的识别不受后续操作影响，通常的做法是先在调用线程截图，
+再把截图交给检测方法在后台识别。关闭流水线时提交的任务在调用线程同步执行，行为与串行一致。
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+try:
+    from src.utils.profiler import LatencyHistogram, profiler
+except ImportError:
+    from ..utils.profiler import LatencyHistogram, profiler
+
+
+class PipelineStats:
+    """单个检测项的统计"""
+
+    __slots__ = ("compute", "blocked")
+
+    def __init__(self):
+        # 后台识别耗时
+        self.compute = LatencyHistogram()
+        # 调用方实际阻塞等待的耗时
+        self.blocked = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, float]:
+        compute = self.compute.to_dict()
+        blocked = self.blocked.to_dict()
+        return {
+            "count": compute["count"],
+            "compute_ms": compute["mean_ms"],
+            "blocked_ms": blocked["mean_ms"],
+            "hidden_ms": max(0.0, compute["mean_ms"] - blocked["mean_ms"]),
+        }
+
+
+class PendingDetection:
+    """尚未取值的检测结果"""
+
+    def __init__(self, pipeline: "DetectionPipeline", name: str, future: Future):
+        self._pipeline = pipeline
+        self.name = name
+        self.future = future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def get(self, timeout: float = None) -> Any:
+        """
+        等待并返回检测结果，检测抛出的异常在这里重新抛出
+
+        Raises:
+            concurrent.futures.TimeoutError: 超时仍未完成
+        """
+        start = time.perf_counter()
+        try:
+            with profiler.span(f"pipeline.{self.name}"):
+                return self.future.result(timeout)
+        finally:
+            self._pipeline._record_blocked(self.name, time.perf_counter() - start)
+
+
+class DetectionPipeline:
+    """基于线程池的检测流水线"""
+
+    def __init__(self, max_workers: int = 2, enabled: bool = True):
+        """
+        Args:
+            max_workers: 后台识别线程数
+            enabled: 关闭时提交的任务在调用线程同步执行
+        """
+        self.max_workers = max_workers
+        self.enabled = enabled
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, PipelineStats] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="detection")
+            return self._executor
+
+    def submit(self, name: str, func: Callable[..., Any], *args, **kwargs) -> PendingDetection:
+        """
+        提交一个检测任务
+
+        Args:
+            name: 检测项名称，用于统计，例如 expected_revenue
+            func: 检测函数
+        """
+        if not self.enabled:
+            future = Future()
+            try:
+                future.set_result(self._timed(name, func, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return PendingDetection(self, name, future)
+        return PendingDetection(self, name, self._get_executor().submit(self._timed, name, func, *args, **kwargs))
+
+    def _timed(self, name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._get_stats(name).compute.record(elapsed)
+
+    def _record_blocked(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self._get_stats(name).blocked.record(elapsed)
+
+    def _get_stats(self, name: str) -> PipelineStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = PipelineStats()
+        return stats
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各检测项的识别耗时、阻塞耗时和被隐藏的耗时（毫秒）"""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def format_stats(self) -> str:
+        """检测流水线统计报告"""
+        stats = self.stats()
+        if not stats:
+            return "检测流水线: 无记录"
+        lines = ["检测流水线:"]
+        for name, item in stats.items():
+            lines.append(
+                f"  {name}: {item['count']}次, 识别{item['compute_ms']:.1f}ms, "
+                f"阻塞{item['blocked_ms']:.1f}ms, 隐藏{item['hidden_ms']:.1f}ms"
+            )
+        return "\n".join(lines)
+
+    def reset_stats(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭后台线程，之后再提交会重新创建线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
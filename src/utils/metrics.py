@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+运行指标
+
+交易线程通过事件总线发布数值样本：每轮耗时、截图和OCR耗时、当前价格，以及购买次数、盈利、失败次数这类计数的增量。
+MetricsAggregator 为每个指标保留固定长度的环形缓冲区，记录一个样本只是一次赋值，
+悬浮窗HUD在界面线程按限定频率读取滚动平均、每小时速率和最近的样本（折线图）。
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Metric:
+    """指标名称"""
+
+    CYCLE_MS = "cycle_ms"
+    CAPTURE_MS = "capture_ms"
+    OCR_MS = "ocr_ms"
+    PRICE = "price"
+    # 以下为计数类指标，样本是增量，按每小时速率显示
+    BUYS = "buys"
+    PROFIT = "profit"
+    FAILURES = "failures"
+
+
+class MetricSummary(NamedTuple):
+    """一个指标的汇总"""
+
+    last: float
+    # 环形缓冲区内样本的平均值
+    mean: float
+    # 累计样本数和累计值
+    count: int
+    total: float
+    # 累计值按运行时长折算的每小时速率
+    per_hour: float
+    # 环形缓冲区内的样本，从旧到新
+    recent: Tuple[float, ...]
+
+
+class RingBuffer:
+    """固定长度的数值环形缓冲区，写满后覆盖最旧的样本"""
+
+    __slots__ = ("capacity", "_values", "_next", "_size")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"环形缓冲区长度至少为1: {capacity}")
+        self.capacity = capacity
+        self._values = [0.0] * capacity
+        self._next = 0
+        self._size = 0
+
+    def append(self, value: float) -> None:
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def last(self) -> float:
+        return self._values[self._next - 1] if self._size else 0.0
+
+    def values(self) -> List[float]:
+        """所有样本，从旧到新"""
+        if self._size < self.capacity:
+            return self._values[: self._size]
+        return self._values[self._next :] + self._values[: self._next]
+
+    def mean(self) -> float:
+        return sum(self.values()) / self._size if self._size else 0.0
+
+
+class MetricsAggregator:
+    """按指标名称聚合数值样本"""
+
+    def __init__(self, capacity: int = 120, clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            capacity: 每个指标保留的最近样本数
+            clock: 单调时钟，测试时可替换
+        """
+        self.capacity = capacity
+        self._clock = clock or time.monotonic
+        self._lock = threading.Lock()
+        self._series: Dict[str, RingBuffer] = {}
+        self._counts: Dict[str, int] = {}
+        self._totals: Dict[str, float] = {}
+        self._started = self._clock()
+
+    def record(self, name: str, value: float) -> None:
+        """记录一个样本"""
+        with self._lock:
+            self._record(name, float(value))
+
+    def record_many(self, samples: Dict[str, float]) -> None:
+        """一次记录多个指标的样本"""
+        with self._lock:
+            for name, value in samples.items():
+                self._record(name, float(value))
+
+    def _record(self, name: str, value: float) -> None:
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = RingBuffer(self.capacity)
+        series.append(value)
+        self._counts[name] = self._counts.get(name, 0) + 1
+        self._totals[name] = self._totals.get(name, 0.0) + value
+
+    def reset(self) -> None:
+        """清空样本，每小时速率从现在开始计算"""
+        with self._lock:
+            self._series.clear()
+            self._counts.clear()
+            self._totals.clear()
+            self._started = self._clock()
+
+    def summary(self, name: str) -> Optional[MetricSummary]:
+        """指标的汇总，没有样本时返回None"""
+        with self._lock:
+            return self._summary(name, self._clock() - self._started)
+
+    def snapshot(self) -> Dict[str, MetricSummary]:
+        """所有指标的汇总"""
+        with self._lock:
+            elapsed = self._clock() - self._started
+            return {name: self._summary(name, elapsed) for name in self._series}
+
+    def _summary(self, name: str, elapsed: float) -> Optional[MetricSummary]:
+        series = self._series.get(name)
+        if series is None:
+            return None
+        total = self._totals[name]
+        return MetricSummary(
+            last=series.last(),
+            mean=series.mean(),
+            count=self._counts[name],
+            total=total,
+            per_hour=total * 3600 / elapsed if elapsed > 0 else 0.0,
+            recent=tuple(series.values()),
+        )
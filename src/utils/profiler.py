@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+分步耗时剖析器
+
+以span（上下文管理器/装饰器）记录截图、OCR、鼠标键盘动作和延迟等待各步骤的耗时，
+按步骤聚合为HDR风格的对数直方图（p50/p95/p99），可导出为JSON，并生成每轮的耗时分解。
+
+span名称使用 "分类.步骤" 格式，例如 "capture.region"、"ocr.image_to_string"、
+"action.click_position"、"delay.after_buy"，每轮分解按分类汇总。
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class LatencyHistogram:
+    """
+    HDR风格的对数-线性直方图
+
+    以微秒为单位记录，小于 2^sub_bucket_bits 的值精确记录，更大的值按2的幂分段，
+    每段再等分为 2^(sub_bucket_bits-1) 个子桶，相对误差不超过 1/2^(sub_bucket_bits-1)。
+    记录 O(1)，内存只与出现过的桶数相关。
+    """
+
+    __slots__ = ("sub_bucket_bits", "_half", "_counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._half = 1 << (sub_bucket_bits - 1)
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        """值所在桶的序号"""
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return (shift + 1) * self._half + ((value >> shift) - self._half)
+
+    def _bucket_value(self, index: int) -> int:
+        """桶的代表值（桶内最大值）"""
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        mantissa = index % self._half + self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """记录一次耗时（秒）"""
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        if self.count == 0 or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+        self.count += 1
+        self.total_us += value
+
+    def percentile(self, q: float) -> float:
+        """分位数（毫秒），q取值0~100"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(round(self.count * q / 100)))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._bucket_value(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def to_dict(self) -> Dict[str, float]:
+        """统计摘要（毫秒）"""
+        return {
+            "count": self.count,
+            "total_ms": self.total_us / 1000,
+            "mean_ms": self.total_us / self.count / 1000 if self.count else 0.0,
+            "min_ms": self.min_us / 1000,
+            "max_ms": self.max_us / 1000,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class SpanProfiler:
+    """基于span的分步耗时剖析器"""
+
+    OTHER = "other"
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 当前轮各分类的累计耗时，只统计最外层span，避免嵌套重复计算
+        self._cycle_totals: Dict[str, float] = {}
+        self._cycle_start: Optional[float] = None
+        self.last_cycle_breakdown: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """记录一个步骤的耗时"""
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = depth
+            self._record(name, elapsed, top_level=depth == 0)
+
+    def profiled(self, name: str) -> Callable:
+        """装饰器形式的span"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _record(self, name: str, elapsed: float, top_level: bool) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(elapsed)
+            if top_level and self._cycle_start is not None:
+                category = name.split(".", 1)[0]
+                self._cycle_totals[category] = self._cycle_totals.get(category, 0.0) + elapsed
+
+    def begin_cycle(self) -> None:
+        """开始新一轮的耗时分解"""
+        with self._lock:
+            self._cycle_totals = {}
+            self._cycle_start = time.perf_counter()
+
+    def end_cycle(self) -> List[Tuple[str, float]]:
+        """
+        结束本轮并生成耗时分解
+
+        Returns:
+            [(分类, 毫秒)]，按耗时降序，未被span覆盖的时间计入 "other"
+        """
+        with self._lock:
+            if self._cycle_start is None:
+                return self.last_cycle_breakdown
+            total = time.perf_counter() - self._cycle_start
+            self._cycle_start = None
+            totals = dict(self._cycle_totals)
+        other = total - sum(totals.values())
+        if other > 0:
+            totals[self.OTHER] = other
+        self._record("cycle", total, top_level=False)
+        self.last_cycle_breakdown = sorted(
+            ((category, seconds * 1000) for category, seconds in totals.items()), key=lambda x: -x[1]
+        )
+        return self.last_cycle_breakdown
+
+    def format_breakdown(self, breakdown: Optional[List[Tuple[str, float]]] = None) -> str:
+        """把耗时分解格式化为一行文本，用于悬浮窗显示"""
+        breakdown = self.last_cycle_breakdown if breakdown is None else breakdown
+        total = sum(ms for _, ms in breakdown)
+        if total <= 0:
+            return ""
+        parts = [f"{category} {ms:.0f}ms({ms / total:.0%})" for category, ms in breakdown]
+        return f"上轮 {total:.0f}ms: " + " | ".join(parts)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """所有步骤的直方图摘要"""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def export_json(self, path: str) -> None:
+        """把统计结果导出为JSON文件"""
+        data = {"steps": self.stats(), "last_cycle": dict(self.last_cycle_breakdown)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._histograms.clear()
+            self._cycle_totals = {}
+            self._cycle_start = None
+            self.last_cycle_breakdown = []
+
+
+# 全局剖析器实例
+profiler = SpanProfiler()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时剖析
+
+记录程序启动过程中每个模块的导入耗时和每个子系统（主窗口、悬浮窗、界面适配器、交易服务等）的初始化耗时，
+用于找出拖慢界面出现的步骤。设置环境变量 DFMB_PROFILE_STARTUP=1 启动时，
+导入耗时由替换的 __import__ 统计，界面就绪后打印报告并导出 startup_profile.json。
+
+导入耗时按首次导入的模块记录，分为包含子模块的总耗时和扣除子模块后的自身耗时。
+"""
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ENV_FLAG = "DFMB_PROFILE_STARTUP"
+
+
+class StartupProfiler:
+    """启动耗时剖析器"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._origin = clock()
+        self._lock = threading.Lock()
+        # (名称, 开始时刻, 耗时, 线程名)，时刻相对于剖析器创建
+        self._stages: List[Tuple[str, float, float, str]] = []
+        self._marks: Dict[str, float] = {}
+        # 模块名 -> [总耗时, 自身耗时]
+        self._imports: Dict[str, List[float]] = {}
+        self._import_stack = threading.local()
+        self._original_import = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否按环境变量开启了导入耗时统计和报告"""
+        return os.environ.get(ENV_FLAG, "") not in ("", "0")
+
+    def elapsed(self) -> float:
+        """距离剖析器创建（约等于程序启动）的秒数"""
+        return self._clock() - self._origin
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """记录一个启动阶段的耗时"""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            end = self._clock()
+            with self._lock:
+                self._stages.append((name, start - self._origin, end - start, threading.current_thread().name))
+
+    def mark(self, name: str) -> float:
+        """记录一个时间点（例如界面就绪），返回距启动的秒数"""
+        elapsed = self.elapsed()
+        with self._lock:
+            self._marks.setdefault(name, elapsed)
+        return elapsed
+
+    def install_import_hook(self) -> None:
+        """开始统计之后首次导入的模块耗时"""
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall_import_hook(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals_=None, locals_=None, fromlist=(), level=0):
+        original = self._original_import
+        if level or name in sys.modules:
+            return original(name, globals_, locals_, fromlist, level)
+        stack = getattr(self._import_stack, "frames", None)
+        if stack is None:
+            stack = self._import_stack.frames = []
+        # 子模块的耗时累加到栈顶，用于计算自身耗时
+        stack.append(0.0)
+        start = self._clock()
+        try:
+            return original(name, globals_, locals_, fromlist, level)
+        finally:
+            total = self._clock() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                record = self._imports.setdefault(name, [0.0, 0.0])
+                record[0] += total
+                record[1] += total - children
+
+    def report(self, top: int = 15) -> Dict:
+        """启动阶段、时间点和导入耗时最多的模块（毫秒）"""
+        with self._lock:
+            stages = list(self._stages)
+            marks = dict(self._marks)
+            imports = {name: list(value) for name, value in self._imports.items()}
+        ordered = sorted(imports.items(), key=lambda item: -item[1][1])[:top]
+        return {
+            "marks_ms": {name: value * 1000 for name, value in marks.items()},
+            "stages": [
+                {"name": name, "start_ms": start * 1000, "duration_ms": duration * 1000, "thread": thread}
+                for name, start, duration, thread in stages
+            ],
+            "imports": [
+                {"module": name, "total_ms": total * 1000, "self_ms": own * 1000} for name, (total, own) in ordered
+            ],
+        }
+
+    def format_report(self, top: int = 15) -> str:
+        """报告的文本形式"""
+        return format_startup_report(self.report(top))
+
+    def export_json(self, path: str = "startup_profile.json", top: int = 50) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(top), f, ensure_ascii=False, indent=2)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._origin = self._clock()
+            self._stages.clear()
+            self._marks.clear()
+            self._imports.clear()
+
+
+def format_startup_report(report: Dict) -> str:
+    """把 StartupProfiler.report() 的结果格式化为文本"""
+    lines = ["启动耗时:"]
+    for name, value in report["marks_ms"].items():
+        lines.append(f"  {name}: {value:.0f}ms")
+    for stage in report["stages"]:
+        lines.append(
+            f"  [{stage['thread']}] {stage['name']}: {stage['duration_ms']:.0f}ms (开始于 {stage['start_ms']:.0f}ms)"
+        )
+    if report["imports"]:
+        lines.append(f"导入耗时最多的 {len(report['imports'])} 个模块 (自身/总计):")
+        for item in report["imports"]:
+            lines.append(f"  {item['module']}: {item['self_ms']:.0f}ms / {item['total_ms']:.0f}ms")
+    return "\n".join(lines)
+
+
+# 全局启动剖析器实例
+startup_profiler = StartupProfiler()
+
+
+def finish_startup(name: str = "ui_ready") -> Optional[str]:
+    """
+    记录界面就绪，开启剖析时输出报告
+
+    Returns:
+        开启剖析时返回报告文本
+    """
+    startup_profiler.mark(name)
+    if not startup_profiler.enabled:
+        return None
+    text = startup_profiler.format_report()
+    print(text)
+    try:
+        startup_profiler.export_json()
+    except OSError as e:
+        print(f"导出启动耗时失败: {e}")
+    return text
@@ -5,7 +5,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
 
-from src.infrastructure.action_executor import PyAutoGUIActionExecutor, MockActionExecutor
+from src.config.coordinates import CoordinateConfig
+from src.infrastructure.action_executor import LowLatencyActionExecutor, PyAutoGUIActionExecutor, MockActionExecutor
 
 
 class TestActionExecutorWindowOffset(unittest.TestCase):
@@ -152,6 +153,72 @@ class TestActionExecutorWindowOffset(unittest.TestCase):
         # 验证PyAutoGUI调用
         mock_move_to.assert_called_once_with(300, 200)  # 应用了偏移量
 
+    @patch('pyautogui.moveTo')
+    @patch('pyautogui.click')
+    def test_low_latency_executor_with_offset(self, mock_click, mock_move_to):
+        """测试低延迟执行器的窗口偏移功能"""
+        executor = LowLatencyActionExecutor(debug=False)
+
+        # 设置窗口偏移量
+        executor.set_window_offset(100, 50)
+
+        # 执行点击和移动操作
+        executor.click_position((200, 150), pause=0)
+        executor.move_mouse((250.7, 150.2), pause=0)
+
+        # 验证PyAutoGUI调用应用了偏移量且不使用全局停顿
+        self.assertEqual(mock_move_to.call_count, 2)
+        mock_move_to.assert_any_call(300, 200, _pause=False)
+        mock_move_to.assert_any_call(350, 200, _pause=False)
+        mock_click.assert_called_once_with(_pause=False)
+
+    @patch('pyautogui.moveTo')
+    @patch('pyautogui.click')
+    def test_screen_point_not_converted(self, mock_click, mock_move_to):
+        """测试坐标表中已包含窗口偏移的屏幕坐标不再转换"""
+        executor = LowLatencyActionExecutor(debug=False)
+        executor.set_window_offset(100, 50)
+        screen = CoordinateConfig.compile(2560, 1440, (100, 50)).screen
+
+        executor.click_position(screen.rolling_mode.sell_button, pause=0)
+        mock_move_to.assert_called_once_with(2065, 989, _pause=False)
+
+        # 与窗口内坐标经过转换后的结果一致
+        self.mock_executor.set_window_offset(100, 50)
+        self.mock_executor.click_position(screen.rolling_mode.sell_button)
+        self.mock_executor.click_position((1965, 939))
+        actions = self.mock_executor.get_actions()
+        self.assertEqual(actions[0]["converted_coordinates"], (2065, 989))
+        self.assertEqual(actions[1]["converted_coordinates"], (2065, 989))
+
+    @patch('pyautogui.moveTo')
+    def test_low_latency_executor_cleared_offset(self, mock_move_to):
+        """测试低延迟执行器清除偏移量后使用原始坐标"""
+        executor = LowLatencyActionExecutor(debug=False)
+        executor.set_window_offset(0, 0)
+
+        executor.move_mouse((200, 150), pause=0)
+
+        mock_move_to.assert_called_once_with(200, 150, _pause=False)
+
+    @patch('pyautogui.position')
+    @patch('pyautogui.moveTo')
+    def test_cursor_tracking_uses_converted_coordinates(self, mock_move_to, mock_position):
+        """测试光标跟踪按偏移后的屏幕坐标判断，偏移变化后重新移动"""
+        executor = PyAutoGUIActionExecutor(debug=False)
+        executor.set_window_offset(100, 50)
+        mock_position.return_value = (300, 200)
+
+        executor.move_mouse((200, 150))
+        executor.move_mouse((200, 150))
+        mock_move_to.assert_called_once_with(300, 200)
+
+        # 窗口偏移变化后记录的位置失效
+        executor.set_window_offset(0, 0)
+        executor.move_mouse((300, 200))
+        self.assertEqual(mock_move_to.call_count, 2)
+        self.assertEqual(executor.cursor_stats(), {"moves": 2, "elided": 1, "invalidated": 0})
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+模拟游戏基准测试单元测试
+"""
+import unittest
+
+from src.config.trading_config import TradingConfig, TradingMode
+from src.core.cancellation import stop_token
+from src.simulation.benchmark import run_benchmark
+from src.utils.delay_helper import delay_helper
+
+
+class TestBenchmark(unittest.TestCase):
+    """模拟游戏基准测试类"""
+
+    def test_hoarding_run_buys(self):
+        """测试默认配置的屯仓基准测试中有低于最高价格的报价并完成购买"""
+        result = run_benchmark(cycles=10, mode=TradingMode.HOARDING, seed=0)
+        self.assertEqual(result.errors, 0)
+        self.assertGreaterEqual(result.game_stats["buys"], 1)
+
+    def test_config_not_modified(self):
+        """测试不修改调用方传入的配置"""
+        config = TradingConfig(trading_mode=TradingMode.ROLLING, ideal_price=1200, max_price=1500)
+        result = run_benchmark(cycles=3, mode=TradingMode.HOARDING, config=config, seed=0, event_driven_waits=True)
+        self.assertEqual(result.mode, "hoarding")
+        self.assertEqual(config.trading_mode, TradingMode.ROLLING)
+        self.assertFalse(config.event_driven_waits)
+
+    def test_stop_token_restored(self):
+        """测试基准测试结束后全局停止令牌复位，之后的等待不会被取消"""
+        run_benchmark(cycles=1, mode=TradingMode.HOARDING, seed=0)
+        self.assertFalse(stop_token.is_cancelled())
+        delay_helper.sleep("refresh_operation")
+
+
+if __name__ == "__main__":
+    unittest.main()
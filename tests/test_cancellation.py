@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+取消令牌单元测试
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from src.config.delay_config import DelayConfig
+from src.config.trading_config import TradingMode
+from src.core.cancellation import CancellationToken
+from src.core.exceptions import DeadlineExceededException, OperationCancelledException, TradingException
+from src.utils.delay_helper import DelayHelper
+
+
+def cancel_later(token: CancellationToken, seconds: float = 0.05) -> threading.Timer:
+    timer = threading.Timer(seconds, token.cancel)
+    timer.start()
+    return timer
+
+
+class TestCancellationToken(unittest.TestCase):
+    """取消令牌测试类"""
+
+    def test_sleep_and_reset(self):
+        """测试未取消时睡满，取消后立即返回，复位后恢复"""
+        token = CancellationToken()
+        self.assertTrue(token.sleep(0.01))
+        self.assertTrue(token.sleep(0))
+
+        token.cancel()
+        start = time.perf_counter()
+        self.assertFalse(token.sleep(5))
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertTrue(token.is_cancelled())
+        with self.assertRaises(OperationCancelledException):
+            token.raise_if_cancelled()
+
+        token.reset()
+        self.assertFalse(token.is_cancelled())
+        token.raise_if_cancelled()
+
+    def test_cancel_wakes_sleeping_thread(self):
+        """测试其它线程取消时正在进行的等待立即中断"""
+        token = CancellationToken()
+        cancel_later(token)
+        start = time.perf_counter()
+        with self.assertRaises(OperationCancelledException):
+            token.checked_sleep(10)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        # 取消异常属于交易异常，交易线程按交易失败的路径处理
+        self.assertTrue(issubclass(OperationCancelledException, TradingException))
+
+    def test_deadline_per_thread(self):
+        """测试截止时刻到期后等待和检查抛出超时异常，只影响设置它的线程"""
+        token = CancellationToken()
+        token.set_deadline(time.perf_counter() + 0.05)
+        token.checked_sleep(0.01)
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceededException):
+            token.checked_sleep(10)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        with self.assertRaises(DeadlineExceededException):
+            token.raise_if_cancelled()
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(token.remaining()))
+        thread.start()
+        thread.join()
+        self.assertEqual(other, [None])
+
+        token.set_deadline(None)
+        token.raise_if_cancelled()
+
+
+@patch("src.utils.delay_helper.ConfigFactory")
+class TestDelayHelperCancellation(unittest.TestCase):
+    """DelayHelper 等待中断测试类"""
+
+    def _helper(self, mock_factory) -> DelayHelper:
+        mock_manager = Mock()
+        mock_manager.load_config.return_value = DelayConfig(
+            delays={"rolling_mode": {"buy_operation": 10.0, "after_refresh": 0.0}, "hoarding_mode": {}}
+        )
+        mock_factory.get_config_manager.return_value = mock_manager
+        helper = DelayHelper(TradingMode.ROLLING)
+        helper.set_cancel_token(CancellationToken())
+        return helper
+
+    def test_sleep_interrupted(self, mock_factory):
+        """测试固定延迟在停止时立即中断，停止后零延迟也不再继续"""
+        helper = self._helper(mock_factory)
+        cancel_later(helper.cancel_token)
+        start = time.perf_counter()
+        with self.assertRaises(OperationCancelledException):
+            helper.sleep("buy_operation")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        with self.assertRaises(OperationCancelledException):
+            helper.sleep("after_refresh")
+
+    def test_wait_until_interrupted(self, mock_factory):
+        """测试条件等待在停止时立即中断"""
+        helper = self._helper(mock_factory)
+        cancel_later(helper.cancel_token)
+        start = time.perf_counter()
+        with self.assertRaises(OperationCancelledException):
+            helper.wait_until("buy_operation", lambda: False, poll_interval=1.0)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
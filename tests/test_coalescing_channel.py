@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+消息合并通道单元测试
+"""
+import unittest
+
+from src.core.event_bus import CoalescingChannel, LazyText
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCoalescingChannel(unittest.TestCase):
+    """消息合并通道测试类"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.delivered = []
+        self.channel = CoalescingChannel(lambda topic, msg: self.delivered.append((topic, str(msg))), 10, self.clock)
+
+    def test_latest_message_per_topic(self):
+        """测试每个主题只投递最新一条，只有第一条消息需要安排投递"""
+        self.assertTrue(self.channel.post("text", "a"))
+        self.assertFalse(self.channel.post("text", LazyText("价格: {}", 1)))
+        self.assertFalse(self.channel.post("profile", "p"))
+
+        self.assertEqual(self.channel.flush(), 2)
+        self.assertEqual(self.delivered, [("text", "价格: 1"), ("profile", "p")])
+        self.assertEqual(self.channel.stats(), {"posted": 3, "delivered": 2, "coalesced": 1})
+        self.assertTrue(self.channel.post("text", "b"))
+
+    def test_rate_limit(self):
+        """测试两次投递间隔不小于 1/rate"""
+        self.assertEqual(self.channel.delay(), 0.0)
+        self.channel.post("text", "a")
+        self.channel.flush()
+        self.clock.now = 0.04
+        self.assertAlmostEqual(self.channel.delay(), 0.06)
+        self.clock.now = 0.2
+        self.assertEqual(self.channel.delay(), 0.0)
+
+    def test_deliver_error_does_not_stop_flush(self):
+        """测试某个主题投递失败不影响其他主题"""
+
+        def deliver(topic, msg):
+            if topic == "bad":
+                raise RuntimeError("boom")
+            self.delivered.append(topic)
+
+        channel = CoalescingChannel(deliver, 10, self.clock)
+        channel.post("bad", "x")
+        channel.post("good", "y")
+        self.assertEqual(channel.flush(), 2)
+        self.assertEqual(self.delivered, ["good"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+配置文件监视和热更新单元测试
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.config.config_manager import DelayConfigManager, TradingConfigManager
+from src.config.config_watcher import ConfigWatcher
+from src.config.delay_config import DelayConfig
+from src.config.trading_config import TradingMode
+from src.utils.delay_helper import DelayHelper
+
+
+def write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # 保证修改时间变化
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestConfigWatcher(unittest.TestCase):
+    """配置监视测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "settings.yaml")
+        write_text(self.path, "ideal_price: 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_polling_detects_changes(self):
+        """测试轮询检测到修改后回调一次，文件被删除时等待重新出现"""
+        calls = []
+        watcher = ConfigWatcher(settle=0, use_native=False)
+        watcher.watch(self.path, lambda: calls.append(1))
+        self.assertEqual(watcher.check(), [])
+
+        write_text(self.path, "ideal_price: 2\n")
+        self.assertEqual(watcher.check(), [os.path.abspath(self.path)])
+        self.assertEqual(watcher.check(), [])
+        self.assertEqual(len(calls), 1)
+
+        os.remove(self.path)
+        self.assertEqual(watcher.check(), [])
+        write_text(self.path, "ideal_price: 3\n")
+        watcher.check()
+        self.assertEqual(len(calls), 2)
+
+    def test_background_thread(self):
+        """测试后台线程回调，停止后不再检查"""
+        calls = []
+        watcher = ConfigWatcher(interval=0.02, settle=0.01, use_native=False)
+        watcher.watch(self.path, lambda: calls.append(1))
+        watcher.start()
+        try:
+            write_text(self.path, "ideal_price: 2\n")
+            deadline = time.monotonic() + 2
+            while not calls and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(calls), 1)
+        finally:
+            watcher.stop()
+        self.assertFalse(watcher.running)
+
+
+class TestConfigHotReload(unittest.TestCase):
+    """配置管理器热更新测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "settings.yaml")
+        self.manager = TradingConfigManager(self.path)
+        self.manager.save_config(self.manager.load_config())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _edit(self, **values) -> None:
+        """模拟用户用编辑器修改配置文件"""
+        other = TradingConfigManager(self.path)
+        config = other.load_config()
+        for key, value in values.items():
+            setattr(config, key, value)
+        other.save_config(config)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_external_edit_swaps_snapshot(self):
+        """测试外部修改换用新的快照并通知订阅者，自己写入的修改不重复加载"""
+        received, external = [], []
+        self.manager.subscribe(received.append)
+        self.manager.subscribe(external.append, external_only=True)
+        before = self.manager.snapshot()
+        self.assertFalse(self.manager.reload_from_file())
+
+        self._edit(ideal_price=1234)
+        self.assertTrue(self.manager.reload_from_file())
+        self.assertEqual(self.manager.snapshot().ideal_price, 1234)
+        self.assertIsNot(self.manager.snapshot(), before)
+        self.assertEqual([config.ideal_price for config in external], [1234])
+
+        # 界面修改只通知不限定外部修改的订阅者
+        self.manager.WRITE_DELAY = 60
+        self.manager.stage_update({"max_price": 5000})
+        self.assertEqual(self.manager.snapshot().max_price, 5000)
+        self.assertEqual(len(received), 2)
+        self.assertEqual(len(external), 1)
+        self.manager.flush()
+        self.assertFalse(self.manager.reload_from_file())
+
+    def test_invalid_edit_keeps_config(self):
+        """测试无法解析或校验失败的修改不生效"""
+        current = self.manager.snapshot()
+        write_text(self.path, "ideal_price: [1\n")
+        self.assertFalse(self.manager.reload_from_file())
+        write_text(self.path, "ideal_price: -1\n")
+        self.assertFalse(self.manager.reload_from_file())
+        self.assertIs(self.manager.snapshot(), current)
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_delay_helper_hot_reload(self, mock_factory):
+        """测试延迟配置被外部修改后 DelayHelper 使用新值"""
+        delay_path = os.path.join(self.temp_dir, "delay_config.yaml")
+        manager = DelayConfigManager(delay_path)
+        manager.save_config(DelayConfig(delays={"rolling_mode": {"after_refresh": 0.5}, "hoarding_mode": {}}))
+        mock_factory.get_config_manager.return_value = manager
+        helper = DelayHelper(TradingMode.ROLLING)
+        self.assertEqual(helper.get_delay("after_refresh"), 0.5)
+
+        DelayConfigManager(delay_path).save_config(
+            DelayConfig(delays={"rolling_mode": {"after_refresh": 0.2}, "hoarding_mode": {}})
+        )
+        stat = os.stat(delay_path)
+        os.utime(delay_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertTrue(manager.reload_from_file())
+        self.assertEqual(helper.get_delay("after_refresh"), 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
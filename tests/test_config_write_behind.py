@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+配置延迟写回单元测试
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.config.config_manager import TradingConfigManager
+from src.config.serializer import atomic_write
+from src.config.write_behind import WriteBehind
+
+
+class TestWriteBehind(unittest.TestCase):
+    """延迟写回测试类"""
+
+    def test_requests_coalesced(self):
+        """测试静默期内的多次请求合并为一次写入"""
+        writes = []
+        writer = WriteBehind(lambda: writes.append(time.monotonic()), delay=0.05)
+        for _ in range(10):
+            writer.schedule()
+        self.assertEqual(writes, [])
+
+        time.sleep(0.2)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(writer.stats(), {"requests": 10, "writes": 1, "failures": 0})
+
+        # 没有待写入内容时 flush 不写
+        writer.flush()
+        writer.schedule()
+        writer.close()
+        self.assertEqual(len(writes), 2)
+
+
+class TestConfigWriteBehind(unittest.TestCase):
+    """配置管理器延迟写回测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, "settings.yaml")
+        self.manager = TradingConfigManager(self.config_path)
+        self.manager.WRITE_DELAY = 0.05
+        self.manager.save_config(self.manager.load_config())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _load_from_disk(self):
+        return TradingConfigManager(self.config_path).load_config()
+
+    def test_stage_update_writes_once(self):
+        """测试逐字输入只修改内存，静默后写一次文件"""
+        for price in ("1", "15", "152", "1520"):
+            config = self.manager.stage_update({"ideal_price": int(price)})
+        self.assertEqual(config.ideal_price, 1520)
+        self.assertEqual(self.manager.load_config().ideal_price, 1520)
+        self.assertNotEqual(self._load_from_disk().ideal_price, 1520)
+        self.assertTrue(self.manager.has_pending_writes())
+
+        deadline = time.monotonic() + 2
+        while self.manager.has_pending_writes() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(self._load_from_disk().ideal_price, 1520)
+        self.assertEqual(self.manager.write_stats()["writes"], 1)
+
+    def test_flush_and_update_include_staged(self):
+        """测试退出前 flush 立即写入，同步更新会一并写入暂存的修改"""
+        self.manager.WRITE_DELAY = 60
+        self.manager.stage_update({"ideal_price": 1000})
+        self.assertTrue(self.manager.flush())
+        self.assertFalse(self.manager.flush())
+        self.assertEqual(self._load_from_disk().ideal_price, 1000)
+
+        self.manager.stage_update({"max_price": 3000})
+        self.manager.update_config({"hoarding_loop_interval": 120})
+        config = self._load_from_disk()
+        self.assertEqual((config.max_price, config.hoarding_loop_interval), (3000, 120))
+        self.assertFalse(self.manager.has_pending_writes())
+
+    def test_atomic_write_keeps_file_on_failure(self):
+        """测试写入失败时原文件不变，也不留下临时文件"""
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            original = f.read()
+
+        def broken(f):
+            f.write("ideal_price: ")
+            raise RuntimeError("写入中断")
+
+        with self.assertRaises(RuntimeError):
+            atomic_write(self.config_path, broken)
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual(os.listdir(self.temp_dir), ["settings.yaml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
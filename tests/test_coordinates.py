@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+坐标表单元测试
+"""
+import unittest
+
+from src.config.coordinates import CoordinateConfig, Point, Region, ScreenPoint, ScreenRegion
+
+
+class TestCoordinateTable(unittest.TestCase):
+    """坐标表测试类"""
+
+    def test_compile_cached_per_resolution_and_offset(self):
+        """测试同一分辨率和偏移只编译一次，偏移不同时分别编译"""
+        table = CoordinateConfig.compile(1920, 1080, (10, 20))
+        self.assertIs(CoordinateConfig.compile(1920, 1080, [10, 20]), table)
+        self.assertIsNot(CoordinateConfig.compile(1920, 1080), table)
+        self.assertIs(CoordinateConfig.compile(1920, 1080, None), CoordinateConfig.compile(1920, 1080, (0, 0)))
+        self.assertIs(
+            CoordinateConfig.restore_coordinates(1920, 1080), CoordinateConfig.compile(1920, 1080).coordinates
+        )
+
+    def test_screen_coordinates_include_offset(self):
+        """测试屏幕坐标加上了窗口偏移，区域规范为左上、右下顺序，位移不加偏移"""
+        table = CoordinateConfig.compile(2560, 1440, (100, 50))
+        rolling = table.coordinates.rolling_mode
+        screen = table.screen.rolling_mode
+
+        self.assertEqual(rolling.sell_button, Point(1965, 939))
+        self.assertIs(type(screen.sell_button), ScreenPoint)
+        self.assertEqual(screen.sell_button, (2065, 989))
+        self.assertEqual(screen.options[1], (217, 550))
+
+        # 配置中上下颠倒的区域
+        self.assertEqual(rolling.sell_price_text_area, Region(1550, 888, 1950, 829))
+        self.assertIs(type(screen.sell_price_text_area), ScreenRegion)
+        self.assertEqual(screen.sell_price_text_area, (1650, 879, 2050, 938))
+
+        self.assertEqual(screen.item_sell_offset, rolling.item_sell_offset)
+        self.assertIs(type(screen.item_sell_offset), Point)
+
+    def test_group_access(self):
+        """测试坐标组支持按属性和按名称访问，且不可修改"""
+        coordinates = CoordinateConfig.compile(2560, 1440).coordinates
+        self.assertIs(coordinates["rolling_mode"]["price_area"], coordinates.rolling_mode.price_area)
+        self.assertIn("enter_storage", coordinates.rolling_mode)
+        self.assertEqual(coordinates.get("enter_game"), (744, 584))
+        with self.assertRaises(AttributeError):
+            coordinates.rolling_mode.price_area = (0, 0, 1, 1)
+        with self.assertRaises(TypeError):
+            coordinates["enter_game"] = (0, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
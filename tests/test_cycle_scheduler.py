@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+交易周期调度单元测试
+"""
+import unittest
+
+from src.utils.cycle_scheduler import CycleScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCycleScheduler(unittest.TestCase):
+    """交易周期调度测试类"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = CycleScheduler(0.15, clock=self.clock)
+
+    def test_deadline_subtracts_work_time(self):
+        """测试等待时间扣除本轮耗时，实际开始晚于计划时记为抖动"""
+        self.scheduler.begin_cycle()
+        self.clock.now = 0.1
+        self.assertAlmostEqual(self.scheduler.on_success(), 0.05)
+
+        self.clock.now = 0.152
+        self.scheduler.begin_cycle()
+        self.clock.now = 0.2
+        self.assertAlmostEqual(self.scheduler.on_success(), 0.102)
+
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["cycles"], stats["overruns"]), (2, 0))
+        self.assertAlmostEqual(stats["jitter_max_ms"], 2, places=1)
+
+    def test_overrun_starts_next_cycle_immediately(self):
+        """测试超过循环间隔时下一轮立即开始，不补跑错过的周期"""
+        self.scheduler.begin_cycle()
+        self.clock.now = 0.4
+        self.assertEqual(self.scheduler.on_success(), 0)
+        self.scheduler.begin_cycle()
+        self.clock.now = 0.45
+        self.assertAlmostEqual(self.scheduler.on_success(), 0.1)
+
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["overruns"], 1)
+        self.assertAlmostEqual(stats["overrun_total_ms"], 250, places=1)
+        self.assertIn("超时1次", self.scheduler.format_stats())
+
+    def test_backoff_on_consecutive_failures(self):
+        """测试连续失败时等待时间按倍数增加且有上限，成功后复位"""
+        scheduler = CycleScheduler(1.0, max_backoff=3.0, clock=self.clock)
+        delays = []
+        for _ in range(4):
+            scheduler.begin_cycle()
+            delays.append(scheduler.on_failure())
+        self.assertEqual(delays, [1.0, 2.0, 3.0, 3.0])
+
+        scheduler.begin_cycle()
+        scheduler.on_success()
+        scheduler.begin_cycle()
+        self.assertEqual(scheduler.on_failure(), 1.0)
+        self.assertEqual(scheduler.stats()["failures"], 5)
+
+    def test_gap_mode_and_reset(self):
+        """测试按结束时刻计算间隔的模式，以及复位清空统计"""
+        self.scheduler.reset(0.05, start_to_start=False)
+        self.scheduler.begin_cycle()
+        self.clock.now = 1.0
+        self.assertEqual(self.scheduler.on_success(), 0.05)
+        self.assertEqual(self.scheduler.stats()["overruns"], 0)
+
+        self.scheduler.reset()
+        self.assertEqual(self.scheduler.stats()["cycles"], 0)
+        self.assertEqual(self.scheduler.period, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
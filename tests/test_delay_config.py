@@ -320,6 +320,20 @@ class TestDelayConfigManager(unittest.TestCase):
 
         self.assertEqual(updated_config.get_delay("hoarding_mode", "enter_action"), 0.123)
 
+    def test_save_preserves_nested_comments(self):
+        """测试保存配置时保留嵌套字段的注释"""
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write("delays:\n  rolling_mode:\n    # 购买后的延迟\n    after_buy: 2.0\n")
+
+        config = self.manager.load_config()
+        config.set_tuned_delay("rolling_mode", "after_buy", 1.5)
+        self.manager.save_config(config)
+
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("# 购买后的延迟", content)
+        self.assertEqual(self.manager.load_config().get_tuned_delay("rolling_mode", "after_buy"), 1.5)
+
     def test_reload_config(self):
         """测试重新加载配置"""
         # 创建初始配置
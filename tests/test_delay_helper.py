@@ -2,6 +2,7 @@
 """
 DelayHelper 单元测试
 """
+import ast
 import os
 import tempfile
 import threading
@@ -10,7 +11,7 @@ from unittest.mock import Mock, patch
 
 from src.config.delay_config import DelayConfig
 from src.config.trading_config import TradingMode
-from src.utils.delay_helper import DelayHelper, delay_helper
+from src.utils.delay_helper import DelayHelper, DelayTuner, delay_helper
 
 
 class TestDelayHelper(unittest.TestCase):
@@ -51,7 +52,7 @@ class TestDelayHelper(unittest.TestCase):
         mock_manager.load_config.assert_called()
 
     @patch("src.utils.delay_helper.ConfigFactory")
-    @patch("time.sleep")
+    @patch("src.core.cancellation.CancellationToken.checked_sleep")
     def test_sleep(self, mock_sleep, mock_factory):
         """测试延迟执行"""
         mock_manager = Mock()
@@ -69,6 +70,49 @@ class TestDelayHelper(unittest.TestCase):
         helper.sleep("buy_operation")
         mock_sleep.assert_not_called()
 
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_wait_until(self, mock_factory):
+        """测试条件等待：满足即返回，未满足时以延迟为超时"""
+        mock_manager = Mock()
+        mock_manager.load_config.return_value = self.test_config
+        mock_factory.get_config_manager.return_value = mock_manager
+
+        helper = DelayHelper(TradingMode.ROLLING)
+        calls = []
+
+        def ready_on_third_poll():
+            calls.append(1)
+            return len(calls) >= 3
+
+        self.assertTrue(helper.wait_until("buy_operation", ready_on_third_poll, poll_interval=0.001))
+        self.assertEqual(len(calls), 3)
+        self.assertFalse(helper.wait_until("balance_detection", lambda: False, poll_interval=0.05))
+
+        def broken():
+            raise RuntimeError("截图失败")
+
+        self.assertFalse(helper.wait_until("balance_detection", broken, poll_interval=0.05))
+
+        stats = helper.get_wait_stats()
+        self.assertEqual(stats["buy_operation"]["early"], 1)
+        self.assertLess(stats["buy_operation"]["waited"], 1.0)
+        self.assertEqual(stats["balance_detection"]["waits"], 2)
+        self.assertEqual(stats["balance_detection"]["early"], 0)
+        self.assertGreaterEqual(stats["balance_detection"]["waited"], 0.6)
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    @patch("src.core.cancellation.CancellationToken.checked_sleep")
+    def test_wait_until_without_condition(self, mock_sleep, mock_factory):
+        """测试未知条件时退化为固定延迟"""
+        mock_manager = Mock()
+        mock_manager.load_config.return_value = self.test_config
+        mock_factory.get_config_manager.return_value = mock_manager
+
+        helper = DelayHelper(TradingMode.HOARDING)
+        self.assertTrue(helper.wait_until("enter_action"))
+        mock_sleep.assert_called_once_with(0.05)
+        self.assertEqual(helper.get_wait_stats()["enter_action"]["waits"], 1)
+
     @patch("src.utils.delay_helper.ConfigFactory")
     def test_get_mode_delays(self, mock_factory):
         """测试获取模式延迟配置"""
@@ -261,6 +305,203 @@ class TestDelayHelper(unittest.TestCase):
         self.assertIn("DelayHelper", repr_str)
 
 
+class TestDelayTuner(unittest.TestCase):
+    """延迟自动调优测试"""
+
+    def test_aimd_with_guard_rails(self):
+        """测试连续成功减小、失败放大以及上下限"""
+        tuner = DelayTuner(success_streak=2, decrease_ratio=0.1, increase_factor=2.0, min_ratio=0.5, max_ratio=1.5)
+        for _ in range(4):
+            tuner.record("rolling_mode", "sell_window_wait", 1.0, True)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 0.8)
+
+        for _ in range(20):
+            tuner.record("rolling_mode", "sell_window_wait", 1.0, True)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 0.5)
+
+        tuner.record("rolling_mode", "sell_window_wait", 1.0, False)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 1.0)
+        tuner.record("rolling_mode", "sell_window_wait", 1.0, False)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 1.5)
+
+        # 失败后需要两倍的连续成功才会再次减小
+        for _ in range(3):
+            tuner.record("rolling_mode", "sell_window_wait", 1.0, True)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 1.5)
+        tuner.record("rolling_mode", "sell_window_wait", 1.0, True)
+        self.assertAlmostEqual(tuner.current("rolling_mode", "sell_window_wait", 1.0), 1.4)
+
+    def test_learned_value_is_clamped(self):
+        """测试学习值超出区间时被限制"""
+        tuner = DelayTuner(min_ratio=0.5, max_ratio=2.0)
+        self.assertEqual(tuner.current("rolling_mode", "after_buy", 2.0, learned=0.1), 1.0)
+
+
+class TestDelayHelperAutoTune(unittest.TestCase):
+    """DelayHelper 自动调优测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, "delay_config.yaml")
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_tuning_persists_through_config_manager(self, mock_factory):
+        """测试按模式开关、学习值持久化和节省时间统计"""
+        from src.config.config_manager import DelayConfigManager
+
+        manager = DelayConfigManager(self.config_path)
+        manager.save_config(DelayConfig(delays={"rolling_mode": {"sell_window_wait": 1.0}, "hoarding_mode": {}}))
+        mock_factory.get_config_manager.return_value = manager
+
+        helper = DelayHelper(TradingMode.ROLLING)
+        helper.report_outcome("sell_window_wait", True)
+        self.assertEqual(helper.get_delay("sell_window_wait"), 1.0)
+
+        helper.set_auto_tune(TradingMode.ROLLING, True)
+        for _ in range(10):
+            helper.report_outcome("sell_window_wait", True)
+        tuned = helper.get_delay("sell_window_wait")
+        self.assertLess(tuned, 1.0)
+
+        with patch("src.core.cancellation.CancellationToken.checked_sleep"):
+            helper.sleep("sell_window_wait")
+        self.assertAlmostEqual(helper.get_saved_time(TradingMode.ROLLING), 1.0 - tuned)
+        self.assertIn("sell_window_wait", helper.format_tuning_report())
+
+        self.assertTrue(helper.save_tuned())
+        reloaded = DelayConfigManager(self.config_path).load_config()
+        self.assertTrue(reloaded.is_auto_tune("rolling_mode"))
+        self.assertFalse(reloaded.is_auto_tune("hoarding_mode"))
+        self.assertAlmostEqual(reloaded.get_tuned_delay("rolling_mode", "sell_window_wait"), tuned)
+        self.assertEqual(reloaded.get_delay("rolling_mode", "sell_window_wait"), 1.0)
+
+        # 新实例从学习到的值继续
+        self.assertAlmostEqual(DelayHelper(TradingMode.ROLLING).get_delay("sell_window_wait"), tuned)
+
+
+class TestDelayTable(unittest.TestCase):
+    """编译延迟表测试类"""
+
+    def setUp(self):
+        self.config = DelayConfig(
+            delays={
+                "hoarding_mode": {"enter_action": 0.05},
+                "rolling_mode": {"sell_window_wait": 1.0, "after_refresh": 0},
+            }
+        )
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_table_swapped_on_change(self, mock_factory):
+        """测试读取不加锁，切换模式、热更新和调优后整体替换延迟表"""
+        mock_factory.get_config_manager.return_value.load_config.return_value = self.config
+        helper = DelayHelper(TradingMode.ROLLING)
+        table = helper._table
+        self.assertEqual(table.entries["after_refresh"], (0.0, 0.0))
+        with self.assertRaises(TypeError):
+            table.entries["after_refresh"] = (1.0, 1.0)
+
+        # 其它线程持有锁时读取不受影响
+        with helper._lock:
+            result = []
+            thread = threading.Thread(target=lambda: result.append(helper.get_delay("sell_window_wait")))
+            thread.start()
+            thread.join(1.0)
+        self.assertEqual(result, [1.0])
+
+        helper.set_mode(TradingMode.HOARDING)
+        self.assertEqual(helper.get_delay("enter_action"), 0.05)
+        with self.assertRaises(ValueError):
+            helper.get_delay("sell_window_wait")
+        helper.set_mode(TradingMode.ROLLING)
+
+        helper._on_config_reloaded(DelayConfig(delays={"rolling_mode": {"sell_window_wait": 0.5}}))
+        self.assertEqual(helper.get_delay("sell_window_wait"), 0.5)
+
+        helper.set_auto_tune(TradingMode.ROLLING, True)
+        before = helper._table
+        for _ in range(5):
+            helper.report_outcome("sell_window_wait", True)
+        self.assertIsNot(helper._table, before)
+        self.assertLess(helper.get_delay("sell_window_wait"), 0.5)
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_upper_bound_delay(self, mock_factory):
+        """测试最长延迟按配置值乘以调优上限计算，配置重新加载后随之变化"""
+        mock_factory.get_config_manager.return_value.load_config.return_value = self.config
+        helper = DelayHelper(TradingMode.ROLLING)
+        self.assertEqual(helper.get_delay("sell_window_wait", upper_bound=True), 2.0)
+        self.assertEqual(helper.get_delay("after_refresh", upper_bound=True), 0.0)
+
+        helper._on_config_reloaded(DelayConfig(delays={"rolling_mode": {"sell_window_wait": 0.5}}))
+        self.assertEqual(helper.get_delay("sell_window_wait", upper_bound=True), 1.0)
+
+    @patch("src.utils.delay_helper.ConfigFactory")
+    def test_missing_operations(self, mock_factory):
+        """测试检查代码中用到的操作是否都已配置"""
+        mock_factory.get_config_manager.return_value.load_config.return_value = self.config
+        helper = DelayHelper(TradingMode.ROLLING)
+        self.assertEqual(helper.missing_operations(["sell_window_wait", "after_buy", "after_buy"]), ["after_buy"])
+        self.assertEqual(helper.missing_operations(["enter_action"], TradingMode.HOARDING), [])
+
+
+class TestDelayOperationsInTradingModes(unittest.TestCase):
+    """交易模式用到的延迟操作与配置一致性测试"""
+
+    ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _scan_trading_modes(self):
+        """不导入模块（依赖win32），分析源码中用到的延迟操作名、宏中的延迟和声明的操作列表"""
+        with open(os.path.join(self.ROOT, "src", "services", "trading_modes.py"), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        used, macro, declared = set(), set(), {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name):
+                name = node.targets[0].id
+                if name.endswith("_DELAY_OPERATIONS"):
+                    # 滚仓模式的列表形如 (...) + delay_operations(宏)，宏中的延迟单独收集
+                    value = node.value.left if isinstance(node.value, ast.BinOp) else node.value
+                    declared[name] = set(ast.literal_eval(value))
+            if not isinstance(node, ast.Call):
+                continue
+            func = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", "")
+            args = [arg.value if isinstance(arg, ast.Constant) else None for arg in node.args]
+            if func in ("sleep", "wait_until", "report_outcome", "_wait") and args and isinstance(args[0], str):
+                used.add(args[0])
+            elif func == "_click_and_wait_change" and len(args) == 3 and isinstance(args[1], str):
+                used.add(args[1])
+            elif func == "MacroStep" and args[:1] == ["delay"]:
+                macro.add(args[1])
+        return used, macro, declared
+
+    def test_operations_declared_and_configured(self):
+        """测试源码中的延迟操作都已声明，且默认配置和随附的配置文件都包含"""
+        from src.config.config_manager import DelayConfigManager
+
+        used, macro, declared = self._scan_trading_modes()
+        hoarding = declared["HOARDING_DELAY_OPERATIONS"]
+        rolling = declared["ROLLING_DELAY_OPERATIONS"] | macro
+        self.assertEqual(sorted(used - hoarding - rolling), [])
+
+        default = DelayConfigManager(os.path.join(self.temp_dir, "delay.yaml"))._create_default_config()
+        shipped = DelayConfigManager(os.path.join(self.ROOT, "config", "delay_config.yaml")).load_config()
+        for config in (default, shipped):
+            self.assertEqual([op for op in sorted(hoarding) if not config.has_operation("hoarding_mode", op)], [])
+            self.assertEqual([op for op in sorted(rolling) if not config.has_operation("rolling_mode", op)], [])
+
+
 class TestGlobalDelayHelper(unittest.TestCase):
     """全局DelayHelper实例和便捷函数测试"""
 
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+异步检测流水线单元测试
+"""
+import threading
+import time
+import unittest
+
+from src.utils.detection_pipeline import DetectionPipeline
+
+
+class TestDetectionPipeline(unittest.TestCase):
+    """检测流水线测试类"""
+
+    def setUp(self):
+        self.pipeline = DetectionPipeline(max_workers=2)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+
+    def test_detection_overlaps_caller(self):
+        """测试识别在后台执行，调用方继续执行后续操作"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def detect(value):
+            started.set()
+            release.wait(1)
+            return value * 2
+
+        pending = self.pipeline.submit("revenue", detect, 21)
+        self.assertTrue(started.wait(1))
+        self.assertFalse(pending.done())
+        # 模拟调用方的鼠标操作完成后再取值
+        release.set()
+        self.assertEqual(pending.get(timeout=1), 42)
+
+        stats = self.pipeline.stats()["revenue"]
+        self.assertEqual(stats["count"], 1)
+        self.assertIn("revenue", self.pipeline.format_stats())
+
+    def test_hidden_latency(self):
+        """测试识别耗时被调用方的等待隐藏"""
+        pending = self.pipeline.submit("balance", lambda: time.sleep(0.05) or 100)
+        time.sleep(0.1)
+        self.assertEqual(pending.get(), 100)
+
+        stats = self.pipeline.stats()["balance"]
+        self.assertGreaterEqual(stats["compute_ms"], 40)
+        self.assertLess(stats["blocked_ms"], stats["compute_ms"])
+        self.assertGreater(stats["hidden_ms"], 0)
+
+    def test_exception_raised_on_get(self):
+        """测试检测异常在取值时抛出"""
+
+        def fail():
+            raise ValueError("ocr检测失败")
+
+        pending = self.pipeline.submit("price", fail)
+        with self.assertRaises(ValueError):
+            pending.get(timeout=1)
+
+    def test_disabled_runs_inline(self):
+        """测试关闭时在调用线程同步执行"""
+        pipeline = DetectionPipeline(enabled=False)
+        threads = []
+        pending = pipeline.submit("price", lambda: threads.append(threading.current_thread()) or 1)
+
+        self.assertTrue(pending.done())
+        self.assertEqual(pending.get(), 1)
+        self.assertIs(threads[0], threading.current_thread())
+        self.assertIsNone(pipeline._executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+检测器单元测试
+"""
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from src.core.exceptions import PriceDetectionException
+from src.services.detector import RollingModeDetector
+from src.services.trading_modes import RollingTradingMode
+from src.utils.detection_pipeline import DetectionPipeline
+
+
+class TestPipelinedDetection(unittest.TestCase):
+    """先截图再识别的检测测试类"""
+
+    def setUp(self):
+        self.screen_capture = Mock(width=2560, height=1440, window_region=None)
+        self.ocr_engine = Mock()
+        self.detector = RollingModeDetector(self.screen_capture, self.ocr_engine)
+        self.screenshot = np.zeros((10, 10, 4), dtype=np.uint8)
+
+    def test_screenshot_read_once(self):
+        """测试传入截图时只识别这张截图，失败不重新截图"""
+        self.ocr_engine.image_to_string.return_value = "12345"
+        self.assertEqual(self.detector.read_field("expected_revenue", self.screenshot), 12345)
+
+        self.ocr_engine.image_to_string.return_value = ""
+        with self.assertRaises(PriceDetectionException):
+            self.detector.read_field("expected_revenue", self.screenshot)
+        self.assertEqual(self.ocr_engine.image_to_string.call_count, 2)
+        self.screen_capture.capture_region.assert_not_called()
+
+    def test_redetect_on_trading_thread(self):
+        """测试流水线识别失败后先恢复界面，再在交易线程重新检测"""
+        pipeline = DetectionPipeline(enabled=False)
+        self.ocr_engine.image_to_string.return_value = ""
+        pending = pipeline.submit("expected_revenue_area", self.detector.detect_expected_revenue, self.screenshot)
+        calls = []
+        result = RollingTradingMode._get_detection(
+            pending, lambda: calls.append("detect") or 520, lambda: calls.append("restore")
+        )
+        self.assertEqual(result, 520)
+        self.assertEqual(calls, ["restore", "detect"])
+
+        succeeded = pipeline.submit("balance", lambda: 100)
+        self.assertEqual(RollingTradingMode._get_detection(succeeded, Mock()), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,7 +14,7 @@ from PyQt5.QtWidgets import QApplication
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.core.event_bus import event_bus
+from src.core.event_bus import LazyText, event_bus
 from src.ui.overlay import TransparentOverlay
 
 
@@ -67,12 +67,23 @@ class TestEventBus:
         QTimer.singleShot(200, self.app.quit)
         self.app.exec_()
 
-        # 验证结果
-        for text in test_texts:
-            assert text in self.received_texts, f"期望收到 '{text}'"
+        # 验证结果：连续发送的消息合并为最后一条
+        assert self.received_texts == test_texts[-1:], f"应只收到最后一条消息，实际: {self.received_texts}"
         assert self.overlay.label.text() == test_texts[-1], f"悬浮窗应显示最后一条消息 '{test_texts[-1]}'"
         print("✅ 多次文本更新测试通过")
 
+    def test_lazy_text(self):
+        """测试延迟格式化的文本在投递时格式化"""
+        print("=== 测试延迟格式化 ===")
+        event_bus.emit_overlay_text_updated(LazyText("当前价格: {}", 1000))
+
+        QTimer.singleShot(100, self.app.quit)
+        self.app.exec_()
+
+        assert self.received_texts == ["当前价格: 1000"]
+        assert self.overlay.label.text() == "当前价格: 1000"
+        print("✅ 延迟格式化测试通过")
+
     def test_empty_text(self):
         """测试空文本"""
         print("=== 测试空文本 ===")
@@ -116,6 +127,7 @@ class TestEventBus:
         """测试性能：快速连续发送消息"""
         print("=== 测试性能 ===")
         messages = [f"消息{i}" for i in range(10)]
+        before = event_bus.overlay_channel.stats()
 
         for msg in messages:
             event_bus.emit_overlay_text_updated(msg)
@@ -123,9 +135,10 @@ class TestEventBus:
         QTimer.singleShot(300, self.app.quit)
         self.app.exec_()
 
-        # 验证所有消息都被接收
-        for msg in messages:
-            assert msg in self.received_texts
+        # 验证只投递了最后一条消息，其余被合并
+        stats = event_bus.overlay_channel.stats()
+        assert stats["coalesced"] - before["coalesced"] == len(messages) - 1
+        assert self.received_texts == messages[-1:]
         # 验证最后一条消息显示
         assert self.overlay.label.text() == messages[-1]
         print("✅ 性能测试通过")
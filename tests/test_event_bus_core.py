@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+事件总线核心单元测试，不需要Qt
+"""
+import asyncio
+import subprocess
+import sys
+import threading
+import unittest
+
+from src.core.event_bus import EventBus, LazyText
+
+
+class TestEventBusCore(unittest.TestCase):
+    """事件总线核心测试类"""
+
+    def test_signal_connect_and_disconnect(self):
+        """测试订阅者按连接顺序调用，异常不影响其他订阅者，断开未连接的回调报错"""
+        bus = EventBus()
+        received = []
+
+        def broken(price):
+            raise RuntimeError("boom")
+
+        bus.price_updated.connect(received.append)
+        bus.price_updated.connect(broken)
+        bus.price_updated.connect(lambda price: received.append(price * 2))
+        bus.emit_price_updated(500)
+        self.assertEqual(received, [500, 1000])
+
+        bus.price_updated.disconnect(broken)
+        with self.assertRaises(TypeError):
+            bus.price_updated.disconnect(broken)
+        bus.price_updated.disconnect()
+        bus.emit_price_updated(600)
+        self.assertEqual(received, [500, 1000])
+
+    def test_default_schedule_delivers_from_timer_thread(self):
+        """测试没有界面时合并通道由定时线程投递"""
+        bus = EventBus()
+        delivered = threading.Event()
+        received = []
+        bus.overlay_text_updated.connect(lambda text: (received.append(text), delivered.set()))
+        bus.emit_overlay_text_updated(LazyText("价格: {}", 1))
+        self.assertTrue(delivered.wait(1))
+        self.assertEqual(received, ["价格: 1"])
+
+    def test_asyncio_delivery(self):
+        """测试绑定 asyncio 事件循环后，其他线程发布的事件在事件循环中处理"""
+        received = []
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            bus = EventBus()
+            bus.bind_asyncio(loop)
+            done = asyncio.Event()
+
+            def on_status(status):
+                received.append((status, threading.current_thread() is threading.main_thread()))
+                done.set()
+
+            bus.status_changed.connect(on_status)
+            thread = threading.Thread(target=bus.emit_status_changed, args=("运行中",))
+            thread.start()
+            thread.join()
+            await asyncio.wait_for(done.wait(), 1)
+
+            bus.overlay_text_updated.connect(received.append)
+            bus.emit_overlay_text_updated("a")
+            bus.emit_overlay_text_updated("b")
+            await asyncio.sleep(0.05)
+
+        asyncio.run(main())
+        self.assertEqual(received, [("运行中", True), "b"])
+
+    def test_no_qt_import(self):
+        """测试事件总线不加载PyQt5"""
+        code = "import sys; import src.core.event_bus; sys.exit('PyQt5' in sys.modules)"
+        self.assertEqual(subprocess.run([sys.executable, "-c", code]).returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+FakeGame 模拟游戏单元测试
+"""
+import time
+import unittest
+
+import cv2
+
+from src.simulation.fake_game import FakeGame, FakeGameActionExecutor, FakeScreenCapture
+
+
+class TestFakeGame(unittest.TestCase):
+    """模拟游戏测试类"""
+
+    def setUp(self):
+        self.game = FakeGame((2560, 1440), buy_failure_rate=0.0, seed=1)
+        self.capture = FakeScreenCapture(self.game)
+        self.executor = FakeGameActionExecutor(self.game)
+        self.rolling = self.game.coordinates["rolling_mode"]
+
+    def _contains_picture(self, area, name):
+        gray = cv2.cvtColor(self.capture.capture_region(area), cv2.COLOR_BGRA2GRAY)
+        result = cv2.matchTemplate(gray, self.game.atlas.pictures[name], cv2.TM_CCOEFF_NORMED)
+        return result.max() > 0.99
+
+    def test_price_area_renders_only_on_equipment_screen(self):
+        """测试价格区域只在配装界面显示"""
+        area = self.rolling["price_area"]
+        self.assertEqual(self.capture.capture_region(area)[..., :3].max(), FakeGame.BACKGROUND_COLOR[0])
+
+        self.executor.press_key("l")
+        frame = self.capture.capture_region(area)
+        self.assertEqual(frame.shape, (area[3] - area[1], area[2] - area[0], 4))
+        self.assertEqual(frame[..., :3].max(), 255)
+
+    def test_buy_and_sell_flow(self):
+        """测试购买、上架和领取邮件的完整流程"""
+        start_balance = self.game.balance
+        self.executor.press_key("l")
+        price = self.game.price
+        self.executor.click_position(self.rolling["buy_button"])
+        self.assertEqual(self.game.balance, start_balance - price)
+        self.assertFalse(self._contains_picture(self.rolling["failure_check"], "option_failed"))
+
+        self.executor.click_position(self.rolling["enter_storage"])
+        self.executor.click_position(self.rolling["transfer_all"])
+        self.assertEqual(self.game.storage_lots, [self.game.buy_count])
+
+        area = self.rolling["wait_sell_item_area"]
+        item_range = self.rolling["item_range"]
+        item_pos = (area[0] + item_range[0] // 2, area[1] + item_range[1] // 2)
+        self.executor.move_mouse(item_pos)
+        self.executor.multi_key_press("alt", "d")
+        self.assertTrue(self._contains_picture(self.rolling["failure_check"], "sell"))
+
+        self.executor.click_position(self.rolling["sell_button"])
+        self.executor.click_position(self.rolling["min_sell_price_button"])
+        self.executor.click_position(self.rolling["sell_num_right"])
+        revenue = self.game.expected_revenue(self.game.listing)
+        self.executor.click_position(self.rolling["final_sell_button"])
+        self.assertEqual(self.game.storage_lots, [])
+        self.assertEqual(self.game.mail_revenue, revenue)
+
+        self.executor.click_position(self.rolling["mail_button"])
+        self.executor.click_position(self.rolling["mail_trade_button"])
+        self.executor.click_position(self.rolling["mail_get_button"])
+        self.executor.press_key("esc")
+        self.assertEqual(self.game.balance, start_balance - price + revenue)
+        self.assertEqual(self.game.screen, FakeGame.LOBBY)
+
+    def test_purchase_failure_popup(self):
+        """测试购买失败弹窗"""
+        self.game.buy_failure_rate = 1.0
+        self.executor.press_key("l")
+        self.executor.click_position(self.rolling["buy_button"])
+        self.assertTrue(self._contains_picture(self.rolling["failure_check"], "option_failed"))
+
+        self.executor.press_key("esc")
+        self.assertFalse(self.game.purchase_failed)
+        self.assertEqual(self.game.screen, FakeGame.LOBBY)
+
+    def test_storage_cells_use_detector_empty_color(self):
+        """测试仓库空格子颜色与检测器一致"""
+        self.game.screen = FakeGame.STORAGE
+        frame = self.capture.capture_region(self.rolling["wait_sell_item_area"])
+        self.assertEqual(tuple(frame[40, 40, :3]), FakeGame.EMPTY_CELL_COLOR)
+
+    def test_ui_latency_delays_transitions(self):
+        """测试界面响应延迟"""
+        self.game.ui_latency = 0.05
+        self.executor.press_key("l")
+        self.assertEqual(self.game.screen, FakeGame.LOBBY)
+
+        # 延迟期间画面未切换，点击购买被忽略
+        self.executor.click_position(self.rolling["buy_button"])
+        self.assertEqual(self.game.stats["ignored_actions"], 1)
+
+        time.sleep(0.06)
+        self.capture.capture_region(self.rolling["price_area"])
+        self.assertEqual(self.game.screen, FakeGame.EQUIPMENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+会话记录与回放单元测试
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+
+from src.core.interfaces import IOCREngine
+from src.infrastructure.session_recorder import (
+    RecordingActionExecutor,
+    RecordingDetector,
+    RecordingOCREngine,
+    RecordingScreenCapture,
+    SessionRecorder,
+)
+from src.simulation.fake_game import FakeGame, FakeGameActionExecutor, FakeScreenCapture
+from src.simulation.flight_recorder import SessionReplay
+
+
+class BrightnessOCREngine(IOCREngine):
+    """按亮像素数量输出结果的简单识别引擎"""
+
+    def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
+        return str(int((image[..., :3] > thresh).sum()))
+
+    def detect_template(self, image: np.ndarray, template_name: str) -> bool:
+        return bool(image[..., :3].max() == 255)
+
+    def find_template(self, image: np.ndarray, template_name: str) -> tuple:
+        return (1, 1) if self.detect_template(image, template_name) else (0, 0)
+
+    @staticmethod
+    def get_pixel_color(image: np.ndarray, x: int, y: int):
+        return tuple(image[y, x])
+
+
+class BlankOCREngine(BrightnessOCREngine):
+    """总是识别为0的引擎，用于制造不一致"""
+
+    def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
+        return "0"
+
+
+class CapturingOCREngine(BrightnessOCREngine):
+    """识别时截一次图，模拟识别线程识别期间交易线程截了新图"""
+
+    def __init__(self, screen_capture):
+        self.screen_capture = screen_capture
+
+    def image_to_string(self, image: np.ndarray, binarize: bool = True, font: str = "", thresh=127) -> str:
+        self.screen_capture.capture_region(PriceAreaDetector.area)
+        return super().image_to_string(image, binarize, font, thresh)
+
+
+class PriceAreaDetector:
+    """读取价格区域的简单检测器"""
+
+    area = [1000, 200, 1400, 260]
+
+    def __init__(self, screen_capture, ocr_engine):
+        self.screen_capture = screen_capture
+        self.ocr_engine = ocr_engine
+
+    def detect_price(self, screenshot: np.ndarray = None) -> int:
+        if screenshot is None:
+            screenshot = self.screen_capture.capture_region(self.area)
+        return int(self.ocr_engine.image_to_string(screenshot))
+
+    def has_price(self) -> bool:
+        return self.ocr_engine.detect_template(self.screen_capture.capture_region(self.area), "price")
+
+
+class TestFlightRecorder(unittest.TestCase):
+    """会话记录测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.game = FakeGame(seed=2)
+        PriceAreaDetector.area = self.game.coordinates["rolling_mode"]["price_area"]
+        self.recorder = SessionRecorder(os.path.join(self.temp_dir, "session"), {"resolution": [2560, 1440]})
+        self.engine = BrightnessOCREngine()
+        self.capture = RecordingScreenCapture(FakeScreenCapture(self.game), self.recorder)
+        self.executor = RecordingActionExecutor(FakeGameActionExecutor(self.game), self.recorder)
+        self.detector = RecordingDetector(
+            PriceAreaDetector(self.capture, RecordingOCREngine(self.engine, self.recorder)), self.recorder
+        )
+
+    def tearDown(self):
+        self.recorder.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record_session(self):
+        self.detector.detect_price()
+        self.executor.press_key("l")
+        self.executor.multi_key_press("alt", "d")
+        prices = [self.detector.detect_price(), self.detector.detect_price()]
+        self.detector.has_price()
+        return prices, self.recorder.close()
+
+    def test_archive_contents(self):
+        """测试归档内容和截图去重"""
+        prices, archive = self._record_session()
+        self.assertTrue(archive.endswith(".zip"))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "session")))
+        self.assertEqual(prices[0], prices[1])
+
+        with zipfile.ZipFile(archive) as zf:
+            events = [json.loads(line) for line in zf.read("events.jsonl").decode("utf-8").splitlines()]
+            frames = [name for name in zf.namelist() if name.endswith(".png")]
+        kinds = [event["type"] for event in events]
+        self.assertEqual(kinds.count("capture"), 4)
+        self.assertEqual(kinds.count("detector"), 4)
+        # 大厅画面和配装界面画面各一张
+        self.assertEqual(len(frames), 2)
+        actions = [event["method"] for event in events if event["type"] == "action"]
+        self.assertEqual(actions, ["press_key", "multi_key_press"])
+        timestamps = [event["t"] for event in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_replay_matches_recording(self):
+        """测试回放结果与记录一致"""
+        _, archive = self._record_session()
+        replay = SessionReplay(archive)
+        try:
+            ocr_report = replay.replay_ocr(self.engine)
+            self.assertEqual(ocr_report.total, 4)
+            self.assertEqual(ocr_report.mismatches, [])
+
+            detector_report = replay.replay_detector(self.engine, PriceAreaDetector)
+            self.assertEqual(detector_report.total, 4)
+            self.assertEqual(detector_report.matched, 4)
+        finally:
+            replay.close()
+
+    def test_replay_pipelined_detection(self):
+        """测试传入截图的识别按记录的截图回放，期间其他线程截图也不影响"""
+        screenshot = self.capture.capture_region(PriceAreaDetector.area)
+        self.executor.press_key("l")
+        engine = RecordingOCREngine(CapturingOCREngine(self.capture), self.recorder)
+        price = RecordingDetector(PriceAreaDetector(self.capture, engine), self.recorder).detect_price(screenshot)
+        archive = self.recorder.close()
+
+        replay = SessionReplay(archive)
+        try:
+            report = replay.replay_detector(BrightnessOCREngine(), PriceAreaDetector)
+            self.assertEqual(report.total, 1)
+            self.assertEqual(report.mismatches, [])
+            self.assertEqual(replay.archive.of_type("detector")[0]["result"], price)
+        finally:
+            replay.close()
+
+    def test_pixel_color_reads_screenshot(self):
+        """测试像素读取与接口一致，直接读取截图"""
+        image = np.zeros((4, 4, 3), dtype=np.uint8)
+        image[1, 2] = (10, 20, 30)
+        engine = RecordingOCREngine(self.engine, self.recorder)
+        self.assertEqual(engine.get_pixel_color(image, 2, 1), (10, 20, 30))
+        self.assertEqual(RecordingOCREngine.get_pixel_color(image[..., 0], 2, 1), 10)
+
+    def test_replay_reports_mismatches(self):
+        """测试回放发现不一致"""
+        _, archive = self._record_session()
+        replay = SessionReplay(archive)
+        try:
+            report = replay.replay_ocr(BlankOCREngine())
+            self.assertGreater(len(report.mismatches), 0)
+            self.assertIn("不一致", report.summary())
+        finally:
+            replay.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
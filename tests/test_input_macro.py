@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+输入宏单元测试
+"""
+import time
+import unittest
+from unittest.mock import call, patch
+
+from src.core.input_macro import (
+    InputMacro,
+    MacroRunner,
+    MacroStep,
+    chord_hold_ms,
+    compile_macro,
+    delay_operations,
+    delay_steps,
+)
+
+COORDINATES = {
+    "balance_active": [2200, 70],
+    "rolling_mode": {"mail_button": [100, 200], "mail_get_button": [300, 400]},
+}
+
+MACRO = InputMacro(
+    "mail",
+    (
+        MacroStep("click", "mail_button"),
+        MacroStep("delay", "after_mail_button_click"),
+        MacroStep("chord", ("ctrl", "a")),
+        MacroStep("move", "balance_active"),
+        MacroStep("key", "esc"),
+    ),
+)
+
+
+class StepwiseExecutor:
+    """逐步执行的执行器，记录调用"""
+
+    def __init__(self):
+        self.window_offset = None
+        self.calls = []
+
+    def click_position(self, position, right_click=False):
+        self.calls.append(("click", position))
+
+    def move_mouse(self, position):
+        self.calls.append(("move", position))
+
+    def press_key(self, key):
+        self.calls.append(("key", key))
+
+    def chord(self, keys, hold_ms=0):
+        self.calls.append(("chord",) + tuple(keys) + (hold_ms,))
+
+    def enter_text(self, text, mode="auto"):
+        self.calls.append(("text", text, mode))
+
+
+class BatchExecutor(StepwiseExecutor):
+    """支持批量提交的执行器"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def execute_batch(self, steps, should_stop=None, trace=None):
+        self.batches.append(list(steps))
+        for index, step in enumerate(steps):
+            if should_stop is not None and should_stop():
+                return index
+            start = time.perf_counter()
+            if step.action == "wait":
+                time.sleep(step.target)
+            self.calls.append((step.action, step.target, step.absolute))
+            trace.append((start, time.perf_counter()))
+        return len(steps)
+
+
+@patch("src.core.input_macro.delay_helper")
+class TestInputMacro(unittest.TestCase):
+    """输入宏测试类"""
+
+    def test_compile_resolves_coordinates_and_offset(self, mock_delay_helper):
+        """测试编译时解析坐标名和窗口偏移"""
+        compiled = compile_macro(MACRO, COORDINATES, (10, 20))
+        self.assertEqual(compiled.steps[0].position, (100, 200))
+        self.assertEqual(compiled.steps[0].screen, (110, 220))
+        self.assertEqual(compiled.steps[3].screen, (2210, 90))
+        with self.assertRaises(KeyError):
+            compile_macro(InputMacro("bad", (MacroStep("click", "missing"),)), COORDINATES)
+        with self.assertRaises(ValueError):
+            InputMacro("bad", (MacroStep("jump"),))
+
+    def test_batched_submission(self, mock_delay_helper):
+        """测试整体提交给批量执行器，延迟在执行时读取"""
+        mock_delay_helper.get_delay.return_value = 0.01
+        executor = BatchExecutor()
+        executor.window_offset = (10, 20)
+        runner = MacroRunner(executor, COORDINATES)
+
+        self.assertTrue(runner.run(MACRO))
+        self.assertEqual(len(executor.batches), 1)
+        self.assertEqual(executor.calls[0], ("click", (110, 220), True))
+        # 组合键按下后保持配置的按住时间再松开
+        self.assertEqual(
+            [step[:2] for step in executor.calls[2:7]],
+            [("key_down", "ctrl"), ("key_down", "a"), ("wait", 0.01), ("key_up", "a"), ("key_up", "ctrl")],
+        )
+        self.assertEqual([step[0] for step in executor.calls[7:]], ["move", "key"])
+        self.assertEqual(
+            mock_delay_helper.get_delay.call_args_list, [call("after_mail_button_click"), call("chord_hold")]
+        )
+
+        trace = runner.last_trace
+        self.assertTrue(trace.batched)
+        self.assertEqual([entry[1] for entry in trace.entries], ["click", "delay", "chord", "move", "key"])
+        self.assertGreaterEqual(trace.entries[1][4], 10)
+        self.assertIn("mail", trace.format())
+
+    def test_stepwise_fallback(self, mock_delay_helper):
+        """测试不支持批量的执行器逐步执行"""
+        mock_delay_helper.get_delay.return_value = 0.03
+        executor = StepwiseExecutor()
+        runner = MacroRunner(executor, COORDINATES)
+
+        self.assertTrue(runner.run(MACRO))
+        self.assertEqual(
+            executor.calls,
+            [("click", (100, 200)), ("chord", "ctrl", "a", 30.0), ("move", (2200, 70)), ("key", "esc")],
+        )
+        mock_delay_helper.sleep.assert_called_once_with("after_mail_button_click")
+        self.assertFalse(runner.last_trace.batched)
+
+    def test_interrupted_on_stop(self, mock_delay_helper):
+        """测试停止时中断，轨迹只包含完整执行的步骤"""
+        mock_delay_helper.get_delay.return_value = 0.0
+        # 逐步执行在按 esc 前中断；批量执行在组合键中途中断，组合键不计入轨迹
+        for executor, completed in ((StepwiseExecutor(), 4), (BatchExecutor(), 2)):
+            runner = MacroRunner(executor, COORDINATES, should_stop=lambda executor=executor: len(executor.calls) >= 3)
+
+            self.assertFalse(runner.run(MACRO))
+            trace = runner.last_trace
+            self.assertTrue(trace.interrupted)
+            self.assertEqual(len(trace.entries), completed)
+            self.assertIn("已中断", trace.format())
+
+    def test_chord_hold(self, mock_delay_helper):
+        """测试组合键按住时间计入宏的延迟，配置中没有该项时使用默认值"""
+        self.assertEqual(delay_operations(MACRO), ("after_mail_button_click", "chord_hold"))
+        self.assertEqual(delay_steps(MACRO, MACRO).count("chord_hold"), 2)
+
+        mock_delay_helper.get_delay.return_value = 0.05
+        self.assertEqual(chord_hold_ms(), 50)
+        mock_delay_helper.get_delay.side_effect = ValueError("未找到对应操作: chord_hold")
+        self.assertEqual(chord_hold_ms(), 30)
+
+    def test_recompile_on_offset_change(self, mock_delay_helper):
+        """测试窗口偏移变化后重新编译"""
+        executor = StepwiseExecutor()
+        runner = MacroRunner(executor, COORDINATES)
+        first = runner.compile(MACRO)
+        self.assertIs(runner.compile(MACRO), first)
+        executor.window_offset = (5, 5)
+        self.assertIsNot(runner.compile(MACRO), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+低延迟动作执行器单元测试
+"""
+import time
+import unittest
+from unittest.mock import MagicMock, call, patch
+
+from src.core.exceptions import ActionExecutionException
+from src.infrastructure.action_executor import (
+    ActionExecutorFactory,
+    ActionPacing,
+    InputStep,
+    LowLatencyActionExecutor,
+    MockActionExecutor,
+    PyAutoGUIActionExecutor,
+)
+
+
+class TestLowLatencyActionExecutor(unittest.TestCase):
+    """低延迟动作执行器测试类"""
+
+    def setUp(self):
+        self.executor = LowLatencyActionExecutor(pacing=ActionPacing(click=0.02, key_down=0.0, key_up=0.0))
+
+    @patch("pyautogui.keyUp")
+    @patch("pyautogui.keyDown")
+    def test_multi_key_press_without_global_pause(self, mock_key_down, mock_key_up):
+        """测试组合键按配置停顿，不使用全局停顿"""
+        start = time.perf_counter()
+        self.executor.multi_key_press("alt", "d")
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(mock_key_down.call_args_list, [call("alt", _pause=False), call("d", _pause=False)])
+        self.assertEqual(mock_key_up.call_args_list, [call("alt", _pause=False), call("d", _pause=False)])
+        self.assertLess(elapsed, 0.05)
+
+    @patch("pyautogui.press")
+    @patch("pyautogui.click")
+    @patch("pyautogui.moveTo")
+    def test_batch_pacing_and_budget(self, mock_move_to, mock_click, mock_press):
+        """测试批量输入的停顿和耗时预算"""
+        self.executor.set_window_offset(10, 20)
+        start = time.perf_counter()
+        self.executor.execute_batch(
+            [
+                InputStep("click", (100, 100)),
+                InputStep("wait", 0.03),
+                InputStep("key", "esc", pause=0.01),
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+        mock_move_to.assert_called_once_with(110, 120, _pause=False)
+        mock_press.assert_called_once_with("esc", _pause=False)
+        self.assertGreaterEqual(elapsed, 0.06)
+
+        report = self.executor.latency_report()
+        self.assertEqual(report["click"]["count"], 1)
+        self.assertAlmostEqual(report["click"]["pause_ms"], 20)
+        self.assertGreaterEqual(report["click"]["paced_ms"], 20)
+        self.assertAlmostEqual(report["key"]["pause_ms"], 10)
+        self.assertGreaterEqual(report["wait"]["paced_ms"], 30)
+        self.assertIn("节省", self.executor.format_latency_report())
+
+        self.executor.reset_latency_report()
+        self.assertEqual(self.executor.latency_report(), {})
+
+    @patch("pyautogui.moveTo")
+    def test_batch_absolute_and_interrupt(self, mock_move_to):
+        """测试屏幕坐标不再加偏移，停止信号中断长等待"""
+        self.executor.set_window_offset(10, 20)
+        stopped = []
+        trace = []
+        start = time.perf_counter()
+        executed = self.executor.execute_batch(
+            [InputStep("move", (100, 100), absolute=True), InputStep("wait", 5.0), InputStep("move", (1, 1))],
+            should_stop=lambda: bool(stopped.append(1)) or len(stopped) > 2,
+            trace=trace,
+        )
+
+        mock_move_to.assert_called_once_with(100, 100, _pause=False)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(executed, 2)
+        self.assertEqual(len(trace), 2)
+
+    @patch("pyautogui.position")
+    @patch("pyautogui.click")
+    @patch("pyautogui.moveTo")
+    def test_cursor_tracking(self, mock_move_to, mock_click, mock_position):
+        """测试光标已在目标位置时跳过移动，用户移动鼠标后照常移动"""
+        mock_position.return_value = (100, 100)
+        self.executor.click_position((100, 100), pause=0)
+        self.executor.click_position((100, 100), pause=0)
+        self.assertEqual(mock_move_to.call_count, 1)
+        self.assertEqual(mock_click.call_count, 2)
+
+        # 用户把鼠标移走了
+        mock_position.return_value = (5, 5)
+        self.executor.move_mouse((100, 100), pause=0)
+        self.assertEqual(mock_move_to.call_count, 2)
+        self.assertEqual(self.executor.cursor_stats(), {"moves": 2, "elided": 1, "invalidated": 1})
+        self.assertIn("跳过1次", self.executor.format_cursor_stats())
+
+        # 关闭跟踪后总是移动
+        executor = LowLatencyActionExecutor(track_cursor=False)
+        executor.move_mouse((100, 100), pause=0)
+        executor.move_mouse((100, 100), pause=0)
+        self.assertEqual(mock_move_to.call_count, 4)
+
+    def test_unknown_step(self):
+        """测试不支持的输入动作"""
+        with self.assertRaises(ActionExecutionException):
+            self.executor.execute_batch([InputStep("jump")])
+
+    def test_factory(self):
+        """测试工厂创建低延迟执行器"""
+        pacing = ActionPacing(click=0.0)
+        executor = ActionExecutorFactory.create_executor("low_latency", pacing=pacing)
+        self.assertIsInstance(executor, LowLatencyActionExecutor)
+        self.assertIs(executor.pacing, pacing)
+
+
+class TestChordAndText(unittest.TestCase):
+    """组合键和快速文本输入测试类"""
+
+    @patch("pyautogui.keyUp")
+    @patch("pyautogui.keyDown")
+    def test_chord_releases_in_reverse(self, mock_key_down, mock_key_up):
+        """测试组合键顺序按下、逆序松开，两种后端一致"""
+        executors = (PyAutoGUIActionExecutor(), LowLatencyActionExecutor(pacing=ActionPacing(key_down=0, key_up=0)))
+        for executor in executors:
+            mock_key_down.reset_mock()
+            mock_key_up.reset_mock()
+            start = time.perf_counter()
+            executor.chord(("ctrl", "a"), hold_ms=20)
+            self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+            self.assertEqual(mock_key_down.call_args_list, [call("ctrl", _pause=False), call("a", _pause=False)])
+            self.assertEqual(mock_key_up.call_args_list, [call("a", _pause=False), call("ctrl", _pause=False)])
+
+    @patch("pyautogui.keyUp")
+    @patch("pyautogui.keyDown")
+    def test_chord_releases_keys_on_error(self, mock_key_down, mock_key_up):
+        """测试按下失败时松开已按下的键"""
+        mock_key_down.side_effect = [None, RuntimeError("按键失败")]
+        with self.assertRaises(ActionExecutionException):
+            PyAutoGUIActionExecutor().chord(("alt", "d"))
+        mock_key_up.assert_called_once_with("alt", _pause=False)
+
+    @patch("pyautogui.keyUp")
+    @patch("pyautogui.keyDown")
+    @patch("pyautogui.typewrite")
+    def test_enter_text_modes(self, mock_typewrite, mock_key_down, mock_key_up):
+        """测试短文本逐字输入，长文本通过剪贴板粘贴"""
+        executor = PyAutoGUIActionExecutor()
+        clipboard = MagicMock()
+        with patch("src.infrastructure.action_executor.win32clipboard", clipboard):
+            executor.enter_text("1")
+            mock_typewrite.assert_called_once_with("1", interval=executor.TEXT_INTERVAL, _pause=False)
+
+            executor.enter_text("12345678")
+            clipboard.SetClipboardText.assert_called_once_with("12345678", clipboard.CF_UNICODETEXT)
+            self.assertEqual(mock_key_down.call_args_list, [call("ctrl", _pause=False), call("v", _pause=False)])
+
+        # 没有剪贴板时退化为逐字输入
+        with patch("src.infrastructure.action_executor.win32clipboard", None):
+            executor.enter_text("12345678", mode="paste")
+        self.assertEqual(mock_typewrite.call_count, 2)
+
+        with self.assertRaises(ValueError):
+            executor.enter_text("1", mode="voice")
+
+    def test_mock_executor_records(self):
+        """测试模拟执行器记录组合键和文本输入"""
+        executor = MockActionExecutor(log_actions=False)
+        executor.chord(("alt", "d"), hold_ms=10)
+        executor.enter_text("520", mode="paste")
+        self.assertEqual(
+            executor.get_actions(),
+            [
+                {"type": "chord", "keys": ["alt", "d"], "hold_ms": 10},
+                {"type": "text", "text": "520", "mode": "paste"},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+运行指标和性能HUD单元测试
+"""
+import sys
+import unittest
+
+from PyQt5.QtWidgets import QApplication
+
+from src.core.event_bus import event_bus
+from src.ui.hud import MetricsHud, sparkline_points
+from src.ui.overlay import TransparentOverlay
+from src.utils.metrics import Metric, MetricsAggregator, RingBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestMetricsAggregator(unittest.TestCase):
+    """指标聚合测试类"""
+
+    def test_ring_buffer_keeps_latest(self):
+        """测试环形缓冲区写满后覆盖最旧的样本"""
+        buffer = RingBuffer(3)
+        self.assertEqual((buffer.values(), buffer.last(), buffer.mean()), ([], 0.0, 0.0))
+        for value in (1, 2, 3, 4, 5):
+            buffer.append(value)
+        self.assertEqual(buffer.values(), [3, 4, 5])
+        self.assertEqual((len(buffer), buffer.last(), buffer.mean()), (3, 5, 4))
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+    def test_summary(self):
+        """测试滚动平均只统计缓冲区内的样本，累计值按运行时长折算为每小时速率"""
+        clock = FakeClock()
+        metrics = MetricsAggregator(capacity=2, clock=clock)
+        metrics.record_many({Metric.CYCLE_MS: 100, Metric.BUYS: 1})
+        metrics.record(Metric.CYCLE_MS, 200)
+        metrics.record(Metric.CYCLE_MS, 400)
+        metrics.record(Metric.BUYS, 1)
+        clock.now = 1800
+
+        cycle = metrics.summary(Metric.CYCLE_MS)
+        self.assertEqual((cycle.last, cycle.mean, cycle.count, cycle.total), (400, 300, 3, 700))
+        self.assertEqual(cycle.recent, (200, 400))
+        self.assertEqual(metrics.summary(Metric.BUYS).per_hour, 4)
+        self.assertIsNone(metrics.summary(Metric.PRICE))
+        self.assertEqual(set(metrics.snapshot()), {Metric.CYCLE_MS, Metric.BUYS})
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_sparkline_points(self):
+        """测试折线图点位：最新样本在最右侧，数值越大越靠上"""
+        self.assertEqual(sparkline_points([], 100, 20), [])
+        self.assertEqual(sparkline_points([5], 100, 20), [(100, 10)])
+        self.assertEqual(sparkline_points([1, 3, 2], 100, 20), [(0, 20), (50, 0), (100, 10)])
+
+
+class TestMetricsHud(unittest.TestCase):
+    """性能HUD测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        event_bus.metrics.reset()
+        self.overlay = TransparentOverlay()
+
+    def tearDown(self):
+        self.overlay.close()
+        event_bus.metrics.reset()
+
+    def test_format_lines(self):
+        """测试没有数据和有数据时的HUD文本"""
+        self.assertEqual(
+            MetricsHud.format_lines({}),
+            ("周期 0ms | 截图 0ms | OCR 0ms", "购买 0.0/时 | 盈利 0/时 | 失败 0"),
+        )
+
+    def test_metrics_delivered_to_hud(self):
+        """测试指标样本按频率合并后投递到HUD，HUD隐藏时不更新"""
+        received = []
+        event_bus.metrics_updated.connect(received.append)
+        try:
+            event_bus.emit_metrics({Metric.CYCLE_MS: 120, Metric.PRICE: 800})
+            event_bus.emit_metric(Metric.CYCLE_MS, 80)
+            event_bus.overlay_channel.flush()
+        finally:
+            event_bus.metrics_updated.disconnect(received.append)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0][Metric.CYCLE_MS].mean, 100)
+        self.assertEqual(self.overlay.hud._snapshot, {})
+
+        height = self.overlay.height()
+        self.overlay.set_hud_enabled(True)
+        self.assertEqual(self.overlay.hud._snapshot[Metric.PRICE].last, 800)
+        self.assertEqual(self.overlay.height(), height + self.overlay.hud.height())
+        self.overlay.hud.grab()
+        self.overlay.set_hud_enabled(False)
+        self.assertEqual(self.overlay.height(), height)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+OCR字段配置单元测试
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.config.coordinates import CoordinateConfig
+from src.config.ocr_profiles import DEFAULT_OCR_PROFILES, OCRProfile, OCRProfiles
+
+
+class TestOCRProfiles(unittest.TestCase):
+    """OCR字段配置测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "ocr_profiles.yaml")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, text: str) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_defaults_per_resolution(self):
+        """测试按分辨率合并默认配置，同一分辨率只编译一次"""
+        profiles = OCRProfiles.compile(2560, 1440, self.path)
+        self.assertEqual(set(profiles), set(DEFAULT_OCR_PROFILES))
+        self.assertIs(OCRProfiles.compile(2560, 1440, self.path), profiles)
+        self.assertEqual(
+            (profiles["min_sell_price"].font, profiles["min_sell_price"].binarize, profiles["min_sell_price"].thresh),
+            ("w", True, 50),
+        )
+        self.assertEqual(profiles["rolling_price"].thresh, 127)
+
+        profiles = OCRProfiles.compile(1920, 1080, self.path)
+        self.assertEqual(
+            (profiles["min_sell_price"].font, profiles["min_sell_price"].binarize, profiles["min_sell_price"].thresh),
+            ("g", False, 50),
+        )
+        self.assertEqual(profiles["min_sell_price_count"].font, "c")
+        self.assertEqual(profiles["rolling_price"].thresh, 80)
+
+    def test_overrides_from_file(self):
+        """测试覆盖文件按字段修改参数和增加字段，文件修改后重新编译"""
+        self._write(
+            "min_sell_price:\n"
+            "  thresh: 60\n"
+            "  resolutions:\n"
+            "    1920x1080: {font: w}\n"
+            "sell_count:\n"
+            "  area: rolling_mode.sell_count_area\n"
+            "  max_digits: 4\n"
+        )
+        profiles = OCRProfiles.compile(1920, 1080, self.path)
+        self.assertEqual((profiles["min_sell_price"].font, profiles["min_sell_price"].thresh), ("w", 60))
+        self.assertFalse(profiles["min_sell_price"].binarize)
+        self.assertEqual(profiles["sell_count"].max_digits, 4)
+        area = OCRProfiles.resolve_area(CoordinateConfig.compile(1920, 1080).screen, profiles["sell_count"])
+        self.assertEqual(area, CoordinateConfig.compile(1920, 1080).screen.rolling_mode.sell_count_area)
+
+        self._write("min_sell_price:\n  thresh: 70\n")
+        self.assertEqual(OCRProfiles.compile(1920, 1080, self.path)["min_sell_price"].thresh, 70)
+
+    def test_invalid_override_uses_default(self):
+        """测试无效的覆盖配置被忽略"""
+        self._write(
+            "balance:\n  thresh: 300\n"
+            "expected_revenue:\n  area: rolling_mode.enter_storage\n"
+            "unknown:\n  font: w\n"
+        )
+        profiles = OCRProfiles.compile(2560, 1440, self.path)
+        self.assertEqual(profiles["balance"].thresh, 100)
+        self.assertEqual(profiles["expected_revenue"].area, "rolling_mode.expected_revenue_area")
+        self.assertNotIn("unknown", profiles)
+
+    def test_accepts(self):
+        """测试位数和取值范围校验"""
+        profile = OCRProfile("price", "rolling_mode.price_area", min_digits=2, max_digits=4, max_value=5000)
+        self.assertTrue(profile.accepts(520))
+        self.assertFalse(profile.accepts(7))
+        self.assertFalse(profile.accepts(52000))
+        self.assertFalse(profile.accepts(6000))
+        with self.assertRaises(ValueError):
+            OCRProfile("price", "rolling_mode.price_area", retries=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
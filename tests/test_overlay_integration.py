@@ -12,7 +12,7 @@ import pytest
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.core.event_bus import event_bus
+from src.core.event_bus import EventBus, event_bus
 
 
 def test_event_bus_functionality():
@@ -26,17 +26,22 @@ def test_event_bus_functionality():
         received_messages.append(text)
         print(f"✅ 收到消息: {text}")
 
-    # 连接信号
-    event_bus.overlay_text_updated.connect(on_text_received)
+    # 连接信号，投递时机由测试控制
+    scheduled = []
+    bus = EventBus(schedule=lambda delay, flush: scheduled.append(flush))
+    bus.overlay_text_updated.connect(on_text_received)
 
     # 发送测试消息
     test_messages = ["测试1", "测试2", "测试3"]
     for msg in test_messages:
-        event_bus.emit_overlay_text_updated(msg)
+        bus.emit_overlay_text_updated(msg)
+
+    # 连续发送的消息只安排一次投递，只投递最新一条
+    assert len(scheduled) == 1
+    scheduled[0]()
 
     # 验证
-    for msg in test_messages:
-        assert msg in received_messages, f"消息 '{msg}' 未收到"
+    assert received_messages == test_messages[-1:], f"应只收到最后一条消息，实际: {received_messages}"
 
     print("✅ 事件总线功能正常")
 
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+PriceStore 单元测试
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.storage.price_store import HourlyAggregate, PriceStore
+
+
+class TestPriceStore(unittest.TestCase):
+    """价格观测存储测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "price_history.db")
+        self.store = PriceStore(self.db_path, flush_interval=60)
+        self.base = PriceStore.hour_of(1_700_000_000)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_query_range_returns_sorted_observations(self):
+        """测试时间范围查询"""
+        self.store.record("rolling", "option_0", 500, "refresh", 12.5, timestamp=self.base + 20)
+        self.store.record("rolling", "option_0", 480, "buy", 10.0, timestamp=self.base + 10)
+        self.store.record("rolling", "option_1", 300, "refresh", 8.0, timestamp=self.base + 15)
+        self.store.record("rolling", "option_0", 510, "refresh", 9.0, timestamp=self.base + 4000)
+
+        observations = self.store.query_range(self.base, self.base + 3600, "option_0")
+        self.assertEqual([o.price for o in observations], [480, 500])
+        self.assertEqual(observations[0].decision, "buy")
+        self.assertEqual(observations[0].latency_ms, 10.0)
+
+        self.assertEqual(len(self.store.query_range(self.base, self.base + 3600)), 3)
+
+    def test_hourly_stats_incremental(self):
+        """测试增量小时统计"""
+        for i, price in enumerate([100, 300, 200, 400]):
+            self.store.record("hoarding", "convertible", price, "refresh", timestamp=self.base + i)
+        self.store.record("hoarding", "convertible", 1000, "refresh", timestamp=self.base + 3600)
+
+        stats = self.store.hourly_stats("convertible", self.base, self.base + 7200)
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats[0].count, 4)
+        self.assertEqual(stats[0].min, 100)
+        self.assertEqual(stats[0].max, 400)
+        self.assertEqual(stats[0].median, 250)
+        self.assertEqual(stats[1].count, 1)
+
+    def test_hourly_stats_loaded_from_database(self):
+        """测试重新打开后从数据库重建统计"""
+        self.store.record("rolling", "option_0", 500, "refresh", timestamp=self.base)
+        self.store.record("rolling", "option_0", 700, "refresh", timestamp=self.base + 1)
+        self.store.close()
+
+        self.store = PriceStore(self.db_path, flush_interval=60)
+        stats = self.store.hourly_stats("option_0", self.base, self.base + 3600)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0].count, 2)
+        self.assertEqual(stats[0].mean, 600)
+
+        # 重建后继续增量维护
+        self.store.record("rolling", "option_0", 900, "refresh", timestamp=self.base + 2)
+        stats = self.store.hourly_stats("option_0", self.base, self.base + 3600)
+        self.assertEqual(stats[0].count, 3)
+        self.assertEqual(stats[0].max, 900)
+
+    def test_items(self):
+        """测试物品列表"""
+        self.store.record("rolling", "option_1", 1, "refresh", timestamp=self.base)
+        self.store.record("rolling", "option_0", 1, "refresh", timestamp=self.base)
+        self.assertEqual(self.store.items(), ["option_0", "option_1"])
+
+
+class TestHourlyAggregate(unittest.TestCase):
+    """小时统计测试类"""
+
+    def test_percentile(self):
+        """测试分位数"""
+        aggregate = HourlyAggregate()
+        for price in range(1, 11):
+            aggregate.add(price)
+        self.assertEqual(aggregate.percentile(0), 1)
+        self.assertEqual(aggregate.percentile(100), 10)
+        self.assertAlmostEqual(aggregate.percentile(50), 5.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+SpanProfiler 单元测试
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.utils.profiler import LatencyHistogram, SpanProfiler
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """对数直方图测试类"""
+
+    def test_percentiles_within_relative_error(self):
+        """测试分位数相对误差"""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.min_us, 1000)
+        self.assertEqual(histogram.max_us, 1_000_000)
+        for q, expected in ((50, 500), (95, 950), (99, 990)):
+            self.assertAlmostEqual(histogram.percentile(q), expected, delta=expected / 64)
+
+    def test_small_values_are_exact(self):
+        """测试小值精确记录"""
+        histogram = LatencyHistogram()
+        histogram.record(0.000005)
+        histogram.record(0.000100)
+        self.assertEqual(histogram.percentile(50), 0.005)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+    def test_empty(self):
+        """测试空直方图"""
+        self.assertEqual(LatencyHistogram().to_dict()["p99_ms"], 0.0)
+
+
+class TestSpanProfiler(unittest.TestCase):
+    """分步耗时剖析器测试类"""
+
+    def setUp(self):
+        self.profiler = SpanProfiler()
+
+    def test_span_and_decorator_record_histograms(self):
+        """测试上下文管理器和装饰器"""
+
+        @self.profiler.profiled("action.click_position")
+        def click():
+            return "clicked"
+
+        with self.profiler.span("capture.region"):
+            pass
+        self.assertEqual(click(), "clicked")
+        self.assertEqual(click(), "clicked")
+
+        stats = self.profiler.stats()
+        self.assertEqual(stats["capture.region"]["count"], 1)
+        self.assertEqual(stats["action.click_position"]["count"], 2)
+
+    def test_cycle_breakdown_counts_top_level_spans_only(self):
+        """测试每轮分解只统计最外层span"""
+        self.profiler.begin_cycle()
+        with self.profiler.span("ocr.detect_template"):
+            with self.profiler.span("ocr.find_template"):
+                time.sleep(0.01)
+        with self.profiler.span("delay.after_buy"):
+            time.sleep(0.02)
+        breakdown = dict(self.profiler.end_cycle())
+
+        self.assertEqual(set(breakdown) - {SpanProfiler.OTHER}, {"ocr", "delay"})
+        self.assertGreaterEqual(breakdown["delay"], 20)
+        self.assertLess(breakdown["ocr"], breakdown["delay"])
+        self.assertEqual(self.profiler.stats()["ocr.find_template"]["count"], 1)
+        self.assertEqual(self.profiler.stats()["cycle"]["count"], 1)
+        self.assertTrue(self.profiler.format_breakdown().startswith("上轮 "))
+
+    def test_disabled_profiler_records_nothing(self):
+        """测试关闭后不记录"""
+        self.profiler.enabled = False
+        with self.profiler.span("capture.region"):
+            pass
+        self.assertEqual(self.profiler.stats(), {})
+
+    def test_export_json(self):
+        """测试导出JSON"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with self.profiler.span("capture.region"):
+                pass
+            path = os.path.join(temp_dir, "profile.json")
+            self.profiler.export_json(path)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.assertIn("p95_ms", data["steps"]["capture.region"])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
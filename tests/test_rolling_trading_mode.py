@@ -7,12 +7,14 @@
 import os
 import sys
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.config.coordinates import CoordinateGroup
 from src.config.trading_config import TradingConfig
-from src.services.trading_modes import RollingTradingMode
+from src.core.exceptions import DeadlineExceededException, OperationCancelledException
+from src.services.trading_modes import RollingCycleContext, RollingState, RollingTradingMode
 
 
 class TestRollingTradingMode(unittest.TestCase):
@@ -23,6 +25,8 @@ class TestRollingTradingMode(unittest.TestCase):
         # 创建模拟的依赖对象
         self.mock_detector = Mock()
         self.mock_action_executor = Mock()
+        # 输入宏按执行器的窗口偏移编译坐标
+        self.mock_action_executor.window_offset = (0, 0)
 
         # 创建滚仓交易模式实例
         self.trading_mode = RollingTradingMode(self.mock_detector, self.mock_action_executor)
@@ -32,9 +36,27 @@ class TestRollingTradingMode(unittest.TestCase):
         self.test_config.rolling_option = 0
         self.test_config.min_sell_price = 500  # 全局最低卖价
         self.test_config.rolling_options = [
-            {"buy_price": 520, "min_buy_price": 300, "buy_count": 4980, "fast_sell_threshold": 100000, "min_sell_price": 528},
-            {"buy_price": 450, "min_buy_price": 270, "buy_count": 4980, "fast_sell_threshold": 0, "min_sell_price": 450},
-            {"buy_price": 1700, "min_buy_price": 700, "buy_count": 1740, "fast_sell_threshold": 500000, "min_sell_price": 1700},
+            {
+                "buy_price": 520,
+                "min_buy_price": 300,
+                "buy_count": 4980,
+                "fast_sell_threshold": 100000,
+                "min_sell_price": 528,
+            },
+            {
+                "buy_price": 450,
+                "min_buy_price": 270,
+                "buy_count": 4980,
+                "fast_sell_threshold": 0,
+                "min_sell_price": 450,
+            },
+            {
+                "buy_price": 1700,
+                "min_buy_price": 700,
+                "buy_count": 1740,
+                "fast_sell_threshold": 500000,
+                "min_sell_price": 1700,
+            },
         ]
 
         # 初始化交易模式
@@ -109,20 +131,62 @@ class TestRollingTradingMode(unittest.TestCase):
         min_sell_price = self.trading_mode._get_min_sell_price()
         self.assertEqual(min_sell_price, 1700, "应该返回第三个配装的最低卖价")
 
+    def test_state_timeouts_follow_delay_config(self):
+        """测试状态超时按状态内延迟的最大值计算，延迟变长后超时随之变长"""
+        with patch(
+            "src.services.trading_modes.delay_helper.get_delay",
+            side_effect=lambda operation, upper_bound=False: 10.0 if operation == "after_buy" else 0.0,
+        ):
+            self.trading_mode._update_state_timeouts()
+        specs = self.trading_mode.state_machine.specs
+        self.assertEqual(specs[RollingState.VERIFY].timeout, 20.0)
+        self.assertEqual(specs[RollingState.BUY].timeout, 5.0)
+        self.assertTrue(specs[RollingState.VERIFY].resumable)
+
+    def test_sell_cycle_reraises_cancellation(self):
+        """测试停止和状态超时不会被记为售卖失败"""
+        for exception in (OperationCancelledException("操作已取消"), DeadlineExceededException("超时")):
+            self.mock_detector.detect_sellable_item.side_effect = exception
+            with self.assertRaises(type(exception)):
+                self.trading_mode._execute_single_sell_cycle(0, 0.5)
+
+        self.mock_detector.detect_sellable_item.side_effect = ValueError("识别失败")
+        result = self.trading_mode._execute_single_sell_cycle(0, 0.5)
+        self.assertEqual(result, {"success": False, "message": "识别失败"})
+
+    @patch("src.services.trading_modes.delay_helper")
+    def test_resumed_verify_without_balance_change(self, mock_delay_helper):
+        """测试继续校验时余额未变化记为购买失败，不进入售卖"""
+        self.mock_detector.check_purchase_failure.return_value = False
+        self.mock_detector.detect_balance.return_value = 1000
+        self.trading_mode.last_balance = 1000
+        context = RollingCycleContext(option_config={}, target_price=0, min_price=0, cycle_start=0)
+        self.trading_mode._recover_on_resume(RollingState.VERIFY, context)
+
+        self.assertIsNone(self.trading_mode._state_verify(context))
+        self.assertEqual((self.trading_mode.buy_success_count, self.trading_mode.buy_failed_count), (0, 1))
+        self.mock_action_executor.press_key.assert_called_with("esc")
+
+    @patch("src.core.input_macro.delay_helper")
     @patch("src.services.trading_modes.delay_helper")
-    def test_set_sell_price_with_fast_sell_enabled_above_threshold(self, mock_delay_helper):
+    def test_set_sell_price_with_fast_sell_enabled_above_threshold(self, mock_delay_helper, mock_macro_delay_helper):
         """测试快速售卖逻辑 - 启用快速售卖且超过阈值"""
         # 设置模拟返回值
-        self.mock_detector.coordinates = {
-            "rolling_mode": {
-                "sell_num_left": (100, 200),
-                "sell_num_right": (300, 200),
-                "sell_price_text": (150, 250),
-                "min_sell_price_button": (200, 300),
+        self.mock_detector.coordinates = self.mock_detector.screen = CoordinateGroup(
+            {
+                "rolling_mode": {
+                    "sell_num_left": (100, 200),
+                    "sell_num_right": (300, 200),
+                    "sell_price_text": (150, 250),
+                    "min_sell_price_button": (200, 300),
+                    "btn_quick_sell_area": (250, 350),
+                    "fast_sell_price_button": (300, 400),
+                }
             }
-        }
+        )
         self.mock_detector.detect_min_sell_price.return_value = 150000
         self.mock_detector.detect_second_min_sell_price.return_value = 160000
+        self.mock_detector.detect_current_sell_price.return_value = 140000
         self.mock_detector.detect_min_sell_price_count.return_value = 200000  # 超过阈值100000
 
         # 设置当前配装为第一个（阈值100000）
@@ -132,28 +196,29 @@ class TestRollingTradingMode(unittest.TestCase):
         result = self.trading_mode._set_sell_price(0.5, 0, fast_sell=True)
 
         # 验证快速售卖逻辑被触发
-        self.mock_action_executor.click_position.assert_any_call(
-            self.mock_detector.coordinates["rolling_mode"]["sell_price_text"]
-        )
-        self.mock_action_executor.multi_key_press.assert_called_with("ctrl", "a")
-        self.mock_action_executor.type_text.assert_called()
+        self.mock_action_executor.click_position.assert_any_call((150, 250), right_click=False)
+        self.mock_action_executor.chord.assert_called_with(("ctrl", "a"), hold_ms=ANY)
+        self.mock_action_executor.enter_text.assert_called_with("1")
+        self.mock_action_executor.click_position.assert_any_call((300, 400), right_click=False)
 
-        # 验证返回的最低售卖价格
-        expected_price = 150000 - (160000 - 150000)  # 140000
+        # 验证返回点击价格柱子后识别的售卖价格
+        expected_price = 140000
         self.assertEqual(result, expected_price, "应该返回计算后的快速售卖价格")
 
     @patch("src.services.trading_modes.delay_helper")
     def test_set_sell_price_with_fast_sell_enabled_below_threshold(self, mock_delay_helper):
         """测试快速售卖逻辑 - 启用快速售卖但未超过阈值"""
         # 设置模拟返回值
-        self.mock_detector.coordinates = {
-            "rolling_mode": {
-                "sell_num_left": (100, 200),
-                "sell_num_right": (300, 200),
-                "sell_price_text": (150, 250),
-                "min_sell_price_button": (200, 300),
+        self.mock_detector.coordinates = self.mock_detector.screen = CoordinateGroup(
+            {
+                "rolling_mode": {
+                    "sell_num_left": (100, 200),
+                    "sell_num_right": (300, 200),
+                    "sell_price_text": (150, 250),
+                    "min_sell_price_button": (200, 300),
+                }
             }
-        }
+        )
         self.mock_detector.detect_min_sell_price.return_value = 150000
         self.mock_detector.detect_second_min_sell_price.return_value = 160000
         self.mock_detector.detect_min_sell_price_count.return_value = 50000  # 低于阈值100000
@@ -170,25 +235,31 @@ class TestRollingTradingMode(unittest.TestCase):
         )
 
         # 验证没有触发快速售卖的文本输入
-        self.mock_action_executor.type_text.assert_not_called()
+        self.mock_action_executor.enter_text.assert_not_called()
 
         # 验证返回的最低售卖价格
         self.assertEqual(result, 150000, "应该返回检测到的最低售卖价格")
 
+    @patch("src.core.input_macro.delay_helper")
     @patch("src.services.trading_modes.delay_helper")
-    def test_set_sell_price_with_threshold_zero_always_fast_sell(self, mock_delay_helper):
+    def test_set_sell_price_with_threshold_zero_always_fast_sell(self, mock_delay_helper, mock_macro_delay_helper):
         """测试阈值为0时总是启用快速售卖的边界条件"""
         # 设置模拟返回值
-        self.mock_detector.coordinates = {
-            "rolling_mode": {
-                "sell_num_left": (100, 200),
-                "sell_num_right": (300, 200),
-                "sell_price_text": (150, 250),
-                "min_sell_price_button": (200, 300),
+        self.mock_detector.coordinates = self.mock_detector.screen = CoordinateGroup(
+            {
+                "rolling_mode": {
+                    "sell_num_left": (100, 200),
+                    "sell_num_right": (300, 200),
+                    "sell_price_text": (150, 250),
+                    "min_sell_price_button": (200, 300),
+                    "btn_quick_sell_area": (250, 350),
+                    "fast_sell_price_button": (300, 400),
+                }
             }
-        }
+        )
         self.mock_detector.detect_min_sell_price.return_value = 150000
         self.mock_detector.detect_second_min_sell_price.return_value = 160000
+        self.mock_detector.detect_current_sell_price.return_value = 140000
         self.mock_detector.detect_min_sell_price_count.return_value = 1  # 任意小值
 
         # 设置当前配装为第二个（阈值为0）
@@ -198,28 +269,29 @@ class TestRollingTradingMode(unittest.TestCase):
         result = self.trading_mode._set_sell_price(0.5, 0, fast_sell=True)
 
         # 验证快速售卖逻辑被触发（因为阈值为0）
-        self.mock_action_executor.click_position.assert_any_call(
-            self.mock_detector.coordinates["rolling_mode"]["sell_price_text"]
-        )
-        self.mock_action_executor.multi_key_press.assert_called_with("ctrl", "a")
-        self.mock_action_executor.type_text.assert_called()
+        self.mock_action_executor.click_position.assert_any_call((150, 250), right_click=False)
+        self.mock_action_executor.chord.assert_called_with(("ctrl", "a"), hold_ms=ANY)
+        self.mock_action_executor.enter_text.assert_called_with("1")
+        self.mock_action_executor.click_position.assert_any_call((300, 400), right_click=False)
 
-        # 验证返回的最低售卖价格
-        expected_price = 150000 - (160000 - 150000)  # 140000
+        # 验证返回点击价格柱子后识别的售卖价格
+        expected_price = 140000
         self.assertEqual(result, expected_price, "阈值为0时应该总是启用快速售卖")
 
     @patch("src.services.trading_modes.delay_helper")
     def test_set_sell_price_with_fast_sell_disabled(self, mock_delay_helper):
         """测试快速售卖功能被禁用时的逻辑"""
         # 设置模拟返回值
-        self.mock_detector.coordinates = {
-            "rolling_mode": {
-                "sell_num_left": (100, 200),
-                "sell_num_right": (300, 200),
-                "sell_price_text": (150, 250),
-                "min_sell_price_button": (200, 300),
+        self.mock_detector.coordinates = self.mock_detector.screen = CoordinateGroup(
+            {
+                "rolling_mode": {
+                    "sell_num_left": (100, 200),
+                    "sell_num_right": (300, 200),
+                    "sell_price_text": (150, 250),
+                    "min_sell_price_button": (200, 300),
+                }
             }
-        }
+        )
         self.mock_detector.detect_min_sell_price.return_value = 150000
         self.mock_detector.detect_second_min_sell_price.return_value = 160000
         self.mock_detector.detect_min_sell_price_count.return_value = 200000  # 超过阈值
@@ -236,7 +308,7 @@ class TestRollingTradingMode(unittest.TestCase):
         )
 
         # 验证没有触发快速售卖的文本输入
-        self.mock_action_executor.type_text.assert_not_called()
+        self.mock_action_executor.enter_text.assert_not_called()
 
         # 验证返回的最低售卖价格
         self.assertEqual(result, 150000, "禁用快速售卖时应该返回检测到的最低售卖价格")
@@ -245,14 +317,16 @@ class TestRollingTradingMode(unittest.TestCase):
     def test_set_sell_price_with_zero_min_price(self, mock_delay_helper):
         """测试最低售卖价格为0时的边界条件"""
         # 设置模拟返回值
-        self.mock_detector.coordinates = {
-            "rolling_mode": {
-                "sell_num_left": (100, 200),
-                "sell_num_right": (300, 200),
-                "sell_price_text": (150, 250),
-                "min_sell_price_button": (200, 300),
+        self.mock_detector.coordinates = self.mock_detector.screen = CoordinateGroup(
+            {
+                "rolling_mode": {
+                    "sell_num_left": (100, 200),
+                    "sell_num_right": (300, 200),
+                    "sell_price_text": (150, 250),
+                    "min_sell_price_button": (200, 300),
+                }
             }
-        }
+        )
         self.mock_detector.detect_min_sell_price.return_value = 0  # 最低价格为0
         self.mock_detector.detect_second_min_sell_price.return_value = 10000
         self.mock_detector.detect_min_sell_price_count.return_value = 200000
@@ -270,7 +344,7 @@ class TestRollingTradingMode(unittest.TestCase):
         )
 
         # 验证没有触发快速售卖的文本输入
-        self.mock_action_executor.type_text.assert_not_called()
+        self.mock_action_executor.enter_text.assert_not_called()
 
         # 验证返回的最低售卖价格
         self.assertEqual(result, 0, "最低价格为0时应该返回0")
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时剖析单元测试
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.utils.startup_profiler import StartupProfiler, format_startup_report
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """启动耗时剖析测试类"""
+
+    def test_stages_and_marks(self):
+        """测试阶段耗时和时间点相对于剖析器创建"""
+        clock = FakeClock()
+        profiler = StartupProfiler(clock)
+        clock.now = 0.1
+        with profiler.stage("main_window"):
+            clock.now = 0.25
+        clock.now = 0.3
+        self.assertAlmostEqual(profiler.mark("ui_ready"), 0.3)
+        clock.now = 0.5
+        profiler.mark("ui_ready")
+
+        report = profiler.report()
+        self.assertAlmostEqual(report["marks_ms"]["ui_ready"], 300)
+        stage = report["stages"][0]
+        self.assertEqual(stage["name"], "main_window")
+        self.assertAlmostEqual(stage["start_ms"], 100)
+        self.assertAlmostEqual(stage["duration_ms"], 150)
+        self.assertIn("main_window: 150ms", format_startup_report(report))
+
+        profiler.reset()
+        self.assertEqual(profiler.report()["stages"], [])
+
+    def test_import_hook(self):
+        """测试导入钩子记录首次导入的模块，自身耗时扣除子模块"""
+        temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(temp_dir, "startup_child_mod.py"), "w", encoding="utf-8") as f:
+            f.write("VALUE = 1\n")
+        with open(os.path.join(temp_dir, "startup_parent_mod.py"), "w", encoding="utf-8") as f:
+            f.write("import startup_child_mod\n")
+        sys.path.insert(0, temp_dir)
+        profiler = StartupProfiler()
+        profiler.install_import_hook()
+        try:
+            import startup_parent_mod
+
+            self.assertEqual(startup_parent_mod.startup_child_mod.VALUE, 1)
+        finally:
+            profiler.uninstall_import_hook()
+            sys.path.remove(temp_dir)
+            sys.modules.pop("startup_parent_mod", None)
+            sys.modules.pop("startup_child_mod", None)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        imports = {item["module"]: item for item in profiler.report(top=100)["imports"]}
+        self.assertIn("startup_parent_mod", imports)
+        self.assertIn("startup_child_mod", imports)
+        parent = imports["startup_parent_mod"]
+        self.assertLessEqual(parent["self_ms"], parent["total_ms"])
+        self.assertGreaterEqual(parent["total_ms"], imports["startup_child_mod"]["total_ms"])
+
+    def test_adapter_import_is_light(self):
+        """测试导入界面适配器时不加载截图、OCR和输入相关的库"""
+        code = (
+            "import sys\n"
+            "import src.ui.adapter\n"
+            "heavy = [name for name in ('numpy', 'cv2', 'pyautogui', 'win32gui') if name in sys.modules]\n"
+            "print(','.join(heavy))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        completed = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
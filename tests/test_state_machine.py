@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+交易流程状态机单元测试
+"""
+import time
+import unittest
+from enum import Enum
+
+from src.core.cancellation import CancellationToken
+from src.core.exceptions import DeadlineExceededException
+from src.core.state_machine import StateFailure, StateMachine, StateSpec
+
+
+class Step(Enum):
+    """测试用状态"""
+
+    START = "start"
+    WORK = "work"
+    FINISH = "finish"
+
+
+class TestStateMachine(unittest.TestCase):
+    """状态机测试类"""
+
+    def setUp(self):
+        self.visited = []
+        self.work_failures = 0
+        self.recovered = 0
+
+    def _start(self, context):
+        self.visited.append(Step.START)
+        return Step.WORK
+
+    def _work(self, context):
+        self.visited.append(Step.WORK)
+        if self.work_failures > 0:
+            self.work_failures -= 1
+            raise ValueError("识别失败")
+        context["done"] = True
+        return Step.FINISH
+
+    def _finish(self, context):
+        self.visited.append(Step.FINISH)
+        return None
+
+    def _recover(self, context):
+        self.recovered += 1
+
+    def _machine(self, retries=1, timeout=10.0):
+        return StateMachine(
+            "测试",
+            {
+                Step.START: StateSpec(self._start),
+                Step.WORK: StateSpec(self._work, timeout=timeout, retries=retries, recover=self._recover),
+                Step.FINISH: StateSpec(self._finish),
+            },
+        )
+
+    def test_run_and_stats(self):
+        """测试按状态运行并统计耗时和转移"""
+        machine = self._machine()
+        context = {}
+        machine.run(Step.START, context)
+
+        self.assertTrue(context["done"])
+        self.assertEqual(self.visited, [Step.START, Step.WORK, Step.FINISH])
+        self.assertIsNone(machine.current_state)
+        self.assertEqual(machine.transitions(), {"start->work": 1, "work->finish": 1, "finish->end": 1})
+        self.assertEqual(machine.stats()["work"]["count"], 1)
+        self.assertIn("work", machine.format_stats())
+
+    def test_retry_in_place(self):
+        """测试失败后执行恢复动作并原地重试，不重新执行前面的状态"""
+        machine = self._machine(retries=2)
+        self.work_failures = 2
+        machine.run(Step.START, {})
+
+        self.assertEqual(self.visited, [Step.START, Step.WORK, Step.WORK, Step.WORK, Step.FINISH])
+        self.assertEqual(self.recovered, 2)
+        stats = machine.stats()["work"]
+        self.assertEqual((stats["failures"], stats["retries"], stats["count"]), (2, 2, 3))
+
+    def test_failure_carries_state_and_context(self):
+        """测试重试用尽后抛出带状态和上下文的异常，可从该状态继续"""
+        machine = self._machine(retries=1)
+        self.work_failures = 3
+        context = {"progress": 1}
+        with self.assertRaises(StateFailure) as raised:
+            machine.run(Step.START, context)
+
+        self.assertEqual(raised.exception.state, Step.WORK)
+        self.assertIs(raised.exception.context, context)
+        self.assertIsInstance(raised.exception.cause, ValueError)
+        self.assertEqual(machine.current_state, Step.WORK)
+
+        # 从失败的状态继续
+        self.visited.clear()
+        self.work_failures = 0
+        machine.run(raised.exception.state, raised.exception.context)
+        self.assertEqual(self.visited, [Step.WORK, Step.FINISH])
+
+    def test_timeout_stops_retries(self):
+        """测试超时后不再重试"""
+        machine = self._machine(retries=5, timeout=0.0)
+        self.work_failures = 1
+        with self.assertRaises(StateFailure):
+            machine.run(Step.START, {})
+        self.assertEqual(self.recovered, 0)
+        self.assertEqual(machine.stats()["work"]["timeouts"], 1)
+
+    def test_timeout_interrupts_waiting_handler(self):
+        """测试卡在等待循环中的状态到期后被中断，不再重试"""
+        token = CancellationToken()
+
+        def stuck(context):
+            while True:
+                token.checked_sleep(0.01)
+
+        machine = StateMachine("测试", {Step.WORK: StateSpec(stuck, timeout=0.05, retries=3)}, token=token)
+        start = time.perf_counter()
+        with self.assertRaises(StateFailure) as raised:
+            machine.run(Step.WORK, {})
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIsInstance(raised.exception.cause, DeadlineExceededException)
+        stats = machine.stats()["work"]
+        self.assertEqual((stats["timeouts"], stats["retries"]), (1, 0))
+        # 离开状态后不再限制等待
+        self.assertIsNone(token.remaining())
+        token.checked_sleep(0.06)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+TradeLedger 单元测试
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.storage.trade_ledger import TradeLedger
+
+
+class TestTradeLedger(unittest.TestCase):
+    """交易盈亏账本测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "trade_ledger.db")
+        self.ledger = TradeLedger(self.db_path, flush_interval=60)
+        self.day1 = time.mktime((2025, 1, 1, 12, 0, 0, 0, 0, -1))
+        self.day2 = time.mktime((2025, 1, 2, 12, 0, 0, 0, 0, -1))
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_daily_pnl_grouped_by_day_and_option(self):
+        """测试按天和配装选项汇总"""
+        self.ledger.record_buy(1000, option=0, balance_before=5000, balance_after=4000, timestamp=self.day1)
+        self.ledger.record_sell(6, 100, 570, option=0, cycle_index=0, ratio=0.33, timestamp=self.day1)
+        self.ledger.record_sell(7, 100, 665, option=0, cycle_index=1, ratio=0.5, timestamp=self.day1)
+        self.ledger.record_mail(4000, 5235, option=0, timestamp=self.day1)
+        self.ledger.record_buy(800, option=1, timestamp=self.day1)
+        self.ledger.record_buy(900, option=0, timestamp=self.day2)
+
+        daily = self.ledger.daily_pnl()
+        self.assertEqual([(p.day, p.option) for p in daily], [("2025-01-01", 0), ("2025-01-01", 1), ("2025-01-02", 0)])
+        self.assertEqual(daily[0].buy_count, 1)
+        self.assertEqual(daily[0].sell_count, 200)
+        self.assertEqual(daily[0].revenue, 1235)
+        self.assertEqual(daily[0].mail_amount, 1235)
+        self.assertEqual(daily[0].profit, 235)
+        self.assertEqual(daily[1].profit, -800)
+
+        filtered = self.ledger.daily_pnl(start_day="2025-01-02", option=0)
+        self.assertEqual(len(filtered), 1)
+        self.assertEqual(filtered[0].cost, 900)
+
+    def test_total_pnl(self):
+        """测试累计盈亏"""
+        self.assertEqual(self.ledger.total_pnl(), (0, 0))
+        self.ledger.record_buy(1000, timestamp=self.day1)
+        self.ledger.record_sell(12, 100, 1140, timestamp=self.day1)
+        self.assertEqual(self.ledger.total_pnl(), (140, 100))
+
+    def test_import_sell_log(self):
+        """测试流式导入sell.log"""
+        log_path = os.path.join(self.temp_dir, "sell.log")
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("[2025-01-01 12:00:00] " + "===" * 30 + "\n")
+            f.write("[2025-01-01 12:00:00] 初始化成功，当前余额: 5000\n")
+            f.write("[2025-01-01 12:01:00] 购买成功, 总花费: 1000, 当前盈利: -1000\n")
+            f.write("[2025-01-01 12:02:00] 出售成功, 单价: 6, 数量: 100, 总价: 600, 预期收入: 570\n")
+            f.write("[2025-01-02 08:00:00] 出售成功, 单价: 7, 数量: 100, 总价: 700, 预期收入: 665\n")
+            f.write("broken line\n")
+
+        result = self.ledger.import_sell_log(log_path, option=2)
+        self.assertEqual((result.buys, result.sells, result.skipped), (1, 2, 3))
+
+        daily = self.ledger.daily_pnl()
+        self.assertEqual([(p.day, p.option) for p in daily], [("2025-01-01", 2), ("2025-01-02", 2)])
+        self.assertEqual(daily[0].profit, -430)
+        self.assertEqual(daily[1].revenue, 665)
+
+    def test_records_persist_across_reopen(self):
+        """测试重新打开后数据仍在"""
+        self.ledger.record_buy(1000, option=0, timestamp=self.day1)
+        self.ledger.close()
+
+        self.ledger = TradeLedger(self.db_path, flush_interval=60)
+        self.assertEqual(self.ledger.daily_pnl()[0].cost, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+TradeLogWriter 单元测试
+"""
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.storage.trade_log import TradeLogWriter
+
+
+class TestTradeLogWriter(unittest.TestCase):
+    """交易日志写入器测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "sell.log")
+        self.jsonl_path = os.path.join(self.temp_dir, "sell.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read_lines(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_write_is_buffered_until_flush(self):
+        """测试写入只入队，flush后才落盘"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60)
+        try:
+            writer.write("购买成功", event="buy", cost=100, profit=-100)
+            self.assertFalse(os.path.exists(self.log_path))
+
+            writer.flush()
+            lines = self._read_lines(self.log_path)
+            self.assertEqual(len(lines), 1)
+            self.assertTrue(lines[0].startswith("["))
+            self.assertTrue(lines[0].endswith(" 购买成功"))
+        finally:
+            writer.close()
+
+    def test_jsonl_contains_structured_fields(self):
+        """测试结构化日志字段"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60)
+        writer.write("出售成功", event="sell", price=500, count=100, revenue=48000)
+        writer.close()
+
+        records = [json.loads(line) for line in self._read_lines(self.jsonl_path)]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["event"], "sell")
+        self.assertEqual(records[0]["price"], 500)
+        self.assertEqual(records[0]["count"], 100)
+        self.assertEqual(records[0]["revenue"], 48000)
+        self.assertEqual(records[0]["message"], "出售成功")
+
+    def test_batch_threshold_triggers_background_flush(self):
+        """测试缓冲数量达到阈值时由后台线程落盘"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60, max_batch=3)
+        try:
+            for i in range(3):
+                writer.write(f"line {i}")
+            deadline = time.time() + 2
+            while time.time() < deadline:
+                if os.path.exists(self.log_path) and len(self._read_lines(self.log_path)) == 3:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(len(self._read_lines(self.log_path)), 3)
+        finally:
+            writer.close()
+
+    def test_flush_keeps_order_with_background_batch(self):
+        """测试后台线程取出的批次写入前，其他线程的 flush 不会先写入后面的记录"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60, max_batch=1)
+        entered = threading.Event()
+        release = threading.Event()
+        write_batch = writer._write_batch
+
+        def slow_write_batch(batch):
+            if threading.current_thread() is writer._thread and not entered.is_set():
+                entered.set()
+                release.wait(2)
+            write_batch(batch)
+
+        writer._write_batch = slow_write_batch
+        writer.write("first", index=0)
+        self.assertTrue(entered.wait(2))
+        writer.write("second", index=1)
+        flusher = threading.Thread(target=writer.flush)
+        flusher.start()
+        flusher.join(0.05)
+        release.set()
+        flusher.join(2)
+        writer.close()
+
+        indexes = [json.loads(line)["index"] for line in self._read_lines(self.jsonl_path)]
+        self.assertEqual(indexes, [0, 1])
+
+    def test_close_flushes_and_rejects_new_records(self):
+        """测试关闭时落盘，关闭后拒绝写入"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60)
+        writer.write("last")
+        writer.close()
+
+        self.assertEqual(len(self._read_lines(self.log_path)), 1)
+        self.assertFalse(writer.write("after close"))
+
+    def test_rotate_by_size(self):
+        """测试按大小轮转"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60, max_bytes=64)
+        try:
+            writer.write("a" * 50)
+            writer.flush()
+            writer.write("b" * 50)
+            writer.flush()
+        finally:
+            writer.close()
+
+        rotated = [name for name in os.listdir(self.temp_dir) if name.startswith("sell.") and name.endswith(".log")]
+        self.assertIn("sell.log", rotated)
+        self.assertEqual(len(rotated), 2)
+        self.assertTrue(self._read_lines(self.log_path)[0].endswith("b" * 50))
+
+    def test_rotate_by_day(self):
+        """测试跨天轮转"""
+        writer = TradeLogWriter(self.log_path, flush_interval=60, max_bytes=0)
+        try:
+            writer.write("yesterday")
+            writer.flush()
+            yesterday = datetime.date.today() - datetime.timedelta(days=1)
+            writer._current_day = yesterday
+            writer.write("today")
+            writer.flush()
+        finally:
+            writer.close()
+
+        rotated_path = os.path.join(self.temp_dir, f"sell.{yesterday.isoformat()}.log")
+        self.assertTrue(os.path.exists(rotated_path))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, f"sell.{yesterday.isoformat()}.jsonl")))
+        self.assertTrue(self._read_lines(self.log_path)[0].endswith("today"))
+
+    def test_get_writer_is_shared(self):
+        """测试相同路径共享写入器"""
+        writer = TradeLogWriter.get_writer(self.log_path)
+        try:
+            self.assertIs(writer, TradeLogWriter.get_writer(self.log_path))
+        finally:
+            TradeLogWriter.close_all()
+        self.assertTrue(writer.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
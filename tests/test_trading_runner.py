@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+交易循环单元测试
+"""
+import threading
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+from src.config.trading_config import TradingConfig, TradingMode
+from src.core.cancellation import stop_token
+from src.core.event_bus import EventBus
+from src.core.exceptions import TradingException
+from src.core.interfaces import MarketData
+from src.services.trading_runner import TradingRunner
+from src.utils.metrics import Metric
+
+
+class FakeTradingService:
+    """按脚本返回结果的交易服务"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.cycles = 0
+        self.stopped = threading.Event()
+        self.config = None
+
+    def initialize(self, config):
+        # 与交易模式一样，开始交易时复位停止令牌
+        stop_token.reset()
+        self.config = config
+
+    def prepare(self):
+        pass
+
+    def execute_cycle(self) -> bool:
+        self.cycles += 1
+        result = self.results.pop(0) if self.results else True
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_market_data(self):
+        return MarketData(current_price=1000 + self.cycles)
+
+    def stop(self):
+        self.stopped.set()
+
+
+class FakeConfigManager:
+    def __init__(self):
+        self.config = TradingConfig(trading_mode=TradingMode.ROLLING, rolling_loop_interval=1)
+
+    def load_config(self):
+        return self.config
+
+
+class TestTradingRunner(unittest.TestCase):
+    """交易循环测试类"""
+
+    def setUp(self):
+        self.bus = EventBus(schedule=lambda delay, flush: None)
+        patcher = patch("src.services.trading_runner.event_bus", self.bus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        export = patch.object(TradingRunner, "_export_profile")
+        export.start()
+        self.addCleanup(export.stop)
+        self.stopped = []
+        self.bus.trading_stopped.connect(lambda: self.stopped.append(True))
+
+    def test_runs_until_mode_stops(self):
+        """测试交易模式要求停止时结束循环，失败的周期计入失败次数"""
+        service = FakeTradingService([True, TradingException("ocr失败"), False])
+        runner = TradingRunner(service, FakeConfigManager())
+        runner.run()
+
+        self.assertEqual(service.cycles, 3)
+        self.assertTrue(service.stopped.is_set())
+        self.assertEqual(self.stopped, [True])
+        snapshot = self.bus.metrics.snapshot()
+        self.assertEqual(snapshot[Metric.CYCLE_MS].count, 2)
+        self.assertEqual(snapshot[Metric.PRICE].last, 1003)
+        self.assertEqual(snapshot[Metric.FAILURES].total, 1)
+        stats = runner.scheduler.stats()
+        self.assertEqual((stats["cycles"], stats["failures"]), (3, 1))
+
+    def test_max_cycles_and_config_override(self):
+        """测试达到周期数后停止，指定的配置快照不经过配置文件"""
+        service = FakeTradingService([])
+        manager = FakeConfigManager()
+        runner = TradingRunner(service, manager)
+        runner.set_config(replace(manager.config, trading_mode=TradingMode.HOARDING, hoarding_loop_interval=1))
+        runner.run(max_cycles=4)
+
+        self.assertEqual(service.cycles, 4)
+        self.assertEqual(service.config.trading_mode, TradingMode.HOARDING)
+        self.assertTrue(runner.scheduler.start_to_start)
+        self.assertFalse(runner.running)
+
+    def test_stop_from_other_thread(self):
+        """测试其他线程停止时唤醒循环间隔的等待"""
+        service = FakeTradingService([])
+        manager = FakeConfigManager()
+        runner = TradingRunner(service, manager)
+        runner.set_config(replace(manager.config, rolling_loop_interval=60_000))
+        thread = threading.Thread(target=runner.run)
+        thread.start()
+        while service.cycles == 0 and thread.is_alive():
+            thread.join(0.01)
+        runner.stop()
+        thread.join(2)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(service.cycles, 1)
+        self.assertEqual(self.stopped, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()